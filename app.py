@@ -3,25 +3,52 @@
 Complete Web version of Kan-guroo bot with text, audio, 3D character, and URL responses
 """
 
-import asyncio
 import time
 import os
 import json
-from flask import Flask, render_template, request, jsonify, send_file, send_from_directory
+import asyncio
+import re
+from flask import Flask, Response, render_template, request, jsonify, send_from_directory
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
 from gemini_service import GeminiService
 from elevenlabs_service import ElevenLabsService
 from performance_monitor import performance_monitor
-from config import GEMINI_API_KEY, ELEVENLABS_API_KEY
+from async_runtime import async_runtime
+from sentence_chunker import SentenceChunker
+from knowledge_store import knowledge_store
+from audio_store import audio_store
+from asset_server import asset_server, compress, negotiate_encoding
+from prometheus_metrics import prometheus_exporter, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from tracing import tracer, trace_id_from_header, new_trace_id
+from viseme_codec import encode_viseme_data, VISEME_FORMATS, FORMAT_FULL
+from single_flight import SingleFlight
+from response_cache import ResponseCache
+from audio_cache import AudioCache
+from config import (
+    GEMINI_API_KEY, ELEVENLABS_API_KEY, AUDIO_CACHE_DIR, FAQ_FASTPATH_ENABLED,
+    CHARACTER_MODEL_PATH, IMMUTABLE_CACHE_MAX_AGE, JSON_COMPRESSION_ENABLED, JSON_COMPRESSION_MIN_BYTES,
+    METRICS_ENABLED, SINGLE_FLIGHT_ENABLED
+)
 
-app = Flask(__name__)
+# Static files go through the asset server (precompressed, content-hashed)
+app = Flask(__name__, static_folder=None)
 CORS(app)
+app.jinja_env.globals['asset_url'] = asset_server.url_for
+
+# <sha256>.mp3 names from the TTS audio cache
+CONTENT_ADDRESSED_AUDIO = re.compile(r'^[0-9a-f]{64}\.mp3$')
 
 class WebKanGurooBot:
     def __init__(self):
         self.gemini_service = GeminiService()
         self.elevenlabs_service = None
         self.performance_monitor = performance_monitor
+        self.knowledge_store = knowledge_store
+        self.audio_store = audio_store
+        # Identical questions / answer texts in flight at the same time share one upstream call
+        self.gemini_flights = SingleFlight() if SINGLE_FLIGHT_ENABLED else None
+        self.tts_flights = SingleFlight() if SINGLE_FLIGHT_ENABLED else None
     
     def _get_elevenlabs_service(self):
         """Get ElevenLabs service, creating it if needed"""
@@ -29,61 +56,128 @@ class WebKanGurooBot:
             self.elevenlabs_service = ElevenLabsService()
         return self.elevenlabs_service
     
+    def upstream_connections(self):
+        """Connections in the ElevenLabs pool by state, for the /metrics gauge"""
+        if self.elevenlabs_service is None:
+            return None
+        return self.elevenlabs_service.get_pool_stats()
+    
+    def _answer_from_faq(self, user_message: str):
+        """Try the local FAQ fast path, returning a FaqAnswer or None"""
+        if not FAQ_FASTPATH_ENABLED:
+            return None
+        
+        lookup_start = time.perf_counter()
+        with tracer.span('faq_lookup') as span:
+            try:
+                answer = self.knowledge_store.current().faq_answerer.answer(user_message)
+            except Exception as e:
+                print(f"Error in FAQ fast path: {e}")
+                span.set_error(e)
+                return None
+            finally:
+                self.performance_monitor.record_stage('faq', (time.perf_counter() - lookup_start) * 1000)
+            span.set_attribute('hit', answer is not None)
+            return answer
+    
+    async def _generate_text_stream(self, user_message: str, served_by: dict):
+        """Yield answer text from the FAQ fast path or, failing that, from Gemini"""
+        faq_answer = self._answer_from_faq(user_message)
+        if faq_answer is not None:
+            served_by["path"] = "faq"
+            print(f"⚡ FAQ fast path: {faq_answer.entry_id} (confidence {faq_answer.confidence})")
+            yield faq_answer.text
+            return
+        
+        served_by["path"] = "gemini"
+        async for delta in self.gemini_service.generate_response_stream(user_message):
+            yield delta
+    
+    async def _generate_response(self, user_message: str):
+        """Gemini answer as (text, shared), joining an identical question already in flight
+        
+        Questions match on the normalized text and the knowledge version, like
+        the response cache; a follower gets the leader's answer or error.
+        """
+        key = None
+        if self.gemini_flights is not None:
+            key = ResponseCache.make_key(user_message, str(self.knowledge_store.current().version))
+        if key is None:
+            return await self.gemini_service.generate_response(user_message), False
+        return await self.gemini_flights.do(key, lambda: self.gemini_service.generate_response(user_message))
+    
+    async def _text_to_speech(self, text: str):
+        """(audio_file, viseme_data, shared), joining a synthesis of the same text already in flight
+        
+        Followers get the leader's audio file, so concurrent identical answers
+        produce one synthesis and one file.
+        """
+        elevenlabs_service = self._get_elevenlabs_service()
+        
+        async def synthesize():
+            audio_path = None
+            if elevenlabs_service.audio_cache is None:
+                # With the audio cache on, downloads go into the cache instead
+                _, audio_path = self.audio_store.new_file()
+            return await elevenlabs_service.text_to_speech_with_visemes(text, audio_path)
+        
+        if self.tts_flights is None:
+            return (*await synthesize(), False)
+        (audio_file, viseme_data), shared = await self.tts_flights.do(AudioCache.normalize_text(text), synthesize)
+        return audio_file, viseme_data, shared
+    
+    async def close(self):
+        """Release upstream connections held by the services"""
+        if self.elevenlabs_service is not None:
+            await self.elevenlabs_service.close_session()
+    
     def _find_relevant_urls(self, user_message: str) -> list:
-        """Find relevant URLs based on user message"""
-        try:
-            with open('faq_data.json', 'r', encoding='utf-8') as f:
-                faq_data = json.load(f)
-            
-            company_info = faq_data.get("company", {})
-            programs = company_info.get("programs", {})
-            
-            relevant_urls = []
-            user_message_lower = user_message.lower()
-            
-            # Check for specific program mentions
-            for program_type, program_list in programs.items():
-                for program in program_list:
-                    program_name_lower = program['name'].lower()
-                    
-                    # Check if user is asking about this specific program
-                    if any(keyword in user_message_lower for keyword in program_name_lower.split()):
-                        if 'url' in program:
-                            relevant_urls.append(program['url'])
-                    
-                    # Check for language course mentions
-                    if 'english' in user_message_lower and 'english' in program_name_lower:
-                        if 'url' in program:
-                            relevant_urls.append(program['url'])
-                    elif 'german' in user_message_lower and 'german' in program_name_lower:
-                        if 'url' in program:
-                            relevant_urls.append(program['url'])
-                    
-                    # Check for exchange program mentions
-                    if any(keyword in user_message_lower for keyword in ['exchange', 'high school', 'usa', 'europe']):
-                        if 'url' in program:
-                            relevant_urls.append(program['url'])
-            
-            # Remove duplicates
-            relevant_urls = list(set(relevant_urls))
-            return relevant_urls
-            
-        except Exception as e:
-            print(f"Error finding relevant URLs: {e}")
-            return []
+        """Find relevant URLs based on user message, best match first"""
+        lookup_start = time.perf_counter()
+        with tracer.span('url_lookup') as span:
+            try:
+                return self.knowledge_store.current().url_index.find(user_message)
+            except Exception as e:
+                print(f"Error finding relevant URLs: {e}")
+                span.set_error(e)
+                return []
+            finally:
+                self.performance_monitor.record_stage('url_lookup', (time.perf_counter() - lookup_start) * 1000)
+    
+    async def process_message(self, user_message: str, user_id: str = "web_user", trace_id: str = None):
+        """Process user message and return text, audio, and URLs
+        
+        The request is traced as one span tree under ``trace_id`` (a new ID
+        when not given), which is returned as ``trace_id`` in the result.
+        """
+        with tracer.span('process_message', trace_id=trace_id, user_id=user_id) as span:
+            result = await self._process_message(user_message, user_id, span)
+            result['trace_id'] = span.trace_id
+            return result
     
-    async def process_message(self, user_message: str, user_id: str = "web_user"):
-        """Process user message and return text, audio, and URLs"""
+    async def _process_message(self, user_message: str, user_id: str, span):
+        """process_message inside its root span"""
         start_time = time.time()
         request_id = self.performance_monitor.start_request(user_id)
         
         try:
-            # Step 1: Generate response with Gemini
-            print("🤖 Generating response with Gemini...")
+            # Step 1: Answer from the FAQ if confident, otherwise generate with Gemini
             gemini_start = time.time()
-            response_text = await self.gemini_service.generate_response(user_message)
-            gemini_time = (time.time() - gemini_start) * 1000
-            print(f"✅ Gemini completed in {gemini_time:.2f}ms")
+            faq_answer = self._answer_from_faq(user_message)
+            if faq_answer is not None:
+                served_by = "faq"
+                response_text = faq_answer.text
+                # Gemini wasn't called; the lookup is timed as the 'faq' stage
+                gemini_time = 0
+                print(f"⚡ FAQ fast path: {faq_answer.entry_id} (confidence {faq_answer.confidence}) "
+                      f"in {(time.time() - gemini_start) * 1000:.3f}ms")
+            else:
+                served_by = "gemini"
+                print("🤖 Generating response with Gemini...")
+                response_text, shared = await self._generate_response(user_message)
+                gemini_time = (time.time() - gemini_start) * 1000
+                span.set_attribute('gemini_shared', shared)
+                print(f"✅ Gemini completed in {gemini_time:.2f}ms{' (joined an identical request)' if shared else ''}")
             
             # Step 2: Find relevant URLs
             relevant_urls = self._find_relevant_urls(user_message)
@@ -98,10 +192,9 @@ class WebKanGurooBot:
             try:
                 print("🎤 Converting to speech...")
                 tts_start = time.time()
-                audio_path = f"temp_audio_{user_id}_{int(time.time())}.mp3"
-                elevenlabs_service = self._get_elevenlabs_service()
-                audio_file, viseme_data = await elevenlabs_service.text_to_speech_with_visemes(response_text, audio_path)
+                audio_file, viseme_data, shared = await self._text_to_speech(response_text)
                 tts_time = (time.time() - tts_start) * 1000
+                span.set_attribute('tts_shared', shared)
                 
                 if audio_file and os.path.exists(audio_file):
                     tts_success = True
@@ -111,38 +204,47 @@ class WebKanGurooBot:
                     
             except Exception as tts_error:
                 print(f"⚠️  TTS error: {tts_error}, continuing with text only")
+                self.performance_monitor.record_error('tts')
                 tts_time = 0
             
             # Step 4: Prepare response
             success = bool(response_text and response_text.strip())
             
             # Record performance metrics
+            total_time = (time.time() - start_time) * 1000
+            audio_seconds = (viseme_data or {}).get('audio_duration', 0) if tts_success else 0
             self.performance_monitor.record_metrics(
-                request_id, user_id, gemini_time, tts_time, success, len(response_text)
+                request_id, user_id, gemini_time, tts_time, success, len(response_text),
+                served_by=served_by, audio_seconds=audio_seconds, total_time=total_time
             )
             
             # Performance logging
-            total_time = (time.time() - start_time) * 1000
-            print(f"🚀 Total processing time: {total_time:.2f}ms")
+            span.set_attribute('served_by', served_by)
+            span.set_attribute('success', success)
+            print(f"🚀 Total processing time: {total_time:.2f}ms (trace {span.trace_id})")
             print(f"📊 Breakdown - Gemini: {gemini_time:.2f}ms, TTS: {tts_time:.2f}ms")
             
             return {
                 "success": success,
                 "response_text": response_text,
-                "audio_file": audio_file if tts_success else None,
+                "audio_file": os.path.basename(audio_file) if tts_success else None,
                 "viseme_data": viseme_data if tts_success else None,
                 "relevant_urls": relevant_urls,
+                "served_by": served_by,
                 "performance": {
                     "total_time": total_time,
                     "gemini_time": gemini_time,
-                    "tts_time": tts_time
+                    "tts_time": tts_time,
+                    "audio_seconds": audio_seconds
                 }
             }
             
         except Exception as e:
             print(f"Error in message processing pipeline: {e}")
+            span.set_error(e)
             self.performance_monitor.record_metrics(
-                request_id, user_id, 0, 0, False, 0, str(e)
+                request_id, user_id, 0, 0, False, 0, str(e),
+                total_time=(time.time() - start_time) * 1000
             )
             return {
                 "success": False,
@@ -153,9 +255,221 @@ class WebKanGurooBot:
                 "relevant_urls": []
             }
 
+    async def _synthesize_segment(self, text: str, index: int):
+        """Synthesize one streamed sentence, returning (audio_file, viseme_data, tts_time)"""
+        tts_start = time.time()
+        try:
+            with tracer.span('tts_segment', index=index) as span:
+                audio_file, viseme_data, shared = await self._text_to_speech(text)
+                span.set_attribute('shared', shared)
+        except Exception as tts_error:
+            print(f"⚠️  TTS error on segment {index}: {tts_error}")
+            self.performance_monitor.record_error('tts')
+            audio_file, viseme_data = None, None
+        return audio_file, viseme_data, (time.time() - tts_start) * 1000
+    
+    async def process_message_stream(self, user_message: str, user_id: str = "web_user", trace_id: str = None):
+        """Stream the response as events: text deltas, per-sentence audio, URLs.
+        
+        Gemini output is cut at sentence boundaries and every finished sentence
+        is sent to ElevenLabs straight away, so the first sentence can play
+        while the rest of the answer is still being generated. Audio events are
+        emitted in sentence order.
+        
+        Each step of this generator may run in a different context, so the root
+        span is only made current while the pipeline task and URL lookup start.
+        """
+        start_time = time.time()
+        span = tracer.start_span('process_message_stream', trace_id=trace_id, user_id=user_id)
+        request_id = self.performance_monitor.start_request(user_id)
+        events = asyncio.Queue()
+        segments = asyncio.Queue()
+        response_parts = []
+        served_by = {"path": None}
+        timings = {"gemini_time": 0, "tts_time": 0, "first_audio_time": None, "audio_seconds": 0}
+        segment_tasks = []
+        recorded = False
+        
+        def start_segment(sentence, index):
+            task = asyncio.create_task(self._synthesize_segment(sentence, index))
+            segment_tasks.append(task)
+            return task
+        
+        async def produce_text():
+            chunker = SentenceChunker()
+            index = 0
+            try:
+                async for delta in self._generate_text_stream(user_message, served_by):
+                    response_parts.append(delta)
+                    await events.put({"type": "text", "delta": delta})
+                    for sentence in chunker.feed(delta):
+                        await segments.put((index, sentence, start_segment(sentence, index)))
+                        index += 1
+                for sentence in chunker.flush():
+                    await segments.put((index, sentence, start_segment(sentence, index)))
+                    index += 1
+            finally:
+                if served_by["path"] != "faq":
+                    timings["gemini_time"] = (time.time() - start_time) * 1000
+                await segments.put(None)
+        
+        async def emit_audio():
+            tts_start = None
+            while True:
+                item = await segments.get()
+                if item is None:
+                    break
+                index, sentence, task = item
+                if tts_start is None:
+                    tts_start = time.time()
+                audio_file, viseme_data, segment_time = await task
+                print(f"🎤 Segment {index} ready in {segment_time:.2f}ms")
+                if audio_file and os.path.exists(audio_file):
+                    if timings["first_audio_time"] is None:
+                        timings["first_audio_time"] = (time.time() - start_time) * 1000
+                    timings["audio_seconds"] += (viseme_data or {}).get('audio_duration', 0)
+                    await events.put({
+                        "type": "audio",
+                        "index": index,
+                        "text": sentence,
+                        "audio_file": os.path.basename(audio_file),
+                        "viseme_data": viseme_data
+                    })
+            if tts_start is not None:
+                timings["tts_time"] = (time.time() - tts_start) * 1000
+        
+        async def run_pipeline():
+            try:
+                await asyncio.gather(produce_text(), emit_audio())
+            finally:
+                await events.put(None)
+        
+        with tracer.activate(span):
+            pipeline = asyncio.create_task(run_pipeline())
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                yield event
+            await pipeline
+            
+            response_text = "".join(response_parts).strip()
+            success = bool(response_text)
+            with tracer.activate(span):
+                relevant_urls = self._find_relevant_urls(user_message)
+            total_time = (time.time() - start_time) * 1000
+            self.performance_monitor.record_metrics(
+                request_id, user_id, timings["gemini_time"], timings["tts_time"], success, len(response_text),
+                served_by=served_by["path"], audio_seconds=timings["audio_seconds"], total_time=total_time
+            )
+            recorded = True
+            
+            yield {"type": "urls", "relevant_urls": relevant_urls}
+            
+            print(f"🚀 Total streaming time: {total_time:.2f}ms, first audio at {timings['first_audio_time']}ms "
+                  f"(trace {span.trace_id})")
+            span.set_attribute('served_by', served_by["path"])
+            span.set_attribute('success', success)
+            if timings["first_audio_time"] is not None:
+                span.set_attribute('first_audio_ms', round(timings["first_audio_time"], 3))
+            yield {
+                "type": "done",
+                "success": success,
+                "response_text": response_text,
+                "served_by": served_by["path"],
+                "trace_id": span.trace_id,
+                "performance": {
+                    "total_time": total_time,
+                    "gemini_time": timings["gemini_time"],
+                    "tts_time": timings["tts_time"],
+                    "first_audio_time": timings["first_audio_time"],
+                    "audio_seconds": timings["audio_seconds"]
+                }
+            }
+        except Exception as e:
+            print(f"Error in streaming pipeline: {e}")
+            span.set_error(e)
+            if not recorded:
+                self.performance_monitor.record_metrics(
+                    request_id, user_id, 0, 0, False, 0, str(e),
+                    total_time=(time.time() - start_time) * 1000
+                )
+                recorded = True
+            yield {"type": "error", "error": str(e)}
+        finally:
+            # Client went away or something failed: stop pending upstream work.
+            # Cancelling the pipeline closes the Gemini stream, which stops its worker.
+            if not pipeline.done():
+                pipeline.cancel()
+                span.set_attribute('cancelled', True)
+            for task in segment_tasks:
+                if not task.done():
+                    task.cancel()
+            if not recorded:
+                # Closed before completing (GeneratorExit), so no completion was recorded
+                self.performance_monitor.cancel_request(request_id)
+            span.end()
+
 # Initialize bot
 web_bot = WebKanGurooBot()
 
+# All requests share one event loop so upstream connections stay warm
+async_runtime.start()
+async_runtime.add_shutdown_hook(web_bot.close)
+
+# Pick up faq_data.json edits without a restart
+knowledge_store.start_watching()
+
+# Keep temp_audio/ within its age limit and byte budget
+performance_monitor.register_cache('audio_store', audio_store)
+audio_store.start_janitor()
+
+# Trim old requests, idle users and old errors from the performance stats
+performance_monitor.start_compactor()
+
+# Coalesced upstream calls: followers are requests that joined an identical one in flight
+if SINGLE_FLIGHT_ENABLED:
+    performance_monitor.register_single_flight('gemini', web_bot.gemini_flights)
+    performance_monitor.register_single_flight('tts', web_bot.tts_flights)
+
+# Span buffer and exporter counters
+performance_monitor.register_cache('tracing', tracer)
+
+# Scrape-time gauges for /metrics
+performance_monitor.register_gauge('audio_store_bytes', 'Bytes of per-request audio on disk, as of the last sweep',
+                                   lambda: audio_store.bytes_on_disk)
+performance_monitor.register_gauge('upstream_connections', 'ElevenLabs pool connections by state',
+                                   web_bot.upstream_connections, label='state')
+
+# Hash and precompress static assets before the first page load
+performance_monitor.register_cache('assets', asset_server)
+asset_server.build()
+
+@app.after_request
+def compress_json(response):
+    """gzip/brotli-compress JSON responses for clients that accept it"""
+    if (not JSON_COMPRESSION_ENABLED or response.mimetype != 'application/json'
+            or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers):
+        return response
+    
+    data = response.get_data()
+    if len(data) < JSON_COMPRESSION_MIN_BYTES:
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(request.accept_encodings)
+    if encoding != 'identity':
+        response.set_data(compress(data, encoding, fast=True))
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+def requested_viseme_format(data: dict) -> str:
+    """Viseme wire format the client opted into, "full" by default"""
+    viseme_format = data.get('viseme_format', FORMAT_FULL)
+    return viseme_format if viseme_format in VISEME_FORMATS else FORMAT_FULL
+
 @app.route('/')
 def index():
     """Main chat interface"""
@@ -168,6 +482,7 @@ def chat():
         data = request.get_json()
         user_message = data.get('message', '')
         user_id = data.get('user_id', 'web_user')
+        viseme_format = requested_viseme_format(data)
         
         if not user_message.strip():
             return jsonify({
@@ -177,14 +492,16 @@ def chat():
         
         print(f"📝 Processing message: {user_message}")
         
-        # Process message asynchronously
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        result = loop.run_until_complete(web_bot.process_message(user_message, user_id))
-        loop.close()
+        # Process message on the shared event loop
+        trace_id = trace_id_from_header(request.headers.get('traceparent'))
+        result = async_runtime.run(web_bot.process_message(user_message, user_id, trace_id))
+        result['viseme_data'] = encode_viseme_data(result.get('viseme_data'), viseme_format)
         
         print(f"✅ Response ready: {result['success']}")
-        return jsonify(result)
+        response = jsonify(result)
+        if result.get('trace_id'):
+            response.headers['X-Trace-Id'] = result['trace_id']
+        return response
         
     except Exception as e:
         print(f"Error in chat endpoint: {e}")
@@ -193,12 +510,70 @@ def chat():
             "error": str(e)
         })
 
+def format_sse(event: dict) -> str:
+    """Encode an event dict as a Server-Sent Events message"""
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """Handle chat messages as a Server-Sent Events stream"""
+    data = request.get_json() or {}
+    user_message = data.get('message', '')
+    user_id = data.get('user_id', 'web_user')
+    viseme_format = requested_viseme_format(data)
+    
+    if not user_message.strip():
+        return jsonify({
+            "success": False,
+            "error": "Empty message"
+        })
+    
+    print(f"📝 Streaming message: {user_message}")
+    
+    # The trace ID is picked here so it can go out in the headers before the first event
+    trace_id = trace_id_from_header(request.headers.get('traceparent')) or new_trace_id()
+    
+    def generate():
+        for event in async_runtime.iterate(web_bot.process_message_stream(user_message, user_id, trace_id)):
+            if event.get('viseme_data'):
+                event = dict(event, viseme_data=encode_viseme_data(event['viseme_data'], viseme_format))
+            yield format_sse(event)
+    
+    headers = {
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    }
+    if tracer.enabled:
+        headers['X-Trace-Id'] = trace_id
+    return Response(generate(), mimetype='text/event-stream', headers=headers)
+
 @app.route('/api/audio/<filename>')
 def get_audio(filename):
-    """Serve audio files"""
+    """Serve audio files with Range, ETag and 304 support"""
     try:
         print(f"🎵 Serving audio file: {filename}")
-        return send_file(filename, mimetype='audio/mpeg')
+        # Cached audio is named by its content hash, so it can never change
+        if CONTENT_ADDRESSED_AUDIO.match(filename) and os.path.isfile(os.path.join(AUDIO_CACHE_DIR, filename)):
+            response = send_from_directory(
+                os.path.abspath(AUDIO_CACHE_DIR), filename, mimetype='audio/mpeg',
+                conditional=True, etag=filename[:-4], max_age=IMMUTABLE_CACHE_MAX_AGE
+            )
+            response.cache_control.immutable = True
+            return response
+        
+        # Per-request audio has a unique ID but is deleted by the janitor
+        if audio_store.path_for(filename) is None:
+            return jsonify({"error": "Audio file not found"}), 404
+        response = send_from_directory(
+            os.path.abspath(audio_store.directory), filename, mimetype='audio/mpeg',
+            conditional=True, etag=filename[:-4], max_age=audio_store.max_age
+        )
+        response.cache_control.public = False
+        response.cache_control.private = True
+        return response
+    except HTTPException:
+        # e.g. 416 for an unsatisfiable Range, which isn't a missing file
+        raise
     except Exception as e:
         print(f"Error serving audio: {e}")
         return jsonify({"error": "Audio file not found"}), 404
@@ -206,21 +581,35 @@ def get_audio(filename):
 @app.route('/Dona.glb')
 def get_character():
     """Serve the 3D character model"""
-    try:
-        print(f"🎭 Serving character model: Dona.glb")
-        return send_file('Dona.glb', mimetype='model/gltf-binary')
-    except Exception as e:
-        print(f"Error serving character model: {e}")
+    print(f"🎭 Serving character model: Dona.glb")
+    asset = asset_server.get(os.path.basename(CHARACTER_MODEL_PATH))
+    if asset is None:
         return jsonify({"error": "Character model not found"}), 404
+    return asset_server.make_response(asset, request, immutable=False)
 
 @app.route('/static/models/<filename>')
 def get_model(filename):
     """Serve 3D model files"""
-    try:
-        return send_from_directory('.', filename, mimetype='model/gltf-binary')
-    except Exception as e:
-        print(f"Error serving model file: {e}")
+    asset = asset_server.get(filename) if filename.endswith('.glb') else None
+    if asset is None:
         return jsonify({"error": "Model file not found"}), 404
+    return asset_server.make_response(asset, request, immutable=False)
+
+@app.route('/static/<path:filename>', endpoint='static')
+def get_static(filename):
+    """Serve static files by their plain name (revalidated on every load)"""
+    asset = asset_server.get(filename)
+    if asset is None:
+        return jsonify({"error": "File not found"}), 404
+    return asset_server.make_response(asset, request, immutable=False)
+
+@app.route('/assets/<path:hashed_name>')
+def get_asset(hashed_name):
+    """Serve content-hashed assets, cached by browsers as immutable"""
+    asset = asset_server.get_hashed(hashed_name)
+    if asset is None:
+        return jsonify({"error": "File not found"}), 404
+    return asset_server.make_response(asset, request, immutable=True)
 
 @app.route('/api/status')
 def status():
@@ -236,6 +625,22 @@ def status():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition of the performance counters"""
+    if not METRICS_ENABLED:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    return Response(prometheus_exporter.render(), content_type=METRICS_CONTENT_TYPE,
+                    headers={'Cache-Control': 'no-store'})
+
+@app.route('/api/traces/<trace_id>')
+def get_trace(trace_id):
+    """Spans of a recent request, by the trace ID from its X-Trace-Id header"""
+    spans = tracer.get_trace(trace_id.lower())
+    if not spans:
+        return jsonify({"error": "Trace not found (tracing off, or no longer buffered)"}), 404
+    return jsonify({"trace_id": trace_id.lower(), "spans": spans})
+
 @app.route('/api/health')
 def health():
     """Health check endpoint"""
@@ -256,4 +661,5 @@ if __name__ == '__main__':
     print("📝 Features: Text + Audio + 3D Character + URLs")
     print("=" * 60)
     
-    app.run(debug=True, host='0.0.0.0', port=5001)
+    # The reloader would fork a second process with its own runtime
+    app.run(debug=True, host='0.0.0.0', port=5001, threaded=True, use_reloader=False)
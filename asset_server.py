@@ -0,0 +1,245 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from typing import Any, Dict, List, Optional
+from flask import Response
+from config import (
+    STATIC_DIR, CHARACTER_MODEL_PATH, OPTIMIZED_CHARACTER_MODEL_PATH, SERVE_OPTIMIZED_MODEL,
+    ASSET_BUILD_DIR, ASSET_AUTO_RELOAD, IMMUTABLE_CACHE_MAX_AGE
+)
+
+try:
+    import brotli
+except ImportError:  # Brotli is in requirements.txt; without it only gzip is served
+    brotli = None
+
+# Preferred order when the client accepts several encodings
+ENCODINGS = ['br', 'gzip']
+FILE_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+# Only keep a compressed variant if it saves at least this fraction
+MIN_COMPRESSION_SAVING = 0.05
+
+MIMETYPES = {
+    '.glb': 'model/gltf-binary',
+    '.js': 'application/javascript',
+    '.css': 'text/css',
+}
+
+def compress(data: bytes, encoding: str, fast: bool = False) -> bytes:
+    """Maximum compression for assets built once; ``fast`` for per-request responses"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=4 if fast else 11)
+    return gzip.compress(data, compresslevel=6 if fast else 9, mtime=0)
+
+def negotiate_encoding(accept_encodings) -> str:
+    """Best encoding this server can produce that the client accepts"""
+    for encoding in ENCODINGS:
+        if encoding == 'br' and brotli is None:
+            continue
+        if accept_encodings.quality(encoding) > 0:
+            return encoding
+    return 'identity'
+
+class Asset:
+    """One static file with its content hash and precompressed variants"""
+
+    def __init__(self, name: str, path: str, data: bytes, mtime: float):
+        self.name = name
+        self.path = path
+        self.mtime = mtime
+        self.digest = hashlib.sha256(data).hexdigest()[:16]
+        stem, ext = os.path.splitext(name)
+        self.hashed_name = f"{stem}.{self.digest}{ext}"
+        self.mimetype = MIMETYPES.get(ext) or mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        self.variants = {'identity': data}
+
+class AssetServer:
+    """Serves the avatar model and static JS/CSS precompressed and cacheable.
+
+    Every asset is hashed and gets a ``/assets/<name>.<hash>.<ext>`` URL that
+    is cached as immutable, so a warm page load doesn't request it at all.
+    gzip and (if the ``brotli`` package is installed) brotli variants are
+    built once per content hash and kept in ``build_dir``, so restarts don't
+    pay for compression again. The response picks a variant from
+    ``Accept-Encoding`` and answers ``If-None-Match`` with 304. With
+    ``auto_reload`` an edited file is rehashed on its next request.
+    """
+
+    def __init__(self, sources: Dict[str, str], build_dir: str, auto_reload: bool = False):
+        self.sources = sources  # logical name -> file path
+        self.build_dir = build_dir
+        self.auto_reload = auto_reload
+        self._assets: Dict[str, Asset] = {}
+        self._by_hashed_name: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+        self.responses = {'identity': 0, 'gzip': 0, 'br': 0}
+        self.not_modified = 0
+        self.bytes_sent = 0
+
+    @staticmethod
+    def discover(static_dir: str, extra_files: List[str]) -> Dict[str, str]:
+        """Map logical names to paths: everything under static_dir plus extra_files by basename"""
+        sources = {}
+        for root, _, files in os.walk(static_dir):
+            for filename in files:
+                path = os.path.join(root, filename)
+                sources[os.path.relpath(path, static_dir).replace(os.sep, '/')] = path
+        for path in extra_files:
+            if os.path.isfile(path):
+                sources[os.path.basename(path)] = path
+        return sources
+
+    def _variant_path(self, asset: Asset, encoding: str) -> str:
+        return os.path.join(self.build_dir, asset.digest + FILE_SUFFIXES[encoding])
+
+    def _build_variant(self, asset: Asset, encoding: str) -> Optional[bytes]:
+        """Load a compressed variant from the build dir, compressing it on first use"""
+        path = self._variant_path(asset, encoding)
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            pass
+
+        data = compress(asset.variants['identity'], encoding)
+        os.makedirs(self.build_dir, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.part"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+        return data
+
+    def _load(self, name: str) -> Optional[Asset]:
+        path = self.sources.get(name)
+        if path is None:
+            return None
+        try:
+            mtime = os.stat(path).st_mtime
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            print(f"Error loading asset {name}: {e}")
+            return None
+
+        asset = Asset(name, path, data, mtime)
+        for encoding in ENCODINGS:
+            if encoding == 'br' and brotli is None:
+                continue
+            variant = self._build_variant(asset, encoding)
+            if len(variant) <= len(data) * (1 - MIN_COMPRESSION_SAVING):
+                asset.variants[encoding] = variant
+
+        with self._lock:
+            previous = self._assets.get(name)
+            if previous is not None:
+                self._by_hashed_name.pop(previous.hashed_name, None)
+            self._assets[name] = asset
+            self._by_hashed_name[asset.hashed_name] = name
+        return asset
+
+    def build(self):
+        """Hash and compress every asset up front"""
+        for name in self.sources:
+            self._load(name)
+        print(f"📦 Asset server ready: {len(self._assets)} assets"
+              f"{'' if brotli else ' (Brotli not installed, serving gzip only)'}")
+
+    def get(self, name: str) -> Optional[Asset]:
+        """Current version of an asset by logical name (e.g. 'js/chat.js')"""
+        asset = self._assets.get(name)
+        if asset is None:
+            return self._load(name)
+        if self.auto_reload:
+            try:
+                if os.stat(asset.path).st_mtime != asset.mtime:
+                    return self._load(name)
+            except OSError:
+                return None
+        return asset
+
+    def get_hashed(self, hashed_name: str) -> Optional[Asset]:
+        """Asset for a content-hashed name, or None if that version is gone"""
+        name = self._by_hashed_name.get(hashed_name)
+        if name is None:
+            return None
+        asset = self.get(name)
+        if asset is None or asset.hashed_name != hashed_name:
+            return None
+        return asset
+
+    def url_for(self, name: str) -> str:
+        """Content-hashed URL for templates, or the plain static URL if unknown"""
+        asset = self.get(name)
+        if asset is None:
+            return f"/static/{name}"
+        return f"/assets/{asset.hashed_name}"
+
+    def choose_encoding(self, asset: Asset, accept_encodings) -> str:
+        for encoding in ENCODINGS:
+            if encoding in asset.variants and accept_encodings.quality(encoding) > 0:
+                return encoding
+        return 'identity'
+
+    def make_response(self, asset: Asset, request, immutable: bool) -> Response:
+        """Response for an asset; hashed URLs are immutable, plain ones revalidate"""
+        encoding = self.choose_encoding(asset, request.accept_encodings)
+        response = Response(asset.variants[encoding], mimetype=asset.mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        # Strong ETags must differ between encodings of the same content
+        response.set_etag(f"{asset.digest}-{encoding}")
+        response.last_modified = asset.mtime
+
+        if immutable:
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_CACHE_MAX_AGE
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+
+        response.make_conditional(request)
+        if response.status_code == 304:
+            self.not_modified += 1
+        else:
+            self.responses[encoding] += 1
+            self.bytes_sent += len(asset.variants[encoding])
+        return response
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get asset server statistics"""
+        assets = list(self._assets.values())
+        return {
+            'assets': len(assets),
+            'raw_bytes': sum(len(a.variants['identity']) for a in assets),
+            'gzip_bytes': sum(len(a.variants.get('gzip', a.variants['identity'])) for a in assets),
+            'br_bytes': sum(len(a.variants.get('br', a.variants['identity'])) for a in assets) if brotli else None,
+            'responses': dict(self.responses),
+            'not_modified': self.not_modified,
+            'bytes_sent': self.bytes_sent
+        }
+
+def default_sources() -> Dict[str, str]:
+    """Static files plus the avatar, using the glb_optimizer.py output when it exists"""
+    sources = AssetServer.discover(STATIC_DIR, [CHARACTER_MODEL_PATH])
+    if SERVE_OPTIMIZED_MODEL and os.path.isfile(OPTIMIZED_CHARACTER_MODEL_PATH):
+        sources[os.path.basename(CHARACTER_MODEL_PATH)] = OPTIMIZED_CHARACTER_MODEL_PATH
+    return sources
+
+# Global asset server for the avatar model and static files
+asset_server = AssetServer(default_sources(), ASSET_BUILD_DIR, ASSET_AUTO_RELOAD)
+
+if __name__ == '__main__':
+    # Prebuild the compressed variants, e.g. during deployment
+    asset_server.build()
+    print(f"{'asset':<28} {'raw':>10} {'gzip':>10} {'br':>10}")
+    for name in sorted(asset_server.sources):
+        asset = asset_server.get(name)
+        if asset is None:
+            continue
+        sizes = [len(asset.variants.get(e, asset.variants['identity'])) for e in ('identity', 'gzip', 'br')]
+        print(f"{name:<28} {sizes[0]:>10} {sizes[1]:>10} {sizes[2] if brotli else '-':>10}")
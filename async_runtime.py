@@ -0,0 +1,113 @@
+import asyncio
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, List, Optional
+from config import ASYNC_RUNTIME_WORKERS
+
+class AsyncRuntime:
+    """One long-lived event loop running in a background thread.
+
+    Flask views are synchronous, so they submit coroutines to this loop instead
+    of creating a fresh loop per request. Everything that binds to a loop
+    (aiohttp sessions, connectors, asyncio locks) therefore lives for the whole
+    process and keeps its connections warm between requests.
+    """
+
+    def __init__(self, max_workers: int = 16):
+        self.max_workers = max_workers
+        self.loop = None
+        self._thread = None
+        self._executor = None
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+        self._shutdown_hooks: List[Callable[[], Awaitable[Any]]] = []
+
+    def start(self):
+        """Start the loop thread if it is not running yet"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._started.clear()
+            self._thread = threading.Thread(
+                target=self._run_loop, name="async-runtime", daemon=True
+            )
+            self._thread.start()
+        self._started.wait()
+
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        # Bounded pool for asyncio.to_thread() calls (e.g. the Gemini SDK)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="async-runtime-worker"
+        )
+        self.loop.set_default_executor(self._executor)
+        self._started.set()
+        self.loop.run_forever()
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the shared loop and block until it finishes"""
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        return future.result(timeout)
+
+    def submit(self, coro: Awaitable[Any]):
+        """Schedule a coroutine on the shared loop without waiting for it"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def iterate(self, agen: AsyncIterator[Any], timeout: Optional[float] = None) -> Iterator[Any]:
+        """Drive an async generator on the shared loop from synchronous code.
+
+        Used for streaming responses: each item is produced on the runtime loop
+        and handed to the calling (WSGI) thread. Closing the returned generator,
+        e.g. when the client disconnects, closes the async generator too.
+        """
+        async def _next():
+            return await agen.__anext__()
+
+        try:
+            while True:
+                try:
+                    yield self.run(_next(), timeout)
+                except StopAsyncIteration:
+                    break
+        finally:
+            try:
+                self.run(agen.aclose(), timeout)
+            except Exception as e:
+                print(f"Error closing async stream: {e}")
+
+    def add_shutdown_hook(self, hook: Callable[[], Awaitable[Any]]):
+        """Register a coroutine function to run before the loop stops"""
+        self._shutdown_hooks.append(hook)
+
+    def shutdown(self, timeout: float = 5.0):
+        """Run shutdown hooks and stop the loop thread"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                return
+            thread = self._thread
+            self._thread = None
+
+        async def _close():
+            for hook in self._shutdown_hooks:
+                try:
+                    await hook()
+                except Exception as e:
+                    print(f"Error in runtime shutdown hook: {e}")
+
+        try:
+            asyncio.run_coroutine_threadsafe(_close(), self.loop).result(timeout)
+        except Exception as e:
+            print(f"Error shutting down async runtime: {e}")
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        thread.join(timeout)
+        self._executor.shutdown(wait=False)
+        self.loop.close()
+
+# Global runtime shared by the web bot and its services
+async_runtime = AsyncRuntime(max_workers=ASYNC_RUNTIME_WORKERS)
+atexit.register(async_runtime.shutdown)
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+class AudioCache:
+    """Content-addressed on-disk store for synthesized speech.
+
+    Each entry is ``<key>.mp3`` plus ``<key>.json`` holding the viseme
+    timeline, where the key hashes the text and every synthesis setting that
+    changes the audio. Identical answers are therefore synthesized once and the
+    same file serves every user. Writes go through a temp file and
+    ``os.replace`` so readers never see a partial MP3, and the directory is
+    kept under ``max_bytes`` by evicting the least recently used entries.
+    Entries returned or committed within the last ``serve_grace`` seconds
+    may not have been sent to the client yet and are never evicted; the
+    cache can then briefly exceed its budget.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, serve_grace: float = 30):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.serve_grace = serve_grace
+        self._entries = OrderedDict()  # key -> size in bytes, oldest first
+        self._last_used: Dict[str, float] = {}  # key -> when it was last handed out
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Collapse whitespace and unicode variants that don't change the speech"""
+        return " ".join(unicodedata.normalize('NFC', text).split())
+
+    @classmethod
+    def make_key(cls, text: str, voice_id: str, model_id: str,
+                 voice_settings: Dict[str, Any], output_format: str) -> str:
+        """Hash the text and synthesis settings into a content address"""
+        payload = json.dumps({
+            'text': cls.normalize_text(text),
+            'voice_id': voice_id,
+            'model_id': model_id,
+            'voice_settings': voice_settings,
+            'output_format': output_format
+        }, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def audio_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _entry_size(self, key: str) -> int:
+        size = 0
+        for path in (self.audio_path(key), self._meta_path(key)):
+            try:
+                size += os.path.getsize(path)
+            except OSError:
+                pass
+        return size
+
+    def _load_index(self):
+        """Rebuild the LRU index from the files left by a previous run"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.part'):
+                # Interrupted write from a previous run
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+                continue
+            if not name.endswith('.mp3'):
+                continue
+            key = name[:-4]
+            try:
+                mtime = os.path.getmtime(self.audio_path(key))
+            except OSError:
+                continue
+            entries.append((mtime, key))
+
+        for _, key in sorted(entries):
+            size = self._entry_size(key)
+            self._entries[key] = size
+            self.total_bytes += size
+        self._evict()
+
+    def get(self, key: str) -> Optional[Tuple[str, Optional[dict]]]:
+        """Return (audio_path, viseme_data) for a cached entry, or None"""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._last_used[key] = time.time()
+
+        try:
+            with open(self._meta_path(key), 'r', encoding='utf-8') as f:
+                viseme_data = json.load(f)
+            # Persist recency so the LRU order survives a restart
+            os.utime(self.audio_path(key))
+        except (OSError, ValueError):
+            # Entry was removed or damaged behind our back
+            self._discard(key)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return self.audio_path(key), viseme_data
+
+    def new_temp_path(self) -> str:
+        """Temp file in the cache directory to stream a download into"""
+        fd, path = tempfile.mkstemp(dir=self.directory, suffix='.part')
+        os.close(fd)
+        return path
+
+    def commit(self, key: str, temp_audio_path: str, viseme_data: Optional[dict]) -> str:
+        """Atomically move a finished download into the cache"""
+        fd, temp_meta_path = tempfile.mkstemp(dir=self.directory, suffix='.part')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(viseme_data, f)
+        # Metadata first: an .mp3 without its .json is treated as a miss
+        os.replace(temp_meta_path, self._meta_path(key))
+        os.replace(temp_audio_path, self.audio_path(key))
+
+        size = self._entry_size(key)
+        with self._lock:
+            self.total_bytes += size - self._entries.get(key, 0)
+            self._entries[key] = size
+            self._entries.move_to_end(key)
+            self._last_used[key] = time.time()
+            self._evict()
+        return self.audio_path(key)
+
+    def update_visemes(self, key: str, viseme_data: Optional[dict]):
+        """Replace an entry's viseme sidecar, e.g. after regenerating it with a newer engine"""
+        with self._lock:
+            if key not in self._entries:
+                return
+        fd, temp_meta_path = tempfile.mkstemp(dir=self.directory, suffix='.part')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(viseme_data, f)
+        os.replace(temp_meta_path, self._meta_path(key))
+
+        size = self._entry_size(key)
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes += size - self._entries[key]
+                self._entries[key] = size
+
+    def _discard(self, key: str):
+        with self._lock:
+            size = self._entries.pop(key, None)
+            self._last_used.pop(key, None)
+            if size is not None:
+                self.total_bytes -= size
+        for path in (self.audio_path(key), self._meta_path(key)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _evict(self):
+        """Drop least recently used entries until under the size cap (lock held)
+
+        Entries handed out within ``serve_grace`` are skipped, as the
+        audio_store janitor skips files that may still be downloading.
+        """
+        cutoff = time.time() - self.serve_grace
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            if self._last_used.get(key, 0) > cutoff:
+                break  # entries are in order of use, so the rest are more recent still
+            size = self._entries.pop(key)
+            self._last_used.pop(key, None)
+            self.total_bytes -= size
+            self.evictions += 1
+            for path in (self.audio_path(key), self._meta_path(key)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 2) if lookups else 0,
+            'evictions': self.evictions
+        }
@@ -0,0 +1,181 @@
+import shutil
+import subprocess
+import time
+from typing import Any, Dict, List, Optional
+from config import AUDIO_LIPSYNC_FRAME_RATE, AUDIO_LIPSYNC_FFMPEG
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, audio analysis is disabled without it
+    np = None
+
+# Bump when the output changes; cached entries with another 'analyzer' are reanalyzed
+ANALYZER_ID = 'energy-1'
+
+# Speech is decoded to mono at this rate; nothing useful for the mouth lies above 8kHz
+SAMPLE_RATE = 16000
+
+# Frequency bands in Hz: vowel first formants, second formants and fricative noise
+LOW_BAND = (80, 900)
+MID_BAND = (900, 4000)
+HIGH_BAND = (4000, 8000)
+
+class AudioLipSyncAnalyzer:
+    """Mouth movement derived from the generated speech itself.
+
+    The MP3 is decoded to PCM with ffmpeg and cut into overlapping frames at
+    ``frame_rate`` per second. Per frame, NumPy computes the energy, zero-crossing
+    rate, spectral centroid and the share of energy in three bands, all
+    vectorized over frames. Energy relative to the loudest speech gives the
+    mouth-open intensity; the spectral shape picks a coarse viseme class
+    (silence, open, rounded, spread or fricative).
+    """
+
+    def __init__(self, frame_rate: int = 50, sample_rate: int = SAMPLE_RATE, ffmpeg: str = 'ffmpeg',
+                 dynamic_range_db: float = 30.0, silence_db: float = -50.0, min_run: float = 0.06):
+        self.frame_rate = frame_rate
+        self.sample_rate = sample_rate
+        self.ffmpeg = ffmpeg
+        self.dynamic_range_db = dynamic_range_db
+        self.silence_db = silence_db
+        self.min_run_frames = max(1, round(min_run * frame_rate))
+        self.hop = sample_rate // frame_rate
+        self.window = 2 * self.hop
+
+        self.files_analyzed = 0
+        self.failures = 0
+        self.audio_seconds = 0.0
+        self.analysis_ms = 0.0
+
+    @property
+    def available(self) -> bool:
+        return not self.missing_dependencies
+
+    @property
+    def missing_dependencies(self) -> List[str]:
+        """What's missing for audio analysis: the numpy package and/or the ffmpeg binary"""
+        missing = []
+        if np is None:
+            missing.append('numpy (pip install -r requirements.txt)')
+        if shutil.which(self.ffmpeg) is None:
+            missing.append(f'ffmpeg (no "{self.ffmpeg}" on the PATH)')
+        return missing
+
+    def decode(self, path: str) -> 'np.ndarray':
+        """Decode an audio file to mono float32 samples in [-1, 1]"""
+        result = subprocess.run(
+            [self.ffmpeg, '-v', 'error', '-nostdin', '-i', path,
+             '-f', 's16le', '-ac', '1', '-ar', str(self.sample_rate), '-'],
+            capture_output=True, timeout=30, check=True
+        )
+        return np.frombuffer(result.stdout, dtype='<i2').astype(np.float32) / 32768.0
+
+    def features(self, samples: 'np.ndarray') -> Dict[str, 'np.ndarray']:
+        """Per-frame features, one row per frame of ``1 / frame_rate`` seconds"""
+        n_frames = max(1, -(-len(samples) // self.hop))
+        padded = np.zeros(n_frames * self.hop + self.window, dtype=np.float32)
+        padded[self.hop // 2:self.hop // 2 + len(samples)] = samples
+        # Frame i is centred on sample i * hop + hop / 2
+        frames = np.lib.stride_tricks.sliding_window_view(padded, self.window)[::self.hop][:n_frames]
+
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / self.window
+
+        spectrum = np.abs(np.fft.rfft(frames * np.hanning(self.window), axis=1)) ** 2
+        freqs = np.fft.rfftfreq(self.window, 1.0 / self.sample_rate)
+        total = spectrum.sum(axis=1) + 1e-12
+
+        def band(low, high):
+            mask = (freqs >= low) & (freqs < high)
+            return spectrum[:, mask].sum(axis=1) / total
+
+        return {
+            'db': 20 * np.log10(rms + 1e-9),
+            'zcr': zcr,
+            'centroid': (spectrum * freqs).sum(axis=1) / total,
+            'low': band(*LOW_BAND),
+            'mid': band(*MID_BAND),
+            'high': band(*HIGH_BAND),
+        }
+
+    def analyze_pcm(self, samples: 'np.ndarray') -> Dict[str, Any]:
+        """Intensity track and viseme keyframes for decoded samples"""
+        features = self.features(samples)
+        db = features['db']
+
+        # Normalise against the loud end of this clip so quiet and loud voices open alike
+        speech = db[db > self.silence_db]
+        reference = np.percentile(speech, 95) if len(speech) else self.silence_db
+        intensity = np.clip((db - (reference - self.dynamic_range_db)) / self.dynamic_range_db, 0.0, 1.0)
+        intensity[db <= self.silence_db] = 0.0
+
+        fricative = (features['high'] > 0.4) | (features['zcr'] > 0.3)
+        # Fricatives are noisy but barely open the mouth
+        intensity = np.where(fricative, intensity * 0.5, intensity)
+        intensity = np.convolve(intensity, [0.25, 0.5, 0.25], mode='same')
+
+        classes = np.select(
+            [intensity < 0.1, fricative, (features['centroid'] < 700) & (features['low'] > 0.75), features['mid'] > 0.35],
+            ['viseme_sil', 'viseme_ss', 'viseme_oo', 'viseme_ee'],
+            default='viseme_aa'
+        )
+
+        return {
+            'visemes': self._keyframes(classes),
+            'duration': round(len(samples) / self.sample_rate, 3),
+            'engine': ANALYZER_ID,
+            'analyzer': ANALYZER_ID,
+            'source': 'audio',
+            'frame_rate': self.frame_rate,
+            'intensity': np.rint(intensity * 100).astype(np.uint8).tolist(),
+        }
+
+    def _keyframes(self, classes: 'np.ndarray') -> List[Dict[str, Any]]:
+        """Run-length encode per-frame classes, folding runs shorter than min_run into the previous one"""
+        starts = np.concatenate(([0], np.flatnonzero(classes[1:] != classes[:-1]) + 1))
+        ends = np.append(starts[1:], len(classes))
+
+        runs = []
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            viseme = str(classes[start])
+            if runs and (runs[-1][0] == viseme or end - start < self.min_run_frames):
+                continue
+            runs.append((viseme, start))
+
+        visemes = [{'time': round(start / self.frame_rate, 3), 'viseme': viseme} for viseme, start in runs]
+        if not visemes or visemes[-1]['viseme'] != 'viseme_sil':
+            visemes.append({'time': round(len(classes) / self.frame_rate, 3), 'viseme': 'viseme_sil'})
+        return visemes
+
+    def analyze_file(self, path: str) -> Optional[Dict[str, Any]]:
+        """Decode and analyse an audio file; None if that isn't possible"""
+        if not self.available:
+            return None
+        start_time = time.perf_counter()
+        try:
+            samples = self.decode(path)
+            if not len(samples):
+                raise ValueError("no audio decoded")
+            result = self.analyze_pcm(samples)
+        except Exception as e:
+            self.failures += 1
+            print(f"⚠️  Audio lip-sync analysis failed for {path}: {e}")
+            return None
+        self.files_analyzed += 1
+        self.audio_seconds += result['duration']
+        self.analysis_ms += (time.perf_counter() - start_time) * 1000
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'available': self.available,
+            'frame_rate': self.frame_rate,
+            'files_analyzed': self.files_analyzed,
+            'failures': self.failures,
+            'audio_seconds': round(self.audio_seconds, 1),
+            'ms_per_audio_second': round(self.analysis_ms / self.audio_seconds, 2) if self.audio_seconds else 0.0,
+        }
+
+# Global analyzer instance
+audio_lipsync = AudioLipSyncAnalyzer(AUDIO_LIPSYNC_FRAME_RATE, ffmpeg=AUDIO_LIPSYNC_FFMPEG)
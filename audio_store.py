@@ -0,0 +1,160 @@
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple
+from config import (
+    TEMP_AUDIO_DIR, AUDIO_STORE_MAX_AGE, AUDIO_STORE_MAX_BYTES, AUDIO_JANITOR_INTERVAL, AUDIO_STORE_WRITE_GRACE
+)
+
+AUDIO_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]+\.mp3$')
+
+class AudioStore:
+    """Managed directory for per-request audio files.
+
+    Files get collision-free IDs (millisecond timestamp + random suffix), so
+    two requests from the same user in the same second can't overwrite each
+    other. A background janitor deletes files older than ``max_age`` and then
+    the oldest files until the directory fits in ``max_bytes``. Files modified
+    within the last ``write_grace`` seconds may still be downloading and are
+    never trimmed for the budget. Only files directly inside the directory are
+    managed; the content-addressed TTS cache in its ``cache/`` subdirectory
+    enforces its own size limit.
+    """
+
+    def __init__(self, directory: str, max_age: float, max_bytes: int, sweep_interval: float = 60,
+                 write_grace: float = 30):
+        self.directory = directory
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self.write_grace = write_grace
+        self._stop = threading.Event()
+        self._janitor = None
+        self._lock = threading.Lock()
+
+        self.files_created = 0
+        self.files_on_disk = 0
+        self.bytes_on_disk = 0
+        self.age_evictions = 0
+        self.budget_evictions = 0
+        self.last_sweep_time = None
+        self.last_sweep_ms = 0.0
+
+        os.makedirs(directory, exist_ok=True)
+
+    def new_file(self, prefix: str = "tts") -> Tuple[str, str]:
+        """Reserve a new audio file, returning (audio_id, path)"""
+        audio_id = f"{prefix}_{int(time.time() * 1000)}_{uuid.uuid4().hex[:12]}.mp3"
+        with self._lock:
+            self.files_created += 1
+        return audio_id, os.path.join(self.directory, audio_id)
+
+    def path_for(self, audio_id: str) -> Optional[str]:
+        """Resolve an audio ID to its path, or None if invalid or missing"""
+        if not AUDIO_ID_PATTERN.match(audio_id):
+            return None
+        path = os.path.join(self.directory, audio_id)
+        return path if os.path.isfile(path) else None
+
+    def remove(self, audio_id: str):
+        """Delete an audio file early, e.g. when it's no longer needed"""
+        path = self.path_for(audio_id)
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def sweep(self):
+        """Enforce the age limit and the byte budget once"""
+        start = time.perf_counter()
+        now = time.time()
+        cutoff = now - self.max_age
+        writing_cutoff = now - self.write_grace
+        files = []
+        age_evictions = 0
+
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if stat.st_mtime < cutoff:
+                    try:
+                        os.remove(entry.path)
+                        age_evictions += 1
+                    except OSError:
+                        pass
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_bytes = sum(size for _, size, _ in files)
+        budget_evictions = 0
+        files_on_disk = len(files)
+        if total_bytes > self.max_bytes:
+            # Oldest first, leaving files that may still be written
+            files.sort()
+            for mtime, size, path in files:
+                if total_bytes <= self.max_bytes or mtime >= writing_cutoff:
+                    break
+                try:
+                    os.remove(path)
+                    budget_evictions += 1
+                    files_on_disk -= 1
+                    total_bytes -= size
+                except OSError:
+                    pass
+
+        with self._lock:
+            self.files_on_disk = files_on_disk
+            self.bytes_on_disk = total_bytes
+            self.age_evictions += age_evictions
+            self.budget_evictions += budget_evictions
+            self.last_sweep_time = time.time()
+            self.last_sweep_ms = (time.perf_counter() - start) * 1000
+
+        if age_evictions or budget_evictions:
+            print(f"🧹 Audio janitor removed {age_evictions} expired and {budget_evictions} over-budget files")
+
+    def _run_janitor(self):
+        while True:
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Error in audio janitor: {e}")
+            if self._stop.wait(self.sweep_interval):
+                break
+
+    def start_janitor(self):
+        """Start the background cleanup thread"""
+        if self._janitor is not None and self._janitor.is_alive():
+            return
+        self._stop.clear()
+        self._janitor = threading.Thread(target=self._run_janitor, name="audio-janitor", daemon=True)
+        self._janitor.start()
+
+    def stop_janitor(self):
+        self._stop.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get audio store statistics (disk usage as of the last sweep)"""
+        return {
+            'files_created': self.files_created,
+            'files_on_disk': self.files_on_disk,
+            'bytes_on_disk': self.bytes_on_disk,
+            'max_bytes': self.max_bytes,
+            'max_age_seconds': self.max_age,
+            'age_evictions': self.age_evictions,
+            'budget_evictions': self.budget_evictions,
+            'last_sweep_time': self.last_sweep_time,
+            'last_sweep_ms': round(self.last_sweep_ms, 3)
+        }
+
+# Global store for per-request audio files
+audio_store = AudioStore(TEMP_AUDIO_DIR, AUDIO_STORE_MAX_AGE, AUDIO_STORE_MAX_BYTES, AUDIO_JANITOR_INTERVAL,
+                         AUDIO_STORE_WRITE_GRACE)
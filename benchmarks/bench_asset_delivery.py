@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Bytes-on-wire report for the page's static assets (CSS, JS and Dona.glb).
+
+"Before" replays the previous delivery: Flask's default /static route and
+send_file('Dona.glb'), uncompressed, with no Cache-Control. "After" follows
+the content-hashed /assets/ URLs from the rendered page, requested with
+Accept-Encoding: gzip, deflate, br.
+
+A cold load starts with an empty browser cache. A warm load is a repeat
+visit: before, every asset has to be revalidated (304 at best); after, the
+hashed assets are immutable and are not requested at all.
+
+Usage:
+    python benchmarks/bench_asset_delivery.py
+"""
+
+import os
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+ACCEPT_ENCODING = 'gzip, deflate, br'
+
+def wire_bytes(response):
+    """Body plus status line and headers, roughly as sent over HTTP/1.1"""
+    head = len(f"HTTP/1.1 {response.status}\r\n")
+    head += sum(len(f"{key}: {value}\r\n") for key, value in response.headers.to_wsgi_list())
+    return head + 2 + len(response.get_data())
+
+def legacy_app(static_paths):
+    """The previous static delivery"""
+    from flask import Flask, send_file
+
+    app = Flask('legacy', static_folder=os.path.join(ROOT, 'static'))
+
+    @app.route('/Dona.glb')
+    def get_character():
+        return send_file(os.path.join(ROOT, 'Dona.glb'), mimetype='model/gltf-binary')
+
+    return app, ['/Dona.glb'] + [f"/static/{name}" for name in static_paths]
+
+def load(client, urls, validators=None):
+    """Fetch urls, optionally revalidating with the validators from a previous load"""
+    total = 0
+    requests = 0
+    results = {}
+    for url in urls:
+        headers = {'Accept-Encoding': ACCEPT_ENCODING}
+        if validators is not None:
+            etag, last_modified = validators[url]
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        response = client.get(url, headers=headers)
+        total += wire_bytes(response)
+        requests += 1
+        results[url] = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        response.close()
+    return total, requests, results
+
+def report(name, total, requests):
+    print(f"{name:<28} {total / 1024:10.1f} KiB  {requests:3d} requests")
+
+def main():
+    os.chdir(ROOT)
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    os.environ.setdefault("ELEVENLABS_API_KEY", "benchmark")
+
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        import app as web_app
+        client = web_app.app.test_client()
+        html = client.get('/').get_data(as_text=True)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    hashed_urls = sorted(set(re.findall(r'/assets/[^"\']+', html)))
+    static_paths = sorted(name for name in web_app.asset_server.sources if name != 'Dona.glb')
+    old_app, old_urls = legacy_app(static_paths)
+    old_client = old_app.test_client()
+
+    print(f"📦 Page assets: {len(old_urls)} files")
+    print("=" * 60)
+    before_cold, before_cold_requests, validators = load(old_client, old_urls)
+    before_warm, before_warm_requests, _ = load(old_client, old_urls, validators)
+
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        after_cold, after_cold_requests, _ = load(client, hashed_urls)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    # Immutable hashed URLs are served from the browser cache without a request
+    after_warm, after_warm_requests = 0, 0
+
+    report("before, cold load", before_cold, before_cold_requests)
+    report("after,  cold load", after_cold, after_cold_requests)
+    report("before, warm load", before_warm, before_warm_requests)
+    report("after,  warm load", after_warm, after_warm_requests)
+    print("=" * 60)
+    print(f"⚡ Cold load sends {(1 - after_cold / before_cold) * 100:.1f}% fewer bytes")
+
+if __name__ == '__main__':
+    main()
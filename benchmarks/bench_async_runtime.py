@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: fresh event loop per request vs. the shared AsyncRuntime loop.
+
+Drives ElevenLabsService against a local TLS stub upstream and reports the
+average request latency and how many TLS connections were opened in each mode.
+
+Usage:
+    python benchmarks/bench_async_runtime.py [requests]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_upstream import StubUpstream
+
+def run_fresh_loop_per_request(service, text, out_dir, count):
+    """The old /api/chat pattern: new loop, run_until_complete, close.
+
+    The session is closed with its loop so the baseline isn't penalised by
+    leaked sockets, it still has to open a new connection every time.
+    """
+    timings = []
+    for i in range(count):
+        start = time.perf_counter()
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(
+            service.text_to_speech_with_visemes(text, os.path.join(out_dir, f"fresh_{i}.mp3"))
+        )
+        loop.run_until_complete(service.close_session())
+        loop.close()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def run_shared_runtime(runtime, service, text, out_dir, count):
+    """The new pattern: submit every request to the long-lived loop"""
+    timings = []
+    for i in range(count):
+        start = time.perf_counter()
+        runtime.run(
+            service.text_to_speech_with_visemes(text, os.path.join(out_dir, f"shared_{i}.mp3"))
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def report(name, timings, stub):
+    avg = sum(timings) / len(timings)
+    print(f"{name:<28} avg {avg:7.2f}ms  first {timings[0]:7.2f}ms  "
+          f"connections {len(stub.connections):3d} / {stub.requests} requests")
+    return avg
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    text = "Welcome to Kan-Guroo, we help students study abroad."
+
+    stub = StubUpstream(use_tls=True)
+    if stub.cert_file:
+        os.environ["SSL_CERT_FILE"] = stub.cert_file
+    else:
+        print("⚠️  openssl not found, falling back to plain HTTP (no TLS handshake cost)")
+    stub.start()
+
+    os.environ["ELEVENLABS_BASE_URL"] = stub.base_url
+    os.environ.setdefault("ELEVENLABS_API_KEY", "benchmark")
+    # Every request repeats the same text, so with the audio cache on all but the
+    # first would be cache hits that never reach the upstream (nor touch temp_audio/)
+    os.environ["AUDIO_CACHE_ENABLED"] = "false"
+
+    from async_runtime import AsyncRuntime
+    from elevenlabs_service import ElevenLabsService
+
+    print(f"🏁 {count} sequential TTS requests against {stub.base_url}")
+    print("=" * 80)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        service = ElevenLabsService()
+        assert service.audio_cache is None
+        fresh = run_fresh_loop_per_request(service, text, out_dir, count)
+        fresh_avg = report("fresh loop per request", fresh, stub)
+
+        stub.reset_counters()
+        runtime = AsyncRuntime()
+        service = ElevenLabsService()
+        shared = run_shared_runtime(runtime, service, text, out_dir, count)
+        shared_avg = report("shared AsyncRuntime", shared, stub)
+        runtime.add_shutdown_hook(service.close_session)
+        runtime.shutdown()
+
+    print("=" * 80)
+    print(f"⚡ Saved {fresh_avg - shared_avg:.2f}ms per request "
+          f"({(1 - shared_avg / fresh_avg) * 100:.1f}%) by reusing the connection")
+    stub.stop()
+
+if __name__ == '__main__':
+    main()
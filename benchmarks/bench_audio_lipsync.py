@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: AudioLipSyncAnalyzer analysis time per second of audio.
+
+The analysis runs on a synthetic speech-like signal (voiced syllables with
+formant-shaped harmonics, fricative noise bursts and pauses), so it needs
+NumPy but no ffmpeg. If ffmpeg is installed and an MP3 is given, decoding
+that file is timed as well.
+
+Usage:
+    python benchmarks/bench_audio_lipsync.py [file.mp3]
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from audio_lipsync import AudioLipSyncAnalyzer, SAMPLE_RATE, np
+
+def synthetic_speech(seconds, sample_rate=SAMPLE_RATE, seed=0):
+    """Alternating syllables, fricatives and pauses"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 180 + 20 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+    noise = rng.standard_normal(len(t)) * 0.3
+    noise = np.diff(noise, prepend=0.0)  # crude high-pass, mostly energy above 4kHz
+
+    # 4 syllables per second: voiced, then a fricative every third syllable, then a short gap
+    position = (t * 4) % 1.0
+    syllable = (t * 4).astype(int)
+    envelope = np.sin(np.pi * np.clip(position / 0.7, 0, 1)) * (position < 0.7)
+    fricative = (syllable % 3 == 2) & (position >= 0.7) & (position < 0.9)
+    pause = (t % 2.0) > 1.7
+    signal = np.where(fricative, noise, voiced * envelope * 0.2)
+    signal[pause] = 0.0
+    return signal.astype(np.float32)
+
+def main():
+    if np is None:
+        print("❌ NumPy is not installed")
+        sys.exit(1)
+
+    analyzer = AudioLipSyncAnalyzer()
+    print(f"🎚️  Audio lip-sync analysis at {analyzer.frame_rate} frames/s, {SAMPLE_RATE} Hz mono")
+    print("=" * 70)
+
+    for seconds in (2, 5, 15, 60):
+        samples = synthetic_speech(seconds)
+        iterations = max(3, int(60 / seconds))
+        analyzer.analyze_pcm(samples)  # warm up
+        start = time.perf_counter()
+        for _ in range(iterations):
+            result = analyzer.analyze_pcm(samples)
+        elapsed = (time.perf_counter() - start) / iterations * 1000
+        print(f"{seconds:3d}s of audio  {elapsed:8.2f}ms  {elapsed / seconds:6.2f}ms per audio second  "
+              f"{len(result['intensity']):5d} frames  {len(result['visemes']):4d} keyframes")
+
+    if len(sys.argv) > 1:
+        if not analyzer.available:
+            print("⚠️  ffmpeg not found, skipping decode timing")
+        else:
+            start = time.perf_counter()
+            samples = analyzer.decode(sys.argv[1])
+            decode_ms = (time.perf_counter() - start) * 1000
+            seconds = len(samples) / SAMPLE_RATE
+            print(f"decode {sys.argv[1]}: {decode_ms:.1f}ms for {seconds:.1f}s "
+                  f"({decode_ms / seconds:.2f}ms per audio second)")
+    print("=" * 70)
+
+if __name__ == '__main__':
+    main()
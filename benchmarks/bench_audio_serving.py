@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent fetches from /api/audio/<filename>.
+
+Serves fake MP3s from the TTS audio cache through the real Flask route on a
+threaded local server, and reports requests/s and MB/s for full downloads,
+byte-range requests (what <audio> seeking sends) and ETag revalidations that
+end in 304 Not Modified.
+
+Usage:
+    python benchmarks/bench_audio_serving.py [requests] [concurrency]
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FILE_COUNT = 20
+FILE_SIZE = 96 * 1024  # about 6 seconds of 128kbps MP3
+
+def make_audio_files(directory):
+    os.makedirs(directory, exist_ok=True)
+    names = []
+    for i in range(FILE_COUNT):
+        name = hashlib.sha256(f"benchmark audio {i}".encode()).hexdigest() + ".mp3"
+        with open(os.path.join(directory, name), 'wb') as f:
+            f.write(os.urandom(FILE_SIZE))
+        names.append(name)
+    return names
+
+async def fetch_all(base_url, names, total, concurrency, headers_for):
+    import aiohttp
+
+    statuses = {}
+    received = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+        async def one(i):
+            nonlocal received
+            name = names[i % len(names)]
+            async with semaphore:
+                async with session.get(f"{base_url}/api/audio/{name}", headers=headers_for(name)) as response:
+                    body = await response.read()
+                    received += len(body)
+                    statuses[response.status] = statuses.get(response.status, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+
+    return elapsed, received, statuses
+
+def report(name, total, elapsed, received, statuses):
+    codes = ", ".join(f"{code}x{count}" for code, count in sorted(statuses.items()))
+    print(f"{name:<22} {total / elapsed:8.0f} req/s  {received / elapsed / 1e6:8.1f} MB/s  [{codes}]")
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+
+    # Run against a scratch temp_audio/ so the real one isn't touched
+    work_dir = tempfile.mkdtemp(prefix="kanguroo_audio_bench_")
+    os.chdir(work_dir)
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    os.environ.setdefault("ELEVENLABS_API_KEY", "benchmark")
+
+    from werkzeug.serving import make_server
+    from config import AUDIO_CACHE_DIR
+    import app as web_app
+
+    names = make_audio_files(AUDIO_CACHE_DIR)
+    server = make_server('127.0.0.1', 0, web_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    # Silence the per-request log lines from the server and the route while measuring
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    devnull = open(os.devnull, 'w')
+    scenarios = [
+        ("full download", lambda name: {}),
+        ("range (64 KiB)", lambda name: {"Range": "bytes=0-65535"}),
+        ("range (tail)", lambda name: {"Range": "bytes=-4096"}),
+        ("revalidate (304)", lambda name: {"If-None-Match": f'"{name[:-4]}"'}),
+    ]
+
+    print(f"🎵 {total} fetches of {FILE_COUNT} x {FILE_SIZE // 1024} KiB files, concurrency {concurrency}")
+    print("=" * 80)
+    for name, headers_for in scenarios:
+        stdout = sys.stdout
+        sys.stdout = devnull
+        try:
+            result = asyncio.run(fetch_all(base_url, names, total, concurrency, headers_for))
+        finally:
+            sys.stdout = stdout
+        report(name, total, *result)
+    print("=" * 80)
+    print("Content-addressed audio is sent with Cache-Control: immutable, so browsers")
+    print("replaying a cached answer skip even the 304 round trip.")
+
+    server.shutdown()
+    devnull.close()
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: sliding-window latency histograms.
+
+Measures the cost of recording a value and of building the 1m/5m/1h
+summaries for one stage, checks that memory doesn't grow with the number
+of recorded values, and compares the bucketed percentiles with exact ones.
+
+Usage:
+    python benchmarks/bench_latency_histogram.py [values]
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from latency_histogram import SlidingHistogram, LatencyTracker
+from performance_monitor import LATENCY_STAGES
+
+def exact_percentile(ordered, percentile):
+    return ordered[max(0, -(-len(ordered) * percentile // 100) - 1)]
+
+def per_call_us(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    random.seed(1)
+    values = [random.lognormvariate(7.2, 0.7) for _ in range(count)]
+
+    print("⏱️  Sliding-window latency histogram")
+    print("=" * 60)
+    histogram = SlidingHistogram(threshold=4000)
+    start = time.perf_counter()
+    for value in values:
+        histogram.record(value)
+    record = (time.perf_counter() - start) / count * 1e6
+    print(f"record:            {record:8.2f}µs per value")
+
+    # Memory is allocated up front; recording more values must not add to it
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for value in values:
+        histogram.record(value)
+    grown = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"memory growth:     {grown:8d} bytes after {count:,d} more values")
+
+    summary = per_call_us(histogram.get_stats, 200)
+    print(f"1m/5m/1h summary:  {summary:8.1f}µs per stage")
+    tracker = LatencyTracker(LATENCY_STAGES, {'total': 4000})
+    for stage in LATENCY_STAGES:
+        for value in values[:1000]:
+            tracker.record(stage, value)
+    print(f"/api/status:       {per_call_us(tracker.get_stats, 50):8.1f}µs for {len(LATENCY_STAGES)} stages")
+
+    print("-" * 60)
+    ordered = sorted(values)
+    stats = histogram.summary('1m')
+    print(f"{'':>6} {'exact':>10} {'bucketed':>10} {'error':>8}")
+    for percentile in (50, 90, 95, 99):
+        exact = exact_percentile(ordered, percentile)
+        bucketed = stats[f'p{percentile}']
+        print(f"p{percentile:<5} {exact:9.1f}ms {bucketed:9.1f}ms {abs(bucketed - exact) / exact * 100:7.2f}%")
+    breaches = sum(1 for value in values if value > 4000) / count * 100
+    print(f"over budget: {stats['over_budget_pct']}% (exact {breaches:.2f}%)")
+    print("=" * 60)
+
+if __name__ == '__main__':
+    main()
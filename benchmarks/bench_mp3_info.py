@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: MP3 frame-header scan time by file size.
+
+Uses synthetic 128 kbps CBR files (valid headers, silent frames) from
+stub_upstream, scanned with and without recording frame offsets, plus a
+VBR-style file whose Xing tag lets the scan be skipped.
+
+Usage:
+    python benchmarks/bench_mp3_info.py [iterations]
+"""
+
+import os
+import struct
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mp3_info import parse_mp3
+from stub_upstream import fake_mp3, FAKE_FRAME
+
+def with_xing_tag(audio):
+    frames = len(audio) // len(FAKE_FRAME)
+    tag = b'Xing' + struct.pack('>II', 0x01, frames)
+    return (FAKE_FRAME[:4] + bytes(32) + tag).ljust(len(FAKE_FRAME), b'\x00') + audio
+
+def timed(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1000
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print("🎵 MP3 frame scan (128 kbps CBR, 44.1 kHz)")
+    print("=" * 72)
+    print(f"{'audio':>8} {'size':>9} {'frames':>7} {'scan':>9} {'+offsets':>9} {'xing tag':>9}")
+    for seconds in (5, 30, 120, 300):
+        data = fake_mp3(seconds)
+        tagged = with_xing_tag(data)
+        info = parse_mp3(data)
+        scan = timed(lambda: parse_mp3(data), iterations)
+        offsets = timed(lambda: parse_mp3(data, offsets=True), iterations)
+        xing = timed(lambda: parse_mp3(tagged), iterations)
+        print(f"{seconds:7d}s {len(data) / 1e6:7.2f}MB {info.frames:7d} {scan:7.2f}ms {offsets:7.2f}ms {xing:7.3f}ms")
+    print("=" * 72)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: PerformanceMonitor bookkeeping cost by window size.
+
+Compares the previous monitor (linear scan in record_metrics, full rescan in
+get_performance_stats) with the indexed one at 10k and 100k tracked
+requests, then checks that 8 threads recording concurrently lose no counts.
+
+Usage:
+    python benchmarks/bench_performance_monitor.py
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from performance_monitor import PerformanceMonitor
+
+class LegacyPerformanceMonitor:
+    """The previous request bookkeeping, kept as the baseline"""
+
+    def __init__(self, max_requests=1000):
+        self.requests = deque(maxlen=max_requests)
+        self.user_stats = defaultdict(lambda: {'total_requests': 0, 'successful_requests': 0})
+        self.request_counter = 0
+
+    def start_request(self, user_id):
+        self.request_counter += 1
+        request_id = f"req_{self.request_counter}_{int(time.time())}"
+        self.requests.append({'request_id': request_id, 'user_id': user_id,
+                              'start_time': time.time(), 'status': 'started'})
+        return request_id
+
+    def record_metrics(self, request_id, user_id, gemini_time, tts_time, success, response_length):
+        self.user_stats[user_id]['total_requests'] += 1
+        for request in self.requests:
+            if request['request_id'] == request_id:
+                request.update({'gemini_time': gemini_time, 'tts_time': tts_time,
+                                'total_time': gemini_time + tts_time, 'success': success,
+                                'response_length': response_length, 'status': 'completed'})
+                break
+
+    def get_performance_stats(self):
+        completed = [r for r in self.requests if r.get('status') == 'completed']
+        successful = [r for r in completed if r.get('success', False)]
+        total = len(completed)
+        return {
+            'total_requests': total,
+            'success_rate': len(successful) / total * 100,
+            'average_gemini_time': sum(r.get('gemini_time', 0) for r in completed) / total,
+            'average_tts_time': sum(r.get('tts_time', 0) for r in completed) / total,
+            'average_response_time': sum(r.get('total_time', 0) for r in completed) / total,
+        }
+
+def fill(monitor, count):
+    for i in range(count):
+        request_id = monitor.start_request("web_user")
+        monitor.record_metrics(request_id, "web_user", 300.0, 800.0, i % 10 != 0, 120)
+
+def per_call_us(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def bench(name, monitor_class, window):
+    monitor = monitor_class(max_requests=window)
+    fill(monitor, window)
+
+    def one_request():
+        request_id = monitor.start_request("web_user")
+        monitor.record_metrics(request_id, "web_user", 300.0, 800.0, True, 120)
+
+    iterations = 200 if monitor_class is LegacyPerformanceMonitor else 20000
+    record = per_call_us(one_request, iterations)
+    stats = per_call_us(monitor.get_performance_stats, max(5, iterations // 20))
+    print(f"{name:<10} {window:>7,d}  {record:10.1f}µs {stats:12.1f}µs")
+
+def check_threads(threads=8, per_thread=5000):
+    monitor = PerformanceMonitor(max_requests=threads * per_thread)
+    workers = [threading.Thread(target=fill, args=(monitor, per_thread)) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    stats = monitor.get_performance_stats()
+    expected = threads * per_thread
+    ok = (stats['total_requests'] == expected and monitor.request_counter == expected
+          and stats['user_stats']['web_user']['total_requests'] == expected)
+    print(f"{'✅' if ok else '❌'} {threads} threads x {per_thread} requests: "
+          f"{stats['total_requests']} recorded, {monitor.request_counter} started")
+
+def main():
+    print("📊 PerformanceMonitor cost per call")
+    print("=" * 56)
+    print(f"{'monitor':<10} {'window':>7}  {'request':>12} {'/api/status':>14}")
+    for window in (10_000, 100_000):
+        bench("legacy", LegacyPerformanceMonitor, window)
+        bench("indexed", PerformanceMonitor, window)
+    print("=" * 56)
+    check_threads()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: /metrics render time next to the /api/status JSON.
+
+Fills a private PerformanceMonitor with requests from many users (each
+with a few errors), then times the Prometheus exposition and the JSON that
+/api/status builds, which grows with the number of users.
+
+Usage:
+    python benchmarks/bench_prometheus_metrics.py
+"""
+
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from performance_monitor import PerformanceMonitor
+from prometheus_metrics import PrometheusExporter
+
+def fill(monitor, users, per_user=5):
+    for user in range(users):
+        user_id = f"user_{user}"
+        for i in range(per_user):
+            request_id = monitor.start_request(user_id)
+            monitor.record_metrics(request_id, user_id, 400.0, 900.0, i != 0, 120,
+                                   error="upstream timeout" if i == 0 else None, served_by="gemini")
+    for stage in ('url_lookup', 'viseme', 'file_write'):
+        monitor.record_stage(stage, 1.5)
+
+def per_call_us(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def main():
+    print("📈 /metrics vs /api/status")
+    print("=" * 64)
+    print(f"{'users':>7} {'/metrics':>11} {'bytes':>8} {'/api/status':>13} {'bytes':>10}")
+    for users in (10, 1000, 10000):
+        monitor = PerformanceMonitor()
+        fill(monitor, users)
+        exporter = PrometheusExporter(monitor)
+        status = lambda: json.dumps(monitor.get_performance_stats())
+        metrics_us = per_call_us(exporter.render, 500)
+        status_us = per_call_us(status, 20)
+        print(f"{users:7,d} {metrics_us:9.1f}µs {len(exporter.render()):8,d} "
+              f"{status_us:11.1f}µs {len(status()):10,d}")
+    print("=" * 64)
+
+if __name__ == '__main__':
+    main()
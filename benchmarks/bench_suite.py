@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark suite for the server hot paths, with a regression gate.
+
+Times each path over a range of input sizes and compares the results with
+benchmarks/baseline.json:
+- url_lookup: UrlIndex.find, behind WebKanGurooBot._find_relevant_urls (FAQ size)
+- prompt_build / prompt_scoped: the full prompt built per FAQ version and
+  the scoped prompt built per question (FAQ size)
+- viseme_estimated / viseme_aligned: the engine calls behind
+  ElevenLabsService._generate_viseme_data (reply length)
+- monitor_record / monitor_stats: PerformanceMonitor.record_metrics and
+  get_performance_stats (tracked requests)
+- chat_json: Flask's JSON encoding of an /api/chat response with full and
+  binary viseme data (reply length)
+
+Each case reports the best of several timed batches. Machines differ, so
+a fixed pure-Python calibration loop is timed just before and after each
+case, and cases are compared by their time relative to it. A case fails
+the gate when its relative time is more than --tolerance above the
+baseline in three measurements in a row. The baseline is the median of
+three runs; commit an updated one (--update) together with changes that
+are meant to change performance.
+
+Usage:
+    python benchmarks/bench_suite.py                 # run and compare, exit 1 on regression
+    python benchmarks/bench_suite.py --update        # rewrite the baseline
+    python benchmarks/bench_suite.py --filter monitor --tolerance 0.5
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+
+from performance_monitor import PerformanceMonitor
+from prompt_builder import ScopedPromptBuilder, build_custom_prompt
+from stub_upstream import fake_alignment, fake_answer
+from url_index import UrlIndex
+from viseme_codec import encode_viseme_data
+from viseme_engine import viseme_engine
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+DEFAULT_TOLERANCE = 0.30
+RETRIES = 2  # extra measurements of a case before it counts as regressed
+UPDATE_RUNS = 3  # runs whose median becomes the baseline
+
+FAQ_SCALES = (1, 10, 100)
+REPLY_CHARS = (100, 400, 1600)
+TRACKED_REQUESTS = (1_000, 10_000, 100_000)
+
+QUESTION = "Do you have summer school programs in the USA or a university degree in Europe?"
+
+def load_faq():
+    with open(os.path.join(ROOT, 'faq_data.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+def scaled_faq(faq, scale):
+    """FAQ with ``scale`` copies of every program and team member, each with a distinct name"""
+    company = dict(faq['company'])
+    programs = {}
+    for program_type, program_list in company.get('programs', {}).items():
+        programs[program_type] = [
+            dict(program, name=f"{program['name']} {copy}" if copy else program['name'])
+            for copy in range(scale) for program in program_list
+        ]
+    company['programs'] = programs
+    company['team'] = [dict(member, name=f"{member['name']} {copy}" if copy else member['name'])
+                       for copy in range(scale) for member in company.get('team', [])]
+    return dict(faq, company=company)
+
+def chat_response(reply, viseme_data, fmt):
+    """The dict /api/chat returns, as WebKanGurooBot.process_message builds it"""
+    return {
+        'success': True,
+        'response_text': reply,
+        'audio_file': 'response_web_user_1718000000.mp3',
+        'viseme_data': encode_viseme_data(viseme_data, fmt),
+        'relevant_urls': ['https://calendly.com/kan-guroo/15min'],
+        'served_by': 'gemini',
+        'trace_id': '0af7651916cd43dd8448eb211c80319c',
+        'performance': {'total_time': 1834.2, 'gemini_time': 1120.7, 'tts_time': 702.1, 'audio_seconds': 6.4}
+    }
+
+def filled_monitor(tracked):
+    monitor = PerformanceMonitor(max_requests=tracked)
+    for i in range(tracked):
+        user_id = f"user_{i % 500}"
+        request_id = monitor.start_request(user_id)
+        monitor.record_metrics(request_id, user_id, 300.0, 800.0, i % 10 != 0, 120)
+    return monitor
+
+def build_cases():
+    """{name: zero-argument callable}, in report order"""
+    cases = {}
+    faq = load_faq()
+    for scale in FAQ_SCALES:
+        data = scaled_faq(faq, scale)
+        index = UrlIndex(data)
+        builder = ScopedPromptBuilder(data)
+        cases[f'url_lookup[faq={scale}x]'] = lambda index=index: index.find(QUESTION)
+        cases[f'prompt_build[faq={scale}x]'] = lambda data=data: build_custom_prompt(data)
+        cases[f'prompt_scoped[faq={scale}x]'] = lambda builder=builder: builder.build(QUESTION)
+
+    json_provider = Flask('bench_suite').json
+    for chars in REPLY_CHARS:
+        reply = fake_answer(f"reply {chars}", chars)
+        alignment = fake_alignment(reply)
+        duration = alignment['character_end_times_seconds'][-1]
+        viseme_data = viseme_engine.generate(reply, target_duration=duration)
+        cases[f'viseme_estimated[reply={chars}]'] = (
+            lambda reply=reply, duration=duration: viseme_engine.generate(reply, target_duration=duration))
+        cases[f'viseme_aligned[reply={chars}]'] = (
+            lambda reply=reply, alignment=alignment: viseme_engine.generate_aligned(reply, alignment))
+        for fmt in ('full', 'binary'):
+            cases[f'chat_json[{fmt},reply={chars}]'] = (
+                lambda reply=reply, viseme_data=viseme_data, fmt=fmt:
+                json_provider.dumps(chat_response(reply, viseme_data, fmt)))
+
+    for tracked in TRACKED_REQUESTS:
+        monitor = filled_monitor(tracked)
+
+        def record(monitor=monitor):
+            request_id = monitor.start_request("web_user")
+            monitor.record_metrics(request_id, "web_user", 300.0, 800.0, True, 120)
+
+        cases[f'monitor_record[tracked={tracked}]'] = record
+        cases[f'monitor_stats[tracked={tracked}]'] = monitor.get_performance_stats
+    return cases
+
+def calibration():
+    """Fixed pure-Python work (loops, dicts, strings) to scale results by machine speed"""
+    counts = {}
+    for i in range(400):
+        key = f"k{i % 37}"
+        counts[key] = counts.get(key, 0) + i * i
+    return sorted(counts.items())
+
+def measure(func, min_time=0.05, repeats=7):
+    """Best time per call in µs over ``repeats`` batches of at least ``min_time`` seconds"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.1))
+    best = elapsed / number
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best * 1e6
+
+def measure_relative(func, min_time=0.05):
+    """(µs per call, time relative to the calibration loop timed just before and after)"""
+    before = measure(calibration, min_time, 3)
+    us = measure(func, min_time)
+    after = measure(calibration, min_time, 3)
+    return us, us / min(before, after)
+
+def run_cases(cases, min_time, runs=1):
+    """{name: (us, relative)}, the median relative time over ``runs`` runs"""
+    samples = {name: [] for name in cases}
+    for _ in range(runs):
+        for name, func in cases.items():
+            samples[name].append(measure_relative(func, min_time))
+    return {name: sorted(values, key=lambda value: value[1])[len(values) // 2]
+            for name, values in samples.items()}
+
+def compare(results, baseline, tolerance):
+    """Rows of (name, expected_us, current_us, change) and the names that regressed
+
+    ``expected_us`` is the baseline's relative time at this run's calibration
+    speed, and ``change`` the relative difference; cases without a baseline
+    get None for both.
+    """
+    rows, regressions = [], []
+    for name, (current, relative) in results.items():
+        previous = (baseline or {}).get('cases', {}).get(name)
+        if previous is None:
+            rows.append((name, None, current, None))
+            continue
+        change = relative / previous['relative'] - 1
+        expected = previous['relative'] * current / relative
+        rows.append((name, expected, current, change))
+        if change > tolerance:
+            regressions.append(name)
+    return rows, regressions
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_baseline(path, results):
+    baseline = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'calibration_us': round(statistics.median(us / relative for us, relative in results.values()), 3),
+        'cases': {name: {'us': round(us, 3), 'relative': round(relative, 6)}
+                  for name, (us, relative) in results.items()}
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
+        f.write('\n')
+
+def print_rows(rows, tolerance):
+    print(f"{'case':<34} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, expected, current, change in rows:
+        if change is None:
+            print(f"{name:<34} {'-':>12} {current:>10.2f}µs {'new':>9}")
+            continue
+        mark = '❌' if change > tolerance else ''
+        print(f"{name:<34} {expected:>10.2f}µs {current:>10.2f}µs {change * 100:>+8.1f}% {mark}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Server hot-path benchmarks with a regression gate")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update', action='store_true',
+                        help=f'write the median of {UPDATE_RUNS} runs as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed slowdown before failing (0.3 = 30%%)')
+    parser.add_argument('--filter', default='', help='only run cases whose name contains this')
+    parser.add_argument('--min-time', type=float, default=0.05, help='seconds per timed batch')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    print("⏱️  Building benchmark inputs...")
+    cases = {name: func for name, func in build_cases().items() if args.filter in name}
+    results = run_cases(cases, args.min_time, UPDATE_RUNS if args.update else 1)
+
+    baseline = None if args.update else load_baseline(args.baseline)
+    rows, regressions = compare(results, baseline, args.tolerance)
+    for _ in range(RETRIES):
+        if not regressions:
+            break
+        # Re-time the failures, so a noisy spell alone doesn't fail the run
+        for name in regressions:
+            retry = measure_relative(cases[name], args.min_time)
+            results[name] = min(results[name], retry, key=lambda value: value[1])
+        rows, regressions = compare(results, baseline, args.tolerance)
+
+    print("\n📊 Hot-path benchmarks")
+    print("=" * 72)
+    print_rows(rows, args.tolerance)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({name: {'us': us, 'relative': relative} for name, (us, relative) in results.items()},
+                      f, indent=2)
+    if args.update:
+        previous = load_baseline(args.baseline) if args.filter else None
+        if previous:
+            # Relative times don't depend on the machine, so a partial update can be merged
+            merged = {name: (case['us'], case['relative']) for name, case in previous['cases'].items()}
+            merged.update(results)
+            results = merged
+        save_baseline(args.baseline, results)
+        print(f"\n💾 Baseline written to {os.path.relpath(args.baseline, ROOT)}")
+    elif baseline is None:
+        print(f"\n⚠️  No baseline at {args.baseline}; run with --update to create one")
+    elif regressions:
+        print(f"\n❌ {len(regressions)} case(s) regressed by more than {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    else:
+        print(f"\n✅ No case regressed by more than {args.tolerance:.0%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: tracing overhead per span and per traced request.
+
+Times an empty span with tracing off, on, and on with a queued exporter
+(which only hands the span to the exporter thread), then a span tree
+shaped like one /api/chat request (about a dozen spans).
+
+Usage:
+    python benchmarks/bench_tracing.py [iterations]
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tracing import Tracer
+
+class NullExporter:
+    def export(self, spans):
+        pass
+
+def request_tree(tracer):
+    with tracer.span('process_message', user_id='web_user'):
+        with tracer.span('faq_lookup') as span:
+            span.set_attribute('hit', False)
+        with tracer.span('gemini.generate'):
+            with tracer.span('gemini.cache_lookup'):
+                pass
+            with tracer.span('gemini.prompt_assembly', mode='full'):
+                pass
+            with tracer.span('gemini.request'):
+                pass
+        with tracer.span('url_lookup'):
+            pass
+        with tracer.span('tts', chars=80):
+            for name in ('tts.cache_lookup', 'tts.session', 'tts.ttfb', 'tts.download',
+                         'tts.file_write', 'viseme', 'tts.cache_commit'):
+                with tracer.span(name):
+                    pass
+
+def per_call_us(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    exporting = Tracer()
+    exporting.add_exporter(NullExporter())
+    tracers = (('disabled', Tracer(enabled=False)), ('buffer', Tracer()), ('exporter', exporting))
+
+    print("🧵 Tracing overhead")
+    print("=" * 48)
+    print(f"{'tracer':<10} {'empty span':>14} {'/api/chat tree':>18}")
+    for name, tracer in tracers:
+        def empty_span():
+            with tracer.span('noop'):
+                pass
+        span_us = per_call_us(empty_span, iterations)
+        tree_us = per_call_us(lambda: request_tree(tracer), iterations // 10)
+        print(f"{name:<10} {span_us:12.2f}µs {tree_us:16.1f}µs")
+    exporting.flush()
+    print("=" * 48)
+    print(f"exporter queue: {exporting.spans_finished:,d} spans, {exporting.spans_dropped:,d} dropped")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: URL matching with the precompiled UrlIndex vs. the previous
+_find_relevant_urls, which re-read faq_data.json and substring-scanned every
+program on each call.
+
+Usage:
+    python benchmarks/bench_url_matching.py [iterations]
+"""
+
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from url_index import UrlIndex
+
+FAQ_PATH = os.path.join(ROOT, 'faq_data.json')
+
+MESSAGES = [
+    "Tell me about the exchange program in the USA",
+    "I want to learn German",
+    "Do you have English courses?",
+    "Who is your CEO?",
+    "What summer schools do you offer?",
+    "Can you help me with a master's degree abroad in Europe?",
+]
+
+def legacy_find_relevant_urls(user_message: str) -> list:
+    """The original implementation, kept here as the baseline"""
+    with open(FAQ_PATH, 'r', encoding='utf-8') as f:
+        faq_data = json.load(f)
+
+    programs = faq_data.get("company", {}).get("programs", {})
+    relevant_urls = []
+    user_message_lower = user_message.lower()
+
+    for program_type, program_list in programs.items():
+        for program in program_list:
+            program_name_lower = program['name'].lower()
+            if any(keyword in user_message_lower for keyword in program_name_lower.split()):
+                if 'url' in program:
+                    relevant_urls.append(program['url'])
+            if 'english' in user_message_lower and 'english' in program_name_lower:
+                if 'url' in program:
+                    relevant_urls.append(program['url'])
+            elif 'german' in user_message_lower and 'german' in program_name_lower:
+                if 'url' in program:
+                    relevant_urls.append(program['url'])
+            if any(keyword in user_message_lower for keyword in ['exchange', 'high school', 'usa', 'europe']):
+                if 'url' in program:
+                    relevant_urls.append(program['url'])
+
+    return list(set(relevant_urls))
+
+def bench(name, func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for message in MESSAGES:
+            func(message)
+    elapsed = time.perf_counter() - start
+    per_call = elapsed / (iterations * len(MESSAGES)) * 1e6
+    print(f"{name:<22} {per_call:9.2f}µs per message")
+    return per_call
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with open(FAQ_PATH, 'r', encoding='utf-8') as f:
+        index = UrlIndex(json.load(f))
+
+    print("🔗 URL matching micro-benchmark")
+    print("=" * 60)
+    for message in MESSAGES:
+        print(f"• {message}")
+        print(f"    legacy: {legacy_find_relevant_urls(message)}")
+        print(f"    index:  {index.find(message)}")
+    print("=" * 60)
+
+    legacy = bench("legacy (file + scan)", legacy_find_relevant_urls, iterations)
+    indexed = bench("UrlIndex", index.find, iterations)
+    print("=" * 60)
+    print(f"⚡ {legacy / indexed:.1f}x faster")
+
+if __name__ == '__main__':
+    main()
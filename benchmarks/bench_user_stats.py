@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: per-user stats memory and cost under a flood of unique IDs.
+
+Records the same traffic (a few busy kiosks plus a stream of one-off user
+IDs, as a client minting a new ID per request would send) into the
+previous unbounded defaultdict and into the bounded UserStatsTable, and
+reports memory held, time per record and whether the busy users' counts
+survived.
+
+Usage:
+    python benchmarks/bench_user_stats.py [requests]
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from user_stats import UserStatsTable
+
+MAX_BYTES = 2 * 1024 * 1024
+KIOSKS = 20
+
+class LegacyUserStats:
+    """The previous per-user bookkeeping, kept as the baseline"""
+
+    def __init__(self):
+        self.user_stats = defaultdict(lambda: {
+            'total_requests': 0,
+            'successful_requests': 0,
+            'total_gemini_time': 0,
+            'total_tts_time': 0,
+            'total_response_length': 0,
+            'total_audio_seconds': 0,
+            'errors': []
+        })
+
+    def record(self, user_id, success, gemini_time, tts_time, response_length, audio_seconds=0.0, error=None):
+        stats = self.user_stats[user_id]
+        stats['total_requests'] += 1
+        if success:
+            stats['successful_requests'] += 1
+        stats['total_gemini_time'] += gemini_time
+        stats['total_tts_time'] += tts_time
+        stats['total_response_length'] += response_length
+        stats['total_audio_seconds'] += audio_seconds
+        if error:
+            stats['errors'].append({'timestamp': time.time(), 'error': error})
+
+    def get(self, user_id):
+        return self.user_stats[user_id]
+
+def traffic(count):
+    rng = random.Random(1)
+    requests = []
+    for i in range(count):
+        if i % 2:
+            user_id = f"kiosk_{int(rng.paretovariate(1.0)) % KIOSKS}"
+        else:
+            user_id = f"session_{i:08x}_{rng.getrandbits(64):016x}"
+        requests.append((user_id, "ElevenLabs timeout" if i % 20 == 0 else None))
+    return requests
+
+def measure(factory, requests):
+    """The filled table and the bytes it holds, sketches included"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    table = factory()
+    for user_id, error in requests:
+        table.record(user_id, error is None, 300.0, 700.0, 80, 2.0, error)
+    used = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(before, 'filename'))
+    tracemalloc.stop()
+    return table, used
+
+def per_record_us(table, requests):
+    start = time.perf_counter()
+    for user_id, error in requests:
+        table.record(user_id, error is None, 300.0, 700.0, 80, 2.0, error)
+    return (time.perf_counter() - start) / len(requests) * 1e6
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    requests = traffic(count)
+    expected = defaultdict(int)
+    for user_id, _ in requests:
+        if user_id.startswith('kiosk_'):
+            expected[user_id] += 1
+
+    print(f"👥 Per-user stats, {count:,} requests ({count // 2:,} one-off IDs, {KIOSKS} kiosks)")
+    print("=" * 64)
+    print(f"{'table':<12} {'memory':>12} {'per record':>14} {'kiosks exact':>16}")
+    for name, factory in (('legacy', LegacyUserStats), ('bounded', lambda: UserStatsTable(MAX_BYTES))):
+        table, used = measure(factory, requests)
+        exact = sum(table.get(user_id).get('total_requests') == total for user_id, total in expected.items())
+        elapsed = per_record_us(factory(), requests)
+        print(f"{name:<12} {used / 1024 / 1024:>9.1f} MB {elapsed:>11.2f} µs {exact:>10}/{len(expected)}")
+    print(f"\nBounded table ceiling: {MAX_BYTES / 1024 / 1024:.0f} MB")
+
+if __name__ == '__main__':
+    main()
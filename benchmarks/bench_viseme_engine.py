@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: phoneme-based VisemeEngine vs. the previous per-letter
+mapping (one viseme per letter, 100ms per character).
+
+Reports time per reply, keyframes sent to the client and timeline length.
+
+Usage:
+    python benchmarks/bench_viseme_engine.py [iterations]
+"""
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from viseme_engine import VisemeEngine, word_to_phonemes
+
+REPLIES = [
+    "Our CEO is Otari Melanashvili, who is also our Co-Founder!",
+    "We offer exchange programs in the USA and Europe, summer schools, and language courses in English and German.",
+    "You can reach us at info@kan-guroo.com or call 555-123-456. We'd love to help you study abroad!",
+    "Kan-Guroo helps students find the right university abroad, from bachelor's to master's degrees.",
+]
+
+LEGACY_MAP = {
+    'A': 'viseme_sil', 'B': 'viseme_PP', 'C': 'viseme_kk', 'D': 'viseme_DD',
+    'E': 'viseme_aa', 'F': 'viseme_ff', 'G': 'viseme_kk', 'H': 'viseme_aa',
+    'I': 'viseme_aa', 'J': 'viseme_DD', 'K': 'viseme_kk', 'L': 'viseme_nn',
+    'M': 'viseme_PP', 'N': 'viseme_nn', 'O': 'viseme_aa', 'P': 'viseme_PP',
+    'Q': 'viseme_kk', 'R': 'viseme_rr', 'S': 'viseme_ss', 'T': 'viseme_DD',
+    'U': 'viseme_aa', 'V': 'viseme_ff', 'W': 'viseme_aa', 'X': 'viseme_kk',
+    'Y': 'viseme_aa', 'Z': 'viseme_ss'
+}
+
+def legacy_generate(text):
+    """The previous ElevenLabsService._generate_viseme_data, kept as the baseline"""
+    visemes = []
+    current_time = 0.0
+    for char in text.upper():
+        if char in LEGACY_MAP:
+            visemes.append({'time': current_time, 'viseme': LEGACY_MAP[char]})
+        current_time += 0.1
+    return {'visemes': visemes, 'duration': current_time, 'text': text}
+
+def bench(name, func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for reply in REPLIES:
+            func(reply)
+    per_reply = (time.perf_counter() - start) / (iterations * len(REPLIES)) * 1e6
+    keyframes = sum(len(func(r)['visemes']) for r in REPLIES) / len(REPLIES)
+    duration = sum(func(r)['duration'] for r in REPLIES) / len(REPLIES)
+    print(f"{name:<22} {per_reply:8.1f}µs per reply  {keyframes:6.1f} keyframes  {duration:5.1f}s timeline")
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    chars = sum(len(r) for r in REPLIES) / len(REPLIES)
+    print(f"👄 Viseme generation for {len(REPLIES)} replies (avg {chars:.0f} chars)")
+    print("=" * 80)
+
+    bench("legacy per-letter", legacy_generate, iterations)
+
+    # Cold: new engine and empty word cache for every reply
+    def cold(text):
+        word_to_phonemes.cache_clear()
+        return VisemeEngine().generate(text)
+    bench("engine (cold cache)", cold, max(1, iterations // 10))
+
+    engine = VisemeEngine()
+    bench("engine (warm cache)", engine.generate, iterations)
+    print("=" * 80)
+
+if __name__ == '__main__':
+    main()
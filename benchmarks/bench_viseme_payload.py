@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Viseme payload size and parse time per wire format.
+
+"legacy" is the previous per-letter timeline with the full text repeated,
+"full" the current viseme_data dict, and "compact"/"binary" the opt-in
+encodings from viseme_codec.py. Sizes are for the JSON-serialized
+viseme_data, raw and as sent with gzip or brotli. Parse time is json.loads
+plus decoding back to times and viseme names.
+
+Usage:
+    python benchmarks/bench_viseme_payload.py [iterations]
+"""
+
+import gzip
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_viseme_engine import REPLIES, legacy_generate
+from viseme_engine import viseme_engine
+from viseme_codec import encode_viseme_data, decode_viseme_data, FORMAT_COMPACT, FORMAT_BINARY
+from asset_server import brotli, compress
+
+def payloads(with_intensity):
+    """Serialized viseme_data per format, one per reply"""
+    formats = {'legacy': [], 'full': [], FORMAT_COMPACT: [], FORMAT_BINARY: []}
+    for reply in REPLIES:
+        data = viseme_engine.generate(reply)
+        if with_intensity:
+            # An audio analysis track: 50 values per second, mouth opening 0-100
+            frames = int(data['duration'] * 50)
+            data = dict(data, frame_rate=50, intensity=[(i * 37) % 101 for i in range(frames)])
+        formats['legacy'].append(json.dumps(legacy_generate(reply)).encode())
+        formats['full'].append(json.dumps(data).encode())
+        formats[FORMAT_COMPACT].append(json.dumps(encode_viseme_data(data, FORMAT_COMPACT)).encode())
+        formats[FORMAT_BINARY].append(json.dumps(encode_viseme_data(data, FORMAT_BINARY)).encode())
+    return formats
+
+def parse_time(encoded, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for payload in encoded:
+            decode_viseme_data(json.loads(payload))
+    return (time.perf_counter() - start) / (iterations * len(encoded)) * 1e6
+
+def report(title, formats, iterations):
+    print(f"\n{title}")
+    print(f"{'format':<10} {'raw':>8} {'gzip':>8} {'br':>8} {'parse':>10}")
+    for name, encoded in formats.items():
+        raw = sum(len(p) for p in encoded) / len(encoded)
+        gz = sum(len(compress(p, 'gzip', fast=True)) for p in encoded) / len(encoded)
+        br = sum(len(compress(p, 'br', fast=True)) for p in encoded) / len(encoded) if brotli else float('nan')
+        print(f"{name:<10} {raw:7.0f}B {gz:7.0f}B {br:7.0f}B {parse_time(encoded, iterations):8.1f}µs")
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    chars = sum(len(r) for r in REPLIES) / len(REPLIES)
+    print(f"📦 Viseme payload per reply ({len(REPLIES)} replies, avg {chars:.0f} chars)")
+    print("=" * 50)
+    report("Text-derived visemes", payloads(False), iterations)
+    report("With a 50 fps audio intensity track", payloads(True), iterations // 4)
+    print("=" * 50)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Load test: drive /api/chat (or /api/chat/stream) and report throughput,
+latency percentiles, time to first byte and error rates.
+
+Two arrival models:
+- closed loop (--concurrency N): N clients, each sending its next request
+  as soon as the previous one finishes; shows the throughput ceiling.
+- open loop (--rate R): Poisson arrivals at R requests/s whatever the server
+  does, as real visitors arrive; latency is measured from the scheduled
+  send time, so a backed-up server can't hide its queueing delay.
+
+With --local the app is started in a subprocess against the stub Gemini
+and ElevenLabs servers from stub_upstream.py, so no API quota is used;
+otherwise --url points at an app that is already running (start it against
+`python benchmarks/stub_upstream.py` the same way). Questions get a unique
+suffix so the response and audio caches don't answer them, unless --repeat.
+Server-side failures the client can't see (Gemini errors are answered with
+an apology) are read from the app's /metrics before and after the run.
+
+Note: google-generativeai's REST transport, which the stub needs, reads a
+streamed Gemini answer to the end before yielding it, so streamed text
+arrives in one burst against the stub.
+
+Usage:
+    python benchmarks/load_test.py --local --concurrency 8 --duration 30
+    python benchmarks/load_test.py --local --rate 5 --stream --gemini-error-rate 0.05
+    python benchmarks/load_test.py --url http://localhost:5001 --concurrency 16 --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import aiohttp
+
+from stub_upstream import StubGemini, StubUpstream
+
+QUESTIONS = (
+    "What exchange programs do you offer in the USA?",
+    "How much does the work and travel program cost?",
+    "Which documents do I need for the visa interview?",
+    "When is the application deadline for next summer?",
+    "Can I choose my employer in America?",
+    "Do you help with flights and insurance?",
+    "How long can I stay after my job ends?",
+    "Is there an age limit for participants?",
+)
+
+ERRORS_SAMPLE = re.compile(r'^kanguroo_errors_total\{stage="([^"]*)"\} (\S+)$', re.MULTILINE)
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def message_for(index, repeat):
+    question = QUESTIONS[index % len(QUESTIONS)]
+    return question if repeat else f"{question} (load test #{index})"
+
+async def send(session, base_url, stream, index, repeat, scheduled):
+    """One request; times are in ms from ``scheduled``"""
+    path = '/api/chat/stream' if stream else '/api/chat'
+    result = {'ok': False, 'audio': False, 'ttfb_ms': None, 'first_audio_ms': None,
+              'served_by': None, 'error': None}
+    try:
+        async with session.post(base_url + path, json={'message': message_for(index, repeat),
+                                                       'user_id': f'load_{index % 50}'}) as response:
+            result['ttfb_ms'] = (time.perf_counter() - scheduled) * 1000
+            if response.status != 200:
+                result['error'] = f'http_{response.status}'
+            elif stream:
+                event = None
+                async for raw in response.content:
+                    line = raw.decode('utf-8').strip()
+                    if line.startswith('event: '):
+                        event = line[7:]
+                        if event == 'audio':
+                            result['audio'] = True
+                            if result['first_audio_ms'] is None:
+                                result['first_audio_ms'] = (time.perf_counter() - scheduled) * 1000
+                    elif line.startswith('data: ') and event in ('done', 'error'):
+                        data = json.loads(line[6:])
+                        result['ok'] = event == 'done' and data.get('success', False)
+                        result['served_by'] = data.get('served_by')
+                        if not result['ok']:
+                            result['error'] = 'stream_error' if event == 'error' else 'unsuccessful'
+            else:
+                data = await response.json()
+                result['ok'] = bool(data.get('success'))
+                result['audio'] = bool(data.get('audio_file'))
+                result['served_by'] = data.get('served_by')
+                if not result['ok']:
+                    result['error'] = 'unsuccessful'
+    except Exception as e:
+        result['error'] = type(e).__name__
+    result['latency_ms'] = (time.perf_counter() - scheduled) * 1000
+    return result
+
+async def closed_loop(session, args, deadline):
+    results = []
+    counter = iter(range(args.warmup, args.warmup + (args.requests or 10 ** 9)))
+
+    async def client():
+        for index in counter:
+            if time.perf_counter() >= deadline:
+                break
+            results.append(await send(session, args.url, args.stream, index, args.repeat, time.perf_counter()))
+
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    return results, args.concurrency
+
+async def open_loop(session, args, deadline):
+    rng = random.Random(args.seed)
+    tasks = []
+    outstanding = peak = 0
+
+    async def tracked(index, scheduled):
+        nonlocal outstanding, peak
+        outstanding += 1
+        peak = max(peak, outstanding)
+        try:
+            return await send(session, args.url, args.stream, index, args.repeat, scheduled)
+        finally:
+            outstanding -= 1
+
+    next_at = time.perf_counter()
+    index = args.warmup
+    while next_at < deadline and (not args.requests or len(tasks) < args.requests):
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(tracked(index, next_at)))
+        index += 1
+        next_at += rng.expovariate(args.rate)
+    return list(await asyncio.gather(*tasks)), peak
+
+def read_server_errors(base_url):
+    """errors_total by stage from the app's /metrics, or None if it isn't served"""
+    try:
+        with urllib.request.urlopen(base_url + '/metrics', timeout=5) as response:
+            text = response.read().decode('utf-8')
+    except Exception:
+        return None
+    return {stage: float(value) for stage, value in ERRORS_SAMPLE.findall(text)}
+
+async def run(args):
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    async with aiohttp.ClientSession(timeout=timeout, connector=aiohttp.TCPConnector(limit=0)) as session:
+        for index in range(args.warmup):
+            await send(session, args.url, args.stream, index, args.repeat, time.perf_counter())
+        errors_before = read_server_errors(args.url)
+        start = time.perf_counter()
+        deadline = start + args.duration
+        if args.rate:
+            results, concurrency = await open_loop(session, args, deadline)
+        else:
+            results, concurrency = await closed_loop(session, args, deadline)
+        elapsed = time.perf_counter() - start
+    errors_after = read_server_errors(args.url)
+    server_errors = None
+    if errors_before is not None and errors_after is not None:
+        server_errors = {stage: int(count - errors_before.get(stage, 0))
+                         for stage, count in errors_after.items() if count > errors_before.get(stage, 0)}
+    return summarize(results, elapsed, concurrency, server_errors)
+
+def distribution(values):
+    values = sorted(v for v in values if v is not None)
+    return {
+        'p50': round(percentile(values, 0.50), 1),
+        'p90': round(percentile(values, 0.90), 1),
+        'p99': round(percentile(values, 0.99), 1),
+        'max': round(values[-1], 1) if values else 0.0
+    }
+
+def summarize(results, elapsed, concurrency, server_errors):
+    total = len(results)
+    ok = sum(result['ok'] for result in results)
+    return {
+        'requests': total,
+        'successful': ok,
+        'error_rate': round((total - ok) / total * 100, 2) if total else 0.0,
+        'without_audio': sum(result['ok'] and not result['audio'] for result in results),
+        'errors': dict(Counter(result['error'] for result in results if result['error'])),
+        'served_by': dict(Counter(result['served_by'] for result in results if result['served_by'])),
+        'server_errors': server_errors,
+        'duration_s': round(elapsed, 2),
+        'throughput_rps': round(total / elapsed, 2) if elapsed else 0.0,
+        'concurrency': concurrency,
+        'latency_ms': distribution(result['latency_ms'] for result in results),
+        'ttfb_ms': distribution(result['ttfb_ms'] for result in results),
+        'first_audio_ms': distribution(result['first_audio_ms'] for result in results)
+    }
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_local_app(args):
+    """Stub upstreams plus the app in a subprocess; returns (process, stubs)"""
+    gemini = StubGemini(latency=args.gemini_latency, chunk_latency=args.chunk_latency,
+                        response_chars=args.response_chars, error_rate=args.gemini_error_rate,
+                        error_status=args.error_status, seed=args.seed).start()
+    elevenlabs = StubUpstream(use_tls=False, latency=args.tts_latency, audio_seconds=args.audio_seconds,
+                              error_rate=args.tts_error_rate, error_status=args.error_status,
+                              seed=args.seed).start()
+    port = free_port()
+    env = dict(os.environ, GEMINI_API_KEY='stub', GEMINI_API_ENDPOINT=gemini.base_url,
+               ELEVENLABS_API_KEY='stub', ELEVENLABS_VOICE_ID='stub', ELEVENLABS_BASE_URL=elevenlabs.base_url)
+    command = [sys.executable, '-c',
+               f"import app; app.app.run(host='127.0.0.1', port={port}, threaded=True, use_reloader=False)"]
+    log = open(args.server_log, 'w')
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    args.url = f'http://127.0.0.1:{port}'
+    for _ in range(300):
+        if process.poll() is not None:
+            raise RuntimeError(f"App exited with code {process.returncode}, see {args.server_log}")
+        try:
+            urllib.request.urlopen(args.url + '/api/health', timeout=1).close()
+            break
+        except OSError:
+            time.sleep(0.1)
+    else:
+        process.terminate()
+        raise RuntimeError("App didn't come up within 30s")
+    return process, (gemini, elevenlabs)
+
+def print_report(summary, args, stubs):
+    mode = f"open loop, {args.rate:g} req/s" if args.rate else f"closed loop, {args.concurrency} clients"
+    print(f"\n📈 Load test: {mode}, {'/api/chat/stream' if args.stream else '/api/chat'}, {args.url}")
+    print("=" * 64)
+    print(f"requests        {summary['requests']} in {summary['duration_s']}s "
+          f"({summary['throughput_rps']} req/s, peak {summary['concurrency']} in flight)")
+    print(f"errors          {summary['error_rate']}% {summary['errors'] or ''}")
+    print(f"without audio   {summary['without_audio']}")
+    if summary['served_by']:
+        print(f"served by       {summary['served_by']}")
+    if summary['server_errors'] is not None:
+        print(f"server errors   {summary['server_errors'] or 'none'} (from /metrics)")
+    rows = [('latency', 'latency_ms'), ('ttfb', 'ttfb_ms')]
+    if args.stream:
+        rows.append(('first audio', 'first_audio_ms'))
+    print(f"\n{'ms':<14} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}")
+    for label, key in rows:
+        values = summary[key]
+        print(f"{label:<14} {values['p50']:>9} {values['p90']:>9} {values['p99']:>9} {values['max']:>9}")
+    for stub in stubs:
+        print(f"\n{type(stub).__name__}: {stub.get_stats()}", end='')
+    print()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip(),
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--url', help='base URL of a running app')
+    target.add_argument('--local', action='store_true', help='start the app against stub upstreams')
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument('--concurrency', type=int, default=8, help='closed loop: clients in parallel')
+    load.add_argument('--rate', type=float, help='open loop: Poisson arrivals per second')
+    parser.add_argument('--duration', type=float, default=30, help='seconds to send requests for')
+    parser.add_argument('--requests', type=int, default=0, help='stop after this many requests')
+    parser.add_argument('--warmup', type=int, default=3, help='unrecorded requests sent first')
+    parser.add_argument('--stream', action='store_true', help='use /api/chat/stream')
+    parser.add_argument('--repeat', action='store_true', help='reuse questions so the caches can answer')
+    parser.add_argument('--timeout', type=float, default=60, help='per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--json', help='also write the summary to this file')
+    stub = parser.add_argument_group('stub upstreams (--local)')
+    stub.add_argument('--gemini-latency', default='lognormal:0.6,0.3', help='seconds or spec, e.g. uniform:0.3,0.9')
+    stub.add_argument('--chunk-latency', default='0.05', help='between streamed Gemini chunks')
+    stub.add_argument('--response-chars', type=int, default=300, help='Gemini answer length')
+    stub.add_argument('--tts-latency', default='lognormal:0.4,0.3')
+    stub.add_argument('--audio-seconds', type=float, default=None, help='fixed MP3 length (default: sized to the text)')
+    stub.add_argument('--gemini-error-rate', type=float, default=0.0)
+    stub.add_argument('--tts-error-rate', type=float, default=0.0)
+    stub.add_argument('--error-status', type=int, default=500)
+    stub.add_argument('--server-log', default=os.devnull, help='where the app subprocess logs go')
+    args = parser.parse_args()
+
+    process, stubs = None, ()
+    if args.local:
+        process, stubs = start_local_app(args)
+    args.url = args.url.rstrip('/')
+    try:
+        summary = asyncio.run(run(args))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(10)
+        for upstream in stubs:
+            upstream.stop()
+
+    print_report(summary, args, stubs)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for the ElevenLabs and Gemini APIs used by the benchmarks
+and the load test.
+
+Each stub runs an aiohttp server (optionally over TLS with a throwaway
+self-signed certificate) on a background thread and counts requests,
+injected errors and distinct client connections, so benchmarks can tell
+reused connections from new handshakes. Latency is a fixed number of
+seconds or a distribution (see latency_model), and a share of requests
+can be made to fail.
+
+When using TLS, create the stub and export SSL_CERT_FILE=stub.cert_file before
+aiohttp is first imported so the client trusts the throwaway certificate.
+
+Run on its own to serve both APIs to an app started in another shell:
+    python benchmarks/stub_upstream.py --gemini-latency lognormal:0.8,0.4 --error-rate 0.02
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import math
+import os
+import random
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+from typing import Callable, Optional
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz: 417-byte frames of 1152 samples each
+FAKE_FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+FAKE_FRAME_SECONDS = 1152 / 44100
+
+def fake_mp3(seconds: float) -> bytes:
+    """Silent but well-formed MP3 of about the given length"""
+    return FAKE_FRAME * max(1, round(seconds / FAKE_FRAME_SECONDS))
+
+# Canned per-character timings for the with-timestamps endpoint, in seconds
+CHAR_SECONDS = 0.07
+SPACE_SECONDS = 0.04
+PUNCTUATION_SECONDS = 0.25
+TRAILING_SILENCE_SECONDS = 0.2
+
+def fake_alignment(text: str) -> dict:
+    """Deterministic ElevenLabs-style character alignment for text"""
+    starts, ends = [], []
+    current = 0.0
+    for char in text:
+        if char.isspace():
+            duration = SPACE_SECONDS
+        elif char in ",.;:!?":
+            duration = PUNCTUATION_SECONDS
+        else:
+            duration = CHAR_SECONDS
+        starts.append(round(current, 3))
+        current += duration
+        ends.append(round(current, 3))
+    return {
+        "characters": list(text),
+        "character_start_times_seconds": starts,
+        "character_end_times_seconds": ends,
+    }
+
+def fake_speech(text: str) -> bytes:
+    """MP3 as long as the fake alignment of text, plus a little trailing silence"""
+    ends = fake_alignment(text)["character_end_times_seconds"]
+    return fake_mp3((ends[-1] if ends else 0.0) + TRAILING_SILENCE_SECONDS)
+
+def make_self_signed_cert(directory: str):
+    """Create a self-signed certificate for 127.0.0.1, return (cert, key) or None"""
+    if shutil.which("openssl") is None:
+        return None
+    cert_path = os.path.join(directory, "stub_cert.pem")
+    key_path = os.path.join(directory, "stub_key.pem")
+    result = subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+            "-keyout", key_path, "-out", cert_path, "-days", "1",
+            "-subj", "/CN=127.0.0.1",
+            "-addext", "subjectAltName=IP:127.0.0.1,DNS:localhost",
+        ],
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        return None
+    return cert_path, key_path
+
+def latency_model(spec) -> Callable[[random.Random], float]:
+    """Sampler of delays in seconds for a latency spec
+
+    A number is a fixed delay; otherwise one of "fixed:SECONDS",
+    "uniform:LOW,HIGH", "exp:MEAN", "normal:MEAN,STDDEV" (clipped at 0) or
+    "lognormal:MEDIAN,SIGMA" (a long right tail, like real API latency).
+    """
+    try:
+        seconds = float(spec)
+        return lambda rng: seconds
+    except ValueError:
+        pass
+    kind, _, args = str(spec).partition(":")
+    try:
+        values = [float(value) for value in args.split(",")]
+    except ValueError:
+        raise ValueError(f"Bad latency spec: {spec}")
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "exp" and len(values) == 1 and values[0] > 0:
+        return lambda rng: rng.expovariate(1 / values[0])
+    if kind == "normal" and len(values) == 2:
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: values[0] * math.exp(rng.gauss(0, values[1]))
+    raise ValueError(f"Bad latency spec: {spec}")
+
+# Canned answer sentences for the Gemini stub
+ANSWER_SENTENCES = (
+    "Kan-Guroo runs work and travel programs in the USA for university students.",
+    "Applications usually open in the autumn, so it is worth starting early.",
+    "Our team helps with the visa interview, insurance and flights.",
+    "Participants work for up to four months and can travel for one more.",
+    "You will find the program details and fees on our website.",
+    "Feel free to ask me about documents, deadlines or host employers!",
+)
+
+def fake_answer(prompt: str, chars: int) -> str:
+    """Answer of about ``chars`` characters, the same for the same prompt
+
+    It opens by repeating the question (the prompt's last line), so distinct
+    questions get distinct answers and don't share audio cache entries.
+    """
+    rng = random.Random(prompt)
+    lines = prompt.strip().splitlines() or [""]
+    sentences = [f"You asked: {lines[-1][:120]}"]
+    length = len(sentences[0])
+    while length < chars:
+        sentence = rng.choice(ANSWER_SENTENCES)
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)
+
+def split_chunks(text: str, count: int):
+    """Split text at word boundaries into about ``count`` stream chunks"""
+    words = text.split(" ")
+    size = max(1, math.ceil(len(words) / max(1, count)))
+    chunks = [" ".join(words[i:i + size]) for i in range(0, len(words), size)]
+    return [chunk if i == 0 else " " + chunk for i, chunk in enumerate(chunks)]
+
+class StubServer:
+    """aiohttp stub on its own thread; subclasses add their routes in _add_routes"""
+
+    def __init__(self, use_tls: bool = True, latency=0.0, error_rate: float = 0.0,
+                 error_status: int = 500, port: int = 0, seed: Optional[int] = None):
+        self.latency = latency  # seconds, or a latency_model spec
+        self.error_rate = error_rate  # share of requests answered with error_status
+        self.error_status = error_status
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.connections = set()
+        self.cert_dir = tempfile.mkdtemp(prefix="stub_upstream_")
+        self.cert = make_self_signed_cert(self.cert_dir) if use_tls else None
+        self.port = port
+        self._web = None
+        self._loop = None
+        self._runner = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    @property
+    def latency(self):
+        return self._latency
+
+    @latency.setter
+    def latency(self, spec):
+        self._sample_latency = latency_model(spec)
+        self._latency = spec
+
+    @property
+    def scheme(self) -> str:
+        return "https" if self.cert else "http"
+
+    @property
+    def origin(self) -> str:
+        return f"{self.scheme}://127.0.0.1:{self.port}"
+
+    @property
+    def cert_file(self):
+        return self.cert[0] if self.cert else None
+
+    async def _begin(self, request) -> bool:
+        """Count the request and wait out its latency; False if it should fail"""
+        self.requests += 1
+        peer = request.transport.get_extra_info("peername")
+        self.connections.add(peer)
+        delay = self._sample_latency(self.rng)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.errors += 1
+            return False
+        return True
+
+    def _add_routes(self, router):
+        raise NotImplementedError
+
+    def _run(self):
+        # Imported here so callers can point SSL_CERT_FILE at our certificate
+        # before aiohttp builds its default client SSL context
+        from aiohttp import web
+
+        self._web = web
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+
+        app = web.Application()
+        self._add_routes(app.router)
+        self._runner = web.AppRunner(app, access_log=None)
+        self._loop.run_until_complete(self._runner.setup())
+
+        ssl_context = None
+        if self.cert:
+            ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            ssl_context.load_cert_chain(*self.cert)
+
+        site = web.TCPSite(self._runner, "127.0.0.1", self.port, ssl_context=ssl_context)
+        self._loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def reset_counters(self):
+        self.requests = 0
+        self.errors = 0
+        self.connections = set()
+
+    def get_stats(self) -> dict:
+        return {"requests": self.requests, "errors": self.errors, "connections": len(self.connections)}
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+        shutil.rmtree(self.cert_dir, ignore_errors=True)
+
+class StubUpstream(StubServer):
+    """ElevenLabs-compatible stub server running on its own thread"""
+
+    def __init__(self, use_tls: bool = True, latency=0.0, audio: Optional[bytes] = None,
+                 alignment: bool = True, audio_seconds: Optional[float] = None, **kwargs):
+        super().__init__(use_tls, latency, **kwargs)
+        self.audio = audio  # None: fake_speech() sized to each request's text
+        self.audio_seconds = audio_seconds  # fixed length instead, to set the payload size
+        self.alignment = alignment  # False: with-timestamps responses omit the alignment
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.origin}/v1"
+
+    def _audio_for(self, body: dict) -> bytes:
+        if self.audio is not None:
+            return self.audio
+        if self.audio_seconds is not None:
+            return fake_mp3(self.audio_seconds)
+        return fake_speech(body.get("text", ""))
+
+    def _error(self):
+        return self._web.json_response(
+            {"detail": {"status": "stub_error", "message": "Injected stub error"}}, status=self.error_status)
+
+    async def _tts(self, request):
+        body = await request.json()
+        if not await self._begin(request):
+            return self._error()
+        return self._web.Response(body=self._audio_for(body), content_type="audio/mpeg")
+
+    async def _tts_with_timestamps(self, request):
+        body = await request.json()
+        if not await self._begin(request):
+            return self._error()
+        payload = {"audio_base64": base64.b64encode(self._audio_for(body)).decode("ascii")}
+        if self.alignment:
+            payload["alignment"] = fake_alignment(body.get("text", ""))
+        return self._web.json_response(payload)
+
+    def _add_routes(self, router):
+        router.add_post("/v1/text-to-speech/{voice_id}", self._tts)
+        router.add_post("/v1/text-to-speech/{voice_id}/with-timestamps", self._tts_with_timestamps)
+
+# gRPC status names Google APIs put in error bodies
+GOOGLE_STATUS = {400: "INVALID_ARGUMENT", 429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE"}
+
+class StubGemini(StubServer):
+    """Gemini REST stub (generateContent and streamGenerateContent) on its own thread
+
+    Point the app at it with GEMINI_API_ENDPOINT=stub.base_url. ``latency``
+    is the time to the first byte; streamed answers then arrive in
+    ``chunks`` pieces ``chunk_latency`` apart.
+    """
+
+    def __init__(self, use_tls: bool = False, latency=0.0, chunk_latency=0.0,
+                 response_chars: int = 300, chunks: int = 6, **kwargs):
+        super().__init__(use_tls, latency, **kwargs)
+        self.chunk_latency = chunk_latency
+        self.response_chars = response_chars
+        self.chunks = chunks
+
+    @property
+    def chunk_latency(self):
+        return self._chunk_latency
+
+    @chunk_latency.setter
+    def chunk_latency(self, spec):
+        self._sample_chunk_latency = latency_model(spec)
+        self._chunk_latency = spec
+
+    @property
+    def base_url(self) -> str:
+        return self.origin
+
+    @staticmethod
+    def _candidate(text: str, last: bool) -> dict:
+        candidate = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+        if last:
+            candidate["finishReason"] = "STOP"
+        return {"candidates": [candidate]}
+
+    def _error(self):
+        return self._web.json_response({"error": {
+            "code": self.error_status,
+            "message": "Injected stub error",
+            "status": GOOGLE_STATUS.get(self.error_status, "UNKNOWN")
+        }}, status=self.error_status)
+
+    async def _call(self, request):
+        model, _, method = request.match_info["call"].partition(":")
+        if method not in ("generateContent", "streamGenerateContent"):
+            return self._web.json_response({"error": {"code": 404, "message": f"Unknown method {method}"}},
+                                           status=404)
+        body = await request.json()
+        prompt = body["contents"][-1]["parts"][-1]["text"]
+        if not await self._begin(request):
+            return self._error()
+        answer = fake_answer(prompt, self.response_chars)
+        if method == "generateContent":
+            return self._web.json_response(self._candidate(answer, True))
+
+        # The REST client reads a JSON array and parses elements as they arrive
+        response = self._web.StreamResponse(headers={"Content-Type": "application/json"})
+        await response.prepare(request)
+        chunks = split_chunks(answer, self.chunks)
+        for i, chunk in enumerate(chunks):
+            if i:
+                delay = self._sample_chunk_latency(self.rng)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            prefix = "[" if i == 0 else ",\r\n"
+            await response.write((prefix + json.dumps(self._candidate(chunk, i == len(chunks) - 1))).encode())
+        await response.write(b"]")
+        await response.write_eof()
+        return response
+
+    def _add_routes(self, router):
+        router.add_post("/v1beta/models/{call}", self._call)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve stub Gemini and ElevenLabs APIs")
+    parser.add_argument("--gemini-port", type=int, default=8701)
+    parser.add_argument("--elevenlabs-port", type=int, default=8702)
+    parser.add_argument("--gemini-latency", default="lognormal:0.6,0.3", help="time to first byte")
+    parser.add_argument("--chunk-latency", default="0.05", help="between streamed Gemini chunks")
+    parser.add_argument("--response-chars", type=int, default=300)
+    parser.add_argument("--tts-latency", default="lognormal:0.4,0.3")
+    parser.add_argument("--audio-seconds", type=float, default=None, help="fixed MP3 length (default: sized to the text)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    errors = dict(error_rate=args.error_rate, error_status=args.error_status, seed=args.seed)
+    gemini = StubGemini(latency=args.gemini_latency, chunk_latency=args.chunk_latency,
+                        response_chars=args.response_chars, port=args.gemini_port, **errors).start()
+    elevenlabs = StubUpstream(use_tls=False, latency=args.tts_latency, audio_seconds=args.audio_seconds,
+                              port=args.elevenlabs_port, **errors).start()
+    print("🧪 Stub upstreams running; start the app with:")
+    print(f"   GEMINI_API_ENDPOINT={gemini.base_url} ELEVENLABS_BASE_URL={elevenlabs.base_url} \\")
+    print("   GEMINI_API_KEY=stub ELEVENLABS_API_KEY=stub ELEVENLABS_VOICE_ID=stub python app.py")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    for stub in (gemini, elevenlabs):
+        print(f"{type(stub).__name__}: {stub.get_stats()}")
+        stub.stop()
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,11 @@ load_dotenv()
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', 'your_gemini_api_key_here')
 ELEVENLABS_API_KEY = os.getenv('ELEVENLABS_API_KEY', 'your_elevenlabs_api_key_here')
 ELEVENLABS_VOICE_ID = os.getenv('ELEVENLABS_VOICE_ID', 'your_voice_id_here')
+ELEVENLABS_BASE_URL = os.getenv('ELEVENLABS_BASE_URL', 'https://api.elevenlabs.io/v1')
+# Alternative Gemini API host, e.g. the load-test stub (http://127.0.0.1:8701); empty uses Google's
+GEMINI_API_ENDPOINT = os.getenv('GEMINI_API_ENDPOINT', '')
+# Request character timestamps with the audio and align visemes to them
+TTS_ALIGNMENT_ENABLED = os.getenv('TTS_ALIGNMENT_ENABLED', 'true').lower() == 'true'
 
 # Application settings
 DEBUG = True
@@ -21,13 +26,88 @@ PORT = 5001
 # File paths
 FAQ_DATA_PATH = 'faq_data.json'
 CHARACTER_MODEL_PATH = 'Dona.glb'
+OPTIMIZED_CHARACTER_MODEL_PATH = 'Dona.optimized.glb'  # built by glb_optimizer.py
+SERVE_OPTIMIZED_MODEL = os.getenv('SERVE_OPTIMIZED_MODEL', 'true').lower() == 'true'
+STATIC_DIR = 'static'
 TEMP_AUDIO_DIR = 'temp_audio'
 
 # Performance settings
 MAX_RESPONSE_TIME = 4000  # milliseconds
 TTS_TIMEOUT = 10  # seconds
 GEMINI_TIMEOUT = 15  # seconds
+ASYNC_RUNTIME_WORKERS = 16  # threads for blocking SDK calls on the shared loop
+
+# Response cache settings
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+RESPONSE_CACHE_MAX_ENTRIES = 256
+RESPONSE_CACHE_TTL = 3600  # seconds
+
+# Knowledge store: how often to check faq_data.json for edits
+KNOWLEDGE_POLL_INTERVAL = 2.0  # seconds
+
+# Prompt assembly: 'full' sends the whole FAQ, 'scoped' only the top-k relevant sections
+PROMPT_MODE = os.getenv('PROMPT_MODE', 'full')
+PROMPT_TOP_K = 2
+
+# FAQ fast path: answer confident FAQ matches locally instead of calling Gemini
+FAQ_FASTPATH_ENABLED = os.getenv('FAQ_FASTPATH_ENABLED', 'true').lower() == 'true'
+FAQ_FASTPATH_THRESHOLD = 0.6  # 0-1, how sure the local match has to be
+
+# TTS audio cache settings
+AUDIO_CACHE_ENABLED = os.getenv('AUDIO_CACHE_ENABLED', 'true').lower() == 'true'
+AUDIO_CACHE_DIR = os.path.join(TEMP_AUDIO_DIR, 'cache')
+AUDIO_CACHE_MAX_BYTES = int(os.getenv('AUDIO_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+AUDIO_CACHE_SERVE_GRACE = 30  # seconds; entries handed out this recently may still be being served
+
+# Single-flight: concurrent requests for the same question (same FAQ version)
+# share one Gemini call, and concurrent TTS of the same text one synthesis
+SINGLE_FLIGHT_ENABLED = os.getenv('SINGLE_FLIGHT_ENABLED', 'true').lower() == 'true'
+
+# Per-request audio store: the janitor deletes files past the age limit, then
+# the oldest files until the directory fits the byte budget
+AUDIO_STORE_MAX_AGE = int(os.getenv('AUDIO_STORE_MAX_AGE', 3600))  # seconds
+AUDIO_STORE_MAX_BYTES = int(os.getenv('AUDIO_STORE_MAX_BYTES', 100 * 1024 * 1024))
+AUDIO_JANITOR_INTERVAL = 60  # seconds between sweeps
+AUDIO_STORE_WRITE_GRACE = 30  # seconds; files modified this recently may still be downloading
+
+# Static assets: precompressed variants are kept per content hash in ASSET_BUILD_DIR
+ASSET_BUILD_DIR = 'asset_build'
+ASSET_AUTO_RELOAD = DEBUG  # rehash edited files without a restart
+IMMUTABLE_CACHE_MAX_AGE = 365 * 24 * 3600  # seconds, for content-addressed URLs
+
+# gzip/brotli for JSON API responses (SSE streams are never compressed)
+JSON_COMPRESSION_ENABLED = os.getenv('JSON_COMPRESSION_ENABLED', 'true').lower() == 'true'
+JSON_COMPRESSION_MIN_BYTES = 512  # smaller bodies aren't worth the CPU
+
+# Prometheus text exposition on /metrics
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+
+# Per-user stats: full stats for the heaviest users, approximate counts for
+# everyone else, all within USER_STATS_MAX_BYTES; the compactor drops users
+# idle for USER_STATS_IDLE_SECONDS and errors older than an hour
+USER_STATS_MAX_BYTES = int(os.getenv('USER_STATS_MAX_BYTES', 8 * 1024 * 1024))
+USER_STATS_ERRORS_PER_USER = 10  # most recent errors kept per tracked user
+USER_STATS_IDLE_SECONDS = 24 * 3600
+USER_STATS_COMPACT_INTERVAL = 300  # seconds between compactions
+USER_STATS_REPORT_TOP = 20  # users listed in /api/status
+
+# Request tracing: spans are kept in a ring buffer (see /api/traces/<id>) and
+# optionally exported by a background thread; TRACE_EXPORTERS is a comma
+# separated list of 'jsonl' and 'otlp' (an OTLP/HTTP collector, JSON encoding)
+TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'true').lower() == 'true'
+TRACE_BUFFER_SPANS = 4096
+TRACE_EXPORTERS = os.getenv('TRACE_EXPORTERS', '')
+TRACE_JSONL_PATH = os.getenv('TRACE_JSONL_PATH', 'traces.jsonl')
+TRACE_OTLP_ENDPOINT = os.getenv('TRACE_OTLP_ENDPOINT', 'http://localhost:4318/v1/traces')
+TRACE_SERVICE_NAME = 'kanguroo'
 
 # Character animation settings
 ANIMATION_SPEED = 1.0
-LIPSYNC_SENSITIVITY = 0.5
\ No newline at end of file
+VISEME_SPEAKING_RATE = 1.0  # >1 shortens the phoneme durations of the viseme timeline
+LIPSYNC_SENSITIVITY = 0.5
+
+# Optional stage after TTS: decode the MP3 (needs ffmpeg and NumPy) and derive a
+# per-frame mouth-open intensity track from the waveform
+AUDIO_LIPSYNC_ENABLED = os.getenv('AUDIO_LIPSYNC_ENABLED', 'false').lower() == 'true'
+AUDIO_LIPSYNC_FRAME_RATE = 50  # intensity values per second of audio
+AUDIO_LIPSYNC_FFMPEG = os.getenv('AUDIO_LIPSYNC_FFMPEG', 'ffmpeg')
\ No newline at end of file
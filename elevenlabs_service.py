@@ -1,9 +1,20 @@
 import asyncio
 import aiohttp
+import base64
 import time
 import os
 from typing import Optional, Tuple
-from config import ELEVENLABS_API_KEY, ELEVENLABS_VOICE_ID
+from config import (
+    ELEVENLABS_API_KEY, ELEVENLABS_VOICE_ID, ELEVENLABS_BASE_URL, TTS_ALIGNMENT_ENABLED,
+    AUDIO_LIPSYNC_ENABLED, AUDIO_CACHE_ENABLED, AUDIO_CACHE_DIR, AUDIO_CACHE_MAX_BYTES,
+    AUDIO_CACHE_SERVE_GRACE
+)
+from audio_cache import AudioCache
+from viseme_engine import viseme_engine, ENGINE_ID as VISEME_ENGINE_ID
+from audio_lipsync import audio_lipsync, ANALYZER_ID
+from mp3_info import mp3_duration
+from performance_monitor import performance_monitor
+from tracing import tracer
 
 class ElevenLabsService:
     def __init__(self):
@@ -12,16 +23,43 @@ class ElevenLabsService:
         
         self.api_key = ELEVENLABS_API_KEY
         self.voice_id = ELEVENLABS_VOICE_ID
-        self.base_url = "https://api.elevenlabs.io/v1"
+        self.base_url = ELEVENLABS_BASE_URL
+        self.use_alignment = TTS_ALIGNMENT_ENABLED
+        self.audio_lipsync = None
+        if AUDIO_LIPSYNC_ENABLED:
+            if audio_lipsync.available:
+                self.audio_lipsync = audio_lipsync
+                performance_monitor.register_cache('audio_lipsync', audio_lipsync)
+            else:
+                missing = ', '.join(audio_lipsync.missing_dependencies)
+                print(f"⚠️  Audio lip-sync analysis disabled, missing {missing}; using text-derived visemes only")
         
         # Performance optimizations
         self.session = None
+        self.connector = None
+        self._session_loop = None
         self.timeout = aiohttp.ClientTimeout(total=10, connect=5)
-        self.connector = aiohttp.TCPConnector(limit=10, limit_per_host=5)
+        
+        self.audio_cache = None
+        if AUDIO_CACHE_ENABLED:
+            self.audio_cache = AudioCache(AUDIO_CACHE_DIR, AUDIO_CACHE_MAX_BYTES, AUDIO_CACHE_SERVE_GRACE)
+            performance_monitor.register_cache('tts_audio', self.audio_cache)
     
     async def _get_session(self):
         """Get or create persistent session for better performance"""
+        loop = asyncio.get_running_loop()
+        if self.session is not None and not self.session.closed and self._session_loop is not loop:
+            # The session is bound to another (possibly dead) loop and can't be reused here
+            print("⚠️  ElevenLabs session belongs to another event loop, creating a new one")
+            self.session = None
+        
         if self.session is None or self.session.closed:
+            # The connector must be created on the loop that will use it, so it is
+            # built lazily here rather than in __init__
+            self.connector = aiohttp.TCPConnector(
+                limit=10, limit_per_host=5, keepalive_timeout=60
+            )
+            self._session_loop = loop
             self.session = aiohttp.ClientSession(
                 connector=self.connector,
                 timeout=self.timeout,
@@ -32,9 +70,21 @@ class ElevenLabsService:
             )
         return self.session
     
-    async def text_to_speech_with_visemes(self, text: str, output_path: str = "temp_audio.mp3") -> Tuple[Optional[str], Optional[dict]]:
-        """Convert text to speech using ElevenLabs API with viseme data for lip-sync"""
+    async def text_to_speech_with_visemes(self, text: str, output_path: Optional[str] = "temp_audio.mp3") -> Tuple[Optional[str], Optional[dict]]:
+        """Convert text to speech using ElevenLabs API with viseme data for lip-sync
+        
+        With the audio cache enabled the returned path points into the cache
+        and ``output_path`` is not used (it may be None). In alignment mode the with-timestamps
+        endpoint is used and the visemes follow the returned character timings.
+        """
+        with tracer.span('tts', chars=len(text), alignment=self.use_alignment) as span:
+            return await self._synthesize(text, output_path, span)
+    
+    async def _synthesize(self, text: str, output_path: Optional[str], span) -> Tuple[Optional[str], Optional[dict]]:
+        """text_to_speech_with_visemes inside its span, with child spans per step"""
         start_time = time.time()
+        cache_key = None
+        ttfb_span = None
         
         try:
             # Optimize text length for faster processing
@@ -50,6 +100,10 @@ class ElevenLabsService:
             
             # Prepare the request with optimized settings
             url = f"{self.base_url}/text-to-speech/{self.voice_id}"
+            headers = None
+            if self.use_alignment:
+                url += "/with-timestamps"
+                headers = {"Accept": "application/json"}
             
             data = {
                 "text": text,
@@ -64,77 +118,202 @@ class ElevenLabsService:
                 "optimize_streaming_latency": 3  # Maximum optimization
             }
             
+            if self.audio_cache is not None:
+                cache_key = AudioCache.make_key(
+                    text, self.voice_id, data["model_id"], data["voice_settings"], data["output_format"]
+                )
+                with tracer.span('tts.cache_lookup') as lookup_span:
+                    cached = self.audio_cache.get(cache_key)
+                    lookup_span.set_attribute('hit', cached is not None)
+                span.set_attribute('cache_hit', cached is not None)
+                if cached is not None:
+                    cached_path, viseme_data = cached
+                    stale = False
+                    if not viseme_data or viseme_data.get('engine') not in (VISEME_ENGINE_ID, ANALYZER_ID):
+                        # Entry from an older viseme engine, the audio is still good
+                        viseme_data = await self._generate_viseme_data(text, audio_duration=mp3_duration(cached_path))
+                        stale = True
+                    if self.audio_lipsync is not None and (viseme_data or {}).get('analyzer') != ANALYZER_ID:
+                        # Not analyzed yet, or by an older analyzer
+                        viseme_data = await self._add_audio_analysis(cached_path, viseme_data)
+                        stale = True
+                    if stale and viseme_data:
+                        self.audio_cache.update_visemes(cache_key, viseme_data)
+                    elapsed_time = (time.time() - start_time) * 1000
+                    print(f"ElevenLabs TTS cache hit: {elapsed_time:.2f}ms")
+                    return cached_path, viseme_data
+                # Download next to the cache entry so committing it is an atomic rename
+                output_path = self.audio_cache.new_temp_path()
+            
             # Use persistent session for better performance
-            session = await self._get_session()
+            with tracer.span('tts.session'):
+                session = await self._get_session()
             
-            async with session.post(url, json=data) as response:
+            # Time to first byte ends when the response headers are in; the body is the download
+            ttfb_span = tracer.start_span('tts.ttfb')
+            async with session.post(url, json=data, headers=headers) as response:
+                ttfb_span.set_attribute('status', response.status)
+                ttfb_span.end()
+                span.set_attribute('status', response.status)
                 if response.status == 200:
-                    # Optimized file writing with larger chunks
-                    with open(output_path, 'wb') as f:
-                        async for chunk in response.content.iter_chunked(32768):  # Larger chunks
-                            f.write(chunk)
+                    alignment = None
+                    if self.use_alignment:
+                        # JSON with base64 audio and per-character timings
+                        with tracer.span('tts.download'):
+                            payload = await response.json()
+                            audio = base64.b64decode(payload.get("audio_base64") or "")
+                        if not audio:
+                            raise ValueError("with-timestamps response has no audio")
+                        write_start = time.perf_counter()
+                        with tracer.span('tts.file_write', bytes=len(audio)):
+                            with open(output_path, 'wb') as f:
+                                f.write(audio)
+                        performance_monitor.record_stage('file_write', (time.perf_counter() - write_start) * 1000)
+                        alignment = payload.get("alignment") or payload.get("normalized_alignment")
+                    else:
+                        # Optimized file writing with larger chunks; only the writes are timed, not the download
+                        write_time = 0.0
+                        received = 0
+                        with tracer.span('tts.download') as download_span:
+                            with open(output_path, 'wb') as f:
+                                async for chunk in response.content.iter_chunked(32768):  # Larger chunks
+                                    write_start = time.perf_counter()
+                                    f.write(chunk)
+                                    write_time += time.perf_counter() - write_start
+                                    received += len(chunk)
+                            download_span.set_attribute('bytes', received)
+                            download_span.set_attribute('write_ms', round(write_time * 1000, 3))
+                        performance_monitor.record_stage('file_write', write_time * 1000)
                     
                     elapsed_time = (time.time() - start_time) * 1000
                     print(f"ElevenLabs TTS time: {elapsed_time:.2f}ms")
                     
-                    # Generate viseme data for lip-sync animation
-                    viseme_data = await self._generate_viseme_data(text)
+                    # Generate viseme data for lip-sync animation, fitted to the real audio length
+                    audio_duration = mp3_duration(output_path)
+                    viseme_data = await self._generate_viseme_data(text, alignment, audio_duration)
+                    if self.audio_lipsync is not None:
+                        viseme_data = await self._add_audio_analysis(output_path, viseme_data)
+                    
+                    if cache_key is not None:
+                        with tracer.span('tts.cache_commit'):
+                            output_path = self.audio_cache.commit(cache_key, output_path, viseme_data)
                     
                     return output_path, viseme_data
                 else:
                     error_text = await response.text()
                     print(f"ElevenLabs API error: {response.status} - {error_text}")
+                    performance_monitor.record_error('tts')
+                    span.set_error(f"HTTP {response.status}")
+                    if cache_key is not None:
+                        self.cleanup_audio_file(output_path)
                     return None, None
                         
         except Exception as e:
             print(f"Error in ElevenLabs service: {e}")
+            performance_monitor.record_error('tts')
+            span.set_error(e)
+            if ttfb_span is not None:
+                ttfb_span.end()
+            # Don't leave a partial download behind
+            self.cleanup_audio_file(output_path)
             return None, None
     
-    async def _generate_viseme_data(self, text: str) -> dict:
-        """Generate viseme data for lip-sync animation"""
+    async def _generate_viseme_data(self, text: str, alignment: Optional[dict] = None,
+                                    audio_duration: Optional[float] = None) -> dict:
+        """Generate viseme data for lip-sync animation, from alignment when available
+        
+        With the audio length known (``audio_duration`` from the MP3 frame
+        headers), an estimated timeline is scaled to it and ``audio_duration``
+        is included so the client can stop exactly when the audio ends.
+        """
+        viseme_start = time.perf_counter()
         try:
-            # This is a simplified viseme generation
-            # In a real implementation, you would use ElevenLabs' phoneme API
-            # or a separate phoneme analysis service
-            
-            # Basic viseme mapping for common phonemes
-            viseme_map = {
-                'A': 'viseme_sil', 'B': 'viseme_PP', 'C': 'viseme_kk', 'D': 'viseme_DD',
-                'E': 'viseme_aa', 'F': 'viseme_ff', 'G': 'viseme_kk', 'H': 'viseme_aa',
-                'I': 'viseme_aa', 'J': 'viseme_DD', 'K': 'viseme_kk', 'L': 'viseme_nn',
-                'M': 'viseme_PP', 'N': 'viseme_nn', 'O': 'viseme_aa', 'P': 'viseme_PP',
-                'Q': 'viseme_kk', 'R': 'viseme_rr', 'S': 'viseme_ss', 'T': 'viseme_DD',
-                'U': 'viseme_aa', 'V': 'viseme_ff', 'W': 'viseme_aa', 'X': 'viseme_kk',
-                'Y': 'viseme_aa', 'Z': 'viseme_ss'
-            }
-            
-            # Generate basic viseme sequence
-            visemes = []
-            current_time = 0.0
-            duration_per_char = 0.1  # 100ms per character
-            
-            for char in text.upper():
-                if char in viseme_map:
-                    visemes.append({
-                        'time': current_time,
-                        'viseme': viseme_map[char]
-                    })
-                current_time += duration_per_char
-            
+            with tracer.span('viseme', aligned=bool(alignment)) as span:
+                viseme_data = None
+                if alignment:
+                    try:
+                        viseme_data = viseme_engine.generate_aligned(text, alignment)
+                    except Exception as e:
+                        print(f"⚠️  Viseme alignment failed: {e}")
+                        performance_monitor.record_error('viseme')
+                    if viseme_data is None:
+                        print("⚠️  Unusable TTS alignment, falling back to estimated viseme timing")
+                if viseme_data is None:
+                    viseme_data = viseme_engine.generate(text, target_duration=audio_duration)
+                if audio_duration:
+                    viseme_data['audio_duration'] = round(audio_duration, 3)
+                    viseme_data['duration'] = max(viseme_data['duration'], viseme_data['audio_duration'])
+                span.set_attribute('source', viseme_data['source'])
+            performance_monitor.record_stage('viseme', (time.perf_counter() - viseme_start) * 1000)
+            return viseme_data
+        except Exception as e:
+            print(f"Error generating viseme data: {e}")
+            performance_monitor.record_error('viseme')
+            return None
+    
+    async def _add_audio_analysis(self, audio_path: str, viseme_data: Optional[dict]) -> Optional[dict]:
+        """Attach the per-frame intensity track measured on the audio itself
+        
+        Aligned visemes are kept since they come from the actual timings; the
+        estimated text timeline is replaced by the classes found in the audio.
+        """
+        loop = asyncio.get_running_loop()
+        with tracer.span('audio_lipsync'):
+            analysis = await loop.run_in_executor(None, self.audio_lipsync.analyze_file, audio_path)
+        if analysis is None:
+            return viseme_data
+        if viseme_data is None:
+            return analysis
+        viseme_data = dict(viseme_data)
+        viseme_data['analyzer'] = analysis['analyzer']
+        viseme_data['frame_rate'] = analysis['frame_rate']
+        viseme_data['intensity'] = analysis['intensity']
+        if viseme_data.get('source') != 'alignment':
+            viseme_data['visemes'] = analysis['visemes']
+            viseme_data['duration'] = analysis['duration']
+            viseme_data['source'] = 'audio'
+        return viseme_data
+    
+    def get_pool_stats(self, timeout: float = 0.5) -> Optional[dict]:
+        """Connections held by the upstream pool: in use and idle keep-alive ones
+        
+        The connector's bookkeeping is only changed on the session's loop, so
+        it is read there too; callers on other threads (the /metrics scrape)
+        wait up to ``timeout`` for it. None before the first request or if the
+        loop doesn't answer in time.
+        """
+        connector, loop = self.connector, self._session_loop
+        if connector is None or connector.closed or loop is None or loop.is_closed():
+            return None
+        
+        def read():
             return {
-                'visemes': visemes,
-                'duration': current_time,
-                'text': text
+                'active': len(connector._acquired),
+                'idle': sum(len(conns) for conns in connector._conns.values())
             }
-            
+        
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return read()
+        
+        async def read_on_loop():
+            return read()
+        
+        try:
+            return asyncio.run_coroutine_threadsafe(read_on_loop(), loop).result(timeout)
         except Exception as e:
-            print(f"Error generating viseme data: {e}")
+            print(f"⚠️  Could not read ElevenLabs pool stats: {e}")
             return None
     
     async def close_session(self):
         """Close the persistent session"""
         if self.session and not self.session.closed:
             await self.session.close()
+        self.session = None
+        self.connector = None
     
     async def get_voices(self) -> Optional[list]:
         """Get available voices from ElevenLabs"""
@@ -161,7 +340,7 @@ class ElevenLabsService:
     def cleanup_audio_file(self, file_path: str):
         """Clean up temporary audio file"""
         try:
-            if os.path.exists(file_path):
+            if file_path and os.path.exists(file_path):
                 os.remove(file_path)
         except Exception as e:
             print(f"Error cleaning up audio file: {e}")
@@ -0,0 +1,201 @@
+import math
+import re
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Question scaffolding that carries no topic information
+STOP_WORDS = {
+    'a', 'about', 'an', 'and', 'any', 'are', 'at', 'be', 'can', 'could', 'do',
+    'does', 'for', 'from', 'give', 'has', 'have', 'how', 'i', 'in', 'is', 'it', 'kan',
+    'guroo', 'kanguroo', 'know', 'me', 'my', 'of', 'on', 'or', 'our', 'please',
+    's', 'tell', 'the', 'there', 'to', 'us', 'want', 'was', 'we', 'what',
+    'whats', 'which', 'who', 'whos', 'would', 'you', 'your', 'yours'
+}
+
+GENERIC_PROGRAM_WORDS = re.compile(r'\b(programs?|courses?)\b', re.IGNORECASE)
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with stop words removed and plurals folded"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOP_WORDS:
+            continue
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+class BM25Index:
+    """Small in-memory inverted index with Okapi BM25 scoring"""
+
+    def __init__(self, documents: List[str], k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)  # token -> [(doc_id, term_frequency)]
+        self.doc_lengths = []
+
+        for doc_id, text in enumerate(documents):
+            counts = defaultdict(int)
+            tokens = tokenize(text)
+            for token in tokens:
+                counts[token] += 1
+            for token, tf in counts.items():
+                self.postings[token].append((doc_id, tf))
+            self.doc_lengths.append(len(tokens))
+
+        self.doc_count = len(documents)
+        self.avg_length = (sum(self.doc_lengths) / self.doc_count) if self.doc_count else 0
+        self.idf = {
+            token: math.log(1 + (self.doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+            for token, posting in self.postings.items()
+        }
+        # Query terms we've never seen are treated as maximally specific
+        self.max_idf = math.log(1 + (self.doc_count + 0.5) / 0.5) if self.doc_count else 0
+
+    def search(self, query_tokens: List[str]) -> List[Tuple[int, float, float]]:
+        """Return (doc_id, score, matched_idf) for matching documents, best first"""
+        scores = defaultdict(float)
+        matched_idf = defaultdict(float)
+        for token in set(query_tokens):
+            idf = self.idf.get(token)
+            if idf is None:
+                continue
+            for doc_id, tf in self.postings[token]:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+                matched_idf[doc_id] += idf
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return [(doc_id, score, matched_idf[doc_id]) for doc_id, score in ranked]
+
+    def query_weight(self, query_tokens: List[str]) -> float:
+        """Total idf mass of a query, used to measure how much of it a match covers"""
+        return sum(self.idf.get(token, self.max_idf) for token in set(query_tokens))
+
+class FaqAnswer:
+    """A fast-path answer with the confidence it was selected with"""
+
+    def __init__(self, entry_id: str, text: str, confidence: float):
+        self.entry_id = entry_id
+        self.text = text
+        self.confidence = confidence
+
+class FaqAnswerer:
+    """Answer common questions straight from faq_data.json without Gemini.
+
+    Every FAQ fact becomes a small document (keywords plus a templated answer).
+    A question is answered locally only when the best match covers most of the
+    question's terms and clearly beats the runner-up; anything else returns
+    None so the caller can fall back to Gemini.
+    """
+
+    def __init__(self, faq_data: Dict[str, Any], threshold: float = 0.6):
+        self.threshold = threshold
+        self.entries = self._build_entries(faq_data.get('company', {}))
+        self.index = BM25Index([keywords for _, keywords, _ in self.entries])
+
+    @staticmethod
+    def _join_names(names: List[str]) -> str:
+        if len(names) <= 1:
+            return ''.join(names)
+        return f"{', '.join(names[:-1])}, and {names[-1]}"
+
+    def _build_entries(self, company: Dict[str, Any]) -> List[Tuple[str, str, str]]:
+        """Build (entry_id, keywords, answer) triples from the company data"""
+        entries = []
+        team = company.get('team', [])
+
+        ceo = next((m for m in team if 'ceo' in m.get('role', '').lower()), None)
+        if ceo:
+            extra = ceo['role'].replace('&', '').replace('CEO', '').strip()
+            answer = f"Our CEO is {ceo['name']}"
+            answer += f", who is also our {extra}!" if extra else "!"
+            entries.append(('ceo', 'ceo chief executive officer head boss leader runs company', answer))
+
+        founders = [m for m in team if 'founder' in m.get('role', '').lower()]
+        if founders:
+            names = [f"{m['name']} (CEO)" if m is ceo else m['name'] for m in founders]
+            entries.append((
+                'founders', 'founder founders co-founder cofounder founded started created',
+                f"Our founders are {self._join_names(names)}!"
+            ))
+
+        if team:
+            members = [f"{m['name']} ({m['role']})" for m in team]
+            entries.append((
+                'team', 'team member members staff people work works behind',
+                f"Our team includes {self._join_names(members)}."
+            ))
+
+        contact = company.get('contact', {})
+        if contact.get('phone'):
+            entries.append((
+                'phone', 'phone number call telephone mobile',
+                f"You can call us at {contact['phone']}!"
+            ))
+        if contact.get('email'):
+            entries.append((
+                'email', 'email e-mail address mail write',
+                f"You can email us at {contact['email']}!"
+            ))
+        if contact:
+            details = [contact[k] for k in ('phone', 'email') if contact.get(k)]
+            entries.append((
+                'contact', 'contact reach touch get in support',
+                f"You can reach us at {' or '.join(details)}!"
+            ))
+
+        if company.get('website'):
+            entries.append((
+                'website', 'website site url web page online link',
+                f"Our website is {company['website']}!"
+            ))
+        if company.get('mission'):
+            entries.append(('mission', 'mission goal purpose', f"Our mission: {company['mission']}"))
+        if company.get('vision'):
+            entries.append(('vision', 'vision', company['vision']))
+        if company.get('description'):
+            entries.append(('about', 'company overview description', company['description']))
+
+        programs = company.get('programs', {})
+        all_programs = [p for program_list in programs.values() for p in program_list]
+        if all_programs:
+            entries.append((
+                'programs', 'program programs offer offers available list services options',
+                f"We offer {self._join_names([p['name'] for p in all_programs])}!"
+            ))
+        for program_type, program_list in programs.items():
+            for program in program_list:
+                answer = f"{program['name']}: {program['description']}."
+                if 'url' in program:
+                    answer += f" You can book a consultation at {program['url']}"
+                # Generic words stay with the programs overview so "what programs..."
+                # isn't split across every program entry
+                description = GENERIC_PROGRAM_WORDS.sub('', program['description'])
+                keywords = f"{program['name']} {program_type.replace('_', ' ')} {description}"
+                entries.append((f"program:{program['name']}", keywords, answer))
+
+        return entries
+
+    def answer(self, question: str) -> Optional[FaqAnswer]:
+        """Return a templated answer if the match is confident enough"""
+        query_tokens = tokenize(question)
+        if not query_tokens:
+            return None
+
+        results = self.index.search(query_tokens)
+        if not results:
+            return None
+
+        best_id, best_score, matched_idf = results[0]
+        runner_up = results[1][1] if len(results) > 1 else 0.0
+
+        coverage = matched_idf / self.index.query_weight(query_tokens)
+        margin = (best_score - runner_up) / best_score
+        confidence = coverage * (0.5 + 0.5 * margin)
+        if confidence < self.threshold:
+            return None
+
+        entry_id, _, text = self.entries[best_id]
+        return FaqAnswer(entry_id, text, round(confidence, 3))
@@ -1,119 +1,195 @@
 import json
 import asyncio
+import threading
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, AsyncIterator
 import google.generativeai as genai
-from config import GEMINI_API_KEY
+from config import (
+    GEMINI_API_KEY, GEMINI_API_ENDPOINT, RESPONSE_CACHE_ENABLED,
+    RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL, PROMPT_MODE
+)
+from prompt_builder import estimate_tokens
+from knowledge_store import knowledge_store
+from performance_monitor import performance_monitor
+from tracing import tracer
+from response_cache import ResponseCache
 
 class GeminiService:
     def __init__(self):
         if not GEMINI_API_KEY:
             raise ValueError("GEMINI_API_KEY is required")
         
-        genai.configure(api_key=GEMINI_API_KEY)
+        if GEMINI_API_ENDPOINT:
+            # The REST transport takes plain http:// hosts, which local stubs need
+            genai.configure(api_key=GEMINI_API_KEY, transport='rest',
+                            client_options={'api_endpoint': GEMINI_API_ENDPOINT})
+        else:
+            genai.configure(api_key=GEMINI_API_KEY)
         self.model = genai.GenerativeModel('gemini-1.5-flash')
-        self.faq_data = self._load_faq_data()
-        self.custom_prompt = self._create_custom_prompt()
+        self.knowledge_store = knowledge_store
+        
+        self.response_cache = None
+        if RESPONSE_CACHE_ENABLED:
+            self.response_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL)
+            performance_monitor.register_cache('gemini_responses', self.response_cache)
+            # Entries are keyed by version already; clearing just frees the memory
+            self.knowledge_store.subscribe(lambda snapshot: self.response_cache.clear())
     
-    def _load_faq_data(self) -> Dict[str, Any]:
-        """Load FAQ data from JSON file"""
-        try:
-            with open('faq_data.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {"faq": []}
+    @property
+    def faq_data(self) -> Dict[str, Any]:
+        return self.knowledge_store.current().faq_data
     
-    def _create_custom_prompt(self) -> str:
-        """Create custom prompt with company context"""
-        company_info = self.faq_data.get("company", {})
-        
-        prompt = f"""
-You are Kan-guroo, a friendly and knowledgeable customer care agent for {company_info.get('name', 'Kan-Guroo')}.
-
-Company Information:
-- Name: {company_info.get('name', 'Kan-Guroo')}
-- Website: {company_info.get('website', 'https://www.kan-guroo.com')}
-- Description: {company_info.get('description', '')}
-- Mission: {company_info.get('mission', '')}
-- Vision: {company_info.get('vision', '')}
-
-Available Programs:
-"""
-        
-        # Add programs information
-        programs = company_info.get('programs', {})
-        for program_type, program_list in programs.items():
-            prompt += f"\n{program_type.replace('_', ' ').title()}:\n"
-            for program in program_list:
-                prompt += f"- {program['name']}: {program['description']}\n"
-                if 'url' in program:
-                    prompt += f"  URL: {program['url']}\n"
-        
-        prompt += f"""
-Team Information:
-"""
-        
-        # Add team information
-        team = company_info.get('team', [])
-        for member in team:
-            prompt += f"- {member['name']}: {member['role']}\n"
-        
-        prompt += f"""
-Contact Information:
-- Phone: {company_info.get('contact', {}).get('phone', 'N/A')}
-- Email: {company_info.get('contact', {}).get('email', 'N/A')}
-
-Your Role as Kan-guroo:
-1. You are an enthusiastic and helpful customer care agent
-2. Answer questions about our educational programs and services
-3. Be encouraging and positive about our programs
-4. If asked about specific courses/programs, mention how they've helped many students
-5. Keep responses SHORT and CONCISE (1-2 sentences maximum)
-6. Always be helpful and supportive
-7. You have access to team information, company details, and all program information
-8. IMPORTANT: Keep responses under 80 words for faster voice generation
-9. Be direct and to the point while *maintaining enthusiasm*
-10. When asked about founders, CEO, CTO, or team members, ALWAYS use the team information provided above
-11. If asked "Who's your CEO?" answer with the actual CEO name from the team information
-12. If asked about founders or team, provide the specific names and roles from the team information
-
-Examples:
-- "Who's your CEO?" → "Our CEO is Otari Melanashvili, who is also our Co-Founder!"
-- "Who are the founders?" → "Our founders are Otari Melanashvili (CEO), Saba Gelashvili, and Lasha Bevia!"
-
-User Question: """
-        
-        return prompt
+    @property
+    def custom_prompt(self) -> str:
+        return self.knowledge_store.current().prompt
+    
+    def _build_prompt(self, user_question: str, snapshot) -> str:
+        """Assemble the full prompt and log its size"""
+        with tracer.span('gemini.prompt_assembly', mode=PROMPT_MODE) as span:
+            full_prompt = snapshot.prompt_for(user_question, PROMPT_MODE) + user_question
+            tokens = estimate_tokens(full_prompt)
+            span.set_attribute('chars', len(full_prompt))
+            span.set_attribute('tokens', tokens)
+        print(f"Gemini prompt ({PROMPT_MODE}): {len(full_prompt)} chars, ~{tokens} tokens")
+        performance_monitor.record_prompt_size(PROMPT_MODE, len(full_prompt), tokens)
+        return full_prompt
+    
+    def _get_cached_response(self, user_question: str, snapshot):
+        """Return (cache_key, cached_text); both None when caching is off"""
+        if self.response_cache is None:
+            return None, None
+        with tracer.span('gemini.cache_lookup') as span:
+            cache_key = ResponseCache.make_key(user_question, str(snapshot.version))
+            if cache_key is None:
+                span.set_attribute('skipped', True)
+                return None, None
+            cached_text = self.response_cache.get(cache_key)
+            span.set_attribute('hit', cached_text is not None)
+        return cache_key, cached_text
     
     async def generate_response(self, user_question: str) -> str:
         """Generate response using Gemini with custom prompt"""
         start_time = time.time()
-        
-        try:
-            # Create the full prompt
-            full_prompt = self.custom_prompt + user_question
+        with tracer.span('gemini.generate', chars=len(user_question)) as span:
+            try:
+                snapshot = self.knowledge_store.current()
+                cache_key, cached_text = self._get_cached_response(user_question, snapshot)
+                if cached_text is not None:
+                    elapsed_time = (time.time() - start_time) * 1000
+                    print(f"Gemini cache hit: {elapsed_time:.3f}ms")
+                    span.set_attribute('cache_hit', True)
+                    return cached_text
             
-            # Generate response
-            response = await asyncio.to_thread(
-                self.model.generate_content,
-                full_prompt
-            )
+                # Create the full prompt
+                full_prompt = self._build_prompt(user_question, snapshot)
             
-            # Extract text from response
-            if response and response.text:
-                response_text = response.text.strip()
-            else:
-                response_text = "I apologize, but I couldn't generate a response. Please try rephrasing your question or contact our support team."
+                # Generate response
+                with tracer.span('gemini.request'):
+                    response = await asyncio.to_thread(
+                        self.model.generate_content,
+                        full_prompt
+                    )
             
-            # Log performance
-            elapsed_time = (time.time() - start_time) * 1000
-            print(f"Gemini response time: {elapsed_time:.3f}ms")
+                # Extract text from response
+                if response and response.text:
+                    response_text = response.text.strip()
+                    if cache_key is not None:
+                        self.response_cache.set(cache_key, response_text)
+                else:
+                    response_text = "I apologize, but I couldn't generate a response. Please try rephrasing your question or contact our support team."
+            
+                # Log performance
+                elapsed_time = (time.time() - start_time) * 1000
+                print(f"Gemini response time: {elapsed_time:.3f}ms")
             
-            return response_text
+                return response_text
             
-        except Exception as e:
-            print(f"Error in Gemini service: {e}")
-            return "I'm sorry, I encountered an error processing your request. Please try again or contact our support team."
+            except Exception as e:
+                print(f"Error in Gemini service: {e}")
+                span.set_error(e)
+                performance_monitor.record_error('gemini')
+                return "I'm sorry, I encountered an error processing your request. Please try again or contact our support team."
+    
+    async def generate_response_stream(self, user_question: str) -> AsyncIterator[str]:
+        """Stream the Gemini response as text deltas
+        
+        The span is started but not made current: the generator's steps run in
+        the caller's context, so it is only activated around the calls made here.
+        """
+        start_time = time.time()
+        span = tracer.start_span('gemini.stream', chars=len(user_question))
+        
+        snapshot = self.knowledge_store.current()
+        with tracer.activate(span):
+            cache_key, cached_text = self._get_cached_response(user_question, snapshot)
+        if cached_text is not None:
+            print(f"Gemini cache hit: {(time.time() - start_time) * 1000:.3f}ms")
+            span.set_attribute('cache_hit', True)
+            span.end()
+            yield cached_text
+            return
+        
+        with tracer.activate(span):
+            full_prompt = self._build_prompt(user_question, snapshot)
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        finished = object()
+        # Set when the consumer goes away (client disconnect), so the worker stops pulling chunks
+        stop = threading.Event()
+        
+        def _consume_stream():
+            # The SDK stream is a blocking iterator, so drain it on a worker thread
+            try:
+                response = self.model.generate_content(full_prompt, stream=True)
+                for chunk in response:
+                    if stop.is_set():
+                        break
+                    text = chunk.text
+                    if text:
+                        loop.call_soon_threadsafe(queue.put_nowait, text)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, finished)
+        
+        worker = loop.run_in_executor(None, _consume_stream)
+        received_text = False
+        stream_failed = False
+        parts = []
+        first_token_time = None
+        
+        try:
+            while True:
+                item = await queue.get()
+                if item is finished:
+                    break
+                if isinstance(item, Exception):
+                    print(f"Error in Gemini stream: {item}")
+                    span.set_error(item)
+                    performance_monitor.record_error('gemini')
+                    stream_failed = True
+                    if not received_text:
+                        yield "I'm sorry, I encountered an error processing your request. Please try again or contact our support team."
+                    break
+                if first_token_time is None:
+                    first_token_time = (time.time() - start_time) * 1000
+                    print(f"Gemini first token time: {first_token_time:.3f}ms")
+                    span.set_attribute('first_token_ms', round(first_token_time, 3))
+                received_text = True
+                parts.append(item)
+                yield item
+            
+            await worker
+            if received_text and not stream_failed and cache_key is not None:
+                self.response_cache.set(cache_key, "".join(parts).strip())
+            if not received_text:
+                yield "I apologize, but I couldn't generate a response. Please try rephrasing your question or contact our support team."
+        finally:
+            stop.set()
+            elapsed_time = (time.time() - start_time) * 1000
+            print(f"Gemini stream time: {elapsed_time:.3f}ms")
+            span.set_attribute('chunks', len(parts))
+            span.end()
     
     def get_faq_context(self) -> str:
         """Get FAQ context for debugging"""
@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+"""
+Offline optimizer for the avatar GLB.
+
+Parses the GLB container (JSON chunk + BIN chunk) and writes a smaller variant:
+- drops animations other than the ones the frontend plays (``idle``)
+- drops nodes that aren't reachable from the scene or used by a skin
+- drops morph targets that lip-sync never drives (keeps mouth/jaw/viseme)
+- quantizes normals, tangents, UVs and skin weights (KHR_mesh_quantization)
+- downscales and re-encodes oversized textures (needs Pillow)
+- repacks the binary buffer so unreferenced data is left out
+
+Usage:
+    python glb_optimizer.py [input.glb] [output.glb] [--max-texture-size 1024]
+"""
+
+import argparse
+import gzip
+import io
+import json
+import re
+import struct
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from config import CHARACTER_MODEL_PATH, OPTIMIZED_CHARACTER_MODEL_PATH
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is in requirements.txt; without it textures are left untouched
+    Image = None
+
+GLB_MAGIC = 0x46546C67  # 'glTF'
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+
+BYTE, UNSIGNED_BYTE, SHORT, UNSIGNED_SHORT, UNSIGNED_INT, FLOAT = 5120, 5121, 5122, 5123, 5125, 5126
+COMPONENT_FORMATS = {BYTE: 'b', UNSIGNED_BYTE: 'B', SHORT: 'h', UNSIGNED_SHORT: 'H', UNSIGNED_INT: 'I', FLOAT: 'f'}
+COMPONENT_SIZES = {BYTE: 1, UNSIGNED_BYTE: 1, SHORT: 2, UNSIGNED_SHORT: 2, UNSIGNED_INT: 4, FLOAT: 4}
+TYPE_COMPONENTS = {'SCALAR': 1, 'VEC2': 2, 'VEC3': 3, 'VEC4': 4, 'MAT2': 4, 'MAT3': 9, 'MAT4': 16}
+
+QUANTIZATION_EXTENSION = 'KHR_mesh_quantization'
+
+# What the frontend uses: character.js drives mouth morphs, threejs-setup.js plays 'idle'
+DEFAULT_KEEP_MORPHS = ['mouth', 'jaw', 'viseme']
+DEFAULT_KEEP_ANIMATIONS = ['idle']
+
+def read_glb(data: bytes) -> Tuple[Dict[str, Any], bytes]:
+    """Split a GLB file into its glTF JSON and BIN chunk"""
+    magic, version, length = struct.unpack_from('<III', data, 0)
+    if magic != GLB_MAGIC or version != 2:
+        raise ValueError("Not a glTF 2.0 binary file")
+
+    gltf, binary = None, b''
+    offset = 12
+    while offset < length:
+        chunk_length, chunk_type = struct.unpack_from('<II', data, offset)
+        chunk = data[offset + 8:offset + 8 + chunk_length]
+        if chunk_type == CHUNK_JSON:
+            gltf = json.loads(chunk.decode('utf-8'))
+        elif chunk_type == CHUNK_BIN and not binary:
+            binary = bytes(chunk)
+        offset += 8 + chunk_length
+
+    if gltf is None:
+        raise ValueError("GLB file has no JSON chunk")
+    return gltf, binary
+
+def write_glb(gltf: Dict[str, Any], binary: bytes) -> bytes:
+    """Build a GLB file from glTF JSON and a BIN chunk"""
+    json_chunk = json.dumps(gltf, separators=(',', ':')).encode('utf-8')
+    json_chunk += b' ' * (-len(json_chunk) % 4)
+    bin_chunk = binary + b'\x00' * (-len(binary) % 4)
+
+    length = 12 + 8 + len(json_chunk) + (8 + len(bin_chunk) if bin_chunk else 0)
+    out = bytearray(struct.pack('<III', GLB_MAGIC, 2, length))
+    out += struct.pack('<II', len(json_chunk), CHUNK_JSON) + json_chunk
+    if bin_chunk:
+        out += struct.pack('<II', len(bin_chunk), CHUNK_BIN) + bin_chunk
+    return bytes(out)
+
+def element_size(accessor: Dict[str, Any]) -> int:
+    return COMPONENT_SIZES[accessor['componentType']] * TYPE_COMPONENTS[accessor['type']]
+
+def accessor_bytes(gltf: Dict[str, Any], binary: bytes, index: int) -> bytes:
+    """Tightly packed bytes of an accessor (de-interleaving strided views)"""
+    accessor = gltf['accessors'][index]
+    if 'sparse' in accessor:
+        raise ValueError(f"Sparse accessor {index} is not supported")
+    size = element_size(accessor)
+    view = gltf['bufferViews'][accessor['bufferView']]
+    start = view.get('byteOffset', 0) + accessor.get('byteOffset', 0)
+    stride = view.get('byteStride', size)
+    if stride == size:
+        return binary[start:start + size * accessor['count']]
+    return b''.join(binary[start + i * stride:start + i * stride + size] for i in range(accessor['count']))
+
+def read_accessor(gltf: Dict[str, Any], binary: bytes, index: int) -> List[Tuple]:
+    """Decode an accessor into a list of tuples"""
+    accessor = gltf['accessors'][index]
+    components = TYPE_COMPONENTS[accessor['type']]
+    fmt = '<' + COMPONENT_FORMATS[accessor['componentType']] * components
+    return list(struct.iter_unpack(fmt, accessor_bytes(gltf, binary, index)))
+
+def quantize_signed(values: List[Tuple], components: int) -> bytes:
+    """Normalized BYTE, padded to 4 bytes per element"""
+    padding = 4 - components if components < 4 else 0
+    out = bytearray()
+    for value in values:
+        out += struct.pack(f'<{components}b', *(max(-127, min(127, round(v * 127))) for v in value))
+        out += b'\x00' * padding
+    return bytes(out)
+
+def quantize_uv(values: List[Tuple]) -> bytes:
+    """Normalized UNSIGNED_SHORT"""
+    return b''.join(struct.pack('<2H', *(round(v * 65535) for v in value)) for value in values)
+
+def quantize_weights(values: List[Tuple]) -> bytes:
+    """Normalized UNSIGNED_BYTE, still summing to exactly 255"""
+    out = bytearray()
+    for value in values:
+        total = sum(value) or 1.0
+        quantized = [round(v / total * 255) for v in value]
+        quantized[quantized.index(max(quantized))] += 255 - sum(quantized)
+        out += bytes(quantized)
+    return bytes(out)
+
+class GlbOptimizer:
+    """Shrinks a glTF scene to what the web avatar actually uses.
+
+    The JSON is edited in place and the BIN chunk is rebuilt from the
+    accessors and images that are still referenced, one tightly packed buffer
+    view each, so anything that was dropped is left out of the output.
+    """
+
+    def __init__(self, gltf: Dict[str, Any], binary: bytes, keep_morphs: List[str] = None,
+                 keep_animations: List[str] = None, quantize: bool = True,
+                 max_texture_size: int = 1024, jpeg_quality: int = 85):
+        self.gltf = gltf
+        self.binary = binary
+        self.keep_morphs = [p.lower() for p in (DEFAULT_KEEP_MORPHS if keep_morphs is None else keep_morphs)]
+        self.keep_animations = DEFAULT_KEEP_ANIMATIONS if keep_animations is None else keep_animations
+        self.quantize = quantize
+        self.max_texture_size = max_texture_size
+        self.jpeg_quality = jpeg_quality
+        self._replaced_accessors: Dict[int, Tuple[bytes, int]] = {}  # index -> (bytes, byteStride)
+        self._replaced_images: Dict[int, bytes] = {}
+        self.log: List[str] = []
+
+    def optimize(self) -> bytes:
+        self.drop_animations()
+        self.drop_morph_targets()
+        self.drop_unreachable_nodes()
+        self.drop_unused_resources()
+        if self.quantize:
+            self.quantize_attributes()
+        if Image is not None:
+            self.optimize_textures()
+        else:
+            self.log.append("Pillow not installed, textures left as they are")
+        binary = self.repack()
+        return write_glb(self.gltf, binary)
+
+    def drop_animations(self):
+        animations = self.gltf.get('animations', [])
+        kept = [a for a in animations if a.get('name') in self.keep_animations]
+        if len(kept) != len(animations):
+            self.log.append(f"Dropped {len(animations) - len(kept)} of {len(animations)} animations")
+        if kept:
+            self.gltf['animations'] = kept
+        else:
+            self.gltf.pop('animations', None)
+
+    def drop_morph_targets(self):
+        dropped = 0
+        for mesh in self.gltf.get('meshes', []):
+            names = mesh.get('extras', {}).get('targetNames')
+            targets_count = len(mesh['primitives'][0].get('targets', []))
+            if not targets_count:
+                continue
+            if names is None:
+                # Without names we can't tell which targets lip-sync uses
+                continue
+            keep = [i for i, name in enumerate(names) if any(p in name.lower() for p in self.keep_morphs)]
+            if len(keep) == targets_count:
+                continue
+            dropped += targets_count - len(keep)
+            for primitive in mesh['primitives']:
+                targets = [primitive['targets'][i] for i in keep]
+                if targets:
+                    primitive['targets'] = targets
+                else:
+                    primitive.pop('targets', None)
+            mesh['extras']['targetNames'] = [names[i] for i in keep]
+            if 'weights' in mesh:
+                mesh['weights'] = [mesh['weights'][i] for i in keep]
+            if not keep:
+                mesh.pop('weights', None)
+                mesh['extras'].pop('targetNames')
+        if dropped:
+            self.log.append(f"Dropped {dropped} unused morph targets")
+
+    def drop_unreachable_nodes(self):
+        nodes = self.gltf.get('nodes', [])
+        used = set()
+        stack = [n for scene in self.gltf.get('scenes', []) for n in scene.get('nodes', [])]
+        for skin in self.gltf.get('skins', []):
+            stack += skin['joints'] + ([skin['skeleton']] if 'skeleton' in skin else [])
+        while stack:
+            index = stack.pop()
+            if index in used:
+                continue
+            used.add(index)
+            stack += nodes[index].get('children', [])
+
+        if len(used) == len(nodes):
+            return
+        self.log.append(f"Dropped {len(nodes) - len(used)} unreachable nodes")
+        remap = self._compact('nodes', used)
+        for node in self.gltf['nodes']:
+            if 'children' in node:
+                node['children'] = [remap[c] for c in node['children']]
+        for scene in self.gltf.get('scenes', []):
+            scene['nodes'] = [remap[n] for n in scene.get('nodes', [])]
+        for skin in self.gltf.get('skins', []):
+            skin['joints'] = [remap[j] for j in skin['joints']]
+            if 'skeleton' in skin:
+                skin['skeleton'] = remap[skin['skeleton']]
+        for animation in self.gltf.get('animations', []):
+            animation['channels'] = [c for c in animation['channels'] if c['target'].get('node') in remap]
+            for channel in animation['channels']:
+                channel['target']['node'] = remap[channel['target']['node']]
+
+    def _compact(self, key: str, used: set) -> Dict[int, int]:
+        """Keep only the used entries of a top-level array, returning old -> new indices"""
+        items = self.gltf.get(key, [])
+        remap = {}
+        kept = []
+        for index, item in enumerate(items):
+            if index in used:
+                remap[index] = len(kept)
+                kept.append(item)
+        if kept:
+            self.gltf[key] = kept
+        else:
+            self.gltf.pop(key, None)
+        return remap
+
+    def drop_unused_resources(self):
+        """Remove meshes, skins, materials, textures, images and samplers nothing points at"""
+        gltf = self.gltf
+        nodes = gltf.get('nodes', [])
+
+        mesh_map = self._compact('meshes', {n['mesh'] for n in nodes if 'mesh' in n})
+        skin_map = self._compact('skins', {n['skin'] for n in nodes if 'skin' in n})
+        for node in nodes:
+            if 'mesh' in node:
+                node['mesh'] = mesh_map[node['mesh']]
+            if 'skin' in node:
+                node['skin'] = skin_map[node['skin']]
+
+        primitives = [p for m in gltf.get('meshes', []) for p in m['primitives']]
+        material_map = self._compact('materials', {p['material'] for p in primitives if 'material' in p})
+        for primitive in primitives:
+            if 'material' in primitive:
+                primitive['material'] = material_map[primitive['material']]
+
+        texture_refs = list(self._texture_refs())
+        texture_map = self._compact('textures', {ref['index'] for ref in texture_refs})
+        for ref in texture_refs:
+            ref['index'] = texture_map[ref['index']]
+
+        textures = gltf.get('textures', [])
+        image_map = self._compact('images', {t['source'] for t in textures if 'source' in t})
+        sampler_map = self._compact('samplers', {t['sampler'] for t in textures if 'sampler' in t})
+        for texture in textures:
+            if 'source' in texture:
+                texture['source'] = image_map[texture['source']]
+            if 'sampler' in texture:
+                texture['sampler'] = sampler_map[texture['sampler']]
+
+    def _texture_refs(self):
+        """Every textureInfo object ({'index': ...}) in the materials"""
+        def walk(value):
+            if isinstance(value, dict):
+                if 'index' in value and isinstance(value['index'], int):
+                    yield value
+                for child in value.values():
+                    yield from walk(child)
+            elif isinstance(value, list):
+                for child in value:
+                    yield from walk(child)
+        for material in self.gltf.get('materials', []):
+            yield from walk(material)
+
+    def quantize_attributes(self):
+        accessors = self.gltf['accessors']
+        saved = 0
+        for mesh in self.gltf.get('meshes', []):
+            for primitive in mesh['primitives']:
+                for name, index in primitive['attributes'].items():
+                    if index in self._replaced_accessors:
+                        continue
+                    accessor = accessors[index]
+                    if accessor['componentType'] != FLOAT or 'bufferView' not in accessor:
+                        continue
+                    values = read_accessor(self.gltf, self.binary, index)
+                    if name == 'NORMAL':
+                        data, component, stride = quantize_signed(values, 3), BYTE, 4
+                    elif name == 'TANGENT':
+                        data, component, stride = quantize_signed(values, 4), BYTE, None
+                    elif name.startswith('TEXCOORD_'):
+                        if any(v < 0.0 or v > 1.0 for value in values for v in value):
+                            continue  # tiling UVs need the full float range
+                        data, component, stride = quantize_uv(values), UNSIGNED_SHORT, None
+                    elif name.startswith('WEIGHTS_'):
+                        data, component, stride = quantize_weights(values), UNSIGNED_BYTE, None
+                    else:
+                        continue
+                    saved += element_size(accessor) * accessor['count'] - len(data)
+                    accessor['componentType'] = component
+                    accessor['normalized'] = True
+                    accessor.pop('min', None)
+                    accessor.pop('max', None)
+                    self._replaced_accessors[index] = (data, stride)
+
+        if self._replaced_accessors:
+            for key in ('extensionsUsed', 'extensionsRequired'):
+                extensions = self.gltf.setdefault(key, [])
+                if QUANTIZATION_EXTENSION not in extensions:
+                    extensions.append(QUANTIZATION_EXTENSION)
+            self.log.append(f"Quantized {len(self._replaced_accessors)} vertex attributes, saving {saved} bytes")
+
+    def optimize_textures(self):
+        saved = 0
+        resized = 0
+        for index, image in enumerate(self.gltf.get('images', [])):
+            if 'bufferView' not in image:
+                continue
+            view = self.gltf['bufferViews'][image['bufferView']]
+            start = view.get('byteOffset', 0)
+            original = self.binary[start:start + view['byteLength']]
+            try:
+                picture = Image.open(io.BytesIO(original))
+                picture.load()
+            except Exception as e:
+                self.log.append(f"Skipped image {index}: {e}")
+                continue
+
+            scale = self.max_texture_size / max(picture.size)
+            if scale < 1:
+                size = (max(1, round(picture.width * scale)), max(1, round(picture.height * scale)))
+                picture = picture.resize(size, Image.LANCZOS)
+                resized += 1
+
+            out = io.BytesIO()
+            if image.get('mimeType') == 'image/png' or picture.mode in ('RGBA', 'LA', 'P'):
+                picture.save(out, format='PNG', optimize=True)
+                mime_type = 'image/png'
+            else:
+                picture.convert('RGB').save(out, format='JPEG', quality=self.jpeg_quality, optimize=True)
+                mime_type = 'image/jpeg'
+            encoded = out.getvalue()
+            if scale < 1 or len(encoded) < len(original):
+                saved += len(original) - len(encoded)
+                image['mimeType'] = mime_type
+                self._replaced_images[index] = encoded
+
+        if self._replaced_images:
+            self.log.append(f"Re-encoded {len(self._replaced_images)} textures ({resized} downscaled), saving {saved} bytes")
+
+    def repack(self) -> bytes:
+        """Build a fresh BIN chunk with one buffer view per accessor and image"""
+        gltf = self.gltf
+        targets = {}
+        for mesh in gltf.get('meshes', []):
+            for primitive in mesh['primitives']:
+                for index in primitive['attributes'].values():
+                    targets[index] = ARRAY_BUFFER
+                for target in primitive.get('targets', []):
+                    for index in target.values():
+                        targets[index] = ARRAY_BUFFER
+                if 'indices' in primitive:
+                    targets[primitive['indices']] = ELEMENT_ARRAY_BUFFER
+
+        used_accessors = set(targets)
+        used_accessors |= {s['inverseBindMatrices'] for s in gltf.get('skins', []) if 'inverseBindMatrices' in s}
+        for animation in gltf.get('animations', []):
+            for sampler in animation['samplers']:
+                used_accessors |= {sampler['input'], sampler['output']}
+
+        out = bytearray()
+        views = []
+
+        def add_view(data: bytes, stride: Optional[int] = None, target: Optional[int] = None) -> int:
+            out.extend(b'\x00' * (-len(out) % 4))
+            view = {'buffer': 0, 'byteOffset': len(out), 'byteLength': len(data)}
+            if stride:
+                view['byteStride'] = stride
+            if target:
+                view['target'] = target
+            out.extend(data)
+            views.append(view)
+            return len(views) - 1
+
+        accessor_map = self._compact_accessors(used_accessors)
+        new_accessors = gltf.get('accessors', [])
+        for old_index, new_index in accessor_map.items():
+            accessor = new_accessors[new_index]
+            if 'bufferView' not in accessor:
+                continue
+            if old_index in self._replaced_accessors:
+                data, stride = self._replaced_accessors[old_index]
+            else:
+                data, stride = self._old_accessor_bytes(old_index), None
+            accessor['bufferView'] = add_view(data, stride, targets.get(old_index))
+            accessor.pop('byteOffset', None)
+
+        for index, image in enumerate(gltf.get('images', [])):
+            if 'bufferView' not in image:
+                continue
+            data = self._replaced_images.get(index)
+            if data is None:
+                view = self._old_views[image['bufferView']]
+                start = view.get('byteOffset', 0)
+                data = self.binary[start:start + view['byteLength']]
+            image['bufferView'] = add_view(data)
+
+        gltf['bufferViews'] = views
+        gltf['buffers'] = [{'byteLength': len(out)}]
+        return bytes(out)
+
+    def _compact_accessors(self, used: set) -> Dict[int, int]:
+        """Drop unused accessors and point every reference at the new indices"""
+        gltf = self.gltf
+        self._old_accessors = list(gltf.get('accessors', []))
+        self._old_views = list(gltf.get('bufferViews', []))
+        remap = self._compact('accessors', used)
+        # Accessors are rewritten below, so give each kept one its own copy
+        if 'accessors' in gltf:
+            gltf['accessors'] = [dict(a) for a in gltf['accessors']]
+
+        for mesh in gltf.get('meshes', []):
+            for primitive in mesh['primitives']:
+                primitive['attributes'] = {k: remap[v] for k, v in primitive['attributes'].items()}
+                if 'targets' in primitive:
+                    primitive['targets'] = [{k: remap[v] for k, v in t.items()} for t in primitive['targets']]
+                if 'indices' in primitive:
+                    primitive['indices'] = remap[primitive['indices']]
+        for skin in gltf.get('skins', []):
+            if 'inverseBindMatrices' in skin:
+                skin['inverseBindMatrices'] = remap[skin['inverseBindMatrices']]
+        for animation in gltf.get('animations', []):
+            for sampler in animation['samplers']:
+                sampler['input'] = remap[sampler['input']]
+                sampler['output'] = remap[sampler['output']]
+        return remap
+
+    def _old_accessor_bytes(self, old_index: int) -> bytes:
+        view_gltf = {'accessors': self._old_accessors, 'bufferViews': self._old_views}
+        return accessor_bytes(view_gltf, self.binary, old_index)
+
+def parse_time(data: bytes, repeat: int = 5) -> float:
+    """Milliseconds to parse the container and decode every accessor"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        gltf, binary = read_glb(data)
+        for index in range(len(gltf.get('accessors', []))):
+            read_accessor(gltf, binary, index)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+def report(original: bytes, optimized: bytes):
+    """Print a size and parse-time comparison"""
+    rows = [("original", original), ("optimized", optimized)]
+    print(f"{'':<12} {'size':>12} {'gzip':>12} {'parse':>10}")
+    for name, data in rows:
+        print(f"{name:<12} {len(data) / 1024:10.1f}KB {len(gzip.compress(data)) / 1024:10.1f}KB "
+              f"{parse_time(data):8.2f}ms")
+    print(f"⚡ {(1 - len(optimized) / len(original)) * 100:.1f}% smaller")
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimize the avatar GLB for the web client")
+    parser.add_argument('input', nargs='?', default=CHARACTER_MODEL_PATH)
+    parser.add_argument('output', nargs='?', default=OPTIMIZED_CHARACTER_MODEL_PATH)
+    parser.add_argument('--keep-morph', action='append', dest='keep_morphs',
+                        help="substring of morph target names to keep (default: mouth, jaw, viseme)")
+    parser.add_argument('--keep-animation', action='append', dest='keep_animations',
+                        help="animation name to keep (default: idle)")
+    parser.add_argument('--no-quantize', action='store_true', help="keep float vertex attributes")
+    parser.add_argument('--max-texture-size', type=int, default=1024)
+    parser.add_argument('--jpeg-quality', type=int, default=85)
+    args = parser.parse_args()
+
+    with open(args.input, 'rb') as f:
+        original = f.read()
+
+    gltf, binary = read_glb(original)
+    optimizer = GlbOptimizer(
+        gltf, binary, keep_morphs=args.keep_morphs, keep_animations=args.keep_animations,
+        quantize=not args.no_quantize, max_texture_size=args.max_texture_size,
+        jpeg_quality=args.jpeg_quality
+    )
+    optimized = optimizer.optimize()
+
+    with open(args.output, 'wb') as f:
+        f.write(optimized)
+
+    print(f"🎭 {args.input} -> {args.output}")
+    for line in optimizer.log:
+        print(f"  • {line}")
+    report(original, optimized)
+
+if __name__ == '__main__':
+    main()
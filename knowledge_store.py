@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from config import (
+    FAQ_DATA_PATH, FAQ_FASTPATH_THRESHOLD, KNOWLEDGE_POLL_INTERVAL, PROMPT_TOP_K
+)
+from faq_answerer import FaqAnswerer
+from prompt_builder import ScopedPromptBuilder
+from url_index import UrlIndex
+
+class KnowledgeSnapshot:
+    """Immutable view of faq_data.json and everything derived from it.
+
+    Readers grab one snapshot per request and use its prompt, URL index and
+    FAQ answerer together, so they never mix artifacts from two FAQ versions.
+    """
+
+    def __init__(self, version: int, faq_data: Dict[str, Any], content_hash: str):
+        self.version = version
+        self.faq_data = faq_data
+        self.content_hash = content_hash
+        self.loaded_at = time.time()
+        self.prompt_builder = ScopedPromptBuilder(faq_data, PROMPT_TOP_K)
+        self.prompt = self.prompt_builder.full_prompt
+        self.url_index = UrlIndex(faq_data)
+        self.faq_answerer = FaqAnswerer(faq_data, FAQ_FASTPATH_THRESHOLD)
+    
+    def prompt_for(self, question: str, mode: str = 'full') -> str:
+        """Prompt prefix for a question in 'full' or 'scoped' mode"""
+        if mode == 'scoped':
+            return self.prompt_builder.build(question)
+        return self.prompt
+
+class KnowledgeStore:
+    """Single, versioned owner of the FAQ knowledge base.
+
+    The file is parsed once per change. A background watcher polls its mtime,
+    builds a new snapshot off the request path and swaps it in with one
+    reference assignment. Each swap bumps ``version``, which caches include in
+    their keys; subscribers are notified so they can drop stale entries.
+    """
+
+    def __init__(self, path: str, poll_interval: float = 2.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.mtime = None
+        self._subscribers: List[Callable[[KnowledgeSnapshot], None]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+        self._snapshot = KnowledgeSnapshot(0, {"faq": []}, "")
+        if not self.reload_if_changed():
+            print(f"⚠️  Knowledge store started without {path}")
+
+    def current(self) -> KnowledgeSnapshot:
+        """The snapshot to use for this request"""
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def subscribe(self, callback: Callable[[KnowledgeSnapshot], None]):
+        """Call ``callback(snapshot)`` after every swap"""
+        self._subscribers.append(callback)
+
+    def _get_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def reload_if_changed(self) -> bool:
+        """Rebuild and swap the snapshot if the file changed; True if swapped"""
+        mtime = self._get_mtime()
+        if mtime is None or mtime == self.mtime:
+            return False
+
+        with self._lock:
+            if mtime == self.mtime:
+                return False
+            try:
+                with open(self.path, 'rb') as f:
+                    raw = f.read()
+                faq_data = json.loads(raw.decode('utf-8'))
+            except (OSError, ValueError) as e:
+                # Keep serving the previous snapshot while the file is mid-edit
+                print(f"Error loading knowledge from {self.path}: {e}")
+                return False
+
+            self.mtime = mtime
+            content_hash = hashlib.sha1(raw).hexdigest()[:12]
+            if content_hash == self._snapshot.content_hash:
+                # Touched but not changed
+                return False
+
+            snapshot = KnowledgeSnapshot(self._snapshot.version + 1, faq_data, content_hash)
+            self._snapshot = snapshot
+
+        print(f"🔄 Knowledge store loaded version {snapshot.version} ({content_hash})")
+        for callback in self._subscribers:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"Error notifying knowledge subscriber: {e}")
+        return True
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.reload_if_changed()
+            except Exception as e:
+                print(f"Error in knowledge watcher: {e}")
+
+    def start_watching(self):
+        """Start the background thread that picks up FAQ edits"""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="knowledge-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop.set()
+
+# Global knowledge store shared by the Gemini service and the web bot
+knowledge_store = KnowledgeStore(FAQ_DATA_PATH, KNOWLEDGE_POLL_INTERVAL)
@@ -0,0 +1,161 @@
+import bisect
+import math
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Log-spaced buckets: SUB_BUCKETS per doubling gives about 4.4% relative error
+MIN_VALUE_MS = 0.01
+MAX_VALUE_MS = 600_000.0
+SUB_BUCKETS = 16
+BUCKETS = int(math.log2(MAX_VALUE_MS / MIN_VALUE_MS) * SUB_BUCKETS) + 2
+
+EMPTY_COUNTS = array('I', [0]) * BUCKETS
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Sliding windows: (name, seconds per slot, slots). Each window is a ring of
+# sub-histograms and a value is added to the current slot of every window.
+WINDOWS = (('1m', 5, 12), ('5m', 30, 10), ('1h', 300, 12))
+
+# Upper bounds (ms) of the cumulative since-start buckets exported to Prometheus
+EXPORT_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+def bucket_index(value: float) -> int:
+    if value <= MIN_VALUE_MS:
+        return 0
+    return min(BUCKETS - 1, int(math.log2(value / MIN_VALUE_MS) * SUB_BUCKETS) + 1)
+
+def bucket_value(index: int) -> float:
+    """Representative (geometric middle) value of a bucket"""
+    if index == 0:
+        return MIN_VALUE_MS
+    return MIN_VALUE_MS * 2 ** ((index - 0.5) / SUB_BUCKETS)
+
+class SlidingHistogram:
+    """Fixed-memory latency histogram over sliding time windows.
+
+    Values go into log-spaced buckets, so memory doesn't depend on request
+    volume and percentiles are accurate to a few percent. Each window is a
+    ring of time slots; a slot is cleared when the ring comes back round to
+    it, so the 1m window covers the last 55-60 seconds, and so on. Values
+    above ``threshold`` are counted exactly for a budget breach rate.
+
+    Alongside the windows, values are counted since start in the coarse
+    EXPORT_BUCKETS_MS buckets, which is what a Prometheus histogram needs.
+    """
+
+    def __init__(self, threshold: Optional[float] = None, windows: Iterable[Tuple[str, int, int]] = WINDOWS,
+                 clock=time.monotonic):
+        self.threshold = threshold
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._windows = {}
+        self._export_counts = [0] * (len(EXPORT_BUCKETS_MS) + 1)
+        self._export_sum = 0.0
+        for name, slot_seconds, slots in windows:
+            self._windows[name] = {
+                'slot_seconds': slot_seconds,
+                'epochs': [-1] * slots,
+                'counts': [array('I', EMPTY_COUNTS) for _ in range(slots)],
+                'totals': [0] * slots,
+                'breaches': [0] * slots,
+                'maxima': [0.0] * slots,
+                # Sum of the live slots' counts, so a summary reads one array
+                'merged': array('I', EMPTY_COUNTS),
+            }
+
+    @staticmethod
+    def _expire(window: Dict[str, Any], epoch: int):
+        """Take slots older than the window out of the merged counts (caller holds the lock)"""
+        slots = len(window['epochs'])
+        merged = window['merged']
+        for slot, slot_epoch in enumerate(window['epochs']):
+            if slot_epoch <= epoch - slots and window['totals'][slot]:
+                for index, count in enumerate(window['counts'][slot]):
+                    if count:
+                        merged[index] -= count
+                window['counts'][slot] = array('I', EMPTY_COUNTS)
+                window['totals'][slot] = 0
+                window['breaches'][slot] = 0
+                window['maxima'][slot] = 0.0
+
+    def record(self, value_ms: float):
+        index = bucket_index(value_ms)
+        breach = self.threshold is not None and value_ms > self.threshold
+        export_index = bisect.bisect_left(EXPORT_BUCKETS_MS, value_ms)
+        now = self.clock()
+        with self._lock:
+            self._export_counts[export_index] += 1
+            self._export_sum += value_ms
+            for window in self._windows.values():
+                epoch = int(now // window['slot_seconds'])
+                slot = epoch % len(window['epochs'])
+                if window['epochs'][slot] != epoch:
+                    # The ring came round: this slot held values from an older period
+                    self._expire(window, epoch)
+                    window['epochs'][slot] = epoch
+                window['counts'][slot][index] += 1
+                window['merged'][index] += 1
+                window['totals'][slot] += 1
+                if breach:
+                    window['breaches'][slot] += 1
+                if value_ms > window['maxima'][slot]:
+                    window['maxima'][slot] = value_ms
+
+    def summary(self, name: str) -> Dict[str, Any]:
+        """count, p50/p90/p95/p99 and max for one window, plus the breach rate"""
+        window = self._windows[name]
+        with self._lock:
+            self._expire(window, int(self.clock() // window['slot_seconds']))
+            total = sum(window['totals'])
+            breaches = sum(window['breaches'])
+            maximum = max(window['maxima'])
+            merged = window['merged'].tolist() if total else []
+
+        summary = {'count': total}
+        if total:
+            targets = [(p, math.ceil(total * p / 100)) for p in PERCENTILES]
+            seen = 0
+            for index, count in enumerate(merged):
+                if not count:
+                    continue
+                seen += count
+                while targets and seen >= targets[0][1]:
+                    percentile, _ = targets.pop(0)
+                    summary[f'p{percentile}'] = round(min(bucket_value(index), maximum), 2)
+                if not targets:
+                    break
+        else:
+            summary.update({f'p{p}': 0 for p in PERCENTILES})
+        summary['max'] = round(maximum, 2)
+        if self.threshold is not None:
+            summary['over_budget_pct'] = round(breaches / total * 100, 2) if total else 0
+        return summary
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {name: self.summary(name) for name in self._windows}
+
+    def export(self) -> Tuple[List[int], float]:
+        """Per-bucket counts since start (the last one is +Inf) and the sum of all values"""
+        with self._lock:
+            return list(self._export_counts), self._export_sum
+
+class LatencyTracker:
+    """One SlidingHistogram per pipeline stage"""
+
+    def __init__(self, stages: Iterable[str], budgets: Optional[Dict[str, float]] = None):
+        budgets = budgets or {}
+        self.histograms = {stage: SlidingHistogram(budgets.get(stage)) for stage in stages}
+
+    def record(self, stage: str, value_ms: float):
+        histogram = self.histograms.get(stage)
+        if histogram is not None:
+            histogram.record(value_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {stage: histogram.get_stats() for stage, histogram in self.histograms.items()}
+
+    def export(self) -> Dict[str, Tuple[List[int], float]]:
+        return {stage: histogram.export() for stage, histogram in self.histograms.items()}
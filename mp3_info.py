@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+MP3 duration and frame index without decoding.
+
+Walks the MPEG audio frame headers (skipping ID3v2 at the start and
+ID3v1/APE/junk at the end) and reads the Xing/Info or VBRI tag that encoders
+put in the first frame. The tag's frame count gives the duration of VBR files
+without a full scan, and LAME's encoder delay/padding fields are subtracted
+so the duration matches what a gapless player plays.
+
+Usage:
+    python mp3_info.py file.mp3 [...]
+"""
+
+import struct
+import sys
+from array import array
+from typing import Dict, Optional, Tuple
+
+# kbps by [version is MPEG-1][layer]; index 0 is "free format", 15 is invalid
+BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+
+# Hz by version bits (0: MPEG-2.5, 2: MPEG-2, 3: MPEG-1)
+SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+
+# Frames this many bytes apart confirm a sync word found while searching isn't a false match
+MIN_RESYNC_CONFIRM = 2
+
+def _decode_header(b1: int, b2: int) -> Optional[Tuple[int, int, int]]:
+    """(frame length in bytes, samples per frame, sample rate) from header bytes 1 and 2"""
+    if b1 & 0xE0 != 0xE0:
+        return None
+    version = (b1 >> 3) & 0x03
+    layer = 4 - ((b1 >> 1) & 0x03)
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0x03
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None  # reserved values, and free-format bitrates we can't size
+
+    mpeg1 = version == 3
+    bitrate = BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = SAMPLE_RATES[version][rate_index]
+    padding = (b2 >> 1) & 0x01
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4, 384, sample_rate
+    samples = 1152 if layer == 2 or mpeg1 else 576
+    return samples // 8 * bitrate // sample_rate + padding, samples, sample_rate
+
+# All 2^16 values of header bytes 1-2 decoded once, so scanning is a list lookup per frame
+HEADER_TABLE = [_decode_header(i >> 8, i & 0xFF) for i in range(0x10000)]
+
+class Mp3Info:
+    """What the frame scan found out about an MP3 file"""
+
+    def __init__(self):
+        self.duration = 0.0          # seconds, without encoder delay/padding
+        self.frames = 0              # audio frames, not counting the Xing/VBRI tag frame
+        self.sample_rate = 0
+        self.channels = 0
+        self.samples_per_frame = 0
+        self.bitrate = 0             # average, in bits per second
+        self.audio_start = 0         # offset of the first audio frame
+        self.audio_bytes = 0
+        self.tag = None              # 'Xing', 'Info', 'VBRI' or None
+        self.encoder_delay = 0       # samples, from the LAME tag
+        self.encoder_padding = 0
+        self.offsets = None          # array of frame offsets, if requested
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            'duration': round(self.duration, 4),
+            'frames': self.frames,
+            'sample_rate': self.sample_rate,
+            'channels': self.channels,
+            'bitrate': self.bitrate,
+            'audio_bytes': self.audio_bytes,
+            'tag': self.tag,
+            'encoder_delay': self.encoder_delay,
+            'encoder_padding': self.encoder_padding,
+        }
+
+def _skip_id3v2(data: bytes) -> int:
+    position = 0
+    while data[position:position + 3] == b'ID3' and len(data) >= position + 10:
+        size = 0
+        for byte in data[position + 6:position + 10]:
+            size = (size << 7) | (byte & 0x7F)  # synchsafe integer
+        footer = 10 if data[position + 5] & 0x10 else 0
+        position += 10 + size + footer
+    return position
+
+def _find_sync(data: bytes, position: int) -> int:
+    """Offset of the next frame header that is followed by more frames, or -1"""
+    end = len(data) - 4
+    while True:
+        position = data.find(b'\xff', position, end)
+        if position < 0:
+            return -1
+        header = HEADER_TABLE[(data[position + 1] << 8) | data[position + 2]]
+        if header is not None:
+            # Accept if the following frames line up too (or the file ends on a frame boundary)
+            candidate = position
+            for _ in range(MIN_RESYNC_CONFIRM):
+                candidate += header[0]
+                if candidate >= len(data) - 4:
+                    return position if candidate <= len(data) else -1
+                if data[candidate] != 0xFF:
+                    break
+                header = HEADER_TABLE[(data[candidate + 1] << 8) | data[candidate + 2]]
+                if header is None:
+                    break
+            else:
+                return position
+        position += 1
+
+def _read_vbr_tag(data: bytes, position: int, info: Mp3Info) -> Optional[int]:
+    """Parse a Xing/Info or VBRI tag in the frame at position; returns its frame count
+
+    A truncated tag is ignored (None, no tag), so the frames get scanned instead.
+    """
+    try:
+        return _unpack_vbr_tag(data, position, info)
+    except struct.error:
+        info.tag = None
+        return None
+
+def _unpack_vbr_tag(data: bytes, position: int, info: Mp3Info) -> Optional[int]:
+    b1, b3 = data[position + 1], data[position + 3]
+    mpeg1 = (b1 >> 3) & 0x03 == 3
+    mono = b3 >> 6 == 3
+    side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+
+    xing = position + 4 + side_info
+    marker = data[xing:xing + 4]
+    if marker in (b'Xing', b'Info'):
+        info.tag = marker.decode('ascii')
+        flags = struct.unpack_from('>I', data, xing + 4)[0]
+        field = xing + 8
+        frames = None
+        if flags & 0x01:
+            frames = struct.unpack_from('>I', data, field)[0]
+            field += 4
+        if flags & 0x02:
+            field += 4  # byte count
+        if flags & 0x04:
+            field += 100  # seek table of contents
+        if flags & 0x08:
+            field += 4  # quality
+        # LAME extension: 9-byte encoder string, then 12 bits delay + 12 bits padding at +21
+        if data[field:field + 4] in (b'LAME', b'Lavf', b'Lavc', b'L3.9') and len(data) >= field + 24:
+            delay_padding = int.from_bytes(data[field + 21:field + 24], 'big')
+            info.encoder_delay = delay_padding >> 12
+            info.encoder_padding = delay_padding & 0xFFF
+        return frames
+
+    vbri = position + 36
+    if data[vbri:vbri + 4] == b'VBRI':
+        info.tag = 'VBRI'
+        return struct.unpack_from('>I', data, vbri + 14)[0]
+    return None
+
+def parse_mp3(data: bytes, offsets: bool = False) -> Optional[Mp3Info]:
+    """Scan MP3 data; None if no MPEG audio frames are found.
+
+    With ``offsets`` every frame is visited and its offset recorded. Without
+    it a Xing/VBRI frame count is trusted and the scan is skipped.
+    """
+    position = _find_sync(data, _skip_id3v2(data))
+    if position < 0:
+        return None
+
+    info = Mp3Info()
+    first = HEADER_TABLE[(data[position + 1] << 8) | data[position + 2]]
+    info.sample_rate = first[2]
+    info.samples_per_frame = first[1]
+    info.channels = 1 if data[position + 3] >> 6 == 3 else 2
+
+    tagged_frames = _read_vbr_tag(data, position, info)
+    if info.tag is not None:
+        position += first[0]  # the tag frame holds no audio
+    info.audio_start = position
+
+    if tagged_frames is not None and not offsets:
+        frames, samples = tagged_frames, tagged_frames * first[1]
+        info.audio_bytes = len(data) - position
+    else:
+        frames = samples = 0
+        frame_offsets = array('L') if offsets else None
+        table = HEADER_TABLE
+        size = len(data)
+        end = size - 3
+        while position < end:
+            header = table[(data[position + 1] << 8) | data[position + 2]] if data[position] == 0xFF else None
+            if header is None:
+                if data[position:position + 3] == b'TAG' or data[position:position + 8] == b'APETAGEX':
+                    break  # trailing metadata
+                position = _find_sync(data, position + 1)
+                if position < 0:
+                    break
+                continue
+            if position + header[0] > size:
+                break  # truncated last frame
+            if frame_offsets is not None:
+                frame_offsets.append(position)
+            frames += 1
+            samples += header[1]
+            position += header[0]
+        info.audio_bytes = position - info.audio_start if position > 0 else 0
+        info.offsets = frame_offsets
+
+    info.frames = frames
+    playable = max(0, samples - info.encoder_delay - info.encoder_padding)
+    info.duration = playable / info.sample_rate
+    if info.duration:
+        info.bitrate = int(info.audio_bytes * 8 / (samples / info.sample_rate))
+    return info
+
+def probe(path: str, offsets: bool = False) -> Optional[Mp3Info]:
+    """parse_mp3 for a file; None if it can't be read or holds no MPEG audio"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    return parse_mp3(data, offsets)
+
+def mp3_duration(path: str) -> Optional[float]:
+    """Playable duration of an MP3 file in seconds, or None"""
+    info = probe(path)
+    return info.duration if info is not None else None
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python mp3_info.py file.mp3 [...]")
+        sys.exit(1)
+    for path in sys.argv[1:]:
+        info = probe(path, offsets=True)
+        if info is None:
+            print(f"❌ {path}: no MPEG audio frames found")
+            continue
+        print(f"🎵 {path}: {info.duration:.3f}s, {info.frames} frames, {info.sample_rate} Hz, "
+              f"{info.channels} ch, {info.bitrate // 1000} kbps, tag {info.tag or '-'}")
+
+if __name__ == '__main__':
+    main()
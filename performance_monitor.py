@@ -1,143 +1,325 @@
+import threading
 import time
 from typing import Dict, List, Any
 from collections import defaultdict, deque
+from latency_histogram import LatencyTracker
+from user_stats import UserStatsTable
+from config import (
+    MAX_RESPONSE_TIME, USER_STATS_MAX_BYTES, USER_STATS_ERRORS_PER_USER,
+    USER_STATS_IDLE_SECONDS, USER_STATS_COMPACT_INTERVAL, USER_STATS_REPORT_TOP
+)
+
+# Pipeline stages with latency percentiles; only the total has a budget
+LATENCY_STAGES = ('total', 'gemini', 'faq', 'url_lookup', 'tts', 'viseme', 'file_write')
 
 class PerformanceMonitor:
+    """Request metrics over a window of the last ``max_requests`` requests.
+    
+    Requests are indexed by ID and the window's sums are kept as running
+    aggregates: a completion adds to them and a request leaving the window
+    subtracts from them, so recording a request and reading the stats cost
+    the same however large the window is. All updates happen under one lock
+    with short critical sections, so concurrent requests from a threaded
+    server can't lose counts.
+    
+    Latency percentiles per pipeline stage come from fixed-size sliding
+    histograms (see latency_histogram.py), which have their own locks.
+    Per-user stats live in a table with a hard memory ceiling (see
+    user_stats.py), trimmed by a background compactor.
+    """
+    
     def __init__(self, max_requests: int = 1000):
         self.max_requests = max_requests
-        self.requests = deque(maxlen=max_requests)
-        self.user_stats = defaultdict(lambda: {
-            'total_requests': 0,
-            'successful_requests': 0,
-            'total_gemini_time': 0,
-            'total_tts_time': 0,
-            'total_response_length': 0,
-            'errors': []
-        })
+        self.requests = deque()
+        self._index: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._window = self._empty_window()
+        self.user_stats = UserStatsTable(USER_STATS_MAX_BYTES, USER_STATS_ERRORS_PER_USER,
+                                         USER_STATS_IDLE_SECONDS)
         self.request_counter = 0
+        self.caches = {}
+        self.single_flights = {}
+        self.served_by = defaultdict(int)
+        self.prompt_sizes = defaultdict(lambda: {'requests': 0, 'total_chars': 0, 'total_tokens': 0})
+        self.latency = LatencyTracker(LATENCY_STAGES, {'total': MAX_RESPONSE_TIME})
+        # Since-start counters for /metrics; the window above is for /api/status
+        self.totals = {'completed': 0, 'successful': 0, 'cancelled': 0, 'audio_seconds': 0.0}
+        self.errors_by_stage = defaultdict(int)
+        self.in_flight = 0
+        self.gauges = {}
+        self._compactor = None
+        self._stop = threading.Event()
     
-    def start_request(self, user_id: str) -> str:
-        """Start tracking a new request"""
-        self.request_counter += 1
-        request_id = f"req_{self.request_counter}_{int(time.time())}"
-        
-        request_data = {
-            'request_id': request_id,
-            'user_id': user_id,
-            'start_time': time.time(),
-            'status': 'started'
+    @staticmethod
+    def _empty_window() -> Dict[str, float]:
+        return {
+            'completed': 0,
+            'successful': 0,
+            'gemini_time': 0.0,
+            'tts_time': 0.0,
+            'total_time': 0.0,
+            'audio_seconds': 0.0
         }
+    
+    def _add_to_window(self, request: Dict[str, Any], sign: int):
+        window = self._window
+        window['completed'] += sign
+        if request['success']:
+            window['successful'] += sign
+        window['gemini_time'] += sign * request['gemini_time']
+        window['tts_time'] += sign * request['tts_time']
+        window['total_time'] += sign * request['total_time']
+        window['audio_seconds'] += sign * request['audio_seconds']
+    
+    def _drop_oldest(self):
+        """Remove the oldest request from the window (caller holds the lock)"""
+        request = self.requests.popleft()
+        self._index.pop(request['request_id'], None)
+        if request['status'] == 'completed':
+            self._add_to_window(request, -1)
+    
+    def register_cache(self, name: str, cache):
+        """Expose a cache's hit/miss counters in the performance stats"""
+        self.caches[name] = cache
+    
+    def register_single_flight(self, upstream: str, flights):
+        """Expose a SingleFlight's leader/follower counters in the performance stats"""
+        self.single_flights[upstream] = flights
+    
+    def register_gauge(self, name: str, description: str, read, label: str = None):
+        """Expose a value read at scrape time on /metrics
         
-        self.requests.append(request_data)
+        ``read`` returns a number, or a dict of numbers keyed by the value of
+        ``label``; None leaves the gauge out. It is called on every scrape, so
+        it should only read counters that are already kept up to date.
+        """
+        self.gauges[name] = (description, read, label)
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get statistics for every registered cache"""
+        return {name: cache.get_stats() for name, cache in self.caches.items()}
+    
+    def get_single_flight_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics per upstream"""
+        return {upstream: flights.get_stats() for upstream, flights in self.single_flights.items()}
+    
+    def start_request(self, user_id: str) -> str:
+        """Start tracking a new request"""
+        with self._lock:
+            self.request_counter += 1
+            self.in_flight += 1
+            request_id = f"req_{self.request_counter}_{int(time.time())}"
+            
+            request_data = {
+                'request_id': request_id,
+                'user_id': user_id,
+                'start_time': time.time(),
+                'status': 'started'
+            }
+            
+            if len(self.requests) >= self.max_requests:
+                self._drop_oldest()
+            self.requests.append(request_data)
+            self._index[request_id] = request_data
         return request_id
     
-    def record_metrics(self, request_id: str, user_id: str, gemini_time: float, 
-                      tts_time: float, success: bool, response_length: int, 
-                      error: str = None):
-        """Record performance metrics for a completed request"""
-        # Update user stats
-        user_stats = self.user_stats[user_id]
-        user_stats['total_requests'] += 1
-        if success:
-            user_stats['successful_requests'] += 1
-        user_stats['total_gemini_time'] += gemini_time
-        user_stats['total_tts_time'] += tts_time
-        user_stats['total_response_length'] += response_length
+    def record_metrics(self, request_id: str, user_id: str, gemini_time: float,
+                      tts_time: float, success: bool, response_length: int,
+                      error: str = None, served_by: str = None, audio_seconds: float = 0.0,
+                      total_time: float = None):
+        """Record performance metrics for a completed request
         
-        if error:
-            user_stats['errors'].append({
-                'timestamp': time.time(),
-                'error': error
+        ``audio_seconds`` is the length of the synthesized speech, from the MP3 frame headers.
+        ``total_time`` is the wall-clock time of the whole request; it defaults to
+        Gemini + TTS time, which misses URL lookup and overlap in streaming mode.
+        """
+        if total_time is None:
+            total_time = gemini_time + tts_time
+        self.latency.record('total', total_time)
+        if gemini_time:
+            self.latency.record('gemini', gemini_time)
+        if tts_time:
+            self.latency.record('tts', tts_time)
+        self.user_stats.record(user_id, success, gemini_time, tts_time, response_length,
+                               audio_seconds, error)
+        
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            self.totals['completed'] += 1
+            if success:
+                self.totals['successful'] += 1
+            self.totals['audio_seconds'] += audio_seconds
+            if error:
+                self.errors_by_stage['pipeline'] += 1
+            if served_by:
+                self.served_by[served_by] += 1
+            
+            # Update request data; requests that already left the window are only counted per user
+            request = self._index.get(request_id)
+            if request is None or request['status'] == 'completed':
+                return
+            request.update({
+                'gemini_time': gemini_time,
+                'tts_time': tts_time,
+                'total_time': total_time,
+                'success': success,
+                'response_length': response_length,
+                'audio_seconds': audio_seconds,
+                'end_time': time.time(),
+                'status': 'completed',
+                'error': error,
+                'served_by': served_by
             })
+            self._add_to_window(request, 1)
+    
+    def cancel_request(self, request_id: str):
+        """Close a request that ended without a completion, e.g. a stream the client dropped
         
-        # Update request data
-        for request in self.requests:
-            if request['request_id'] == request_id:
-                request.update({
-                    'gemini_time': gemini_time,
-                    'tts_time': tts_time,
-                    'total_time': gemini_time + tts_time,
-                    'success': success,
-                    'response_length': response_length,
-                    'end_time': time.time(),
-                    'status': 'completed',
-                    'error': error
-                })
-                break
+        Call it at most once per request and only when ``record_metrics`` wasn't
+        called; the request leaves ``in_flight`` and stays out of the averages.
+        """
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            self.totals['cancelled'] += 1
+            request = self._index.get(request_id)
+            if request is not None and request['status'] == 'started':
+                request.update({'end_time': time.time(), 'status': 'cancelled'})
     
-    def get_performance_stats(self) -> Dict[str, Any]:
-        """Get comprehensive performance statistics"""
-        if not self.requests:
+    def record_stage(self, stage: str, duration_ms: float):
+        """Record the duration of one pipeline stage (url_lookup, viseme, file_write, ...)"""
+        self.latency.record(stage, duration_ms)
+    
+    def record_error(self, stage: str):
+        """Count a failure in one stage (gemini, tts, viseme, ...) that the request survived"""
+        with self._lock:
+            self.errors_by_stage[stage] += 1
+    
+    def record_prompt_size(self, mode: str, chars: int, tokens: int):
+        """Record the size of a prompt sent to Gemini"""
+        with self._lock:
+            stats = self.prompt_sizes[mode]
+            stats['requests'] += 1
+            stats['total_chars'] += chars
+            stats['total_tokens'] += tokens
+    
+    def get_prompt_stats(self) -> Dict[str, Any]:
+        """Average prompt size per prompt mode"""
+        with self._lock:
+            prompt_sizes = {mode: dict(stats) for mode, stats in self.prompt_sizes.items()}
+        return {
+            mode: {
+                'requests': stats['requests'],
+                'average_chars': round(stats['total_chars'] / stats['requests'], 1),
+                'average_tokens': round(stats['total_tokens'] / stats['requests'], 1)
+            }
+            for mode, stats in prompt_sizes.items() if stats['requests']
+        }
+    
+    def get_served_by_stats(self) -> Dict[str, Any]:
+        """Which path answered requests, and how often Gemini was bypassed"""
+        with self._lock:
+            served_by = dict(self.served_by)
+        total = sum(served_by.values())
+        return {
+            'counts': served_by,
+            'faq_bypass_ratio': round(served_by.get('faq', 0) / total * 100, 2) if total else 0
+        }
+    
+    def get_metrics_snapshot(self) -> Dict[str, Any]:
+        """Since-start counters for the Prometheus exporter, copied under the lock"""
+        with self._lock:
             return {
-                'total_requests': 0,
-                'average_response_time': 0,
-                'success_rate': 0,
-                'average_gemini_time': 0,
-                'average_tts_time': 0
+                'started': self.request_counter,
+                'in_flight': self.in_flight,
+                'totals': dict(self.totals),
+                'errors_by_stage': dict(self.errors_by_stage),
+                'served_by': dict(self.served_by)
             }
+    
+    def get_performance_stats(self) -> Dict[str, Any]:
+        """Get comprehensive performance statistics"""
+        with self._lock:
+            window = dict(self._window)
         
-        # Calculate overall stats
-        completed_requests = [r for r in self.requests if r.get('status') == 'completed']
-        total_requests = len(completed_requests)
-        
+        total_requests = window['completed']
         if total_requests == 0:
             return {
                 'total_requests': 0,
                 'average_response_time': 0,
                 'success_rate': 0,
                 'average_gemini_time': 0,
-                'average_tts_time': 0
+                'average_tts_time': 0,
+                'caches': self.get_cache_stats(),
+                'single_flight': self.get_single_flight_stats(),
+                'served_by': self.get_served_by_stats(),
+                'prompts': self.get_prompt_stats(),
+                'latency': self.latency.get_stats(),
+                'users': self.user_stats.get_stats()
             }
         
-        successful_requests = [r for r in completed_requests if r.get('success', False)]
-        success_rate = len(successful_requests) / total_requests * 100
-        
-        # Calculate average times
-        total_gemini_time = sum(r.get('gemini_time', 0) for r in completed_requests)
-        total_tts_time = sum(r.get('tts_time', 0) for r in completed_requests)
-        total_response_time = sum(r.get('total_time', 0) for r in completed_requests)
-        
-        avg_gemini_time = total_gemini_time / total_requests
-        avg_tts_time = total_tts_time / total_requests
-        avg_response_time = total_response_time / total_requests
-        
         return {
             'total_requests': total_requests,
-            'successful_requests': len(successful_requests),
-            'success_rate': round(success_rate, 2),
-            'average_response_time': round(avg_response_time, 2),
-            'average_gemini_time': round(avg_gemini_time, 2),
-            'average_tts_time': round(avg_tts_time, 2),
-            'total_gemini_time': round(total_gemini_time, 2),
-            'total_tts_time': round(total_tts_time, 2),
-            'user_stats': dict(self.user_stats)
+            'successful_requests': window['successful'],
+            'success_rate': round(window['successful'] / total_requests * 100, 2),
+            'average_response_time': round(window['total_time'] / total_requests, 2),
+            'average_gemini_time': round(window['gemini_time'] / total_requests, 2),
+            'average_tts_time': round(window['tts_time'] / total_requests, 2),
+            'total_gemini_time': round(window['gemini_time'], 2),
+            'total_tts_time': round(window['tts_time'], 2),
+            'total_audio_seconds': round(window['audio_seconds'], 2),
+            'average_audio_seconds': round(window['audio_seconds'] / total_requests, 2),
+            'caches': self.get_cache_stats(),
+            'single_flight': self.get_single_flight_stats(),
+            'served_by': self.get_served_by_stats(),
+            'prompts': self.get_prompt_stats(),
+            'latency': self.latency.get_stats(),
+            'user_stats': self.user_stats.top(USER_STATS_REPORT_TOP),
+            'users': self.user_stats.get_stats()
         }
     
     def get_recent_requests(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent requests for monitoring"""
-        return list(self.requests)[-limit:]
+        with self._lock:
+            start = max(0, len(self.requests) - limit)
+            return [dict(self.requests[i]) for i in range(start, len(self.requests))]
     
     def get_user_stats(self, user_id: str) -> Dict[str, Any]:
-        """Get statistics for a specific user"""
-        return dict(self.user_stats.get(user_id, {}))
+        """Get statistics for a specific user (approximate counts if they aren't in the top table)"""
+        return self.user_stats.get(user_id)
     
     def clear_old_data(self, max_age_seconds: int = 3600):
         """Clear old request data to prevent memory issues"""
         current_time = time.time()
         cutoff_time = current_time - max_age_seconds
         
-        # Remove old requests
-        self.requests = deque(
-            [r for r in self.requests if r.get('start_time', 0) > cutoff_time],
-            maxlen=self.max_requests
-        )
+        with self._lock:
+            # Requests are in start order, so the old ones are at the front
+            while self.requests and self.requests[0].get('start_time', 0) <= cutoff_time:
+                self._drop_oldest()
         
-        # Clean up old errors in user stats
-        for user_id, stats in self.user_stats.items():
-            stats['errors'] = [
-                error for error in stats['errors'] 
-                if error.get('timestamp', 0) > cutoff_time
-            ]
+        # Drop idle users and errors older than the cutoff
+        self.user_stats.compact(current_time, max_age_seconds)
+    
+    def _run_compactor(self, interval: float):
+        while True:
+            try:
+                self.clear_old_data()
+            except Exception as e:
+                print(f"Error in stats compactor: {e}")
+            if self._stop.wait(interval):
+                break
+    
+    def start_compactor(self, interval: float = USER_STATS_COMPACT_INTERVAL):
+        """Start the background thread that calls clear_old_data every ``interval`` seconds"""
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._stop.clear()
+        self._compactor = threading.Thread(target=self._run_compactor, args=(interval,),
+                                           name="stats-compactor", daemon=True)
+        self._compactor.start()
+    
+    def stop_compactor(self):
+        self._stop.set()
 
 # Global performance monitor instance
 performance_monitor = PerformanceMonitor()
@@ -0,0 +1,150 @@
+import time
+from typing import Any, Dict, List, Tuple
+
+from latency_histogram import EXPORT_BUCKETS_MS
+from performance_monitor import performance_monitor
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+PREFIX = 'kanguroo'
+
+# Bucket bounds in seconds, formatted once
+BUCKET_LABELS = [f'{bound / 1000:g}' for bound in EXPORT_BUCKETS_MS] + ['+Inf']
+
+def escape_label(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+class PrometheusExporter:
+    """Renders PerformanceMonitor counters in the Prometheus text format.
+
+    Everything is read from counters that are already kept up to date: the
+    monitor's since-start totals, the stage histograms' export buckets, the
+    registered caches' hit/miss attributes, the single-flight groups'
+    leader/follower attributes and the registered gauges. Each
+    source is copied under its own short lock, so a scrape never waits on a
+    request and never scans the request window. Per-user data is left out
+    on purpose, so the set of series stays bounded and each series' name and
+    labels are formatted once and reused.
+    """
+
+    def __init__(self, monitor=performance_monitor, prefix: str = PREFIX):
+        self.monitor = monitor
+        self.prefix = prefix
+        self.scrapes = 0
+        self.last_render_ms = 0.0
+        self._series = {}
+
+    def _metric(self, lines: List[str], name: str, kind: str, description: str):
+        lines.append(f'# HELP {self.prefix}_{name} {description}')
+        lines.append(f'# TYPE {self.prefix}_{name} {kind}')
+
+    def _series_name(self, name: str, labels: Tuple[Tuple[str, Any], ...] = ()) -> str:
+        key = (name, labels)
+        series = self._series.get(key)
+        if series is None:
+            series = f'{self.prefix}_{name}'
+            if labels:
+                series += '{' + ','.join(f'{label}="{escape_label(value)}"' for label, value in labels) + '}'
+            self._series[key] = series = series + ' '
+        return series
+
+    def _sample(self, lines: List[str], name: str, value: float, labels: Tuple[Tuple[str, Any], ...] = ()):
+        lines.append(self._series_name(name, labels) + format_value(value))
+
+    def _render_requests(self, lines: List[str], snapshot: Dict[str, Any]):
+        totals = snapshot['totals']
+        self._metric(lines, 'requests_started_total', 'counter', 'Requests received')
+        self._sample(lines, 'requests_started_total', snapshot['started'])
+        self._metric(lines, 'requests_completed_total', 'counter', 'Requests finished, successful or not')
+        self._sample(lines, 'requests_completed_total', totals['completed'])
+        self._metric(lines, 'requests_successful_total', 'counter', 'Requests that produced a response text')
+        self._sample(lines, 'requests_successful_total', totals['successful'])
+        self._metric(lines, 'requests_cancelled_total', 'counter', 'Requests abandoned before finishing')
+        self._sample(lines, 'requests_cancelled_total', totals['cancelled'])
+        self._metric(lines, 'requests_in_flight', 'gauge', 'Requests started but not finished')
+        self._sample(lines, 'requests_in_flight', snapshot['in_flight'])
+        self._metric(lines, 'responses_total', 'counter', 'Responses by the path that answered them')
+        for served_by, count in sorted(snapshot['served_by'].items()):
+            self._sample(lines, 'responses_total', count, (('served_by', served_by),))
+        self._metric(lines, 'errors_total', 'counter', 'Failures by pipeline stage')
+        for stage, count in sorted(snapshot['errors_by_stage'].items()):
+            self._sample(lines, 'errors_total', count, (('stage', stage),))
+        self._metric(lines, 'audio_seconds_total', 'counter', 'Seconds of speech synthesized')
+        self._sample(lines, 'audio_seconds_total', totals['audio_seconds'])
+
+    def _render_latency(self, lines: List[str]):
+        name = 'stage_duration_seconds'
+        self._metric(lines, name, 'histogram', 'Time spent per pipeline stage')
+        for stage, (counts, total_ms) in self.monitor.latency.export().items():
+            cumulative = 0
+            for label, count in zip(BUCKET_LABELS, counts):
+                cumulative += count
+                lines.append(self._series_name(f'{name}_bucket', (('stage', stage), ('le', label))) + str(cumulative))
+            self._sample(lines, f'{name}_sum', total_ms / 1000, (('stage', stage),))
+            self._sample(lines, f'{name}_count', cumulative, (('stage', stage),))
+
+    def _render_caches(self, lines: List[str]):
+        counters = {'hits': 'Cache lookups answered from the cache',
+                    'misses': 'Cache lookups that went upstream',
+                    'evictions': 'Cache entries evicted to stay within bounds',
+                    'age_evictions': 'Cache entries removed for exceeding their age limit',
+                    'budget_evictions': 'Cache entries removed to stay within the byte budget'}
+        caches = list(self.monitor.caches.items())
+        for counter, description in counters.items():
+            self._metric(lines, f'cache_{counter}_total', 'counter', description)
+            for cache_name, cache in caches:
+                value = getattr(cache, counter, None)
+                if isinstance(value, (int, float)):
+                    self._sample(lines, f'cache_{counter}_total', value, (('cache', cache_name),))
+
+    def _render_single_flight(self, lines: List[str]):
+        counters = {'leaders': ('singleflight_leaders_total', 'Upstream calls made on behalf of their callers'),
+                    'followers': ('singleflight_coalesced_total',
+                                  'Requests that joined an identical upstream call in flight')}
+        groups = list(self.monitor.single_flights.items())
+        if not groups:
+            return
+        for counter, (name, description) in counters.items():
+            self._metric(lines, name, 'counter', description)
+            for upstream, flights in groups:
+                self._sample(lines, name, getattr(flights, counter), (('upstream', upstream),))
+
+    def _render_gauges(self, lines: List[str]):
+        for gauge_name, (description, read, label) in list(self.monitor.gauges.items()):
+            try:
+                value = read()
+            except Exception as e:
+                print(f"⚠️  Metrics gauge {gauge_name} failed: {e}")
+                continue
+            if value is None:
+                continue
+            self._metric(lines, gauge_name, 'gauge', description)
+            if isinstance(value, dict):
+                for label_value, sample in value.items():
+                    self._sample(lines, gauge_name, sample, ((label, label_value),))
+            else:
+                self._sample(lines, gauge_name, value)
+
+    def render(self) -> str:
+        """The whole exposition, ready to serve as CONTENT_TYPE"""
+        start = time.perf_counter()
+        lines = []
+        self._render_requests(lines, self.monitor.get_metrics_snapshot())
+        self._render_latency(lines)
+        self._render_caches(lines)
+        self._render_single_flight(lines)
+        self._render_gauges(lines)
+        self._metric(lines, 'metrics_render_seconds', 'gauge', 'Time the previous scrape took to render')
+        self._sample(lines, 'metrics_render_seconds', self.last_render_ms / 1000)
+        self.scrapes += 1
+        self.last_render_ms = (time.perf_counter() - start) * 1000
+        return '\n'.join(lines) + '\n'
+
+# Global exporter for the /metrics endpoint
+prometheus_exporter = PrometheusExporter()
@@ -0,0 +1,171 @@
+from typing import Any, Dict, List, Tuple
+from faq_answerer import BM25Index, tokenize
+
+def build_custom_prompt(faq_data: Dict[str, Any]) -> str:
+    """Create custom prompt with company context"""
+    company_info = faq_data.get("company", {})
+    
+    prompt = f"""
+You are Kan-guroo, a friendly and knowledgeable customer care agent for {company_info.get('name', 'Kan-Guroo')}.
+
+Company Information:
+- Name: {company_info.get('name', 'Kan-Guroo')}
+- Website: {company_info.get('website', 'https://www.kan-guroo.com')}
+- Description: {company_info.get('description', '')}
+- Mission: {company_info.get('mission', '')}
+- Vision: {company_info.get('vision', '')}
+
+Available Programs:
+"""
+    
+    # Add programs information
+    programs = company_info.get('programs', {})
+    for program_type, program_list in programs.items():
+        prompt += f"\n{program_type.replace('_', ' ').title()}:\n"
+        for program in program_list:
+            prompt += f"- {program['name']}: {program['description']}\n"
+            if 'url' in program:
+                prompt += f"  URL: {program['url']}\n"
+    
+    prompt += f"""
+Team Information:
+"""
+    
+    # Add team information
+    team = company_info.get('team', [])
+    for member in team:
+        prompt += f"- {member['name']}: {member['role']}\n"
+    
+    prompt += f"""
+Contact Information:
+- Phone: {company_info.get('contact', {}).get('phone', 'N/A')}
+- Email: {company_info.get('contact', {}).get('email', 'N/A')}
+
+Your Role as Kan-guroo:
+1. You are an enthusiastic and helpful customer care agent
+2. Answer questions about our educational programs and services
+3. Be encouraging and positive about our programs
+4. If asked about specific courses/programs, mention how they've helped many students
+5. Keep responses SHORT and CONCISE (1-2 sentences maximum)
+6. Always be helpful and supportive
+7. You have access to team information, company details, and all program information
+8. IMPORTANT: Keep responses under 80 words for faster voice generation
+9. Be direct and to the point while *maintaining enthusiasm*
+10. When asked about founders, CEO, CTO, or team members, ALWAYS use the team information provided above
+11. If asked "Who's your CEO?" answer with the actual CEO name from the team information
+12. If asked about founders or team, provide the specific names and roles from the team information
+
+Examples:
+- "Who's your CEO?" → "Our CEO is Otari Melanashvili, who is also our Co-Founder!"
+- "Who are the founders?" → "Our founders are Otari Melanashvili (CEO), Saba Gelashvili, and Lasha Bevia!"
+
+User Question: """
+    
+    return prompt
+
+def build_role_prefix(faq_data: Dict[str, Any]) -> str:
+    """Fixed instructions shared by every scoped prompt.
+
+    It only depends on the company name, so it is byte-identical across
+    questions and can be reused by prefix caching upstream.
+    """
+    company_name = faq_data.get("company", {}).get('name', 'Kan-Guroo')
+    return f"""
+You are Kan-guroo, a friendly and knowledgeable customer care agent for {company_name}.
+
+Your Role as Kan-guroo:
+1. You are an enthusiastic and helpful customer care agent
+2. Answer questions about our educational programs and services
+3. Be encouraging and positive about our programs
+4. If asked about specific courses/programs, mention how they've helped many students
+5. Keep responses SHORT and CONCISE (1-2 sentences maximum)
+6. Always be helpful and supportive
+7. Use only the company information provided below for facts about us
+8. IMPORTANT: Keep responses under 80 words for faster voice generation
+9. Be direct and to the point while *maintaining enthusiasm*
+10. When asked about founders, CEO, CTO, or team members, ALWAYS use the team information provided below
+11. If asked "Who's your CEO?" answer with the actual CEO name from the team information
+12. If asked about founders or team, provide the specific names and roles from the team information
+
+Examples:
+- "Who's your CEO?" → "Our CEO is Otari Melanashvili, who is also our Co-Founder!"
+- "Who are the founders?" → "Our founders are Otari Melanashvili (CEO), Saba Gelashvili, and Lasha Bevia!"
+"""
+
+def build_sections(faq_data: Dict[str, Any]) -> List[Tuple[str, str, str]]:
+    """Split the company data into (section_id, search_keywords, prompt_text)"""
+    company_info = faq_data.get("company", {})
+    sections = []
+    
+    overview = f"""Company Information:
+- Name: {company_info.get('name', 'Kan-Guroo')}
+- Website: {company_info.get('website', 'https://www.kan-guroo.com')}
+- Description: {company_info.get('description', '')}
+- Mission: {company_info.get('mission', '')}
+- Vision: {company_info.get('vision', '')}
+"""
+    sections.append(('overview', 'company website site description mission vision goal about', overview))
+    
+    values = company_info.get('values', {})
+    if values:
+        text = "Company Values:\n" + "".join(f"- {name.title()}: {value}\n" for name, value in values.items())
+        sections.append(('values', 'values value ' + ' '.join(values) + ' ' + ' '.join(values.values()), text))
+    
+    programs = company_info.get('programs', {})
+    for program_type, program_list in programs.items():
+        text = f"{program_type.replace('_', ' ').title()}:\n"
+        for program in program_list:
+            text += f"- {program['name']}: {program['description']}\n"
+            if 'url' in program:
+                text += f"  URL: {program['url']}\n"
+        keywords = f"program programs offer {program_type.replace('_', ' ')} " + text
+        sections.append((f"programs:{program_type}", keywords, text))
+    
+    team = company_info.get('team', [])
+    if team:
+        text = "Team Information:\n" + "".join(f"- {m['name']}: {m['role']}\n" for m in team)
+        sections.append(('team', 'team founder founders ceo cto staff people members who ' + text, text))
+    
+    contact = company_info.get('contact', {})
+    text = f"""Contact Information:
+- Phone: {contact.get('phone', 'N/A')}
+- Email: {contact.get('email', 'N/A')}
+"""
+    sections.append(('contact', 'contact phone number call email mail reach address', text))
+    
+    return sections
+
+class ScopedPromptBuilder:
+    """Build prompts with only the FAQ sections relevant to the question.
+
+    The full prompt sends every program, team member and contact detail with
+    every question. Here the sections are indexed with BM25 and only the top-k
+    matches are appended after a fixed role prefix. Questions that match no
+    section get the full prompt so Gemini never answers blind.
+    """
+    
+    def __init__(self, faq_data: Dict[str, Any], top_k: int = 2):
+        self.top_k = top_k
+        self.prefix = build_role_prefix(faq_data)
+        self.full_prompt = build_custom_prompt(faq_data)
+        self.sections = build_sections(faq_data)
+        self.index = BM25Index([keywords for _, keywords, _ in self.sections])
+    
+    def select_sections(self, question: str) -> List[str]:
+        """Return the ids of the top-k sections for a question"""
+        results = self.index.search(tokenize(question))
+        return [self.sections[doc_id][0] for doc_id, _, _ in results[:self.top_k]]
+    
+    def build(self, question: str) -> str:
+        """Prompt prefix for this question (the question itself is appended by the caller)"""
+        results = self.index.search(tokenize(question))
+        if not results:
+            return self.full_prompt
+        
+        chosen = sorted(doc_id for doc_id, _, _ in results[:self.top_k])
+        context = "\n".join(self.sections[doc_id][2] for doc_id in chosen)
+        return f"{self.prefix}\nRelevant Company Information:\n{context}\nUser Question: "
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for English text)"""
+    return (len(text) + 3) // 4
@@ -0,0 +1,111 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Words that don't change the meaning of a kiosk question when they open or close it
+FILLER_WORDS = {
+    'please', 'um', 'uh', 'umm', 'uhm', 'hey', 'hi', 'hello', 'well', 'so',
+    'just', 'actually', 'kindly', 'ok', 'okay'
+}
+
+CONTRACTIONS = {
+    "what's": 'what is', "who's": 'who is', "where's": 'where is',
+    "how's": 'how is', "when's": 'when is', "it's": 'it is',
+    "what're": 'what are', "who're": 'who are', "you're": 'you are',
+    "don't": 'do not', "can't": 'cannot'
+}
+
+PUNCTUATION = re.compile(r"[^\w\s']+")
+WHITESPACE = re.compile(r'\s+')
+
+def normalize_question(question: str) -> str:
+    """Normalize a user question so trivially different phrasings share a key
+
+    Filler words are only stripped from the start and end: inside a question
+    they can carry meaning ("how well ..." isn't "how ...").
+    """
+    text = question.lower().replace('’', "'")
+    text = PUNCTUATION.sub(' ', text)
+    words = [CONTRACTIONS.get(word, word).replace("'", '') for word in WHITESPACE.split(text.strip())]
+    words = [word for word in words if word]
+    start, end = 0, len(words)
+    while start < end and words[start] in FILLER_WORDS:
+        start += 1
+    while end > start and words[end - 1] in FILLER_WORDS:
+        end -= 1
+    return ' '.join(words[start:end])
+
+class ResponseCache:
+    """Bounded LRU cache with per-entry TTL for generated answers"""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(question: str, version: str) -> Optional[str]:
+        """Cache key from the normalized question and the prompt/FAQ version
+
+        None for questions made only of filler ("ok", "hi"), which aren't cached.
+        """
+        normalized = normalize_question(question)
+        if not normalized:
+            return None
+        return f"{version}:{normalized}"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value or None, refreshing its LRU position"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any):
+        """Store a value, evicting the least recently used entries if full"""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (e.g. when the FAQ changes)"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups * 100, 2) if lookups else 0,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
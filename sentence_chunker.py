@@ -0,0 +1,47 @@
+import re
+from typing import List
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) followed by whitespace
+SENTENCE_END = re.compile(r'[.!?…]+["\')\]]*\s+')
+
+# Words ending in a period that don't end a sentence
+ABBREVIATIONS = {'mr.', 'mrs.', 'ms.', 'dr.', 'prof.', 'st.', 'vs.', 'etc.', 'e.g.', 'i.e.', 'u.s.'}
+
+class SentenceChunker:
+    """Incrementally cut a token stream into sentences for TTS.
+
+    Feed text deltas as they arrive from the model; every call returns the
+    sentences completed so far. Very short sentences are held back and joined
+    with the next one so we don't pay an upstream round trip for "Hi!".
+    """
+
+    def __init__(self, min_chars: int = 12):
+        self.min_chars = min_chars
+        self.buffer = ""
+
+    def feed(self, delta: str) -> List[str]:
+        """Add a text delta and return any completed sentences"""
+        self.buffer += delta
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self.buffer):
+            end = match.end()
+            candidate = self.buffer[start:end].strip()
+            last_word = candidate.rsplit(None, 1)[-1].lower() if candidate else ""
+            if last_word in ABBREVIATIONS or len(candidate) < self.min_chars:
+                continue
+            sentences.append(candidate)
+            start = end
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self) -> List[str]:
+        """Return whatever is left once the stream has finished"""
+        remainder = self.buffer.strip()
+        self.buffer = ""
+        return [remainder] if remainder else []
+
+def split_sentences(text: str, min_chars: int = 12) -> List[str]:
+    """Split a complete text into TTS-sized sentences"""
+    chunker = SentenceChunker(min_chars)
+    return chunker.feed(text) + chunker.flush()
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one in-flight call.
+
+    The first caller for a key (the leader) starts the work as a task; callers
+    arriving while it runs (followers) await the same task and get its result
+    or its exception. The key is released as soon as the task finishes, so
+    later callers start a fresh call; this only removes duplicate work that
+    overlaps in time, caching finished results is left to the caches.
+
+    The work runs in its own task and every caller awaits it through
+    ``asyncio.shield``, so a cancelled caller (e.g. a dropped client) doesn't
+    cancel the call the others are waiting for. Calls are expected to run on
+    one loop (the shared AsyncRuntime); a caller on another loop runs alone.
+
+    ``leaders`` counts calls that went upstream and ``followers`` calls that
+    joined one in flight.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Await ``func()``, or the call already in flight for ``key``
+        
+        Returns (result, shared), where ``shared`` is True for followers.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            task = self._calls.get(key)
+            shared = task is not None and task.get_loop() is loop
+            if shared:
+                self.followers += 1
+            else:
+                task = loop.create_task(func())
+                if key not in self._calls:
+                    self._calls[key] = task
+                    task.add_done_callback(lambda done: self._release(key, done))
+                self.leaders += 1
+        return await asyncio.shield(task), shared
+
+    def _release(self, key: str, task: asyncio.Task):
+        with self._lock:
+            if self._calls.get(key) is task:
+                del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception retrieved in case every caller went away
+            task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics"""
+        calls = self.leaders + self.followers
+        return {
+            'in_flight': len(self._calls),
+            'leaders': self.leaders,
+            'followers': self.followers,
+            'coalescing_ratio': round(self.followers / calls * 100, 2) if calls else 0
+        }
@@ -130,6 +130,11 @@ class CharacterManager {
             return;
         }
         
+        if (visemeData.format && window.LipSyncManager) {
+            // Compact wire format: this fallback player works on the full viseme list
+            visemeData = { ...visemeData, visemes: LipSyncManager.toVisemeList(visemeData) };
+        }
+        
         this.visemeData = visemeData;
         this.lipSyncActive = true;
         this.animationStartTime = Date.now();
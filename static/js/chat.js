@@ -14,6 +14,11 @@ class ChatManager {
         this.currentAudio = null;
         this.recognition = null;
         
+        // Streaming responses need fetch body streams; older browsers use /api/chat
+        this.useStreaming = !!(window.ReadableStream && window.TextDecoder);
+        this.audioQueue = [];
+        this.isPlayingSegment = false;
+        
         this.init();
     }
     
@@ -136,58 +141,11 @@ class ChatManager {
         this.setProcessingState(true);
         
         try {
-            // Send to backend
-            const response = await fetch('/api/chat', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({
-                    message: message,
-                    user_id: 'web_user'
-                })
-            });
-            
-            const data = await response.json();
-            
-            if (data.success) {
-                // Add bot response
-                this.addMessage(data.response_text, 'bot');
-                
-                // Play audio if available
-                if (data.audio_file) {
-                    await this.playAudio(data.audio_file);
-                }
-                
-                // Handle viseme data for lip-sync
-                console.log('Received response data:', data);
-                if (data.viseme_data) {
-                    console.log('Viseme data received:', data.viseme_data);
-                    console.log('Viseme count:', data.viseme_data.visemes?.length || 0);
-                    console.log('Duration:', data.viseme_data.duration);
-                    
-                    if (window.kanGurooApp) {
-                        console.log('Starting lip sync with app');
-                        window.kanGurooApp.startLipSync(data.viseme_data);
-                    } else if (window.characterManager) {
-                        console.log('Starting lip sync with character manager (fallback)');
-                        window.characterManager.startLipSync(data.viseme_data);
-                    } else {
-                        console.warn('No lip sync manager available');
-                    }
-                } else {
-                    console.log('No viseme data in response');
-                }
-                
-                // Show relevant URLs if any
-                if (data.relevant_urls && data.relevant_urls.length > 0) {
-                    this.showRelevantUrls(data.relevant_urls);
-                }
-                
+            if (this.useStreaming) {
+                await this.sendMessageStream(message);
             } else {
-                this.addMessage(data.error || 'Sorry, I encountered an error. Please try again.', 'bot');
+                await this.sendMessageFull(message);
             }
-            
         } catch (error) {
             console.error('Chat error:', error);
             this.addMessage('Sorry, I\'m having trouble connecting. Please try again.', 'bot');
@@ -196,6 +154,164 @@ class ChatManager {
         }
     }
     
+    async sendMessageFull(message) {
+        // Send to backend
+        const response = await fetch('/api/chat', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                message: message,
+                user_id: 'web_user',
+                viseme_format: this.visemeFormat()
+            })
+        });
+        
+        const data = await response.json();
+        
+        if (data.success) {
+            // Add bot response
+            this.addMessage(data.response_text, 'bot');
+            
+            // Play audio if available
+            if (data.audio_file) {
+                await this.playAudio(data.audio_file);
+            }
+            
+            // Handle viseme data for lip-sync
+            console.log('Received response data:', data);
+            if (data.viseme_data) {
+                this.startLipSync(data.viseme_data);
+            } else {
+                console.log('No viseme data in response');
+            }
+            
+            // Show relevant URLs if any
+            if (data.relevant_urls && data.relevant_urls.length > 0) {
+                this.showRelevantUrls(data.relevant_urls);
+            }
+            
+        } else {
+            this.addMessage(data.error || 'Sorry, I encountered an error. Please try again.', 'bot');
+        }
+    }
+    
+    async sendMessageStream(message) {
+        const response = await fetch('/api/chat/stream', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream'
+            },
+            body: JSON.stringify({
+                message: message,
+                user_id: 'web_user',
+                viseme_format: this.visemeFormat()
+            })
+        });
+        
+        const contentType = response.headers.get('Content-Type') || '';
+        if (!contentType.includes('text/event-stream')) {
+            // Validation errors come back as plain JSON
+            const data = await response.json();
+            this.addMessage(data.error || 'Sorry, I encountered an error. Please try again.', 'bot');
+            return;
+        }
+        
+        this.audioQueue = [];
+        let botMessage = null;
+        let responseText = '';
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            
+            buffer += decoder.decode(value, { stream: true });
+            
+            // SSE messages are separated by a blank line
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                
+                const dataLine = rawEvent.split('\n').find(line => line.startsWith('data: '));
+                if (!dataLine) continue;
+                const event = JSON.parse(dataLine.slice(6));
+                
+                switch (event.type) {
+                    case 'text':
+                        responseText += event.delta;
+                        if (!botMessage) {
+                            botMessage = this.addMessage('', 'bot');
+                            // First words are in, the spinner is no longer needed
+                            this.loadingOverlay.classList.remove('show');
+                        }
+                        botMessage.querySelector('.message-text').textContent = responseText;
+                        this.scrollToBottom();
+                        break;
+                    case 'audio':
+                        this.enqueueAudioSegment(event);
+                        break;
+                    case 'urls':
+                        if (event.relevant_urls && event.relevant_urls.length > 0) {
+                            this.showRelevantUrls(event.relevant_urls);
+                        }
+                        break;
+                    case 'done':
+                        console.log('Stream finished:', event.performance);
+                        break;
+                    case 'error':
+                        this.addMessage(event.error || 'Sorry, I encountered an error. Please try again.', 'bot');
+                        break;
+                }
+            }
+        }
+    }
+    
+    enqueueAudioSegment(segment) {
+        this.audioQueue.push(segment);
+        if (!this.isPlayingSegment) {
+            this.playNextSegment();
+        }
+    }
+    
+    async playNextSegment() {
+        const segment = this.audioQueue.shift();
+        if (!segment) {
+            this.isPlayingSegment = false;
+            return;
+        }
+        
+        this.isPlayingSegment = true;
+        await this.playAudio(segment.audio_file);
+        if (segment.viseme_data) {
+            this.startLipSync(segment.viseme_data);
+        }
+    }
+    
+    visemeFormat() {
+        // The compact formats need LipSyncManager to decode them
+        return window.LipSyncManager ? 'binary' : 'full';
+    }
+    
+    startLipSync(visemeData) {
+        console.log('Viseme format:', visemeData.format || 'full', 'duration:', visemeData.duration);
+        
+        if (window.kanGurooApp) {
+            window.kanGurooApp.startLipSync(visemeData);
+        } else if (window.characterManager) {
+            console.log('Starting lip sync with character manager (fallback)');
+            window.characterManager.startLipSync(visemeData);
+        } else {
+            console.warn('No lip sync manager available');
+        }
+    }
+    
     addMessage(text, sender) {
         const messageDiv = document.createElement('div');
         messageDiv.className = `message ${sender}-message`;
@@ -213,6 +329,7 @@ class ChatManager {
         
         this.chatMessages.appendChild(messageDiv);
         this.scrollToBottom();
+        return messageDiv;
     }
     
     async playAudio(audioFile) {
@@ -227,10 +344,18 @@ class ChatManager {
             
         } catch (error) {
             console.error('Audio playback error:', error);
+            this.isPlayingSegment = false;
         }
     }
     
     onAudioEnded() {
+        // Continue with the next streamed sentence if one is waiting
+        if (this.audioQueue.length > 0) {
+            this.playNextSegment();
+            return;
+        }
+        this.isPlayingSegment = false;
+        
         // Set character back to idle
         if (window.characterManager) {
             window.characterManager.setAnimationStatus('idle');
@@ -1,30 +1,118 @@
 // Lip-sync animation system for character
 class LipSyncManager {
+    // Viseme ID dictionary of the compact wire formats, shared with viseme_codec.py
+    static VISEME_NAMES = [
+        'viseme_sil', 'viseme_aa', 'viseme_ee', 'viseme_ii', 'viseme_oo', 'viseme_uu', 'viseme_PP',
+        'viseme_ff', 'viseme_th', 'viseme_DD', 'viseme_kk', 'viseme_ss', 'viseme_nn', 'viseme_rr'
+    ];
+    
     constructor(characterManager) {
         this.characterManager = characterManager;
         this.isActive = false;
         this.currentViseme = null;
-        this.visemeQueue = [];
+        this.track = null;
         this.animationFrame = null;
     }
     
+    static base64ToBytes(base64) {
+        const binary = atob(base64);
+        const bytes = new Uint8Array(binary.length);
+        for (let i = 0; i < binary.length; i++) {
+            bytes[i] = binary.charCodeAt(i);
+        }
+        return bytes;
+    }
+    
+    // Decode any viseme wire format into typed arrays:
+    // times (seconds) and ids (indexes into names), plus the optional intensity track
+    static decodeVisemeData(visemeData) {
+        let times, ids, intensity = null;
+        let names = LipSyncManager.VISEME_NAMES;
+        
+        if (visemeData.format === 'binary') {
+            // uint16 little-endian millisecond deltas followed by uint8 viseme IDs
+            const bytes = LipSyncManager.base64ToBytes(visemeData.blob);
+            const view = new DataView(bytes.buffer);
+            const count = visemeData.count;
+            times = new Float32Array(count);
+            ids = bytes.slice(count * 2, count * 3);
+            let timeMs = 0;
+            for (let i = 0; i < count; i++) {
+                timeMs += view.getUint16(i * 2, true);
+                times[i] = timeMs / 1000;
+            }
+            if (visemeData.intensity) {
+                intensity = LipSyncManager.base64ToBytes(visemeData.intensity);
+            }
+        } else if (visemeData.format === 'compact') {
+            const count = visemeData.ids.length;
+            times = new Float32Array(count);
+            ids = Uint8Array.from(visemeData.ids);
+            let timeMs = 0;
+            for (let i = 0; i < count; i++) {
+                timeMs += visemeData.dt[i];
+                times[i] = timeMs / 1000;
+            }
+            if (visemeData.intensity) {
+                intensity = Uint8Array.from(visemeData.intensity);
+            }
+        } else {
+            // Full format: a list of {time, viseme} objects
+            const visemes = visemeData.visemes || [];
+            names = [...LipSyncManager.VISEME_NAMES];
+            times = new Float32Array(visemes.length);
+            ids = new Uint8Array(visemes.length);
+            visemes.forEach((viseme, i) => {
+                let id = names.indexOf(viseme.viseme);
+                if (id === -1) {
+                    id = names.push(viseme.viseme) - 1;
+                }
+                times[i] = viseme.time;
+                ids[i] = id;
+            });
+            if (Array.isArray(visemeData.intensity)) {
+                intensity = Uint8Array.from(visemeData.intensity);
+            }
+        }
+        
+        return {
+            times: times,
+            ids: ids,
+            names: names,
+            duration: visemeData.duration || 0,
+            // Exact length of the audio from its MP3 frame headers, when the server knows it
+            audioDuration: visemeData.audio_duration || 0,
+            // Optional mouth opening measured on the audio: 0-100 per frame, frame_rate frames per second
+            intensity: intensity,
+            frameRate: visemeData.frame_rate || 0
+        };
+    }
+    
+    // Back to a list of {time, viseme} objects for code that expects the full format
+    static toVisemeList(visemeData) {
+        const track = LipSyncManager.decodeVisemeData(visemeData);
+        return Array.from(track.times, (time, i) => ({ time: time, viseme: track.names[track.ids[i]] }));
+    }
+    
     startLipSync(visemeData) {
-        if (!visemeData || !visemeData.visemes) {
+        if (!visemeData || !(visemeData.visemes || visemeData.format)) {
             console.warn('No viseme data provided');
             return;
         }
         
-        this.visemeQueue = [...visemeData.visemes];
+        this.track = LipSyncManager.decodeVisemeData(visemeData);
+        this.visemeIndex = -1;
+        this.currentFrame = -1;
         this.isActive = true;
         this.startTime = Date.now();
         
-        console.log('Starting lip-sync with', this.visemeQueue.length, 'visemes');
+        console.log('Starting lip-sync with', this.track.times.length, 'visemes');
         this.animate();
     }
     
     stopLipSync() {
         this.isActive = false;
-        this.visemeQueue = [];
+        this.track = null;
         this.currentViseme = null;
         
         if (this.animationFrame) {
@@ -42,26 +130,43 @@ class LipSyncManager {
         if (!this.isActive) return;
         
         const currentTime = (Date.now() - this.startTime) / 1000;
+        const { times, ids, names, intensity, frameRate, audioDuration } = this.track;
         
-        // Find the current viseme based on time
-        let activeViseme = null;
-        for (const viseme of this.visemeQueue) {
-            if (viseme.time <= currentTime) {
-                activeViseme = viseme;
-            } else {
-                break;
-            }
+        // Time only moves forward, so advance from the previous viseme instead of rescanning
+        let index = this.visemeIndex;
+        while (index + 1 < times.length && times[index + 1] <= currentTime) {
+            index++;
         }
+        const visemeChanged = index !== this.visemeIndex;
+        this.visemeIndex = index;
+        const visemeName = index >= 0 ? names[ids[index]] : null;
         
-        // Apply the viseme if it's different from the current one
-        if (activeViseme && activeViseme !== this.currentViseme) {
-            this.applyViseme(activeViseme);
-            this.currentViseme = activeViseme;
+        if (intensity && frameRate) {
+            // Drive the mouth opening frame by frame from the audio analysis
+            const frame = Math.floor(currentTime * frameRate);
+            if (frame !== this.currentFrame && frame < intensity.length) {
+                this.currentFrame = frame;
+                this.currentViseme = visemeName;
+                if (this.characterManager?.threeJSCharacter?.character) {
+                    this.animateCharacterMouth(intensity[frame] / 100, visemeName || 'viseme_sil');
+                }
+            }
+        } else if (visemeName && visemeChanged) {
+            // Apply the viseme when the timeline reaches the next one
+            this.currentViseme = { time: times[index], viseme: visemeName };
+            this.applyViseme(this.currentViseme);
         }
         
-        // Check if we've reached the end
-        const lastViseme = this.visemeQueue[this.visemeQueue.length - 1];
-        if (lastViseme && currentTime >= lastViseme.time + 0.5) { // Add small buffer
+        // Check if we've reached the end: when the audio ends if its length is known,
+        // otherwise shortly after the last viseme
+        let endTime = times.length ? times[times.length - 1] + 0.5 : 0; // Add small buffer
+        if (intensity && frameRate) {
+            endTime = Math.max(endTime, intensity.length / frameRate + 0.5);
+        }
+        if (audioDuration) {
+            endTime = audioDuration;
+        }
+        if ((times.length || intensity || audioDuration) && currentTime >= endTime) {
             this.stopLipSync();
             return;
         }
@@ -286,7 +391,7 @@ class LipSyncManager {
     // Debug methods
     logVisemeData(visemeData) {
         console.log('Viseme data:', visemeData);
-        console.log('Total visemes:', visemeData.visemes?.length || 0);
+        console.log('Total visemes:', visemeData.visemes?.length || visemeData.count || visemeData.ids?.length || 0);
         console.log('Duration:', visemeData.duration || 0);
     }
 }
@@ -103,7 +103,7 @@ class ThreeJSCharacter {
             const loader = new THREE.GLTFLoader();
             const gltf = await new Promise((resolve, reject) => {
                 loader.load(
-                    '/Dona.glb',
+                    (window.ASSET_URLS && window.ASSET_URLS.characterModel) || '/Dona.glb',
                     resolve,
                     (progress) => {
                         console.log('Loading progress:', (progress.loaded / progress.total * 100) + '%');
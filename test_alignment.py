@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Test script for viseme timelines aligned to ElevenLabs character timestamps.
+
+Runs ElevenLabsService against the local stub server in benchmarks/, which
+returns canned audio plus a deterministic alignment, so no API key or network
+access is needed.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+
+from stub_upstream import StubUpstream, fake_alignment, fake_speech
+from viseme_engine import viseme_engine, alignment_words, word_to_phonemes, MIN_ALIGNED_PAUSE
+
+TEXT = "Hello there, welcome to Kan-Guroo! Call 555 today."
+
+def synthesize(stub, text):
+    """Run one TTS request against the stub, without the audio cache"""
+    from elevenlabs_service import ElevenLabsService
+
+    async def run():
+        service = ElevenLabsService()
+        service.base_url = stub.base_url
+        service.use_alignment = True
+        service.audio_cache = None
+        try:
+            with tempfile.TemporaryDirectory() as out_dir:
+                audio_file, viseme_data = await service.text_to_speech_with_visemes(
+                    text, os.path.join(out_dir, "aligned.mp3")
+                )
+                with open(audio_file, 'rb') as f:
+                    audio = f.read()
+                return audio, viseme_data
+        finally:
+            await service.close_session()
+
+    return asyncio.run(run())
+
+def test_alignment_words():
+    """Characters are grouped into words with their time spans"""
+    print("\n🔍 Grouping aligned characters into words...")
+    words = alignment_words(fake_alignment(TEXT))
+    names = [word for word, _, _ in words]
+    assert names == ['Hello', 'there', 'welcome', 'to', 'Kan-Guroo', 'Call', '5', '5', '5', 'today'], names
+    for word, start, end in words:
+        assert end > start, (word, start, end)
+    print(f"✅ {len(words)} words: {', '.join(names)}")
+
+def test_aligned_timeline():
+    """Pauses and the words after them land exactly on their character timestamps"""
+    print("\n🔍 Building viseme timeline from alignment...")
+    alignment = fake_alignment(TEXT)
+    data = viseme_engine.generate_aligned(TEXT, alignment)
+    assert data is not None and data['source'] == 'alignment'
+
+    times = [v['time'] for v in data['visemes']]
+    assert times == sorted(times), "viseme times must be increasing"
+    assert data['duration'] == alignment['character_end_times_seconds'][-2]  # last letter before '.'
+    assert data['visemes'][-1]['viseme'] == 'viseme_sil'
+
+    # Pauses close the mouth when the previous word ends and speech resumes
+    # exactly when the next word starts, however long the answer is
+    keyframes = {(v['time'], v['viseme']) for v in data['visemes']}
+    words = alignment_words(alignment)
+    pauses = 0
+    for (_, _, previous_end), (word, start, _) in zip(words, words[1:]):
+        if start - previous_end >= MIN_ALIGNED_PAUSE:
+            pauses += 1
+            assert (round(previous_end, 3), 'viseme_sil') in keyframes, f"no silence before '{word}'"
+            assert any(t == round(start, 3) and v != 'viseme_sil' for t, v in keyframes), f"'{word}' starts late"
+    assert pauses >= 2
+    print(f"✅ {len(data['visemes'])} visemes over {data['duration']:.2f}s, {pauses} pauses on their timestamps")
+
+def test_missing_alignment_falls_back():
+    """No or broken alignment gives None, so the caller uses the text engine"""
+    print("\n🔍 Checking fallback for missing alignment...")
+    assert viseme_engine.generate_aligned(TEXT, None) is None
+    broken = fake_alignment(TEXT)
+    broken['character_end_times_seconds'] = broken['character_end_times_seconds'][:-3]
+    assert viseme_engine.generate_aligned(TEXT, broken) is None
+    print("✅ Missing and mismatched alignments are rejected")
+
+def test_non_ascii_replies():
+    """Accented capitals and superscript digits are skipped instead of crashing"""
+    print("\n🔍 Aligning replies with non-ASCII words...")
+    for text in ("Das ist ÜBER gut", "café ÉTÉ", "Call 5² now"):
+        data = viseme_engine.generate_aligned(text, fake_alignment(text))
+        assert data is not None and data['source'] == 'alignment', text
+    names = [word for word, _, _ in alignment_words(fake_alignment("Call 5² now"))]
+    assert names == ['Call', '5', 'now'], names
+    assert word_to_phonemes('ÜBER') == ('B', 'IY', 'IY', 'AA', 'R')
+    print("✅ ÜBER, ÉTÉ and 5² aligned")
+
+def test_failed_alignment_falls_back():
+    """An error while aligning falls back to the estimated timeline"""
+    print("\n🔍 Breaking the aligner...")
+    from elevenlabs_service import ElevenLabsService
+    import elevenlabs_service
+
+    def broken(text, alignment):
+        raise ValueError("bad alignment")
+
+    real = elevenlabs_service.viseme_engine.generate_aligned
+    elevenlabs_service.viseme_engine.generate_aligned = broken
+    try:
+        viseme_data = asyncio.run(ElevenLabsService()._generate_viseme_data(
+            TEXT, fake_alignment(TEXT), audio_duration=3.0))
+    finally:
+        elevenlabs_service.viseme_engine.generate_aligned = real
+    assert viseme_data is not None and viseme_data['source'] == 'text'
+    assert viseme_data['audio_duration'] == 3.0
+    print(f"✅ Fell back to {len(viseme_data['visemes'])} estimated visemes")
+
+def test_service_uses_stub_alignment():
+    """ElevenLabsService requests timestamps and aligns the visemes to them"""
+    print("\n🔍 Requesting audio with timestamps from the stub server...")
+    stub = StubUpstream(use_tls=False).start()
+    try:
+        audio, viseme_data = synthesize(stub, TEXT)
+    finally:
+        stub.stop()
+    assert audio == fake_speech(TEXT)
+    assert viseme_data['source'] == 'alignment'
+    expected = viseme_engine.generate_aligned(TEXT, fake_alignment(TEXT))
+    assert viseme_data['visemes'] == expected['visemes']
+    print(f"✅ Got {len(audio)} bytes of audio and {len(viseme_data['visemes'])} aligned visemes")
+
+def test_service_falls_back_without_alignment():
+    """If the response carries no alignment the estimated timeline is used"""
+    print("\n🔍 Requesting audio from a stub that omits the alignment...")
+    stub = StubUpstream(use_tls=False, alignment=False).start()
+    try:
+        audio, viseme_data = synthesize(stub, TEXT)
+    finally:
+        stub.stop()
+    assert audio == fake_speech(TEXT)
+    assert viseme_data['source'] == 'text'
+    print(f"✅ Fell back to {len(viseme_data['visemes'])} estimated visemes")
+
+def main():
+    """Run all tests"""
+    print("🚀 Viseme Alignment Test")
+    print("=" * 50)
+
+    tests = [
+        test_alignment_words,
+        test_aligned_timeline,
+        test_missing_alignment_falls_back,
+        test_non_ascii_replies,
+        test_failed_alignment_falls_back,
+        test_service_uses_stub_alignment,
+        test_service_falls_back_without_alignment
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
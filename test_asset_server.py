@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for static asset delivery through the Flask routes: immutable
+caching on hashed URLs, encoding negotiation with Vary, conditional
+requests and path traversal.
+"""
+
+import gzip
+import sys
+
+from app import app
+from asset_server import asset_server, brotli
+
+ASSET = 'js/chat.js'
+
+def original_bytes():
+    with open(asset_server.sources[ASSET], 'rb') as f:
+        return f.read()
+
+def test_hashed_url_immutable():
+    """Hashed URLs are cached for a year as immutable; plain URLs revalidate"""
+    print("\n🔍 Fetching a hashed asset URL...")
+    client = app.test_client()
+    url = asset_server.url_for(ASSET)
+    digest = asset_server.get(ASSET).digest
+    assert url == f"/assets/js/chat.{digest}.js", url
+    response = client.get(url)
+    assert response.status_code == 200 and response.get_data() == original_bytes()
+    cache_control = response.headers['Cache-Control']
+    assert 'immutable' in cache_control and 'max-age=31536000' in cache_control and 'public' in cache_control
+    assert response.mimetype == 'application/javascript'
+
+    plain = client.get(f'/static/{ASSET}')
+    assert plain.status_code == 200 and 'no-cache' in plain.headers['Cache-Control']
+    assert 'immutable' not in plain.headers['Cache-Control']
+
+    stale = client.get(f"/assets/js/chat.{'0' * 16}.js")
+    assert stale.status_code == 404
+    print(f"✅ {url}: {cache_control}")
+
+def test_encoding_negotiation():
+    """The variant follows Accept-Encoding, and responses vary on it"""
+    print("\n🔍 Negotiating encodings...")
+    client = app.test_client()
+    url = asset_server.url_for(ASSET)
+    original = original_bytes()
+
+    identity = client.get(url, headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in identity.headers and identity.get_data() == original
+
+    gzipped = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(gzipped.get_data()) == original
+    assert len(gzipped.get_data()) < len(original)
+
+    preferred = client.get(url, headers={'Accept-Encoding': 'gzip, deflate, br'})
+    if brotli is not None:
+        assert preferred.headers['Content-Encoding'] == 'br'
+        assert brotli.decompress(preferred.get_data()) == original
+    else:
+        assert preferred.headers['Content-Encoding'] == 'gzip'
+
+    refused = client.get(url, headers={'Accept-Encoding': 'br;q=0, gzip'})
+    assert refused.headers['Content-Encoding'] == 'gzip'
+
+    for response in (identity, gzipped, preferred):
+        assert 'Accept-Encoding' in response.headers['Vary']
+    assert len({identity.headers['ETag'], gzipped.headers['ETag'], preferred.headers['ETag']}) == 3
+    print(f"✅ identity {len(original)}B, gzip {len(gzipped.get_data())}B, "
+          f"{preferred.headers['Content-Encoding']} {len(preferred.get_data())}B")
+
+def test_not_modified():
+    """A matching If-None-Match gets an empty 304; another encoding's ETag doesn't match"""
+    print("\n🔍 Revalidating with If-None-Match...")
+    client = app.test_client()
+    url = f'/static/{ASSET}'
+    first = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    etag = first.headers['ETag']
+
+    again = client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert again.status_code == 304 and again.get_data() == b''
+    assert 'Accept-Encoding' in again.headers['Vary']
+
+    other_encoding = client.get(url, headers={'Accept-Encoding': 'identity', 'If-None-Match': etag})
+    assert other_encoding.status_code == 200 and other_encoding.get_data() == original_bytes()
+    print(f"✅ 304 for {etag}")
+
+def test_path_traversal():
+    """Only discovered assets are served; paths outside static/ are 404"""
+    print("\n🔍 Requesting paths outside the static directory...")
+    client = app.test_client()
+    for url in ('/static/../app.py', '/static/js/../../config.py', '/static/%2e%2e/app.py',
+                '/static/..%2fconfig.py', '/assets/../app.py', '/static/models/..%2fapp.glb',
+                '/static/js/missing.js'):
+        response = client.get(url)
+        assert response.status_code == 404, (url, response.status_code)
+        assert b'GEMINI_API_KEY' not in response.get_data() and b'Flask' not in response.get_data(), url
+    print("✅ Traversal attempts all 404")
+
+def main():
+    """Run all tests"""
+    print("🚀 Asset Server Test")
+    print("=" * 50)
+
+    tests = [
+        test_hashed_url_immutable,
+        test_encoding_negotiation,
+        test_not_modified,
+        test_path_traversal
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
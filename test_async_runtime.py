@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared event loop: coroutines run from other threads
+on one long-lived loop, exceptions reach the caller, async generators are
+driven to the end (or closed early), and shutdown stops the loop thread.
+
+Each test uses its own AsyncRuntime, so the global one is left alone.
+"""
+
+import asyncio
+import sys
+import threading
+
+from async_runtime import AsyncRuntime
+
+def test_run_from_threads():
+    """Coroutines submitted from several threads all run on the one loop thread"""
+    print("\n🔍 Running coroutines from 4 threads...")
+    runtime = AsyncRuntime(max_workers=2)
+    results, loops = [], set()
+
+    async def work(n):
+        await asyncio.sleep(0.01)
+        loops.add((id(asyncio.get_running_loop()), threading.current_thread().name))
+        return n * n
+
+    def caller(n):
+        results.append(runtime.run(work(n), timeout=5))
+
+    try:
+        threads = [threading.Thread(target=caller, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(results) == [0, 1, 4, 9], results
+        assert loops == {(id(runtime.loop), 'async-runtime')}, loops
+
+        future = runtime.submit(work(5))
+        assert future.result(5) == 25
+    finally:
+        runtime.shutdown()
+    print("✅ 4 results from 1 loop thread, submit() returned a future")
+
+def test_exceptions_propagate():
+    """An exception raised on the loop is raised in the calling thread"""
+    print("\n🔍 Raising inside a coroutine...")
+    runtime = AsyncRuntime(max_workers=2)
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise ValueError("upstream said no")
+
+    try:
+        try:
+            runtime.run(fail(), timeout=5)
+            raise AssertionError("run() swallowed the exception")
+        except ValueError as e:
+            assert str(e) == "upstream said no"
+        assert isinstance(runtime.submit(fail()).exception(5), ValueError)
+        assert runtime.run(asyncio.sleep(0, result="still running"), timeout=5) == "still running"
+    finally:
+        runtime.shutdown()
+    print("✅ ValueError reached the caller, loop still running")
+
+def test_iterate():
+    """iterate() yields every item, and closing it early closes the async generator"""
+    print("\n🔍 Iterating an async generator...")
+    runtime = AsyncRuntime(max_workers=2)
+    closed = []
+
+    async def numbers(n):
+        try:
+            for i in range(n):
+                await asyncio.sleep(0)
+                yield i
+        finally:
+            closed.append(n)
+
+    try:
+        assert list(runtime.iterate(numbers(50))) == list(range(50))
+        assert closed == [50]
+
+        stream = runtime.iterate(numbers(1000))
+        assert [next(stream) for _ in range(3)] == [0, 1, 2]
+        stream.close()
+        assert closed == [50, 1000], "closing the iterator must close the generator"
+    finally:
+        runtime.shutdown()
+    print("✅ All 50 items yielded, early close reached the generator")
+
+def test_shutdown():
+    """shutdown() runs the hooks, stops the loop thread and can be called twice"""
+    print("\n🔍 Shutting the runtime down...")
+    runtime = AsyncRuntime(max_workers=2)
+    hooks = []
+
+    async def hook():
+        hooks.append(threading.current_thread().name)
+
+    async def broken_hook():
+        raise RuntimeError("hook failed")
+
+    runtime.add_shutdown_hook(broken_hook)
+    runtime.add_shutdown_hook(hook)
+    runtime.start()
+    thread = runtime._thread
+    assert thread.is_alive()
+    runtime.shutdown(timeout=5)
+    assert not thread.is_alive() and runtime.loop.is_closed()
+    assert hooks == ['async-runtime'], "hooks run on the loop, after a failing one too"
+    runtime.shutdown(timeout=5)
+    print("✅ Hooks ran, loop thread stopped")
+
+def main():
+    """Run all tests"""
+    print("🚀 Async Runtime Test")
+    print("=" * 50)
+
+    tests = [
+        test_run_from_threads,
+        test_exceptions_propagate,
+        test_iterate,
+        test_shutdown
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
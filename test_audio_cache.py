@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Test script for the content-addressed TTS audio cache: key derivation,
+atomic commits, the viseme sidecar and LRU eviction under the byte budget.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import audio_cache
+from audio_cache import AudioCache
+
+SETTINGS = {"stability": 0.3, "similarity_boost": 0.3, "style": 0.0, "use_speaker_boost": False}
+VISEMES = {'visemes': [{'viseme': 'aa', 'start': 0.0, 'end': 0.1}], 'duration': 0.1, 'engine': 'test'}
+
+def make_key(text="Hello there.", voice="voice_a", model="eleven_turbo_v2_5", settings=SETTINGS,
+             output_format="mp3_44100_128"):
+    return AudioCache.make_key(text, voice, model, settings, output_format)
+
+def add_entry(cache, key, size):
+    path = cache.new_temp_path()
+    with open(path, 'wb') as f:
+        f.write(b'\xff' * size)
+    return cache.commit(key, path, VISEMES)
+
+def test_key_derivation():
+    """Text, voice, model, settings and format each change the key; spacing doesn't"""
+    print("\n🔍 Deriving cache keys...")
+    base = make_key()
+    variants = [
+        make_key(text="Hello there!"),
+        make_key(voice="voice_b"),
+        make_key(model="eleven_multilingual_v2"),
+        make_key(settings=dict(SETTINGS, stability=0.5)),
+        make_key(output_format="mp3_22050_32")
+    ]
+    assert len({base, *variants}) == 6
+    assert make_key(text="  Hello\n there. ") == base
+    assert make_key(settings=dict(reversed(list(SETTINGS.items())))) == base
+    assert len(base) == 64 and all(c in '0123456789abcdef' for c in base)
+    print(f"✅ 5 settings change the key, whitespace and dict order don't ({base[:12]}...)")
+
+def test_atomic_commit():
+    """Commits rename a finished temp file into place and leave no .part files"""
+    print("\n🔍 Committing a download...")
+    renames = []
+    real_replace = os.replace
+
+    def recording_replace(source, target):
+        renames.append((source, target))
+        real_replace(source, target)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = AudioCache(directory, 1024 * 1024)
+        key = make_key()
+        temp_path = cache.new_temp_path()
+        assert temp_path.endswith('.part') and os.path.dirname(temp_path) == directory
+        with open(temp_path, 'wb') as f:
+            f.write(b'\xff\xfb' * 100)
+
+        audio_cache.os.replace = recording_replace
+        try:
+            path = cache.commit(key, temp_path, VISEMES)
+        finally:
+            audio_cache.os.replace = real_replace
+
+        assert path == cache.audio_path(key) and not os.path.exists(temp_path)
+        assert [target for _, target in renames] == [os.path.join(directory, f"{key}.json"), path]
+        assert all(source.endswith('.part') for source, _ in renames)
+        assert not [name for name in os.listdir(directory) if name.endswith('.part')]
+
+        # A download interrupted by a crash is cleaned up on the next start
+        leftover = cache.new_temp_path()
+        restarted = AudioCache(directory, 1024 * 1024)
+        assert not os.path.exists(leftover) and restarted.get(key) is not None
+    print("✅ Sidecar then audio renamed into place, leftovers removed on restart")
+
+def test_sidecar_round_trip():
+    """The viseme timeline comes back with the audio, also after a restart"""
+    print("\n🔍 Reading an entry back...")
+    with tempfile.TemporaryDirectory() as directory:
+        cache = AudioCache(directory, 1024 * 1024)
+        key = make_key()
+        assert cache.get(key) is None
+        add_entry(cache, key, 200)
+        path, viseme_data = cache.get(key)
+        assert viseme_data == VISEMES and os.path.getsize(path) == 200
+
+        restarted = AudioCache(directory, 1024 * 1024)
+        assert restarted.get(key) == (path, VISEMES)
+
+        # An mp3 without its sidecar is a miss and gets discarded
+        os.remove(os.path.join(directory, f"{key}.json"))
+        assert restarted.get(key) is None and not os.path.exists(path)
+        stats = restarted.get_stats()
+        assert stats['hits'] == 1 and stats['misses'] == 1 and stats['entries'] == 0, stats
+    print("✅ Visemes round-trip, damaged entry dropped")
+
+def test_lru_eviction():
+    """Least recently used entries go first once the byte budget is exceeded"""
+    print("\n🔍 Filling the cache past its budget...")
+    with tempfile.TemporaryDirectory() as directory:
+        sidecar = len(audio_cache.json.dumps(VISEMES))
+        entry_size = 1000 + sidecar
+        cache = AudioCache(directory, entry_size * 3, serve_grace=0)
+        keys = [make_key(text=f"Sentence {i}.") for i in range(4)]
+        for key in keys[:3]:
+            add_entry(cache, key, 1000)
+        assert cache.get(keys[0]) is not None  # now the most recently used
+        add_entry(cache, keys[3], 1000)
+
+        assert cache.get(keys[1]) is None
+        assert not os.path.exists(cache.audio_path(keys[1]))
+        assert all(cache.get(key) is not None for key in (keys[0], keys[2], keys[3]))
+        stats = cache.get_stats()
+        assert stats['evictions'] == 1 and stats['bytes'] == entry_size * 3 <= stats['max_bytes'], stats
+
+        # The LRU order survives a restart through the files' mtimes (set
+        # explicitly here, the filesystem clock may be too coarse to order them)
+        for age, key in enumerate((keys[3], keys[2], keys[0])):
+            os.utime(cache.audio_path(key), (1_700_000_000 - age, 1_700_000_000 - age))
+        restarted = AudioCache(directory, entry_size * 2, serve_grace=0)
+        assert restarted.get(keys[0]) is None and restarted.get(keys[3]) is not None
+    print(f"✅ Budget {entry_size * 3} bytes kept, oldest entry evicted")
+
+def test_recently_served_kept():
+    """Entries handed out within the grace window aren't evicted until it passes"""
+    print("\n🔍 Evicting while entries are being served...")
+    with tempfile.TemporaryDirectory() as directory:
+        entry_size = 1000 + len(audio_cache.json.dumps(VISEMES))
+        cache = AudioCache(directory, entry_size * 2, serve_grace=0.2)
+        keys = [make_key(text=f"Sentence {i}.") for i in range(4)]
+        add_entry(cache, keys[0], 1000)
+        add_entry(cache, keys[1], 1000)
+        time.sleep(0.25)
+        served = cache.get(keys[0])[0]  # handed to a client that hasn't fetched it yet
+        cache.get(keys[1])
+        add_entry(cache, keys[2], 1000)
+        assert os.path.exists(served) and cache.get_stats()['evictions'] == 0
+        assert cache.get_stats()['bytes'] == entry_size * 3, "over budget while everything is in use"
+
+        time.sleep(0.25)
+        add_entry(cache, keys[3], 1000)
+        assert not os.path.exists(served) and cache.get(keys[1]) is None
+        stats = cache.get_stats()
+        assert stats['evictions'] == 2 and stats['bytes'] == entry_size * 2, stats
+    print("✅ Served entry kept through the grace window, evicted after it")
+
+def main():
+    """Run all tests"""
+    print("🚀 Audio Cache Test")
+    print("=" * 50)
+
+    tests = [
+        test_key_derivation,
+        test_atomic_commit,
+        test_sidecar_round_trip,
+        test_lru_eviction,
+        test_recently_served_kept
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
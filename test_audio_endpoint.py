@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test script for /api/audio: byte ranges, conditional requests and the
+Cache-Control headers for content-addressed cache files (immutable) and
+per-request audio_store files (private), plus missing and traversal paths.
+"""
+
+import hashlib
+import os
+import sys
+
+from app import app, audio_store
+from config import AUDIO_CACHE_DIR
+
+AUDIO = b'\xff\xfb\x90\x00' + bytes(range(256)) * 8
+
+def cached_file():
+    """Write an audio file into the cache directory under a content hash"""
+    os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
+    filename = hashlib.sha256(b'test_audio_endpoint' + AUDIO).hexdigest() + '.mp3'
+    with open(os.path.join(AUDIO_CACHE_DIR, filename), 'wb') as f:
+        f.write(AUDIO)
+    return filename, lambda: os.remove(os.path.join(AUDIO_CACHE_DIR, filename))
+
+def store_file():
+    """Write an audio file into the per-request audio store"""
+    audio_id, path = audio_store.new_file()
+    with open(path, 'wb') as f:
+        f.write(AUDIO)
+    return audio_id, lambda: audio_store.remove(audio_id)
+
+def test_range_requests():
+    """Byte ranges get 206 with a Content-Range, for both kinds of file"""
+    print("\n🔍 Requesting byte ranges...")
+    client = app.test_client()
+    for make in (cached_file, store_file):
+        filename, cleanup = make()
+        try:
+            full = client.get(f'/api/audio/{filename}')
+            assert full.status_code == 200 and full.get_data() == AUDIO
+            assert full.headers['Accept-Ranges'] == 'bytes' and full.mimetype == 'audio/mpeg'
+
+            partial = client.get(f'/api/audio/{filename}', headers={'Range': 'bytes=100-199'})
+            assert partial.status_code == 206, (filename, partial.status_code)
+            assert partial.get_data() == AUDIO[100:200]
+            assert partial.headers['Content-Range'] == f'bytes 100-199/{len(AUDIO)}'
+
+            tail = client.get(f'/api/audio/{filename}', headers={'Range': 'bytes=-4'})
+            assert tail.status_code == 206 and tail.get_data() == AUDIO[-4:]
+
+            unsatisfiable = client.get(f'/api/audio/{filename}', headers={'Range': f'bytes={len(AUDIO) + 10}-'})
+            assert unsatisfiable.status_code == 416
+        finally:
+            cleanup()
+    print(f"✅ 206 partial content for cache and store files ({len(AUDIO)} bytes)")
+
+def test_conditional_get():
+    """Strong ETags from the file name; a matching If-None-Match gets 304"""
+    print("\n🔍 Revalidating with If-None-Match...")
+    client = app.test_client()
+    for make in (cached_file, store_file):
+        filename, cleanup = make()
+        try:
+            first = client.get(f'/api/audio/{filename}')
+            etag = first.headers['ETag']
+            assert etag == f'"{filename[:-4]}"', etag
+            again = client.get(f'/api/audio/{filename}', headers={'If-None-Match': etag})
+            assert again.status_code == 304 and again.get_data() == b''
+            other = client.get(f'/api/audio/{filename}', headers={'If-None-Match': '"something-else"'})
+            assert other.status_code == 200 and other.get_data() == AUDIO
+        finally:
+            cleanup()
+    print("✅ 304 for matching ETags")
+
+def test_cache_control():
+    """Cache files are public and immutable; store files are private and expire"""
+    print("\n🔍 Checking Cache-Control...")
+    client = app.test_client()
+    filename, cleanup = cached_file()
+    try:
+        cached = client.get(f'/api/audio/{filename}').headers['Cache-Control']
+    finally:
+        cleanup()
+    assert 'immutable' in cached and 'max-age=31536000' in cached and 'private' not in cached, cached
+
+    audio_id, cleanup = store_file()
+    try:
+        stored = client.get(f'/api/audio/{audio_id}').headers['Cache-Control']
+    finally:
+        cleanup()
+    assert 'private' in stored and f'max-age={audio_store.max_age}' in stored, stored
+    assert 'immutable' not in stored and 'public' not in stored, stored
+    print(f"✅ cache: {cached} / store: {stored}")
+
+def test_missing_and_traversal():
+    """Unknown names, expired files and paths outside the audio directories are 404"""
+    print("\n🔍 Requesting files that aren't there...")
+    client = app.test_client()
+    audio_id, cleanup = store_file()
+    cleanup()
+    missing_hash = '0' * 64 + '.mp3'
+    for url in (f'/api/audio/{audio_id}', f'/api/audio/{missing_hash}', '/api/audio/..%2fapp.py',
+                '/api/audio/../config.py', '/api/audio/%2e%2e%2fconfig.py', '/api/audio/cache%2f' + missing_hash,
+                '/api/audio/app.py'):
+        response = client.get(url)
+        assert response.status_code == 404, (url, response.status_code)
+        assert b'GEMINI_API_KEY' not in response.get_data(), url
+    print("✅ Missing and traversal paths all 404")
+
+def main():
+    """Run all tests"""
+    print("🚀 Audio Endpoint Test")
+    print("=" * 50)
+
+    tests = [
+        test_range_requests,
+        test_conditional_get,
+        test_cache_control,
+        test_missing_and_traversal
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
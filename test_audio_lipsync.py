@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test script for the audio-driven lip-sync analyzer.
+
+Feature extraction and the intensity track are checked on synthetic signals
+with NumPy alone; decoding a real MP3 also needs ffmpeg and is skipped
+without it.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+
+from audio_lipsync import AudioLipSyncAnalyzer, SAMPLE_RATE, np
+
+def tone(seconds, frequency, amplitude=0.3):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+def noise(seconds, amplitude=0.3):
+    samples = np.random.default_rng(1).standard_normal(int(seconds * SAMPLE_RATE)) * amplitude
+    return np.diff(samples, prepend=0.0).astype(np.float32)
+
+def silence(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+def test_intensity_track():
+    """One intensity value per frame, closed in silence and open on a vowel"""
+    print("\n🔍 Analysing silence, a vowel and silence again...")
+    analyzer = AudioLipSyncAnalyzer(frame_rate=50)
+    result = analyzer.analyze_pcm(np.concatenate([silence(0.5), tone(1.0, 300), silence(0.5)]))
+
+    intensity = result['intensity']
+    assert result['frame_rate'] == 50 and result['source'] == 'audio'
+    assert len(intensity) == 100, len(intensity)
+    assert all(isinstance(v, int) and 0 <= v <= 100 for v in intensity)
+    assert max(intensity[:20]) == 0 and max(intensity[-20:]) == 0
+    assert min(intensity[35:65]) > 80, intensity[35:65]
+    print(f"✅ {len(intensity)} frames, peak {max(intensity)} in the vowel, 0 in silence")
+
+def test_viseme_classes():
+    """A low vowel reads as rounded, noise as a fricative, and the timeline ends closed"""
+    print("\n🔍 Classifying a rounded vowel and fricative noise...")
+    analyzer = AudioLipSyncAnalyzer()
+    result = analyzer.analyze_pcm(np.concatenate([silence(0.3), tone(0.5, 300), silence(0.3), noise(0.4), silence(0.3)]))
+    sequence = [v['viseme'] for v in result['visemes']]
+    assert sequence == ['viseme_sil', 'viseme_oo', 'viseme_sil', 'viseme_ss', 'viseme_sil'], sequence
+    times = [v['time'] for v in result['visemes']]
+    assert times == sorted(times) and abs(times[1] - 0.3) <= 0.04, times
+    print(f"✅ {' → '.join(sequence)}")
+
+def test_speech_benchmark_signal():
+    """The benchmark's synthetic speech opens the mouth once per syllable"""
+    print("\n🔍 Analysing synthetic speech...")
+    from bench_audio_lipsync import synthetic_speech
+    result = AudioLipSyncAnalyzer().analyze_pcm(synthetic_speech(4))
+    intensity = np.array(result['intensity'])
+    peaks = np.count_nonzero((intensity[1:-1] >= 70) & (intensity[1:-1] >= intensity[:-2]) & (intensity[1:-1] > intensity[2:]))
+    assert 12 <= peaks <= 16, peaks
+    assert result['duration'] == 4.0
+    print(f"✅ {peaks} syllables opened the mouth in 4s, {len(result['visemes'])} keyframes")
+
+def test_decode_mp3():
+    """Decoding goes through ffmpeg; unreadable files give None instead of raising"""
+    print("\n🔍 Decoding through ffmpeg...")
+    analyzer = AudioLipSyncAnalyzer()
+    if not analyzer.available:
+        print("⚠️  ffmpeg not installed, skipping")
+        return
+    assert analyzer.analyze_file(os.path.abspath(__file__)) is None
+    assert analyzer.failures == 1
+    print("✅ Unreadable input is reported and skipped")
+
+def test_missing_dependencies_named():
+    """An unavailable analyzer says which dependency is missing"""
+    print("\n🔍 Pointing the analyzer at a missing ffmpeg...")
+    analyzer = AudioLipSyncAnalyzer(ffmpeg='ffmpeg-not-installed')
+    assert not analyzer.available
+    assert analyzer.missing_dependencies == ['ffmpeg (no "ffmpeg-not-installed" on the PATH)'], \
+        analyzer.missing_dependencies
+    assert analyzer.analyze_file(os.path.abspath(__file__)) is None
+    print(f"✅ Missing: {', '.join(analyzer.missing_dependencies)}")
+
+class FakeAnalyzer:
+    """Stands in for the ffmpeg analysis, tagging results with the current analyzer ID"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def analyze_file(self, path):
+        import elevenlabs_service
+        self.calls += 1
+        return {'visemes': [{'time': 0.0, 'viseme': 'viseme_aa'}], 'duration': 0.5, 'frame_rate': 50,
+                'intensity': [50] * 25, 'engine': elevenlabs_service.ANALYZER_ID,
+                'analyzer': elevenlabs_service.ANALYZER_ID, 'source': 'audio'}
+
+def test_cached_analysis_versioned():
+    """Cached entries are reanalyzed once when the analyzer ID changes"""
+    print("\n🔍 Serving cached audio across an analyzer upgrade...")
+    import asyncio
+    import tempfile
+    import elevenlabs_service
+    from audio_cache import AudioCache
+    from stub_upstream import StubUpstream
+
+    stub = StubUpstream(use_tls=False).start()
+    original_id = elevenlabs_service.ANALYZER_ID
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            service = elevenlabs_service.ElevenLabsService()
+            service.base_url = stub.base_url
+            service.audio_cache = AudioCache(directory, 10 * 1024 * 1024)
+            service.audio_lipsync = analyzer = FakeAnalyzer()
+            text = "Welcome to Kan-Guroo!"
+
+            async def speak():
+                result = await service.text_to_speech_with_visemes(text, os.path.join(directory, 'out.mp3'))
+                await service.close_session()
+                return result
+
+            path, first = asyncio.run(speak())
+            assert first['analyzer'] == original_id and 'intensity' in first and analyzer.calls == 1
+            _, cached = asyncio.run(speak())
+            assert cached == first and analyzer.calls == 1, "same analyzer, no reanalysis"
+
+            elevenlabs_service.ANALYZER_ID = 'energy-test'
+            _, upgraded = asyncio.run(speak())
+            assert upgraded['analyzer'] == 'energy-test' and analyzer.calls == 2
+            _, again = asyncio.run(speak())
+            assert again == upgraded and analyzer.calls == 2, "upgrade must be written back to the cache"
+            assert stub.requests == 1
+    finally:
+        elevenlabs_service.ANALYZER_ID = original_id
+        stub.stop()
+    print("✅ 1 synthesis, reanalyzed once after the analyzer changed")
+
+def main():
+    """Run all tests"""
+    print("🚀 Audio Lip-Sync Analyzer Test")
+    print("=" * 50)
+
+    if np is None:
+        print("❌ NumPy is not installed")
+        sys.exit(1)
+
+    tests = [
+        test_intensity_track,
+        test_viseme_classes,
+        test_speech_benchmark_signal,
+        test_decode_mp3,
+        test_missing_dependencies_named,
+        test_cached_analysis_versioned
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
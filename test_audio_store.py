@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-request audio store and its janitor: files past
+the age limit are deleted, then the oldest until the byte budget fits,
+and files that may still be downloading are left alone.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from audio_store import AudioStore
+
+def add_file(store, size, age):
+    """Write an audio file of ``size`` bytes last modified ``age`` seconds ago"""
+    audio_id, path = store.new_file()
+    with open(path, 'wb') as f:
+        f.write(b'\xff' * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return audio_id
+
+def test_age_limit():
+    """Files older than max_age are deleted, newer ones kept"""
+    print("\n🔍 Sweeping expired files...")
+    with tempfile.TemporaryDirectory() as directory:
+        store = AudioStore(directory, max_age=3600, max_bytes=10**6, write_grace=30)
+        expired = [add_file(store, 100, 7200), add_file(store, 100, 3700)]
+        fresh = [add_file(store, 100, 600), add_file(store, 100, 0)]
+        os.makedirs(os.path.join(directory, 'cache'))
+        store.sweep()
+        assert all(store.path_for(audio_id) is None for audio_id in expired)
+        assert all(store.path_for(audio_id) for audio_id in fresh)
+        assert os.path.isdir(os.path.join(directory, 'cache')), "subdirectories aren't managed"
+        stats = store.get_stats()
+        assert stats['age_evictions'] == 2 and stats['files_on_disk'] == 2 and stats['bytes_on_disk'] == 200, stats
+    print("✅ 2 expired files removed, 2 kept")
+
+def test_byte_budget():
+    """Over budget, the oldest files go first until the directory fits"""
+    print("\n🔍 Trimming to the byte budget...")
+    with tempfile.TemporaryDirectory() as directory:
+        store = AudioStore(directory, max_age=3600, max_bytes=2500, write_grace=30)
+        by_age = {age: add_file(store, 1000, age) for age in (900, 600, 300, 120)}
+        store.sweep()
+        assert store.path_for(by_age[900]) is None and store.path_for(by_age[600]) is None
+        assert store.path_for(by_age[300]) and store.path_for(by_age[120])
+        stats = store.get_stats()
+        assert stats['budget_evictions'] == 2 and stats['bytes_on_disk'] == 2000, stats
+        assert stats['files_on_disk'] == 2 and stats['files_created'] == 4
+    print(f"✅ 2 oldest files trimmed, {stats['bytes_on_disk']} bytes left")
+
+def test_files_being_written():
+    """Recently modified files are never trimmed, even when they alone exceed the budget"""
+    print("\n🔍 Sweeping while downloads are in progress...")
+    with tempfile.TemporaryDirectory() as directory:
+        store = AudioStore(directory, max_age=3600, max_bytes=1500, write_grace=30)
+        old = add_file(store, 1000, 600)
+        writing = [add_file(store, 1000, 5), add_file(store, 1000, 0)]
+        reserved_id, reserved_path = store.new_file()
+        store.sweep()
+        assert store.path_for(old) is None
+        assert all(store.path_for(audio_id) for audio_id in writing)
+        assert not os.path.exists(reserved_path)
+        stats = store.get_stats()
+        assert stats['budget_evictions'] == 1 and stats['bytes_on_disk'] == 2000, stats
+
+        # Once the downloads are done (older than the grace period) the budget applies again
+        for audio_id in writing:
+            mtime = time.time() - 60
+            os.utime(store.path_for(audio_id), (mtime, mtime))
+        store.sweep()
+        assert store.get_stats()['files_on_disk'] == 1
+    print("✅ In-progress files kept over budget, trimmed after the grace period")
+
+def main():
+    """Run all tests"""
+    print("🚀 Audio Store Test")
+    print("=" * 50)
+
+    tests = [
+        test_age_limit,
+        test_byte_budget,
+        test_files_being_written
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test script for the benchmark suite's regression gate: baseline coverage,
+calibration-relative comparison, and a real (fast) run of a few cases.
+
+Timing itself is checked by running benchmarks/bench_suite.py; these tests
+only cover the logic around it, so they don't depend on machine speed.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+
+from bench_suite import (
+    BASELINE_PATH, build_cases, compare, load_baseline, measure_relative, save_baseline, scaled_faq, load_faq
+)
+
+def test_baseline_covers_suite():
+    """Every case has a committed baseline, and the baseline has no stale cases"""
+    print("\n🔍 Checking the committed baseline...")
+    cases = build_cases()
+    baseline = load_baseline(BASELINE_PATH)
+    assert baseline is not None, "benchmarks/baseline.json is missing"
+    assert set(baseline['cases']) == set(cases), set(baseline['cases']) ^ set(cases)
+    assert all(case['us'] > 0 and case['relative'] > 0 for case in baseline['cases'].values())
+    print(f"✅ {len(cases)} cases with baselines")
+
+def test_compare():
+    """Results are compared relative to the calibration loop"""
+    print("\n🔍 Comparing against a baseline...")
+    baseline = {'cases': {name: {'us': 10.0, 'relative': 0.1} for name in ('fast', 'slow', 'same')}}
+    # This machine is twice as slow (calibration 200µs, not 100µs), so 20µs is on par
+    results = {'fast': (14.0, 0.07), 'slow': (30.0, 0.15), 'same': (20.0, 0.1), 'added': (5.0, 0.025)}
+    rows, regressions = compare(results, baseline, 0.3)
+    by_name = {row[0]: row for row in rows}
+    assert regressions == ['slow'], regressions
+    assert by_name['same'][1] == 20.0 and abs(by_name['same'][3]) < 1e-9
+    assert abs(by_name['fast'][3] + 0.3) < 1e-9
+    assert by_name['added'][1] is None and by_name['added'][3] is None
+    print("✅ 50% slowdown flagged, speedup and new case pass")
+
+def test_round_trip():
+    """Measured cases are saved and read back as a baseline"""
+    print("\n🔍 Timing a few cases and saving a baseline...")
+    cases = build_cases()
+    names = ['url_lookup[faq=1x]', 'viseme_estimated[reply=100]', 'chat_json[binary,reply=100]']
+    results = {name: measure_relative(cases[name], min_time=0.005) for name in names}
+    assert all(us > 0 and relative > 0 for us, relative in results.values())
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'baseline.json')
+        save_baseline(path, results)
+        baseline = load_baseline(path)
+    _, regressions = compare(results, baseline, 0.3)
+    assert regressions == [] and set(baseline['cases']) == set(names)
+    print(f"✅ {', '.join(f'{name}: {us:.1f}µs' for name, (us, _) in results.items())}")
+
+def test_scaled_faq():
+    """Scaled FAQs multiply programs and keep names distinct"""
+    print("\n🔍 Scaling the FAQ...")
+    faq = load_faq()
+    base = sum(len(programs) for programs in faq['company']['programs'].values())
+    scaled = scaled_faq(faq, 10)
+    names = [program['name'] for programs in scaled['company']['programs'].values() for program in programs]
+    assert len(names) == base * 10 and len(set(names)) == len(names)
+    assert sum(len(programs) for programs in faq['company']['programs'].values()) == base
+    print(f"✅ {base} programs scaled to {len(names)}")
+
+def main():
+    """Run all tests"""
+    print("🚀 Benchmark Suite Test")
+    print("=" * 50)
+
+    tests = [
+        test_baseline_covers_suite,
+        test_compare,
+        test_round_trip,
+        test_scaled_faq
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for the FAQ fast path: paraphrased questions answered locally
+above the confidence threshold, off-topic ones left to Gemini, and the
+BM25 index rebuilt with each knowledge version.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+from faq_answerer import FaqAnswerer, tokenize
+from knowledge_store import KnowledgeStore
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+THRESHOLD = 0.6
+
+def load_answerer():
+    with open(os.path.join(ROOT, 'faq_data.json'), encoding='utf-8') as f:
+        return FaqAnswerer(json.load(f), THRESHOLD)
+
+def test_paraphrases_answered():
+    """Paraphrases of FAQ questions hit the right entry above the threshold"""
+    print("\n🔍 Asking paraphrased FAQ questions...")
+    answerer = load_answerer()
+    expected = {
+        "Who started Kan-Guroo?": 'founders',
+        "who created kanguroo": 'founders',
+        "whats your phone number": 'phone',
+        "How can I contact you?": 'contact',
+        "What is your purpose?": 'mission',
+        "Who runs the company?": 'ceo',
+        "Tell me about Summer Schools": 'program:Summer School'
+    }
+    for question, entry_id in expected.items():
+        answer = answerer.answer(question)
+        assert answer is not None, f"{question!r} fell through to Gemini"
+        assert answer.entry_id == entry_id, (question, answer.entry_id)
+        assert THRESHOLD <= answer.confidence <= 1.0, (question, answer.confidence)
+    founders = answerer.answer("Who started Kan-Guroo?").text
+    assert "Otari Melanashvili" in founders and "Lasha Bevia" in founders
+    assert tokenize("What are the Programs?") == ['program']
+    print(f"✅ {len(expected)} paraphrases answered locally")
+
+def test_off_topic_falls_through():
+    """Off-topic, empty and ambiguous questions return None"""
+    print("\n🔍 Asking questions the FAQ can't answer...")
+    answerer = load_answerer()
+    for question in ("What is the weather in Tbilisi?", "Recommend a good pizza place",
+                     "Can a kangaroo walk backwards?", "", "What is it?"):
+        answer = answerer.answer(question)
+        assert answer is None, (question, answer and answer.entry_id)
+    print("✅ All left to Gemini")
+
+def test_rebuilt_per_version():
+    """Each knowledge version gets its own index; old snapshots keep theirs"""
+    print("\n🔍 Editing the team in the knowledge file...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'faq_data.json')
+
+        def write_ceo(name, mtime):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({"company": {"team": [{"name": name, "role": "Co-Founder & CEO"}]}}, f)
+            # Distinct mtimes, the filesystem clock may be too coarse to tell the writes apart
+            os.utime(path, (mtime, mtime))
+
+        write_ceo("Nino Beridze", 1_700_000_000)
+        store = KnowledgeStore(path)
+        before = store.current()
+        assert "Nino Beridze" in before.faq_answerer.answer("Who is the CEO?").text
+
+        write_ceo("Giorgi Kapanadze", 1_700_000_060)
+        assert store.reload_if_changed()
+        after = store.current()
+        assert after.version == before.version + 1 and after.faq_answerer is not before.faq_answerer
+        assert "Giorgi Kapanadze" in after.faq_answerer.answer("Who is the CEO?").text
+        assert "Nino Beridze" in before.faq_answerer.answer("Who is the CEO?").text
+    print(f"✅ Version {after.version} answers with the new CEO")
+
+def main():
+    """Run all tests"""
+    print("🚀 FAQ Fast Path Test")
+    print("=" * 50)
+
+    tests = [
+        test_paraphrases_answered,
+        test_off_topic_falls_through,
+        test_rebuilt_per_version
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
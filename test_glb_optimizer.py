@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test script for the offline GLB optimizer: a small GLB built in memory is
+optimized and re-parsed, vertex counts must survive quantization, and
+unused nodes, animations and oversized textures are dealt with.
+"""
+
+import io
+import math
+import struct
+import sys
+
+from glb_optimizer import (
+    GlbOptimizer, read_glb, write_glb, read_accessor, QUANTIZATION_EXTENSION,
+    FLOAT, UNSIGNED_SHORT, BYTE, Image
+)
+
+POSITIONS = [(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (1.0, 1.0, 0.0)]
+NORMALS = [(0.0, 0.0, 1.0), (0.0, 0.6, 0.8), (0.6, 0.0, 0.8), (0.0, -1.0, 0.0)]
+UVS = [(0.0, 0.0), (1.0, 0.0), (0.0, 1.0), (0.5, 0.25)]
+INDICES = [0, 1, 2, 2, 1, 3]
+
+def build_glb(texture_size=64):
+    """A quad with normals and UVs, an unused node and mesh, two animations and a PNG texture"""
+    binary = bytearray()
+    views, accessors = [], []
+
+    def add(data, accessor):
+        while len(binary) % 4:
+            binary.append(0)
+        views.append({'buffer': 0, 'byteOffset': len(binary), 'byteLength': len(data)})
+        binary.extend(data)
+        if accessor is not None:
+            accessors.append(dict(accessor, bufferView=len(views) - 1))
+            return len(accessors) - 1
+        return len(views) - 1
+
+    def floats(values, kind):
+        data = b''.join(struct.pack(f'<{len(value)}f', *value) for value in values)
+        return add(data, {'componentType': FLOAT, 'count': len(values), 'type': kind})
+
+    position = floats(POSITIONS, 'VEC3')
+    accessors[position].update({'min': [0.0, 0.0, 0.0], 'max': [1.0, 1.0, 0.0]})
+    normal = floats(NORMALS, 'VEC3')
+    uv = floats(UVS, 'VEC2')
+    indices = add(struct.pack(f'<{len(INDICES)}H', *INDICES),
+                  {'componentType': UNSIGNED_SHORT, 'count': len(INDICES), 'type': 'SCALAR'})
+    unused_position = floats(POSITIONS[:3], 'VEC3')
+    times = floats([(0.0,), (1.0,)], 'SCALAR')
+    offsets = floats([(0.0, 0.0, 0.0), (0.0, 0.1, 0.0)], 'VEC3')
+
+    picture = Image.new('RGB', (texture_size, texture_size), (200, 120, 40))
+    png = io.BytesIO()
+    picture.save(png, format='PNG')
+    image_view = add(png.getvalue(), None)
+
+    def animation(name):
+        return {'name': name, 'samplers': [{'input': times, 'output': offsets}],
+                'channels': [{'sampler': 0, 'target': {'node': 0, 'path': 'translation'}}]}
+
+    gltf = {
+        'asset': {'version': '2.0'},
+        'scene': 0,
+        'scenes': [{'nodes': [0]}],
+        'nodes': [{'name': 'Avatar', 'mesh': 0}, {'name': 'Leftover', 'mesh': 1}],
+        'meshes': [
+            {'primitives': [{'attributes': {'POSITION': position, 'NORMAL': normal, 'TEXCOORD_0': uv},
+                             'indices': indices, 'material': 0}]},
+            {'primitives': [{'attributes': {'POSITION': unused_position}}]}
+        ],
+        'materials': [{'pbrMetallicRoughness': {'baseColorTexture': {'index': 0}}}],
+        'textures': [{'source': 0}],
+        'images': [{'bufferView': image_view, 'mimeType': 'image/png'}],
+        'animations': [animation('idle'), animation('wave')],
+        'accessors': accessors,
+        'bufferViews': views,
+        'buffers': [{'byteLength': len(binary)}]
+    }
+    return write_glb(gltf, bytes(binary))
+
+def optimize(data, **options):
+    gltf, binary = read_glb(data)
+    optimizer = GlbOptimizer(gltf, binary, **options)
+    return optimizer.optimize(), optimizer.log
+
+def attribute_counts(gltf):
+    """{(mesh, attribute): count} for every primitive attribute and index list"""
+    counts = {}
+    for m, mesh in enumerate(gltf['meshes']):
+        for primitive in mesh['primitives']:
+            for name, index in primitive['attributes'].items():
+                counts[(m, name)] = gltf['accessors'][index]['count']
+            if 'indices' in primitive:
+                counts[(m, 'indices')] = gltf['accessors'][primitive['indices']]['count']
+    return counts
+
+def test_round_trip():
+    """The optimized GLB re-parses with the same vertex counts and the quantization extension"""
+    print("\n🔍 Optimizing a small GLB...")
+    original = build_glb()
+    optimized, log = optimize(original)
+    gltf, binary = read_glb(optimized)
+    before, _ = read_glb(original)
+
+    assert gltf['asset']['version'] == '2.0' and len(binary) % 4 == 0
+    assert attribute_counts(gltf)[(0, 'POSITION')] == len(POSITIONS)
+    assert attribute_counts(gltf) == {key: count for key, count in attribute_counts(before).items() if key[0] == 0}
+    assert QUANTIZATION_EXTENSION in gltf['extensionsRequired']
+    assert QUANTIZATION_EXTENSION in gltf['extensionsUsed']
+    assert 0 <= len(binary) - gltf['buffers'][0]['byteLength'] < 4, "BIN chunk is the buffer plus padding"
+    for view in gltf['bufferViews']:
+        assert view['byteOffset'] + view['byteLength'] <= len(binary)
+
+    attributes = gltf['meshes'][0]['primitives'][0]['attributes']
+    normal = gltf['accessors'][attributes['NORMAL']]
+    assert normal['componentType'] == BYTE and normal['normalized']
+    for decoded, expected in zip(read_accessor(gltf, binary, attributes['NORMAL']), NORMALS):
+        assert all(abs(d / 127 - e) < 0.01 for d, e in zip(decoded, expected)), (decoded, expected)
+    uvs = [tuple(v / 65535 for v in value) for value in read_accessor(gltf, binary, attributes['TEXCOORD_0'])]
+    assert all(math.isclose(u, e, abs_tol=1e-4) for value, expected in zip(uvs, UVS) for u, e in zip(value, expected))
+    assert read_accessor(gltf, binary, attributes['POSITION']) == POSITIONS
+    indices = gltf['meshes'][0]['primitives'][0]['indices']
+    assert [value[0] for value in read_accessor(gltf, binary, indices)] == INDICES
+    print(f"✅ {len(original)} -> {len(optimized)} bytes, counts unchanged: {'; '.join(log)}")
+
+def test_drops_unused_parts():
+    """Unreachable nodes and meshes and unplayed animations are left out"""
+    print("\n🔍 Dropping what the avatar doesn't use...")
+    gltf, _ = read_glb(optimize(build_glb())[0])
+    assert [node['name'] for node in gltf['nodes']] == ['Avatar']
+    assert len(gltf['meshes']) == 1
+    assert [animation['name'] for animation in gltf['animations']] == ['idle']
+    print(f"✅ {len(gltf['nodes'])} node, {len(gltf['meshes'])} mesh, animations: idle")
+
+def test_texture_downscaled():
+    """Textures over the size limit are downscaled and still decode"""
+    print("\n🔍 Downscaling an oversized texture...")
+    gltf, binary = read_glb(optimize(build_glb(texture_size=64), max_texture_size=16)[0])
+    view = gltf['bufferViews'][gltf['images'][0]['bufferView']]
+    picture = Image.open(io.BytesIO(binary[view['byteOffset']:view['byteOffset'] + view['byteLength']]))
+    assert picture.size == (16, 16), picture.size
+    assert gltf['images'][0]['mimeType'] == 'image/png'
+    print(f"✅ 64x64 texture -> {picture.size[0]}x{picture.size[1]}")
+
+def main():
+    """Run all tests"""
+    print("🚀 GLB Optimizer Test")
+    print("=" * 50)
+
+    tests = [
+        test_round_trip,
+        test_drops_unused_parts,
+        test_texture_downscaled
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script for the hot-reloadable knowledge store: edits bump the version
+and swap the whole snapshot at once, and a malformed file keeps the
+previous snapshot serving.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from knowledge_store import KnowledgeStore
+
+def write_faq(path, website, mtime):
+    """Write a small FAQ; mtimes are set explicitly since the filesystem clock may be coarse"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"company": {"name": "Kan-Guroo", "website": website}}, f)
+    os.utime(path, (mtime, mtime))
+
+def test_edit_bumps_version():
+    """Edits bump the version and notify subscribers; touching without changes doesn't"""
+    print("\n🔍 Editing the knowledge file...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'faq_data.json')
+        write_faq(path, "https://v1.example", 1_700_000_000)
+        store = KnowledgeStore(path)
+        notified = []
+        store.subscribe(lambda snapshot: notified.append(snapshot.version))
+        first = store.current()
+        assert first.version == 1 and not store.reload_if_changed()
+
+        write_faq(path, "https://v2.example", 1_700_000_060)
+        assert store.reload_if_changed()
+        second = store.current()
+        assert second.version == 2 and notified == [2]
+        assert second.faq_data['company']['website'] == "https://v2.example"
+        assert "https://v2.example" in second.prompt and "https://v1.example" not in second.prompt
+        assert "https://v1.example" in first.prompt, "old snapshot must stay intact"
+
+        os.utime(path, (1_700_000_120, 1_700_000_120))
+        assert not store.reload_if_changed() and store.version == 2 and notified == [2]
+    print("✅ Version 1 -> 2, touch ignored")
+
+def test_atomic_swap():
+    """Readers always see a snapshot whose artifacts come from one file version"""
+    print("\n🔍 Reading while the file is rewritten...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'faq_data.json')
+        write_faq(path, "https://site0.example", 1_700_000_000)
+        store = KnowledgeStore(path)
+        stop = threading.Event()
+        mixed = []
+        reads = [0]
+
+        def reader():
+            while not stop.is_set():
+                snapshot = store.current()
+                website = snapshot.faq_data['company']['website']
+                if website not in snapshot.prompt or snapshot.faq_answerer.answer("What is your website?").text != \
+                        f"Our website is {website}!":
+                    mixed.append(snapshot.version)
+                reads[0] += 1
+
+        threads = [threading.Thread(target=reader) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for i in range(1, 21):
+            write_faq(path, f"https://site{i}.example", 1_700_000_000 + i * 60)
+            assert store.reload_if_changed()
+        time.sleep(0.05)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        assert store.version == 21 and not mixed, mixed
+    print(f"✅ 20 swaps, {reads[0]} reads, no mixed snapshots")
+
+def test_malformed_file_keeps_snapshot():
+    """A half-written or invalid file keeps the previous snapshot until it's fixed"""
+    print("\n🔍 Saving a malformed file...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'faq_data.json')
+        write_faq(path, "https://good.example", 1_700_000_000)
+        store = KnowledgeStore(path)
+        good = store.current()
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('{"company": {"name": "Kan-Gu')
+        os.utime(path, (1_700_000_060, 1_700_000_060))
+        assert not store.reload_if_changed()
+        assert store.current() is good and store.version == 1
+
+        write_faq(path, "https://fixed.example", 1_700_000_120)
+        assert store.reload_if_changed() and store.version == 2
+        assert store.current().faq_data['company']['website'] == "https://fixed.example"
+
+        os.remove(path)
+        assert not store.reload_if_changed() and store.version == 2
+    print("✅ Malformed and missing files ignored, fix picked up as version 2")
+
+def main():
+    """Run all tests"""
+    print("🚀 Knowledge Store Test")
+    print("=" * 50)
+
+    tests = [
+        test_edit_bumps_version,
+        test_atomic_swap,
+        test_malformed_file_keeps_snapshot
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test script for the sliding-window latency histograms.
+
+A fake clock drives the windows, so expiry is checked without waiting.
+"""
+
+import random
+import sys
+
+from latency_histogram import SlidingHistogram, BUCKETS
+from performance_monitor import PerformanceMonitor
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def exact_percentile(values, percentile):
+    ordered = sorted(values)
+    return ordered[max(0, -(-len(ordered) * percentile // 100) - 1)]
+
+def test_percentile_accuracy():
+    """Bucketed percentiles stay within a few percent of the exact ones"""
+    print("\n🔍 Comparing percentiles with exact values...")
+    random.seed(7)
+    values = [random.lognormvariate(7, 0.6) for _ in range(50000)]
+    histogram = SlidingHistogram(clock=FakeClock())
+    for value in values:
+        histogram.record(value)
+    summary = histogram.summary('1m')
+    assert summary['count'] == len(values)
+    assert summary['max'] == round(max(values), 2)
+    for percentile in (50, 90, 95, 99):
+        exact = exact_percentile(values, percentile)
+        error = abs(summary[f'p{percentile}'] - exact) / exact
+        assert error < 0.03, (percentile, summary[f'p{percentile}'], exact)
+    print(f"✅ p50 {summary['p50']}ms, p99 {summary['p99']}ms, max {summary['max']}ms")
+
+def test_budget_breaches():
+    """The share of values over the threshold is exact"""
+    print("\n🔍 Counting budget breaches...")
+    histogram = SlidingHistogram(threshold=4000, clock=FakeClock())
+    for value in [1000] * 90 + [4000] * 5 + [4500] * 5:
+        histogram.record(value)
+    summary = histogram.summary('1m')
+    assert summary['over_budget_pct'] == 5.0, summary
+    assert 'over_budget_pct' not in SlidingHistogram(clock=FakeClock()).summary('1m')
+    print(f"✅ {summary['over_budget_pct']}% over the 4000ms budget")
+
+def test_window_expiry():
+    """Old values leave the short windows first and memory stays fixed"""
+    print("\n🔍 Moving the clock through the windows...")
+    clock = FakeClock()
+    histogram = SlidingHistogram(threshold=4000, clock=clock)
+    for _ in range(100):
+        histogram.record(5000)
+    clock.now = 90
+    histogram.record(100)
+    stats = histogram.get_stats()
+    assert stats['1m']['count'] == 1 and stats['1m']['max'] == 100 and stats['1m']['over_budget_pct'] == 0
+    assert stats['5m']['count'] == 101 and stats['1h']['count'] == 101
+
+    clock.now = 400
+    stats = histogram.get_stats()
+    assert stats['1m']['count'] == 0 and stats['5m']['count'] == 0
+    assert stats['1h']['count'] == 101 and abs(stats['1h']['p99'] - 5000) < 150
+
+    clock.now = 4000
+    assert histogram.summary('1h')['count'] == 0
+    for window in histogram._windows.values():
+        assert len(window['merged']) == BUCKETS and not any(window['merged'])
+    print("✅ 1m, 5m and 1h windows expire independently")
+
+def test_monitor_stages():
+    """PerformanceMonitor reports per-stage percentiles and the breach rate"""
+    print("\n🔍 Recording requests through PerformanceMonitor...")
+    monitor = PerformanceMonitor()
+    for i in range(20):
+        request_id = monitor.start_request("web_user")
+        total = 5000 if i < 2 else 1500
+        monitor.record_metrics(request_id, "web_user", 600.0, 800.0, True, 100, total_time=total)
+    monitor.record_stage('url_lookup', 0.2)
+    monitor.record_stage('unknown_stage', 1.0)
+    stats = monitor.get_performance_stats()
+    latency = stats['latency']
+    assert set(latency) == {'total', 'gemini', 'faq', 'url_lookup', 'tts', 'viseme', 'file_write'}
+    assert latency['total']['1m']['over_budget_pct'] == 10.0
+    assert latency['gemini']['5m']['count'] == 20 and latency['viseme']['1h']['count'] == 0
+    assert latency['url_lookup']['1m']['count'] == 1
+    assert stats['average_response_time'] == 1850.0
+    print(f"✅ total p95 {latency['total']['1m']['p95']}ms, {latency['total']['1m']['over_budget_pct']}% over budget")
+
+class NoSpeech:
+    async def text_to_speech_with_visemes(self, text, output_path):
+        return None, None
+
+def test_faq_path_stage():
+    """FAQ answers are timed as the 'faq' stage and don't count as Gemini time"""
+    print("\n🔍 Answering from the FAQ fast path...")
+    import asyncio
+    from app import WebKanGurooBot
+    bot = WebKanGurooBot()
+    bot.performance_monitor = monitor = PerformanceMonitor()
+    bot.elevenlabs_service = NoSpeech()
+    result = asyncio.run(bot.process_message("Who founded Kan-Guroo?"))
+    if result['served_by'] != 'faq':
+        print("⚠️  FAQ fast path is off, skipping")
+        return
+    stats = monitor.get_performance_stats()
+    assert result['performance']['gemini_time'] == 0 and stats['average_gemini_time'] == 0
+    assert stats['latency']['gemini']['1h']['count'] == 0
+    assert stats['latency']['faq']['1h']['count'] == 1
+    print(f"✅ FAQ lookup p50 {stats['latency']['faq']['1h']['p50']}ms, no Gemini samples")
+
+def main():
+    """Run all tests"""
+    print("🚀 Latency Histogram Test")
+    print("=" * 50)
+
+    tests = [
+        test_percentile_accuracy,
+        test_budget_breaches,
+        test_window_expiry,
+        test_monitor_stages,
+        test_faq_path_stage
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
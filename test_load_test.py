@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script for the load-testing harness: latency specs, the Gemini stub
+behind the real google-generativeai client, and the load generator's
+closed and open loops against a small local /api/chat stand-in.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+
+from stub_upstream import StubServer, StubGemini, latency_model
+from load_test import run, percentile
+
+class FakeChat(StubServer):
+    """/api/chat that answers after 20ms and fails every fifth request"""
+
+    def __init__(self):
+        super().__init__(use_tls=False, latency=0.02)
+
+    async def _chat(self, request):
+        await self._begin(request)
+        if self.requests % 5 == 0:
+            return self._web.json_response({'success': False, 'error': 'boom'})
+        return self._web.json_response({'success': True, 'audio_file': 'a.mp3', 'served_by': 'gemini'})
+
+    def _add_routes(self, router):
+        router.add_post('/api/chat', self._chat)
+
+def load_args(url, **overrides):
+    args = argparse.Namespace(url=url, stream=False, repeat=False, warmup=0, requests=0, duration=1.0,
+                              concurrency=4, rate=None, timeout=10, seed=1)
+    for key, value in overrides.items():
+        setattr(args, key, value)
+    return args
+
+def test_latency_specs():
+    """Fixed, uniform and lognormal specs sample as described; bad specs are rejected"""
+    print("\n🔍 Sampling latency specs...")
+    rng = random.Random(3)
+    assert latency_model(0.25)(rng) == 0.25 and latency_model("fixed:0.1")(rng) == 0.1
+    assert all(0.2 <= latency_model("uniform:0.2,0.4")(rng) <= 0.4 for _ in range(100))
+    samples = sorted(latency_model("lognormal:0.5,0.5")(rng) for _ in range(2000))
+    assert abs(samples[1000] - 0.5) < 0.05 and samples[-20] > 1.0, (samples[1000], samples[-20])
+    for bad in ("gamma:1", "uniform:1", "fixed:x"):
+        try:
+            latency_model(bad)
+            assert False, f"{bad} accepted"
+        except ValueError:
+            pass
+    print(f"✅ lognormal median {samples[1000]:.3f}s, p99 {samples[-20]:.3f}s")
+
+def test_gemini_stub():
+    """The google-generativeai client talks to the stub, streamed or not, and sees injected errors"""
+    print("\n🔍 Calling the Gemini stub through the SDK...")
+    import google.generativeai as genai
+
+    stub = StubGemini(response_chars=200, chunks=4).start()
+    try:
+        genai.configure(api_key='stub', transport='rest', client_options={'api_endpoint': stub.base_url})
+        model = genai.GenerativeModel('gemini-1.5-flash')
+        text = model.generate_content("FAQ...\nHow much does it cost?").text
+        streamed = "".join(chunk.text for chunk in model.generate_content("FAQ...\nHow much does it cost?",
+                                                                           stream=True))
+        assert text == streamed and text.startswith("You asked: How much does it cost?"), text
+        assert len(text) >= 200
+
+        stub.error_rate = 1.0
+        stub.error_status = 429
+        try:
+            model.generate_content("again")
+            assert False, "injected error not raised"
+        except Exception as e:
+            assert '429' in str(e), e
+        assert stub.get_stats()['errors'] == 1
+    finally:
+        stub.stop()
+    print(f"✅ {len(text)}-char answer, streamed in chunks, 429 surfaced")
+
+def test_load_loops():
+    """Closed and open loops count requests, errors and latency"""
+    print("\n🔍 Driving a stand-in /api/chat...")
+    chat = FakeChat().start()
+    try:
+        closed = asyncio.run(run(load_args(chat.origin, requests=40, duration=30)))
+        chat.reset_counters()
+        opened = asyncio.run(run(load_args(chat.origin, rate=50.0, concurrency=None, duration=1.0)))
+    finally:
+        chat.stop()
+    assert closed['requests'] == 40 and closed['successful'] == 32 and closed['error_rate'] == 20.0
+    assert closed['errors'] == {'unsuccessful': 8} and closed['served_by'] == {'gemini': 32}
+    assert 20 <= closed['latency_ms']['p50'] <= closed['latency_ms']['p99'] < 1000
+    assert closed['server_errors'] is None
+    assert 20 <= opened['requests'] <= 90, opened['requests']
+    assert opened['latency_ms']['p50'] >= 20
+    assert percentile([1, 2, 3, 4], 0.5) == 2 and percentile([], 0.9) == 0.0
+    print(f"✅ closed: {closed['throughput_rps']} req/s, open: {opened['requests']} arrivals in 1s")
+
+def main():
+    """Run all tests"""
+    print("🚀 Load Test Harness Test")
+    print("=" * 50)
+
+    tests = [
+        test_latency_specs,
+        test_gemini_stub,
+        test_load_loops
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
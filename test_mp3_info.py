@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test script for the MP3 frame-header parser and audio-length fitted visemes.
+
+MP3 data is built from synthetic frames (silent, but with valid headers and
+Xing/VBRI tags), so no real audio files are needed.
+"""
+
+import os
+import struct
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+
+from mp3_info import parse_mp3, mp3_duration, _read_vbr_tag, Mp3Info
+from stub_upstream import StubUpstream, fake_mp3, fake_speech, FAKE_FRAME, FAKE_FRAME_SECONDS
+from test_alignment import synthesize
+from viseme_engine import viseme_engine
+
+TEXT = "Hello there, welcome to Kan-Guroo! Call 555 today."
+
+def frame(header: bytes, length: int, body: bytes = b'') -> bytes:
+    return (header + body).ljust(length, b'\x00')
+
+def xing_frame(frames: int, delay: int, padding: int) -> bytes:
+    """First frame carrying a Xing tag with a LAME extension"""
+    tag = b'Xing' + struct.pack('>II', 0x0F, frames) + struct.pack('>I', 0) + bytes(100) + struct.pack('>I', 50)
+    lame = b'LAME3.100' + bytes(12) + ((delay << 12) | padding).to_bytes(3, 'big')
+    return frame(FAKE_FRAME[:4], len(FAKE_FRAME), bytes(32) + tag + lame)
+
+def test_cbr_duration():
+    """Frame count and duration of a plain CBR stream"""
+    print("\n🔍 Scanning a CBR stream...")
+    data = fake_mp3(3.0)
+    info = parse_mp3(data, offsets=True)
+    frames = len(data) // len(FAKE_FRAME)
+    assert info.frames == frames and len(info.offsets) == frames
+    assert list(info.offsets[:3]) == [0, 417, 834]
+    assert abs(info.duration - frames * FAKE_FRAME_SECONDS) < 1e-9
+    assert info.sample_rate == 44100 and info.channels == 2 and info.tag is None
+    print(f"✅ {info.frames} frames, {info.duration:.3f}s")
+
+def test_xing_and_lame_tag():
+    """Xing frame counts skip the scan; LAME delay/padding are not played"""
+    print("\n🔍 Reading a Xing/LAME tag...")
+    audio = fake_mp3(2.0)
+    frames = len(audio) // len(FAKE_FRAME)
+    data = xing_frame(frames, 576, 1000) + audio
+    info = parse_mp3(data)
+    assert info.tag == 'Xing' and info.frames == frames and info.offsets is None
+    assert info.encoder_delay == 576 and info.encoder_padding == 1000
+    assert abs(info.duration - (frames * 1152 - 1576) / 44100) < 1e-9
+    assert info.audio_start == len(FAKE_FRAME)
+
+    scanned = parse_mp3(data, offsets=True)
+    assert scanned.frames == frames and scanned.offsets[0] == len(FAKE_FRAME)
+    print(f"✅ {info.frames} frames from the tag, {info.duration:.3f}s without encoder delay")
+
+def test_vbri_tag():
+    """Fraunhofer VBRI tags are read as well"""
+    print("\n🔍 Reading a VBRI tag...")
+    vbri = b'VBRI' + struct.pack('>HHHII', 1, 0, 75, 0, 40)
+    data = frame(FAKE_FRAME[:4], len(FAKE_FRAME), bytes(32) + vbri) + fake_mp3(1.0)
+    info = parse_mp3(data)
+    assert info.tag == 'VBRI' and info.frames == 40
+    print(f"✅ VBRI: {info.frames} frames")
+
+def test_truncated_tags():
+    """A Xing or VBRI tag cut off mid-field is ignored, not an error"""
+    print("\n🔍 Reading truncated VBR tags...")
+    header = FAKE_FRAME[:4] + bytes(32)
+    for data in (header + b'Xing' + b'\x00\x00',  # flags cut off
+                 header + b'Xing' + struct.pack('>I', 0x01) + b'\x00',  # frame count cut off
+                 header + b'VBRI' + bytes(6)):  # VBRI frame count cut off
+        info = Mp3Info()
+        assert _read_vbr_tag(data, 0, info) is None and info.tag is None, data
+
+    # A file that ends inside its tag frame: no crash, no duration from the tag
+    xing = xing_frame(100, 576, 1000)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'truncated.mp3')
+        with open(path, 'wb') as f:
+            f.write(xing[:44])
+        assert mp3_duration(path) is None
+    print("✅ Truncated Xing and VBRI tags ignored")
+
+def test_metadata_and_junk():
+    """ID3v2 in front, junk in the middle and ID3v1 at the end are skipped"""
+    print("\n🔍 Scanning around ID3 tags and junk...")
+    id3v2 = b'ID3\x04\x00\x00' + bytes([0, 0, 1, 0]) + bytes(128)
+    audio = fake_mp3(1.0)
+    data = id3v2 + audio[:417 * 5] + b'junk\xff\x00junk' + audio[417 * 5:] + b'TAG' + bytes(125)
+    info = parse_mp3(data, offsets=True)
+    frames = len(audio) // len(FAKE_FRAME)
+    assert info.frames == frames, (info.frames, frames)
+    assert info.offsets[0] == len(id3v2)
+    assert parse_mp3(b'not an mp3 file' * 100) is None
+    assert parse_mp3(b'') is None
+    print(f"✅ {info.frames} frames found, non-MP3 data rejected")
+
+def test_timeline_fitted_to_audio():
+    """Estimated visemes are stretched to the real audio length"""
+    print("\n🔍 Synthesizing without alignment against the stub...")
+    stub = StubUpstream(use_tls=False, alignment=False).start()
+    try:
+        _, viseme_data = synthesize(stub, TEXT)
+    finally:
+        stub.stop()
+    expected = parse_mp3(fake_speech(TEXT)).duration
+    assert viseme_data['source'] == 'text'
+    assert viseme_data['audio_duration'] == round(expected, 3)
+    assert viseme_data['duration'] == viseme_data['audio_duration']
+
+    estimated = viseme_engine.generate(TEXT)
+    scale = expected / estimated['duration']
+    for fitted, original in zip(viseme_data['visemes'], estimated['visemes']):
+        assert fitted['viseme'] == original['viseme']
+        assert abs(fitted['time'] - original['time'] * scale) < 0.002, (fitted, original, scale)
+    print(f"✅ Estimated {estimated['duration']}s timeline scaled by {scale:.3f} to the {expected:.3f}s audio")
+
+def main():
+    """Run all tests"""
+    print("🚀 MP3 Frame Parser Test")
+    print("=" * 50)
+
+    tests = [
+        test_cbr_duration,
+        test_xing_and_lame_tag,
+        test_vbri_tag,
+        test_truncated_tags,
+        test_metadata_and_junk,
+        test_timeline_fitted_to_audio
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Test script for the Prometheus /metrics exporter.
+
+Uses a private PerformanceMonitor, so nothing here touches the global one
+or needs API keys.
+"""
+
+import asyncio
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+
+from async_runtime import AsyncRuntime
+from audio_store import AudioStore
+from performance_monitor import PerformanceMonitor
+from prometheus_metrics import PrometheusExporter, BUCKET_LABELS
+from response_cache import ResponseCache
+from single_flight import SingleFlight
+
+SAMPLE = re.compile(r'^([a-z_]+)(\{[^}]*\})? (\S+)$')
+
+def parse(text):
+    """{series: value} for every sample, plus {name: type} from the TYPE lines"""
+    samples, types = {}, {}
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, kind = line.split(' ')
+            types[name] = kind
+        elif line and not line.startswith('#'):
+            match = SAMPLE.match(line)
+            assert match, f"malformed line: {line}"
+            samples[match.group(1) + (match.group(2) or '')] = float(match.group(3))
+    return samples, types
+
+def make_monitor():
+    monitor = PerformanceMonitor()
+    for i in range(10):
+        request_id = monitor.start_request(f"user_{i}")
+        monitor.record_metrics(request_id, f"user_{i}", 300.0, 700.0, i != 0, 80,
+                               error="boom" if i == 0 else None, served_by="gemini",
+                               audio_seconds=2.5, total_time=1200.0 if i else 4500.0)
+    monitor.start_request("user_x")
+    monitor.record_error('tts')
+    monitor.record_stage('url_lookup', 0.3)
+    return monitor
+
+def test_counters_and_gauges():
+    """Since-start counters, in-flight requests and registered gauges"""
+    print("\n🔍 Rendering counters and gauges...")
+    monitor = make_monitor()
+    cache = ResponseCache(max_entries=4, ttl_seconds=60)
+    cache.get("missing")
+    monitor.register_cache('gemini_responses', cache)
+    monitor.register_gauge('audio_store_bytes', 'Audio bytes on disk', lambda: 4096)
+    monitor.register_gauge('upstream_connections', 'Pool connections', lambda: {'active': 1, 'idle': 3}, label='state')
+    monitor.register_gauge('not_ready', 'Gauge without a value yet', lambda: None)
+    monitor.register_gauge('broken', 'Gauge that raises', lambda: 1 / 0)
+    samples, types = parse(PrometheusExporter(monitor).render())
+
+    assert samples['kanguroo_requests_started_total'] == 11
+    assert samples['kanguroo_requests_completed_total'] == 10
+    assert samples['kanguroo_requests_successful_total'] == 9
+    assert samples['kanguroo_requests_in_flight'] == 1
+    assert samples['kanguroo_responses_total{served_by="gemini"}'] == 10
+    assert samples['kanguroo_errors_total{stage="pipeline"}'] == 1
+    assert samples['kanguroo_errors_total{stage="tts"}'] == 1
+    assert samples['kanguroo_audio_seconds_total'] == 25.0
+    assert samples['kanguroo_cache_misses_total{cache="gemini_responses"}'] == 1
+    assert samples['kanguroo_audio_store_bytes'] == 4096
+    assert samples['kanguroo_upstream_connections{state="idle"}'] == 3
+    assert types['kanguroo_requests_in_flight'] == 'gauge' and types['kanguroo_errors_total'] == 'counter'
+    assert not any('not_ready' in name or 'broken' in name for name in samples)
+    assert not any('user_' in name for name in samples), "per-user series must not be exported"
+    print(f"✅ {len(samples)} samples, failing and empty gauges skipped")
+
+def test_stage_histograms():
+    """Stage histograms are cumulative with matching _count and _sum"""
+    print("\n🔍 Checking stage histograms...")
+    samples, types = parse(PrometheusExporter(make_monitor()).render())
+    assert types['kanguroo_stage_duration_seconds'] == 'histogram'
+    buckets = [samples[f'kanguroo_stage_duration_seconds_bucket{{stage="total",le="{label}"}}']
+               for label in BUCKET_LABELS]
+    assert buckets == sorted(buckets) and buckets[-1] == 10
+    assert samples['kanguroo_stage_duration_seconds_bucket{stage="total",le="4"}'] == 9
+    assert samples['kanguroo_stage_duration_seconds_count{stage="total"}'] == 10
+    assert abs(samples['kanguroo_stage_duration_seconds_sum{stage="total"}'] - 15.3) < 1e-9
+    assert samples['kanguroo_stage_duration_seconds_count{stage="url_lookup"}'] == 1
+    assert samples['kanguroo_stage_duration_seconds_count{stage="viseme"}'] == 0
+    print(f"✅ total: {int(buckets[-1])} observations, 1 over the 4s bucket")
+
+def test_cancelled_requests():
+    """A request closed without a completion leaves in_flight and the averages"""
+    print("\n🔍 Cancelling an abandoned request...")
+    monitor = PerformanceMonitor()
+    dropped = monitor.start_request("kiosk")
+    finished = monitor.start_request("kiosk")
+    monitor.cancel_request(dropped)
+    monitor.record_metrics(finished, "kiosk", 300.0, 700.0, True, 80, total_time=1000.0)
+    samples, _ = parse(PrometheusExporter(monitor).render())
+    assert samples['kanguroo_requests_in_flight'] == 0
+    assert samples['kanguroo_requests_cancelled_total'] == 1
+    assert samples['kanguroo_requests_completed_total'] == 1
+    statuses = [request['status'] for request in monitor.get_recent_requests()]
+    assert statuses == ['cancelled', 'completed'], statuses
+    stats = monitor.get_performance_stats()
+    assert stats['total_requests'] == 1 and stats['average_response_time'] == 1000.0
+    print("✅ Cancelled request closed, averages only cover the completed one")
+
+def test_single_flight_counters():
+    """Coalesced calls get their own counters, not the cache hit/miss series"""
+    print("\n🔍 Exporting single-flight counters...")
+    monitor = PerformanceMonitor()
+    flights = SingleFlight()
+
+    async def scenario():
+        async def call():
+            await asyncio.sleep(0.01)
+            return "answer"
+        await asyncio.gather(*(flights.do("same", call) for _ in range(4)))
+
+    asyncio.run(scenario())
+    monitor.register_single_flight('gemini', flights)
+    samples, types = parse(PrometheusExporter(monitor).render())
+    assert samples['kanguroo_singleflight_leaders_total{upstream="gemini"}'] == 1
+    assert samples['kanguroo_singleflight_coalesced_total{upstream="gemini"}'] == 3
+    assert types['kanguroo_singleflight_coalesced_total'] == 'counter'
+    assert not any('cache=' in name for name in samples), "single-flight counters must not look like a cache"
+    assert monitor.get_performance_stats()['single_flight']['gemini']['followers'] == 3
+    print("✅ 1 leader, 3 coalesced")
+
+def test_audio_store_evictions():
+    """Age and budget evictions from the audio store are both exported"""
+    print("\n🔍 Exporting audio store evictions...")
+    monitor = PerformanceMonitor()
+    with tempfile.TemporaryDirectory() as directory:
+        store = AudioStore(directory, max_age=3600, max_bytes=250, write_grace=30)
+        for size, age in ((100, 7200), (100, 600), (100, 500), (100, 400)):
+            _, path = store.new_file()
+            with open(path, 'wb') as f:
+                f.write(b'\xff' * size)
+            mtime = time.time() - age
+            os.utime(path, (mtime, mtime))
+        store.sweep()
+        monitor.register_cache('audio_store', store)
+        samples, types = parse(PrometheusExporter(monitor).render())
+    assert samples['kanguroo_cache_age_evictions_total{cache="audio_store"}'] == 1
+    assert samples['kanguroo_cache_budget_evictions_total{cache="audio_store"}'] == 1
+    assert types['kanguroo_cache_budget_evictions_total'] == 'counter'
+    print("✅ 1 age and 1 budget eviction exported")
+
+def test_pool_stats_on_loop():
+    """ElevenLabs pool stats are read on the session's loop, from any thread"""
+    print("\n🔍 Reading pool stats from another thread...")
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+    from stub_upstream import StubUpstream
+    from elevenlabs_service import ElevenLabsService
+
+    stub = StubUpstream(use_tls=False).start()
+    runtime = AsyncRuntime(max_workers=2)
+    service = ElevenLabsService()
+    service.base_url = stub.base_url
+    service.audio_cache = None
+    try:
+        assert service.get_pool_stats() is None, "no pool before the first request"
+        with tempfile.TemporaryDirectory() as directory:
+            runtime.run(service.text_to_speech_with_visemes("Hello there.", os.path.join(directory, 'a.mp3')), 10)
+        stats = service.get_pool_stats()
+        loop_threads = []
+
+        async def read_on_loop():
+            loop_threads.append(threading.current_thread().name)
+            return service.get_pool_stats()
+
+        assert runtime.run(read_on_loop(), 5) == stats
+        runtime.run(service.close_session(), 5)
+        assert service.get_pool_stats() is None
+    finally:
+        runtime.shutdown()
+        stub.stop()
+    assert stats == {'active': 0, 'idle': 1}, stats
+    assert loop_threads == ['async-runtime']
+    print(f"✅ {stats}")
+
+def test_label_escaping():
+    """Label values are escaped per the exposition format"""
+    print("\n🔍 Escaping label values...")
+    monitor = PerformanceMonitor()
+    monitor.record_error('say "hi"\\now')
+    text = PrometheusExporter(monitor).render()
+    assert 'kanguroo_errors_total{stage="say \\"hi\\"\\\\now"} 1' in text, text
+    print("✅ Quotes and backslashes escaped")
+
+def main():
+    """Run all tests"""
+    print("🚀 Prometheus Metrics Test")
+    print("=" * 50)
+
+    tests = [
+        test_counters_and_gauges,
+        test_stage_histograms,
+        test_cancelled_requests,
+        test_single_flight_counters,
+        test_audio_store_evictions,
+        test_pool_stats_on_loop,
+        test_label_escaping
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Test script for retrieval-scoped prompts: only the matched FAQ sections
+are sent after the fixed role prefix, and questions that match nothing get
+the full prompt.
+"""
+
+import json
+import os
+import sys
+
+from prompt_builder import ScopedPromptBuilder, build_sections, estimate_tokens
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def load_faq():
+    with open(os.path.join(ROOT, 'faq_data.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+def section_texts(faq_data):
+    return {section_id: text for section_id, _, text in build_sections(faq_data)}
+
+def test_only_matched_sections():
+    """A scoped prompt carries the prefix and the matched sections, nothing else"""
+    print("\n🔍 Building scoped prompts...")
+    faq_data = load_faq()
+    builder = ScopedPromptBuilder(faq_data, top_k=2)
+    texts = section_texts(faq_data)
+    contact = faq_data['company']['contact']
+    ceo = faq_data['company']['team'][0]['name']
+
+    cases = {
+        "What is your phone number?": ['contact'],
+        "Who is the CEO?": ['team'],
+        "Tell me about summer schools": ['programs:summer_schools', 'programs:school_exchange']
+    }
+    for question, expected in cases.items():
+        assert builder.select_sections(question) == expected, (question, builder.select_sections(question))
+        prompt = builder.build(question)
+        assert prompt.startswith(builder.prefix) and prompt.endswith("User Question: ")
+        for section_id, text in texts.items():
+            assert (text in prompt) == (section_id in expected), (question, section_id)
+        assert estimate_tokens(prompt) < estimate_tokens(builder.full_prompt), question
+
+    assert contact['phone'] in builder.build("What is your phone number?")
+    assert contact['phone'] not in builder.build("Who is the CEO?")
+    assert f"- {ceo}: Co-Founder & CEO" in builder.build("Who is the CEO?")
+    print(f"✅ {len(cases)} questions scoped to their sections")
+
+def test_sections_kept_in_order():
+    """Chosen sections appear in their original order, whatever their scores"""
+    print("\n🔍 Checking section order...")
+    faq_data = load_faq()
+    builder = ScopedPromptBuilder(faq_data, top_k=2)
+    texts = section_texts(faq_data)
+    prompt = builder.build("Tell me about summer schools")
+    assert prompt.index(texts['programs:school_exchange']) < prompt.index(texts['programs:summer_schools'])
+    print("✅ Sections in file order")
+
+def test_no_match_falls_back():
+    """Questions that match no section get the full prompt"""
+    print("\n🔍 Asking questions outside the knowledge base...")
+    faq_data = load_faq()
+    builder = ScopedPromptBuilder(faq_data)
+    for question in ("What is the weather in Tbilisi?", "", "?!"):
+        assert builder.select_sections(question) == [], question
+        assert builder.build(question) == builder.full_prompt, question
+    print(f"✅ Full prompt ({estimate_tokens(builder.full_prompt)} tokens) for unmatched questions")
+
+def main():
+    """Run all tests"""
+    print("🚀 Scoped Prompt Test")
+    print("=" * 50)
+
+    tests = [
+        test_only_matched_sections,
+        test_sections_kept_in_order,
+        test_no_match_falls_back
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
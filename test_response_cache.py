@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for the Gemini response cache: question normalization, TTL
+expiry, LRU eviction and invalidation when the knowledge base changes.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+from response_cache import ResponseCache, normalize_question
+from knowledge_store import KnowledgeStore
+
+def test_normalization():
+    """Trivially different phrasings share a key"""
+    print("\n🔍 Normalizing questions...")
+    assert normalize_question("Um, what's the PRICE?!") == "what is the price"
+    assert normalize_question("Hey, please tell me:  what’s the price") == "tell me what is the price"
+    assert normalize_question("Don't you have summer schools?") == "do not you have summer schools"
+    same = ResponseCache.make_key("What's the price?", "3")
+    assert same == ResponseCache.make_key("  what is the price  ", "3")
+    assert same != ResponseCache.make_key("What's the price?", "4")
+    assert same != ResponseCache.make_key("What's the deadline?", "3")
+    print(f"✅ Key: {same}")
+
+def test_filler_only_at_edges():
+    """Fillers inside a question are kept; questions made only of fillers aren't cached"""
+    print("\n🔍 Normalizing filler words...")
+    assert normalize_question("How well do students do abroad?") == "how well do students do abroad"
+    assert normalize_question("How do students do abroad?") == "how do students do abroad"
+    assert normalize_question("Is it ok to apply late, please?") == "is it ok to apply late"
+    assert normalize_question("So, can you say hi to my class? Thanks, ok") == "can you say hi to my class thanks"
+    for filler in ("ok", "Hi!", "please", "Um... okay, well", ""):
+        assert normalize_question(filler) == "" and ResponseCache.make_key(filler, "3") is None, filler
+
+    from gemini_service import GeminiService
+    service = GeminiService()
+    service.response_cache = ResponseCache(max_entries=8, ttl_seconds=60)
+    snapshot = service.knowledge_store.current()
+    assert service._get_cached_response("ok", snapshot) == (None, None)
+    assert service.response_cache.misses == 0, "filler-only questions must not touch the cache"
+    print("✅ 'how well' kept apart from 'how', 'ok' and 'hi' not cached")
+
+def test_ttl_expiry():
+    """Entries past their TTL are misses and are dropped"""
+    print("\n🔍 Expiring entries...")
+    cache = ResponseCache(max_entries=4, ttl_seconds=0.05)
+    cache.set("k", "answer")
+    assert cache.get("k") == "answer"
+    time.sleep(0.08)
+    assert cache.get("k") is None and len(cache) == 0
+    stats = cache.get_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1 and stats['expirations'] == 1, stats
+    print("✅ Expired entry missed and removed")
+
+def test_lru_eviction():
+    """The least recently used entry goes first once the cache is full"""
+    print("\n🔍 Filling the cache past its limit...")
+    cache = ResponseCache(max_entries=3, ttl_seconds=60)
+    for key in ("a", "b", "c"):
+        cache.set(key, key.upper())
+    cache.get("a")  # a is now the most recently used
+    cache.set("d", "D")
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in ("a", "c", "d")] == ["A", "C", "D"]
+    cache.set("c", "C2")  # overwriting refreshes instead of growing
+    assert len(cache) == 3 and cache.get("c") == "C2"
+    assert cache.get_stats()['evictions'] == 1
+    print("✅ b evicted, a kept after its lookup")
+
+def test_knowledge_invalidation():
+    """A knowledge change moves questions to new keys and clears the old entries"""
+    print("\n🔍 Editing the knowledge file...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'faq_data.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"company": {"name": "Kan-Guroo"}}, f)
+        store = KnowledgeStore(path)
+        cache = ResponseCache(max_entries=8, ttl_seconds=60)
+        # The same wiring as GeminiService
+        store.subscribe(lambda snapshot: cache.clear())
+
+        old_key = ResponseCache.make_key("Who are you?", str(store.version))
+        cache.set(old_key, "We are Kan-Guroo.")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"company": {"name": "Kan-Guroo Global"}}, f)
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+        assert store.reload_if_changed()
+
+        new_key = ResponseCache.make_key("Who are you?", str(store.version))
+        assert new_key != old_key
+        assert cache.get(old_key) is None and cache.get(new_key) is None and len(cache) == 0
+    print(f"✅ Version {store.version}: old answers gone")
+
+def main():
+    """Run all tests"""
+    print("🚀 Response Cache Test")
+    print("=" * 50)
+
+    tests = [
+        test_normalization,
+        test_filler_only_at_edges,
+        test_ttl_expiry,
+        test_lru_eviction,
+        test_knowledge_invalidation
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
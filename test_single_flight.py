@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test script for single-flight coalescing: concurrent identical calls share
+one upstream call, followers see the leader's result or error, and
+process_message shares both the Gemini answer and the synthesized audio.
+"""
+
+import asyncio
+import os
+import sys
+
+from single_flight import SingleFlight
+
+class CountingCall:
+    """Async call that records how often it ran"""
+
+    def __init__(self, result=None, error=None, delay=0.05):
+        self.result = result
+        self.error = error
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+def test_coalesces_concurrent_calls():
+    """Concurrent calls with one key run once; other keys and later calls run again"""
+    print("\n🔍 Coalescing identical concurrent calls...")
+    flights = SingleFlight()
+    call = CountingCall(result="answer")
+    other = CountingCall(result="other")
+
+    async def scenario():
+        results = await asyncio.gather(*[flights.do('q', call) for _ in range(10)], flights.do('other', other))
+        again = await flights.do('q', call)
+        return results, again
+
+    results, again = asyncio.run(scenario())
+    assert [result for result, _ in results[:10]] == ["answer"] * 10
+    assert [shared for _, shared in results[:10]] == [False] + [True] * 9
+    assert results[10] == ("other", False) and again == ("answer", False)
+    assert call.calls == 2 and other.calls == 1
+    stats = flights.get_stats()
+    assert stats == {'in_flight': 0, 'leaders': 3, 'followers': 9, 'coalescing_ratio': 75.0}, stats
+    print(f"✅ 10 concurrent calls, 1 upstream call, ratio {stats['coalescing_ratio']}%")
+
+def test_followers_get_error():
+    """The leader's exception reaches every follower and the key is released"""
+    print("\n🔍 Sharing a failed call...")
+    flights = SingleFlight()
+    failing = CountingCall(error=RuntimeError("upstream 503"))
+
+    async def scenario():
+        return await asyncio.gather(*[flights.do('q', failing) for _ in range(5)], return_exceptions=True)
+
+    errors = asyncio.run(scenario())
+    assert failing.calls == 1 and all(isinstance(e, RuntimeError) and str(e) == "upstream 503" for e in errors)
+    assert flights.get_stats()['in_flight'] == 0
+    assert asyncio.run(flights.do('q', CountingCall(result="ok", delay=0))) == ("ok", False)
+    print("✅ 5 callers saw the same error, next call ran fresh")
+
+def test_leader_cancellation():
+    """Cancelling the leader doesn't cancel the call its followers wait for"""
+    print("\n🔍 Cancelling the leader...")
+    flights = SingleFlight()
+    call = CountingCall(result="answer", delay=0.1)
+
+    async def scenario():
+        leader = asyncio.create_task(flights.do('q', call))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flights.do('q', call))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        result = await follower
+        return leader.cancelled(), result
+
+    leader_cancelled, result = asyncio.run(scenario())
+    assert leader_cancelled and result == ("answer", True) and call.calls == 1
+    print("✅ Follower got the answer after the leader was cancelled")
+
+class FakeGemini:
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_response(self, user_question):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return f"Kangaroos can't walk backwards, you asked: {user_question}"
+
+class FakeElevenLabs:
+    def __init__(self):
+        self.calls = 0
+        self.audio_cache = None
+
+    async def text_to_speech_with_visemes(self, text, output_path):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        with open(output_path, 'wb') as f:
+            f.write(b'\xff\xfb' + b'\x00' * 64)
+        return output_path, {'visemes': [], 'duration': 1.0, 'audio_duration': 1.0}
+
+def test_process_message_shares_calls():
+    """A burst of the same question makes one Gemini call and one synthesis"""
+    print("\n🔍 Sending the same question from 8 users at once...")
+    from app import WebKanGurooBot
+    bot = WebKanGurooBot()
+    if bot.gemini_flights is None:
+        print("⚠️  SINGLE_FLIGHT_ENABLED is off, skipping")
+        return
+    bot.gemini_service = FakeGemini()
+    bot.elevenlabs_service = FakeElevenLabs()
+    question = "Can a kangaroo walk backwards?"
+
+    async def scenario():
+        return await asyncio.gather(*[bot.process_message(question, f"student_{i}") for i in range(8)])
+
+    results = asyncio.run(scenario())
+    try:
+        assert bot.gemini_service.calls == 1 and bot.elevenlabs_service.calls == 1
+        assert all(result['success'] and result['served_by'] == 'gemini' for result in results)
+        assert len({result['response_text'] for result in results}) == 1
+        assert len({result['audio_file'] for result in results}) == 1 and results[0]['audio_file']
+        assert len({result['trace_id'] for result in results}) == 8
+        assert bot.gemini_flights.get_stats()['followers'] == 7
+        assert bot.tts_flights.get_stats()['followers'] == 7
+    finally:
+        bot.audio_store.remove(results[0]['audio_file'] or '')
+    print(f"✅ 8 answers from 1 Gemini call and 1 audio file ({results[0]['audio_file']})")
+
+class CachedElevenLabs:
+    """TTS whose audio cache answers every request"""
+
+    def __init__(self, cached_path):
+        self.audio_cache = object()
+        self.cached_path = cached_path
+        self.output_paths = []
+
+    async def text_to_speech_with_visemes(self, text, output_path):
+        self.output_paths.append(output_path)
+        return self.cached_path, {'visemes': [], 'duration': 1.0, 'audio_duration': 1.0}
+
+def test_cache_hits_reserve_no_files():
+    """With the audio cache on, no per-request audio file is reserved"""
+    print("\n🔍 Answering from the TTS audio cache...")
+    from app import WebKanGurooBot
+    bot = WebKanGurooBot()
+    bot.elevenlabs_service = CachedElevenLabs(os.path.abspath(__file__))
+    created = bot.audio_store.files_created
+
+    async def scenario():
+        return [await bot._text_to_speech(f"Sentence {i}.") for i in range(3)]
+
+    results = asyncio.run(scenario())
+    assert all(audio_file == os.path.abspath(__file__) for audio_file, _, _ in results)
+    assert bot.elevenlabs_service.output_paths == [None] * 3
+    assert bot.audio_store.files_created == created, "cache hits must not reserve audio files"
+    print("✅ 3 cache hits, no audio files reserved")
+
+def main():
+    """Run all tests"""
+    print("🚀 Single-Flight Coalescing Test")
+    print("=" * 50)
+
+    tests = [
+        test_coalesces_concurrent_calls,
+        test_followers_get_error,
+        test_leader_cancellation,
+        test_process_message_shares_calls,
+        test_cache_hits_reserve_no_files
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming chat endpoint: sentence chunking of the token
+stream, SSE event order on /api/chat/stream, the error event, and that a
+client disconnect stops the Gemini stream.
+
+Gemini and ElevenLabs are replaced by fakes, so no API keys are needed.
+"""
+
+import asyncio
+import json
+import sys
+import time
+
+from sentence_chunker import SentenceChunker, split_sentences
+
+QUESTION = "Can a kangaroo walk backwards?"
+ANSWER = ["Kangaroos can't walk ", "backwards at all. They use ", "their tail for balance, ",
+          "like a fifth leg! Ask me anything else."]
+
+class StreamingGemini:
+    """Streams canned deltas, optionally failing partway"""
+
+    def __init__(self, deltas=ANSWER, fail_after=None, delay=0.01):
+        self.deltas = deltas
+        self.fail_after = fail_after
+        self.delay = delay
+        self.sent = 0
+        self.closed = False
+
+    async def generate_response_stream(self, user_question):
+        try:
+            for i, delta in enumerate(self.deltas):
+                if i == self.fail_after:
+                    raise RuntimeError("Gemini stream broke")
+                await asyncio.sleep(self.delay)
+                self.sent += 1
+                yield delta
+        finally:
+            self.closed = True
+
+class WritingElevenLabs:
+    audio_cache = None
+
+    async def text_to_speech_with_visemes(self, text, output_path):
+        await asyncio.sleep(0.01)
+        with open(output_path, 'wb') as f:
+            f.write(b'\xff\xfb' + b'\x00' * 64)
+        return output_path, {'visemes': [], 'duration': 1.0, 'audio_duration': 1.0}
+
+def collect(chunker, deltas):
+    sentences = []
+    for delta in deltas:
+        sentences.extend(chunker.feed(delta))
+    return sentences, chunker.flush()
+
+def test_chunk_boundaries():
+    """Sentences end at terminal punctuation, not at abbreviations or decimals"""
+    print("\n🔍 Chunking a token stream...")
+    deltas = ["Dr. Bevia leads the ", "programs in the U.S. and Europe. Fees start ", "at 3.5 thousand ",
+              "GEL per term! Want to know more"]
+    sentences, rest = collect(SentenceChunker(), deltas)
+    assert sentences == ["Dr. Bevia leads the programs in the U.S. and Europe.",
+                         "Fees start at 3.5 thousand GEL per term!"], sentences
+    assert rest == ["Want to know more"], rest
+
+    # Nothing is emitted until the whitespace after the punctuation arrives
+    chunker = SentenceChunker()
+    assert chunker.feed("We help students study abroad.") == []
+    assert chunker.feed(" Next") == ["We help students study abroad."]
+    assert chunker.flush() == ["Next"] and chunker.flush() == []
+    print(f"✅ {len(sentences)} sentences plus the flushed remainder")
+
+def test_min_chars():
+    """Short sentences are joined with the next one"""
+    print("\n🔍 Holding back short sentences...")
+    assert split_sentences("Hi! Yes. How can I help you today? Sure.") == [
+        "Hi! Yes. How can I help you today?", "Sure."]
+    assert split_sentences("Hi! Yes. Ok.", min_chars=3) == ["Hi!", "Yes.", "Ok."]
+    assert split_sentences("") == [] and split_sentences("   ") == []
+    print("✅ 'Hi! Yes.' joined with the next sentence")
+
+def stream_events(gemini):
+    """POST a question to /api/chat/stream with fake services, returning the parsed events"""
+    from app import app, web_bot
+    real = web_bot.gemini_service, web_bot.elevenlabs_service
+    web_bot.gemini_service, web_bot.elevenlabs_service = gemini, WritingElevenLabs()
+    try:
+        response = app.test_client().post('/api/chat/stream', json={'message': QUESTION, 'user_id': 'sse_test'})
+        assert response.mimetype == 'text/event-stream'
+        body = response.get_data(as_text=True)
+    finally:
+        web_bot.gemini_service, web_bot.elevenlabs_service = real
+    events = []
+    for message in body.strip().split('\n\n'):
+        name_line, data_line = message.split('\n')
+        event = json.loads(data_line[len('data: '):])
+        assert name_line == f"event: {event['type']}"
+        events.append(event)
+    for event in events:
+        if event['type'] == 'audio':
+            web_bot.audio_store.remove(event['audio_file'])
+    return events
+
+def test_sse_event_order():
+    """Text deltas come first, audio follows in sentence order, then urls and done"""
+    print("\n🔍 Streaming an answer over SSE...")
+    events = stream_events(StreamingGemini())
+    types = [event['type'] for event in events]
+    assert types[0] == 'text' and types[-2:] == ['urls', 'done'], types
+    assert 'audio' in types and types.index('audio') > types.index('text')
+    assert "".join(event['delta'] for event in events if event['type'] == 'text') == "".join(ANSWER)
+
+    audio = [event for event in events if event['type'] == 'audio']
+    assert [event['index'] for event in audio] == list(range(len(audio)))
+    assert [event['text'] for event in audio] == split_sentences("".join(ANSWER))
+    done = events[-1]
+    assert done['success'] and done['served_by'] == 'gemini' and done['response_text'] == "".join(ANSWER).strip()
+    print(f"✅ {types.count('text')} text, {len(audio)} audio, then urls and done")
+
+def test_error_event():
+    """A failing Gemini stream ends with an error event"""
+    print("\n🔍 Breaking the Gemini stream...")
+    events = stream_events(StreamingGemini(fail_after=2))
+    types = [event['type'] for event in events]
+    assert types[-1] == 'error' and 'done' not in types, types
+    assert events[-1]['error'] == "Gemini stream broke"
+    assert types.count('text') == 2
+    print(f"✅ {types.count('text')} text events, then: {events[-1]['error']}")
+
+def test_disconnect_stops_gemini():
+    """Closing the stream early stops the Gemini stream and closes the request"""
+    print("\n🔍 Disconnecting after the first event...")
+    from app import web_bot
+    from async_runtime import async_runtime
+    gemini = StreamingGemini(deltas=["Word number %d. " % i for i in range(100)], delay=0.02)
+    real = web_bot.gemini_service, web_bot.elevenlabs_service
+    web_bot.gemini_service, web_bot.elevenlabs_service = gemini, WritingElevenLabs()
+    in_flight = web_bot.performance_monitor.in_flight
+    try:
+        events = async_runtime.iterate(web_bot.process_message_stream(QUESTION, 'sse_test'))
+        assert next(events)['type'] == 'text'
+        events.close()
+        time.sleep(0.1)
+        sent = gemini.sent
+        time.sleep(0.1)
+    finally:
+        web_bot.gemini_service, web_bot.elevenlabs_service = real
+    assert gemini.closed and gemini.sent == sent < 100, (gemini.closed, sent, gemini.sent)
+    assert web_bot.performance_monitor.in_flight == in_flight
+    print(f"✅ Gemini stream closed after {sent} of 100 deltas")
+
+def test_disconnect_stops_worker():
+    """Closing GeminiService's stream stops the worker thread pulling SDK chunks"""
+    print("\n🔍 Closing a Gemini stream mid-answer...")
+    from gemini_service import GeminiService
+
+    class Chunk:
+        text = "Kangaroos hop. "
+
+    class SlowModel:
+        pulled = 0
+
+        def generate_content(self, prompt, stream=False):
+            for _ in range(100):
+                time.sleep(0.01)
+                SlowModel.pulled += 1
+                yield Chunk()
+
+    service = GeminiService()
+    service.model = SlowModel()
+    service.response_cache = None
+
+    async def scenario():
+        stream = service.generate_response_stream(QUESTION)
+        await stream.__anext__()
+        await stream.aclose()
+        await asyncio.sleep(0.1)
+        pulled = SlowModel.pulled
+        await asyncio.sleep(0.1)
+        return pulled
+
+    pulled = asyncio.run(scenario())
+    assert SlowModel.pulled <= pulled + 1 and pulled < 100, (pulled, SlowModel.pulled)
+    print(f"✅ Worker stopped after {SlowModel.pulled} of 100 chunks")
+
+def main():
+    """Run all tests"""
+    print("🚀 Streaming Chat Test")
+    print("=" * 50)
+
+    tests = [
+        test_chunk_boundaries,
+        test_min_chars,
+        test_sse_event_order,
+        test_error_event,
+        test_disconnect_stops_gemini,
+        test_disconnect_stops_worker
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
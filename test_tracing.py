@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Test script for request tracing: span nesting across asyncio tasks, the
+bounded buffer and the JSONL and OTLP exporters.
+
+The OTLP exporter posts to a throwaway local HTTP server.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from tracing import Tracer, JsonlExporter, OtlpHttpExporter, NOOP_SPAN, trace_id_from_header
+
+def test_nesting_across_tasks():
+    """Child spans follow the current span into tasks and to_thread calls"""
+    print("\n🔍 Nesting spans across asyncio tasks...")
+    tracer = Tracer()
+
+    def blocking_call():
+        with tracer.span('in_thread'):
+            pass
+
+    async def child(index):
+        with tracer.span('child', index=index):
+            await asyncio.to_thread(blocking_call)
+
+    async def main():
+        with tracer.span('root', trace_id='ab' * 16) as root:
+            await asyncio.gather(*(asyncio.create_task(child(i)) for i in range(3)))
+        return root
+
+    root = asyncio.run(main())
+    spans = tracer.get_trace(root.trace_id)
+    assert root.trace_id == 'ab' * 16 and len(spans) == 7, spans
+    by_id = {span['span_id']: span for span in spans}
+    children = [span for span in spans if span['name'] == 'child']
+    assert all(span['parent_id'] == root.span_id for span in children)
+    assert all(by_id[span['parent_id']]['name'] == 'child' for span in spans if span['name'] == 'in_thread')
+    assert tracer.current_span() is None
+    print(f"✅ {len(spans)} spans in one trace, all parented correctly")
+
+def test_generator_spans():
+    """start_span/activate keep async generator steps from leaking the current span"""
+    print("\n🔍 Tracing an async generator...")
+    tracer = Tracer()
+
+    async def stream():
+        span = tracer.start_span('stream')
+        try:
+            with tracer.activate(span):
+                with tracer.span('setup'):
+                    pass
+            for i in range(3):
+                yield i
+        finally:
+            span.end()
+
+    async def main():
+        with tracer.span('root') as root:
+            async for _ in stream():
+                assert tracer.current_span() is root
+                with tracer.span('between'):
+                    pass
+        return root
+
+    root = asyncio.run(main())
+    spans = {span['name']: span for span in tracer.get_trace(root.trace_id)}
+    assert spans['stream']['parent_id'] == root.span_id
+    assert spans['setup']['parent_id'] == spans['stream']['span_id']
+    assert spans['between']['parent_id'] == root.span_id
+    print("✅ Generator span parented to the root, siblings unaffected")
+
+def test_errors_and_buffer():
+    """Exceptions mark the span, and the buffer keeps only the newest spans"""
+    print("\n🔍 Recording an error and overflowing the buffer...")
+    tracer = Tracer(buffer_size=10)
+    try:
+        with tracer.span('failing'):
+            raise ValueError("upstream said no")
+    except ValueError:
+        pass
+    assert tracer.recent_traces(1)[0]['error'] == "upstream said no"
+    for i in range(25):
+        with tracer.span('filler', index=i):
+            pass
+    assert len(tracer.buffer) == 10 and tracer.spans_finished == 26
+    assert tracer.recent_traces(1)[0]['attributes']['index'] == 24
+
+    disabled = Tracer(enabled=False)
+    with disabled.span('ignored') as span:
+        assert span is NOOP_SPAN
+    assert len(disabled.buffer) == 0
+    print("✅ Error recorded, buffer bounded at 10, disabled tracer is a no-op")
+
+def test_traceparent():
+    """Incoming W3C traceparent headers supply the trace ID"""
+    print("\n🔍 Parsing traceparent headers...")
+    trace_id = '0af7651916cd43dd8448eb211c80319c'
+    assert trace_id_from_header(f'00-{trace_id}-b7ad6b7169203331-01') == trace_id
+    assert trace_id_from_header(f'00-{"0" * 32}-b7ad6b7169203331-01') is None
+    assert trace_id_from_header('garbage') is None and trace_id_from_header(None) is None
+    print("✅ Valid header accepted, invalid ones ignored")
+
+def test_jsonl_exporter():
+    """Flushed spans are appended as JSON lines"""
+    print("\n🔍 Exporting to JSONL...")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'traces.jsonl')
+        tracer = Tracer()
+        tracer.add_exporter(JsonlExporter(path))
+        with tracer.span('root', user_id='kiosk'):
+            with tracer.span('child'):
+                pass
+        tracer.flush()
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+    names = sorted(record['name'] for record in records)
+    assert names == ['child', 'root'], records
+    assert all(record['duration_ms'] >= 0 and record['start_time'] > 1e9 for record in records)
+    print(f"✅ {len(records)} spans written")
+
+def test_otlp_exporter():
+    """OTLP/JSON payloads reach a local collector"""
+    print("\n🔍 Exporting to a local OTLP collector...")
+    received = []
+
+    class Collector(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append((self.path, json.loads(self.rfile.read(int(self.headers['Content-Length'])))))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Collector)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        tracer = Tracer()
+        tracer.add_exporter(OtlpHttpExporter(f'http://127.0.0.1:{server.server_port}/v1/traces'))
+        with tracer.span('root', chars=12, cached=False):
+            try:
+                with tracer.span('tts'):
+                    raise TimeoutError("slow")
+            except TimeoutError:
+                pass
+        tracer.flush()
+    finally:
+        server.shutdown()
+    spans = [span for _, payload in received
+             for span in payload['resourceSpans'][0]['scopeSpans'][0]['spans']]
+    assert received and received[0][0] == '/v1/traces'
+    resource = received[0][1]['resourceSpans'][0]['resource']['attributes']
+    assert resource[0]['value']['stringValue'] == 'kanguroo'
+    by_name = {span['name']: span for span in spans}
+    assert by_name['tts']['parentSpanId'] == by_name['root']['spanId']
+    assert by_name['tts']['status'] == {'code': 2, 'message': 'slow'}
+    assert {'key': 'chars', 'value': {'intValue': '12'}} in by_name['root']['attributes']
+    assert int(by_name['root']['endTimeUnixNano']) >= int(by_name['tts']['endTimeUnixNano'])
+    print(f"✅ {len(spans)} spans posted as OTLP/JSON")
+
+def main():
+    """Run all tests"""
+    print("🚀 Tracing Test")
+    print("=" * 50)
+
+    tests = [
+        test_nesting_across_tasks,
+        test_generator_spans,
+        test_errors_and_buffer,
+        test_traceparent,
+        test_jsonl_exporter,
+        test_otlp_exporter
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
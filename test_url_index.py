@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the program URL index: phrases match on word boundaries
+and in order, URLs are ranked by keyword weight, each URL is returned once,
+and unrelated messages match nothing.
+"""
+
+import sys
+
+from url_index import UrlIndex
+
+FAQ = {"company": {"programs": {
+    "school_exchange": [
+        {"name": "High School Exchange USA", "url": "https://kanguroo.example/usa"},
+        {"name": "European School Exchange", "url": "https://kanguroo.example/europe"}
+    ],
+    "summer_schools": [
+        {"name": "Oxford Summer School", "url": "https://kanguroo.example/oxford"},
+        {"name": "Malta Summer Camp", "url": "https://kanguroo.example/malta"}
+    ],
+    "language_courses": [
+        {"name": "German Language Course", "url": "https://kanguroo.example/german"},
+        {"name": "Spanish Language Course", "url": ""}
+    ]
+}}}
+
+def url(slug):
+    return f"https://kanguroo.example/{slug}"
+
+def test_phrase_matching():
+    """Multi-word phrases match only as consecutive whole words"""
+    print("\n🔍 Matching phrases...")
+    index = UrlIndex(FAQ)
+    assert index.find("Can I learn a language abroad?") == [url('german')]
+    assert index.find("learn, a LANGUAGE") == [url('german')], "punctuation and case don't matter"
+    assert index.find("a language to learn") == []
+    # 'high school' is an exchange keyword; in the wrong order only the name word 'high' matches
+    assert index.find("high school") == [url('usa'), url('europe')]
+    assert index.find("school high") == [url('usa')]
+    assert index.find("Is Maltaa nice?") == [] and index.find("oxfordshire") == [], "no partial words"
+    print("✅ Phrases match in order on word boundaries")
+
+def test_ranking():
+    """A program's own name words outrank its category keywords"""
+    print("\n🔍 Ranking matches...")
+    index = UrlIndex(FAQ)
+    assert index.find("Tell me about the Oxford summer school") == [url('oxford'), url('malta')]
+    assert index.find("What about summer in Malta?") == [url('malta'), url('oxford')]
+    assert index.find("An exchange year in the USA?") == [url('usa'), url('europe')]
+    assert index.find("High School Exchange USA")[0] == url('usa')
+    print("✅ Named programs first, then the rest of their category")
+
+def test_deduplication():
+    """Each URL appears once however many keywords hit it"""
+    print("\n🔍 Repeating keywords...")
+    index = UrlIndex(FAQ)
+    urls = index.find("Oxford oxford OXFORD summer school summer camp")
+    assert len(urls) == len(set(urls)) == 2, urls
+    assert urls[0] == url('oxford')
+    assert index.find("Spanish language course") == [url('german')], "programs without a URL are skipped"
+    print(f"✅ {len(urls)} distinct URLs")
+
+def test_no_match():
+    """Unrelated or empty messages return no URLs"""
+    print("\n🔍 Asking unrelated questions...")
+    index = UrlIndex(FAQ)
+    for message in ("What is the weather in Tbilisi?", "", "!!!", "Who founded Kan-Guroo?"):
+        assert index.find(message) == [], message
+    assert UrlIndex({}).find("summer school") == []
+    print("✅ No URLs for unrelated messages")
+
+def main():
+    """Run all tests"""
+    print("🚀 URL Index Test")
+    print("=" * 50)
+
+    tests = [
+        test_phrase_matching,
+        test_ranking,
+        test_deduplication,
+        test_no_match
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script for the bounded per-user stats table: heavy hitters, the
+memory ceiling under a flood of unique IDs, error rings and compaction.
+"""
+
+import random
+import sys
+import tracemalloc
+
+from performance_monitor import PerformanceMonitor
+from user_stats import UserStatsTable, CountMinSketch
+
+def record(table, user_id, error=None):
+    table.record(user_id, error is None, 300.0, 700.0, 80, 2.0, error=error)
+
+def test_heavy_hitters():
+    """Frequent users are tracked exactly among a long tail of one-off IDs"""
+    print("\n🔍 Tracking heavy hitters among 20k one-off users...")
+    table = UserStatsTable(256 * 1024)
+    rng = random.Random(7)
+    for i in range(20000):
+        record(table, f"once_{i}")
+        if i % 4 == 0:
+            record(table, f"kiosk_{rng.randrange(5)}")
+    top = table.top(5)
+    assert sorted(top) == [f"kiosk_{i}" for i in range(5)], list(top)
+    assert sum(stats['total_requests'] for stats in top.values()) == 5000
+    assert all(stats['count_error'] == 0 for stats in top.values())
+    assert len(table._users) <= table.capacity
+    print(f"✅ Top 5 exact, {table.get_stats()['tracked_users']}/{table.capacity} entries used")
+
+def test_memory_ceiling():
+    """Memory stays under max_bytes with long IDs and full error rings"""
+    print("\n🔍 Flooding a 1 MB table with unique IDs...")
+    max_bytes = 1024 * 1024
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    table = UserStatsTable(max_bytes, errors_per_user=10)
+    for i in range(60000):
+        user_id = f"user_{i % 3000 if i % 2 else i}_" + 'x' * 200
+        record(table, user_id, error='E' * 500)
+    used = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(before, 'filename'))
+    tracemalloc.stop()
+    stats = table.get_stats()
+    assert used < max_bytes, f"{used} bytes"
+    assert stats['tracked_users'] <= stats['capacity'] and stats['total_requests'] == 60000
+    assert all(len(user_id) <= 128 for user_id in table._users)
+    print(f"✅ {used / 1024:.0f} KB used of {max_bytes // 1024} KB, {stats['evictions']} evictions")
+
+def test_error_ring_and_compaction():
+    """Errors are capped per user; compaction drops idle users and old errors"""
+    print("\n🔍 Capping errors and compacting...")
+    table = UserStatsTable(256 * 1024, errors_per_user=3, idle_seconds=100, error_max_age=10)
+    for i in range(8):
+        record(table, "flaky", error=f"timeout {i}")
+    record(table, "quiet")
+    errors = table.get("flaky")['errors']
+    assert [e['error'] for e in errors] == ['timeout 5', 'timeout 6', 'timeout 7']
+
+    now = errors[-1]['timestamp']
+    table._users['quiet']['last_seen'] = now - 200
+    table.compact(now + 20)
+    assert table.get("flaky")['errors'] == [] and table.get("flaky")['total_requests'] == 8
+    assert table.get("quiet")['approximate'] and table.get_stats()['idle_evictions'] == 1
+    print("✅ 3 of 8 errors kept, idle user and stale errors dropped")
+
+def test_approximate_counts():
+    """Untracked users get sketch counts that never undercount"""
+    print("\n🔍 Reading counts for users outside the table...")
+    sketch = CountMinSketch(64)
+    for i in range(2000):
+        sketch.add(f"user_{i % 200}")
+    assert all(sketch.estimate(f"user_{i}") >= 10 for i in range(200))
+
+    table = UserStatsTable(16 * 1024)
+    for i in range(5000):
+        record(table, f"user_{i}")
+    untracked = next(f"user_{i}" for i in range(5000) if f"user_{i}" not in table._users)
+    stats = table.get(untracked)
+    assert stats['approximate'] and stats['total_requests'] >= 1
+    print(f"✅ {untracked}: ~{stats['total_requests']} requests from the sketch")
+
+def test_monitor_integration():
+    """PerformanceMonitor reports the top users and table counters"""
+    print("\n🔍 Reading user stats through PerformanceMonitor...")
+    monitor = PerformanceMonitor()
+    for i in range(30):
+        user_id = "web_user" if i % 3 else f"guest_{i}"
+        request_id = monitor.start_request(user_id)
+        monitor.record_metrics(request_id, user_id, 300.0, 700.0, True, 80)
+    stats = monitor.get_performance_stats()
+    assert stats['user_stats']['web_user']['total_requests'] == 20
+    assert stats['users']['total_requests'] == 30
+    assert monitor.get_user_stats('web_user')['successful_requests'] == 20
+    monitor.clear_old_data()
+    assert monitor.get_performance_stats()['total_requests'] == 30
+    print("✅ Top users and table counters in the stats")
+
+def main():
+    """Run all tests"""
+    print("🚀 User Stats Test")
+    print("=" * 50)
+
+    tests = [
+        test_heavy_hitters,
+        test_memory_ceiling,
+        test_error_ring_and_compaction,
+        test_approximate_counts,
+        test_monitor_integration
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for the compact viseme wire formats and compressed JSON responses.
+"""
+
+import gzip
+import json
+import os
+import sys
+
+from viseme_engine import viseme_engine
+from viseme_codec import (
+    encode_viseme_data, decode_viseme_data, FORMAT_FULL, FORMAT_COMPACT, FORMAT_BINARY, VISEME_NAMES
+)
+
+TEXT = "Hello there, welcome to Kan-Guroo! Call 555 today."
+
+def assert_same_timeline(decoded, original):
+    assert len(decoded['visemes']) == len(original['visemes'])
+    for got, expected in zip(decoded['visemes'], original['visemes']):
+        assert got['viseme'] == expected['viseme'], (got, expected)
+        assert abs(got['time'] - expected['time']) <= 0.0005, (got, expected)
+    assert decoded['duration'] == original['duration']
+
+def test_round_trip():
+    """Compact and binary payloads decode to the same timeline, without the text"""
+    print("\n🔍 Round-tripping viseme data through both compact formats...")
+    data = viseme_engine.generate(TEXT)
+    full_size = len(json.dumps(data))
+    for fmt in (FORMAT_COMPACT, FORMAT_BINARY):
+        encoded = encode_viseme_data(data, fmt)
+        assert encoded['format'] == fmt and 'text' not in encoded
+        assert_same_timeline(decode_viseme_data(encoded), data)
+        size = len(json.dumps(encoded))
+        assert size < full_size / 3, (fmt, size, full_size)
+        print(f"✅ {fmt}: {size} bytes instead of {full_size}")
+    assert encode_viseme_data(data, FORMAT_FULL) is data
+    assert encode_viseme_data(None, FORMAT_BINARY) is None
+
+def test_run_length_and_deltas():
+    """Repeated visemes are merged and times become millisecond deltas"""
+    print("\n🔍 Checking run-length merging and delta times...")
+    data = {'visemes': [
+        {'time': 0.0, 'viseme': 'viseme_aa'},
+        {'time': 0.1, 'viseme': 'viseme_aa'},
+        {'time': 0.25, 'viseme': 'viseme_PP'},
+        {'time': 0.4, 'viseme': 'viseme_sil'},
+    ], 'duration': 0.4}
+    encoded = encode_viseme_data(data, FORMAT_COMPACT)
+    assert encoded['ids'] == [VISEME_NAMES.index('viseme_aa'), VISEME_NAMES.index('viseme_PP'), 0]
+    assert encoded['dt'] == [0, 250, 150], encoded['dt']
+    print(f"✅ ids {encoded['ids']}, deltas {encoded['dt']}")
+
+def test_binary_limits_and_intensity():
+    """Gaps that don't fit uint16 fall back to compact; intensity tracks survive"""
+    print("\n🔍 Checking long gaps and intensity tracks...")
+    long_gap = {'visemes': [{'time': 0.0, 'viseme': 'viseme_aa'}, {'time': 70.0, 'viseme': 'viseme_sil'}], 'duration': 70.0}
+    assert encode_viseme_data(long_gap, FORMAT_BINARY)['format'] == FORMAT_COMPACT
+
+    data = dict(viseme_engine.generate(TEXT), frame_rate=50, intensity=[0, 20, 100, 55, 0])
+    for fmt in (FORMAT_COMPACT, FORMAT_BINARY):
+        decoded = decode_viseme_data(encode_viseme_data(data, fmt))
+        assert decoded['intensity'] == data['intensity'] and decoded['frame_rate'] == 50
+    print("✅ Long gaps sent compact, intensity track preserved")
+
+def test_json_compression():
+    """JSON API responses are compressed for clients that accept it"""
+    print("\n🔍 Requesting /api/status with and without Accept-Encoding...")
+    os.environ.setdefault("GEMINI_API_KEY", "test")
+    os.environ.setdefault("ELEVENLABS_API_KEY", "test")
+    from app import app
+    client = app.test_client()
+
+    plain = client.get('/api/status')
+    assert 'Content-Encoding' not in plain.headers
+    compressed = client.get('/api/status', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers.get('Content-Encoding') == 'gzip'
+    assert 'Accept-Encoding' in compressed.headers.get('Vary', '')
+    assert json.loads(gzip.decompress(compressed.get_data()))['status'] == plain.get_json()['status']
+    assert int(compressed.headers['Content-Length']) == len(compressed.get_data())
+
+    small = client.get('/api/health', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+    print(f"✅ {len(plain.get_data())} bytes sent as {len(compressed.get_data())} gzip bytes")
+
+def main():
+    """Run all tests"""
+    print("🚀 Viseme Wire Format Test")
+    print("=" * 50)
+
+    tests = [
+        test_round_trip,
+        test_run_length_and_deltas,
+        test_binary_limits_and_intensity,
+        test_json_compression
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script for the text-to-viseme engine: G2P output for known words,
+merging of adjacent identical visemes, fitting the timeline to the audio
+length, and that the per-word cache doesn't keep engines alive.
+"""
+
+import asyncio
+import gc
+import sys
+import weakref
+
+from viseme_engine import VisemeEngine, word_to_phonemes, word_to_segments, ENGINE_ID
+
+def test_g2p_known_words():
+    """Lexicon words, letter-to-sound rules, acronyms and plurals"""
+    print("\n🔍 Converting words to phonemes...")
+    expected = {
+        'Kan-Guroo': ('K', 'AE', 'N', 'G', 'UH', 'R', 'UW'),  # lexicon, hyphenated
+        'Otari': ('OW', 'T', 'AA', 'R', 'IY'),  # lexicon, team name
+        'cat': ('K', 'AE', 'T'),  # spelling rules
+        'ship': ('SH', 'IH', 'P'),  # digraph rule
+        'FAQ': ('EH', 'F', 'EY', 'K', 'Y', 'UW'),  # acronym spelled out
+        'schools': ('S', 'K', 'UW', 'L', 'Z'),
+        'who': ('HH', 'UW')
+    }
+    for word, phonemes in expected.items():
+        assert word_to_phonemes(word) == phonemes, (word, word_to_phonemes(word))
+    assert VisemeEngine().text_to_phonemes("Hi, 2") == ['HH', 'AY', 'sil', 'T', 'UW']
+    print(f"✅ {len(expected)} words converted")
+
+def test_merging():
+    """Identical adjacent visemes merge, within and across words; silent h folds forward"""
+    print("\n🔍 Merging segments...")
+    assert word_to_segments('who') == (('viseme_uu', 0.05 + 0.10),)
+    segments = VisemeEngine().segments("mom mom")
+    names = [viseme for viseme, _ in segments]
+    assert names == ['viseme_PP', 'viseme_aa', 'viseme_PP', 'viseme_aa', 'viseme_PP'], names
+    assert abs(segments[2][1] - 0.14) < 1e-9, "the two m's between the words merge into one keyframe"
+    assert all(a != b for a, b in zip(names, names[1:]))
+
+    timeline = VisemeEngine().generate("Hello, Kan-Guroo students. We offer programs abroad!")
+    keyframes = [frame['viseme'] for frame in timeline['visemes']]
+    assert all(a != b for a, b in zip(keyframes, keyframes[1:])), keyframes
+    assert keyframes[-1] == 'viseme_sil' and timeline['engine'] == ENGINE_ID
+    print(f"✅ {len(keyframes)} keyframes, no repeats")
+
+def test_fit_to_audio_duration():
+    """Timelines stretch or squeeze to the measured audio length"""
+    print("\n🔍 Fitting timelines to the audio length...")
+    engine = VisemeEngine()
+    text = "Welcome to Kan-Guroo, we help students study abroad."
+    natural = engine.generate(text)['duration']
+    for target in (natural * 0.5, natural * 2, 7.25):
+        timeline = engine.generate(text, target_duration=target)
+        assert abs(timeline['duration'] - target) < 0.002, (target, timeline['duration'])
+        times = [frame['time'] for frame in timeline['visemes']]
+        assert times == sorted(times) and times[-1] <= timeline['duration']
+
+    from elevenlabs_service import ElevenLabsService
+    service = ElevenLabsService()
+    viseme_data = asyncio.run(service._generate_viseme_data(text, audio_duration=4.0004))
+    assert viseme_data['audio_duration'] == 4.0 and viseme_data['duration'] == 4.0, viseme_data
+    print(f"✅ Natural {natural}s fitted to 0.5x, 2x and 7.25s")
+
+def test_cache_keeps_no_engines():
+    """Per-word results are cached by word and rate, not by engine instance"""
+    print("\n🔍 Dropping an engine...")
+    engine = VisemeEngine(rate=1.3)
+    fast = engine.segments("kangaroo")
+    reference = weakref.ref(engine)
+    del engine
+    gc.collect()
+    assert reference() is None, "the word cache is keeping the engine alive"
+    assert sum(d for _, d in fast) < sum(d for _, d in VisemeEngine(rate=1.0).segments("kangaroo"))
+    print(f"✅ Engine collected, cache holds {word_to_segments.cache_info().currsize} words")
+
+def main():
+    """Run all tests"""
+    print("🚀 Viseme Engine Test")
+    print("=" * 50)
+
+    tests = [
+        test_g2p_known_words,
+        test_merging,
+        test_fit_to_audio_duration,
+        test_cache_keeps_no_engines
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"❌ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 50)
+    print(f"📊 Test Results: {passed}/{len(tests)} tests passed")
+    if passed != len(tests):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
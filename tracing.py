@@ -0,0 +1,339 @@
+import atexit
+import contextvars
+import json
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, List, Optional
+
+from config import (
+    TRACING_ENABLED, TRACE_BUFFER_SPANS, TRACE_EXPORTERS, TRACE_JSONL_PATH,
+    TRACE_OTLP_ENDPOINT, TRACE_SERVICE_NAME
+)
+
+# W3C trace context header: version-traceid-parentid-flags
+TRACEPARENT = re.compile(r'^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$')
+
+# Wall-clock anchor for the monotonic span clock, so exported times are
+# epoch-based while durations can't jump with NTP adjustments
+_WALL_ANCHOR_NS = time.time_ns()
+_MONO_ANCHOR_NS = time.perf_counter_ns()
+
+def _wall_ns(mono_ns: int) -> int:
+    return _WALL_ANCHOR_NS + (mono_ns - _MONO_ANCHOR_NS)
+
+def new_trace_id() -> str:
+    return f'{random.getrandbits(128):032x}'
+
+def new_span_id() -> str:
+    return f'{random.getrandbits(64):016x}'
+
+def trace_id_from_header(traceparent: Optional[str]) -> Optional[str]:
+    """Trace ID of an incoming ``traceparent`` header, if it is valid"""
+    match = TRACEPARENT.match((traceparent or '').strip().lower())
+    if match and match.group(1) != '0' * 32:
+        return match.group(1)
+    return None
+
+class Span:
+    """One timed operation; durations come from a monotonic clock"""
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'start_ns', 'end_ns',
+                 'attributes', 'error', '_tracer')
+
+    def __init__(self, tracer, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = new_span_id()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.error = None
+        self.end_ns = None
+        self.start_ns = time.perf_counter_ns()
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_error(self, error: Any):
+        self.error = str(error) or type(error).__name__
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.perf_counter_ns()
+            self._tracer._finish(self)
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_time': _wall_ns(self.start_ns) / 1e9,
+            'duration_ms': round(self.duration_ms, 3),
+            'attributes': self.attributes,
+            'error': self.error
+        }
+
+class _NoopSpan:
+    """Stands in for a span when tracing is disabled"""
+
+    trace_id = None
+    span_id = None
+    duration_ms = 0.0
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_error(self, error: Any):
+        pass
+
+    def end(self):
+        pass
+
+NOOP_SPAN = _NoopSpan()
+NOOP_CONTEXT = nullcontext(NOOP_SPAN)
+
+class _ActiveSpan:
+    """Context manager for Tracer.span: current inside the block, ended after it"""
+
+    __slots__ = ('_var', '_span', '_token')
+
+    def __init__(self, var: contextvars.ContextVar, span: Span):
+        self._var = var
+        self._span = span
+
+    def __enter__(self) -> Span:
+        self._token = self._var.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self._span.set_error(exc)
+        self._var.reset(self._token)
+        self._span.end()
+        return False
+
+class JsonlExporter:
+    """Appends one JSON object per span to a file"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: List[Span]):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), default=str) + '\n')
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+class OtlpHttpExporter:
+    """Posts spans as OTLP/JSON to a collector (e.g. http://localhost:4318/v1/traces)"""
+
+    def __init__(self, endpoint: str, service_name: str = TRACE_SERVICE_NAME, timeout: float = 2.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def encode(self, spans: List[Span]) -> Dict[str, Any]:
+        otlp_spans = []
+        for span in spans:
+            otlp_span = {
+                'traceId': span.trace_id,
+                'spanId': span.span_id,
+                'name': span.name,
+                'kind': 1,  # internal
+                'startTimeUnixNano': str(_wall_ns(span.start_ns)),
+                'endTimeUnixNano': str(_wall_ns(span.end_ns)),
+                'attributes': [{'key': key, 'value': _otlp_value(value)} for key, value in span.attributes.items()],
+                'status': {'code': 2, 'message': span.error} if span.error else {'code': 1}
+            }
+            if span.parent_id:
+                otlp_span['parentSpanId'] = span.parent_id
+            otlp_spans.append(otlp_span)
+        return {'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': self.service_name}}]},
+            'scopeSpans': [{'scope': {'name': 'kanguroo.tracing'}, 'spans': otlp_spans}]
+        }]}
+
+    def export(self, spans: List[Span]):
+        body = json.dumps(self.encode(spans)).encode('utf-8')
+        req = urllib.request.Request(self.endpoint, data=body, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(req, timeout=self.timeout) as response:
+            response.read()
+
+class Tracer:
+    """Nested spans with a bounded in-memory buffer and background exporters.
+
+    The current span lives in a context variable, so it follows asyncio
+    tasks (which copy the context when created) and ``asyncio.to_thread``.
+    Finished spans go into a ring buffer of the last ``buffer_size`` spans,
+    used to look up a trace by ID, and into a bounded queue drained by one
+    exporter thread; when the exporters fall behind, spans are dropped and
+    counted rather than slowing requests down.
+    """
+
+    def __init__(self, enabled: bool = True, buffer_size: int = 2048, queue_size: int = 4096,
+                 batch_size: int = 256, flush_interval: float = 1.0):
+        self.enabled = enabled
+        self.buffer = deque(maxlen=buffer_size)
+        self.exporters = []
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._current = contextvars.ContextVar('current_span', default=None)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._worker = None
+        self._lock = threading.Lock()
+        self.spans_finished = 0
+        self.spans_dropped = 0
+        self.export_failures = 0
+
+    def add_exporter(self, exporter):
+        """Send finished spans to ``exporter.export(spans)`` from the exporter thread"""
+        with self._lock:
+            self.exporters.append(exporter)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._export_loop, name='trace-exporter', daemon=True)
+                self._worker.start()
+                atexit.register(self.flush)
+
+    def current_span(self) -> Optional[Span]:
+        return self._current.get()
+
+    def start_span(self, name: str, parent: Optional[Span] = None, trace_id: Optional[str] = None,
+                   **attributes):
+        """Start a span without making it current; call ``end()`` when done
+
+        Without a ``parent`` the current span is used, and without either a
+        new trace is started (with ``trace_id`` when given).
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        if parent is None:
+            parent = self._current.get()
+        if isinstance(parent, Span):
+            return Span(self, name, parent.trace_id, parent.span_id, attributes)
+        return Span(self, name, trace_id or new_trace_id(), None, attributes)
+
+    @contextmanager
+    def activate(self, span):
+        """Make ``span`` the current span inside the block, without ending it"""
+        if not isinstance(span, Span):
+            yield span
+            return
+        token = self._current.set(span)
+        try:
+            yield span
+        finally:
+            self._current.reset(token)
+
+    def span(self, name: str, parent: Optional[Span] = None, trace_id: Optional[str] = None, **attributes):
+        """Time the block as a child of the current span; exceptions are recorded on it
+
+        Not for blocks that ``yield`` in an async generator: the steps of a
+        generator can run in different contexts, so use ``start_span`` there.
+        """
+        if not self.enabled:
+            return NOOP_CONTEXT
+        return _ActiveSpan(self._current, self.start_span(name, parent, trace_id, **attributes))
+
+    def _finish(self, span: Span):
+        self.buffer.append(span)
+        self.spans_finished += 1
+        if self.exporters:
+            try:
+                self._queue.put_nowait(span)
+            except queue.Full:
+                self.spans_dropped += 1
+
+    def _export_batch(self, batch: List[Span]):
+        for exporter in list(self.exporters):
+            try:
+                exporter.export(batch)
+            except Exception as e:
+                self.export_failures += 1
+                print(f"⚠️  Trace export to {type(exporter).__name__} failed: {e}")
+        for _ in batch:
+            self._queue.task_done()
+
+    def _drain(self, first: Optional[Span] = None) -> List[Span]:
+        batch = [first] if first is not None else []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _export_loop(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            self._export_batch(self._drain(first))
+
+    def flush(self):
+        """Export whatever is queued, and wait for a batch the exporter thread is on"""
+        batch = self._drain()
+        while batch:
+            self._export_batch(batch)
+            batch = self._drain()
+        self._queue.join()
+
+    def get_trace(self, trace_id: str) -> List[Dict[str, Any]]:
+        """Buffered spans of one trace, in start order"""
+        spans = [span for span in list(self.buffer) if span.trace_id == trace_id]
+        return [span.to_dict() for span in sorted(spans, key=lambda span: span.start_ns)]
+
+    def recent_traces(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """The last ``limit`` finished root spans, newest first"""
+        roots = []
+        for span in reversed(list(self.buffer)):
+            if span.parent_id is None:
+                roots.append(span.to_dict())
+                if len(roots) >= limit:
+                    break
+        return roots
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'buffered_spans': len(self.buffer),
+            'spans_finished': self.spans_finished,
+            'spans_dropped': self.spans_dropped,
+            'export_failures': self.export_failures,
+            'exporters': [type(exporter).__name__ for exporter in self.exporters]
+        }
+
+def build_tracer() -> Tracer:
+    """The tracer configured by the TRACE_* settings"""
+    tracer = Tracer(TRACING_ENABLED, TRACE_BUFFER_SPANS)
+    for name in filter(None, (part.strip() for part in TRACE_EXPORTERS.split(','))):
+        if name == 'jsonl':
+            tracer.add_exporter(JsonlExporter(TRACE_JSONL_PATH))
+        elif name == 'otlp':
+            tracer.add_exporter(OtlpHttpExporter(TRACE_OTLP_ENDPOINT))
+        else:
+            print(f"⚠️  Unknown trace exporter: {name}")
+    return tracer
+
+# Global tracer instance
+tracer = build_tracer()
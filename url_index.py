@@ -0,0 +1,70 @@
+import re
+from collections import defaultdict
+from typing import Any, Dict, List
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Words in program names that say nothing about which program is meant
+GENERIC_NAME_WORDS = {'abroad', 'course', 'courses', 'language', 'other', 'program', 'programs', 'school'}
+
+# Extra phrases that point at a whole program category
+CATEGORY_KEYWORDS = {
+    'school_exchange': ['exchange', 'high school', 'usa', 'america', 'europe', 'european'],
+    'summer_schools': ['summer', 'summer school', 'summer camp'],
+    'university_programs': ['university', 'degree', 'bachelor', 'master', 'phd', 'doctorate'],
+    'language_courses': ['language course', 'language courses', 'learn a language']
+}
+
+class UrlIndex:
+    """Phrase -> URL index for matching program links in a user message.
+
+    Keywords (single words or short phrases) are matched on word boundaries
+    with one pass over the message's tokens, and URLs are ranked by the summed
+    weight of the keywords that hit them. Specific keywords, like a program's
+    distinctive name words, weigh more than category keywords.
+    """
+
+    def __init__(self, faq_data: Dict[str, Any]):
+        self.phrases = defaultdict(dict)  # phrase tuple -> {url: weight}
+        self._build(faq_data.get('company', {}).get('programs', {}))
+        
+        # Phrases grouped by first word, so most message words cost one dict miss
+        self.by_first_word = defaultdict(list)
+        for words, urls in self.phrases.items():
+            self.by_first_word[words[0]].append((words, list(urls.items())))
+
+    def _add(self, phrase: str, url: str, weight: float):
+        words = tuple(WORD_PATTERN.findall(phrase.lower()))
+        if not words:
+            return
+        current = self.phrases[words].get(url, 0.0)
+        self.phrases[words][url] = max(current, weight)
+
+    def _build(self, programs: Dict[str, List[Dict[str, Any]]]):
+        for program_type, program_list in programs.items():
+            for program in program_list:
+                url = program.get('url')
+                if not url:
+                    continue
+                name_words = WORD_PATTERN.findall(program['name'].lower())
+                # Full program name is the strongest signal
+                self._add(program['name'], url, 3.0)
+                for word in name_words:
+                    if word not in GENERIC_NAME_WORDS:
+                        self._add(word, url, 2.0)
+                for keyword in CATEGORY_KEYWORDS.get(program_type, []):
+                    self._add(keyword, url, 1.0)
+
+    def find(self, message: str) -> List[str]:
+        """Return matching URLs, best match first"""
+        words = WORD_PATTERN.findall(message.lower())
+        scores = defaultdict(float)
+        for start, word in enumerate(words):
+            candidates = self.by_first_word.get(word)
+            if not candidates:
+                continue
+            for phrase, urls in candidates:
+                if len(phrase) == 1 or tuple(words[start:start + len(phrase)]) == phrase:
+                    for url, weight in urls:
+                        scores[url] += weight
+        return [url for url, _ in sorted(scores.items(), key=lambda item: item[1], reverse=True)]
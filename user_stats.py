@@ -0,0 +1,233 @@
+import heapq
+import threading
+import time
+from array import array
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# Worst-case sizes used to turn the memory ceiling into table and sketch
+# sizes (measured with tracemalloc on CPython 3, 64-bit)
+ENTRY_BYTES = 800          # stats dict, user ID of up to MAX_USER_ID_CHARS, table and heap slots
+ERROR_RING_BYTES = 640     # an empty deque
+ERROR_BYTES = 450          # one error record with a message of up to MAX_ERROR_CHARS
+SKETCH_SHARE = 0.25        # part of the ceiling given to the count-min sketches
+SKETCH_DEPTH = 4
+
+# Client-supplied strings are cut to these lengths before they are stored
+MAX_USER_ID_CHARS = 128
+MAX_ERROR_CHARS = 200
+
+class CountMinSketch:
+    """Approximate per-key counts in fixed memory.
+
+    Estimates never undercount; with conservative update, collisions only
+    inflate a count when every row collides.
+    """
+
+    def __init__(self, width: int, depth: int = SKETCH_DEPTH):
+        self.width = width
+        self.depth = depth
+        self.rows = [array('I', [0]) * width for _ in range(depth)]
+
+    def _indexes(self, key: str) -> List[int]:
+        # Double hashing on the (per-process salted) string hash
+        h = hash(key)
+        h1 = h & 0xFFFFFFFF
+        h2 = ((h >> 32) & 0xFFFFFFFF) | 1
+        width = self.width
+        return [(h1 + i * h2) % width for i in range(self.depth)]
+
+    def add(self, key: str, count: int = 1) -> int:
+        """Count ``key`` and return its new estimate"""
+        slots = list(zip(self.rows, self._indexes(key)))
+        counts = [row[index] for row, index in slots]
+        estimate = min(counts) + count
+        for (row, index), current in zip(slots, counts):
+            if current < estimate:
+                row[index] = estimate
+        return estimate
+
+    def estimate(self, key: str) -> int:
+        return min(row[index] for row, index in zip(self.rows, self._indexes(key)))
+
+    @property
+    def nbytes(self) -> int:
+        return self.width * self.depth * self.rows[0].itemsize
+
+class UserStatsTable:
+    """Per-user request stats with a hard memory ceiling.
+
+    The heaviest users get full stats in a table of ``capacity`` entries
+    (Space-Saving: when it is full, a newcomer whose estimated count beats
+    the smallest entry replaces it, and ``count_error`` bounds the
+    overcount). Everyone is counted approximately in count-min sketches, so
+    the long tail still has request and error counts. Errors are kept in a
+    ring buffer of the last ``errors_per_user`` per tracked user.
+
+    Sizes are derived from ``max_bytes`` assuming every entry has a full
+    error ring, so the ceiling holds whatever user IDs clients send.
+    """
+
+    def __init__(self, max_bytes: int, errors_per_user: int = 10, idle_seconds: float = 86400,
+                 error_max_age: float = 3600):
+        self.max_bytes = max_bytes
+        self.errors_per_user = errors_per_user
+        self.idle_seconds = idle_seconds
+        self.error_max_age = error_max_age
+
+        sketch_bytes = int(max_bytes * SKETCH_SHARE)
+        width = max(64, sketch_bytes // (2 * SKETCH_DEPTH * 4))
+        self.requests_sketch = CountMinSketch(width)
+        self.errors_sketch = CountMinSketch(width)
+
+        self.entry_bytes = ENTRY_BYTES + ERROR_RING_BYTES + errors_per_user * ERROR_BYTES
+        table_bytes = max_bytes - self.requests_sketch.nbytes - self.errors_sketch.nbytes
+        self.capacity = max(1, table_bytes // self.entry_bytes)
+
+        self._users: Dict[str, Dict[str, Any]] = {}
+        # (count when pushed, user_id); counts only grow, so the top is a lower bound of the minimum
+        self._heap = []
+        self._lock = threading.Lock()
+
+        self.total_requests = 0
+        self.admissions = 0
+        self.evictions = 0
+        self.idle_evictions = 0
+        self.rejected = 0
+        self.last_compaction_ms = 0.0
+
+    def _new_entry(self, estimate: int, now: float) -> Dict[str, Any]:
+        return {
+            'total_requests': estimate - 1,
+            'count_error': estimate - 1,
+            'successful_requests': 0,
+            'total_gemini_time': 0,
+            'total_tts_time': 0,
+            'total_response_length': 0,
+            'total_audio_seconds': 0,
+            'last_seen': now,
+            'errors': None
+        }
+
+    def _minimum(self):
+        """(count, user_id) of the smallest tracked entry, refreshing stale heap records on the way"""
+        heap = self._heap
+        while heap:
+            count, user_id = heap[0]
+            stats = self._users.get(user_id)
+            if stats is None:
+                heapq.heappop(heap)
+            elif stats['total_requests'] != count:
+                heapq.heapreplace(heap, (stats['total_requests'], user_id))
+            else:
+                return count, user_id
+        return None
+
+    def _admit(self, user_id: str, estimate: int, now: float) -> Optional[Dict[str, Any]]:
+        """Table entry for a user not tracked yet, or None if it doesn't make the cut (caller holds the lock)"""
+        if len(self._users) >= self.capacity:
+            # The heap top is a lower bound of the minimum, so most of the long tail stops here
+            if estimate <= self._heap[0][0]:
+                self.rejected += 1
+                return None
+            minimum = self._minimum()
+            if minimum is None or estimate <= minimum[0]:
+                self.rejected += 1
+                return None
+            heapq.heappop(self._heap)
+            del self._users[minimum[1]]
+            self.evictions += 1
+        stats = self._new_entry(estimate, now)
+        self._users[user_id] = stats
+        heapq.heappush(self._heap, (estimate, user_id))
+        self.admissions += 1
+        return stats
+
+    def record(self, user_id: str, success: bool, gemini_time: float, tts_time: float,
+               response_length: int, audio_seconds: float = 0.0, error: str = None):
+        now = time.time()
+        user_id = str(user_id)[:MAX_USER_ID_CHARS]
+        with self._lock:
+            self.total_requests += 1
+            estimate = self.requests_sketch.add(user_id)
+            if error:
+                self.errors_sketch.add(user_id)
+            stats = self._users.get(user_id)
+            if stats is None:
+                stats = self._admit(user_id, estimate, now)
+                if stats is None:
+                    return
+            stats['total_requests'] += 1
+            if success:
+                stats['successful_requests'] += 1
+            stats['total_gemini_time'] += gemini_time
+            stats['total_tts_time'] += tts_time
+            stats['total_response_length'] += response_length
+            stats['total_audio_seconds'] += audio_seconds
+            stats['last_seen'] = now
+            if error:
+                if stats['errors'] is None:
+                    stats['errors'] = deque(maxlen=self.errors_per_user)
+                stats['errors'].append({'timestamp': now, 'error': str(error)[:MAX_ERROR_CHARS]})
+
+    @staticmethod
+    def _export(stats: Dict[str, Any]) -> Dict[str, Any]:
+        return dict(stats, errors=list(stats['errors'] or ()))
+
+    def get(self, user_id: str) -> Dict[str, Any]:
+        """Full stats for a tracked user, approximate counts for anyone else"""
+        user_id = str(user_id)[:MAX_USER_ID_CHARS]
+        with self._lock:
+            stats = self._users.get(user_id)
+            if stats is not None:
+                return self._export(stats)
+            requests = self.requests_sketch.estimate(user_id)
+            if not requests:
+                return {}
+            return {
+                'total_requests': requests,
+                'errors': self.errors_sketch.estimate(user_id),
+                'approximate': True
+            }
+
+    def top(self, limit: int) -> Dict[str, Dict[str, Any]]:
+        """The ``limit`` tracked users with the most requests"""
+        with self._lock:
+            heaviest = heapq.nlargest(limit, self._users.items(), key=lambda item: item[1]['total_requests'])
+            return {user_id: self._export(stats) for user_id, stats in heaviest}
+
+    def compact(self, now: float = None, error_max_age: float = None):
+        """Drop idle users and old errors, and rebuild the heap without stale records"""
+        now = time.time() if now is None else now
+        start = time.perf_counter()
+        idle_cutoff = now - self.idle_seconds
+        error_cutoff = now - (self.error_max_age if error_max_age is None else error_max_age)
+        with self._lock:
+            for user_id, stats in list(self._users.items()):
+                if stats['last_seen'] < idle_cutoff:
+                    del self._users[user_id]
+                    self.idle_evictions += 1
+                    continue
+                errors = stats['errors']
+                if errors:
+                    while errors and errors[0]['timestamp'] < error_cutoff:
+                        errors.popleft()
+                    if not errors:
+                        stats['errors'] = None
+            self._heap = [(stats['total_requests'], user_id) for user_id, stats in self._users.items()]
+            heapq.heapify(self._heap)
+        self.last_compaction_ms = (time.perf_counter() - start) * 1000
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'tracked_users': len(self._users),
+            'capacity': self.capacity,
+            'max_bytes': self.max_bytes,
+            'sketch_width': self.requests_sketch.width,
+            'total_requests': self.total_requests,
+            'admissions': self.admissions,
+            'evictions': self.evictions,
+            'idle_evictions': self.idle_evictions,
+            'rejected': self.rejected,
+            'last_compaction_ms': round(self.last_compaction_ms, 3)
+        }
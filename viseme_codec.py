@@ -0,0 +1,99 @@
+import base64
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+# Wire formats a client can ask for with "viseme_format" in the request body
+FORMAT_FULL = 'full'        # the viseme_data dict as generated
+FORMAT_COMPACT = 'compact'  # viseme IDs and millisecond deltas as JSON integer lists
+FORMAT_BINARY = 'binary'    # the same arrays packed little-endian in one base64 blob
+VISEME_FORMATS = (FORMAT_FULL, FORMAT_COMPACT, FORMAT_BINARY)
+
+# Viseme ID dictionary shared with LipSyncManager.VISEME_NAMES in static/js/lipsync.js.
+# Only append: IDs are positions in this list.
+VISEME_NAMES = [
+    'viseme_sil', 'viseme_aa', 'viseme_ee', 'viseme_ii', 'viseme_oo', 'viseme_uu', 'viseme_PP',
+    'viseme_ff', 'viseme_th', 'viseme_DD', 'viseme_kk', 'viseme_ss', 'viseme_nn', 'viseme_rr',
+]
+VISEME_IDS = {name: index for index, name in enumerate(VISEME_NAMES)}
+
+MAX_DELTA_MS = 0xFFFF  # delta times are uint16 in the binary blob
+
+def _runs(visemes: List[Dict[str, Any]]) -> Tuple[List[int], List[int]]:
+    """Viseme IDs and delta-encoded millisecond times, with repeated visemes merged"""
+    ids, deltas = [], []
+    previous_ms = 0
+    for viseme in visemes:
+        viseme_id = VISEME_IDS.get(viseme['viseme'], 0)
+        if ids and ids[-1] == viseme_id:
+            continue
+        time_ms = max(previous_ms, int(round(viseme['time'] * 1000)))
+        ids.append(viseme_id)
+        deltas.append(time_ms - previous_ms)
+        previous_ms = time_ms
+    return ids, deltas
+
+def encode_viseme_data(viseme_data: Optional[Dict[str, Any]], fmt: str = FORMAT_FULL) -> Optional[Dict[str, Any]]:
+    """Encode viseme data for the wire.
+
+    The compact forms drop ``text`` (the client already has the answer) and
+    the engine ID. A timeline with a gap longer than 65.5s doesn't fit the
+    binary blob and is sent compact instead.
+    """
+    if not viseme_data or fmt not in (FORMAT_COMPACT, FORMAT_BINARY):
+        return viseme_data
+
+    ids, deltas = _runs(viseme_data.get('visemes') or [])
+    intensity = viseme_data.get('intensity')
+    if fmt == FORMAT_BINARY and all(delta <= MAX_DELTA_MS for delta in deltas):
+        encoded = {
+            'format': FORMAT_BINARY,
+            'count': len(ids),
+            # uint16 deltas first so they stay 2-byte aligned, then uint8 IDs
+            'blob': base64.b64encode(struct.pack(f'<{len(ids)}H{len(ids)}B', *deltas, *ids)).decode('ascii')
+        }
+        if intensity is not None:
+            encoded['intensity'] = base64.b64encode(bytes(intensity)).decode('ascii')
+    else:
+        encoded = {'format': FORMAT_COMPACT, 'ids': ids, 'dt': deltas}
+        if intensity is not None:
+            encoded['intensity'] = list(intensity)
+
+    encoded['duration'] = viseme_data.get('duration', 0)
+    if 'audio_duration' in viseme_data:
+        encoded['audio_duration'] = viseme_data['audio_duration']
+    if intensity is not None:
+        encoded['frame_rate'] = viseme_data.get('frame_rate')
+    if 'source' in viseme_data:
+        encoded['source'] = viseme_data['source']
+    return encoded
+
+def decode_viseme_data(encoded: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Inverse of encode_viseme_data, back to the full format (without text)"""
+    if not encoded or encoded.get('format') not in (FORMAT_COMPACT, FORMAT_BINARY):
+        return encoded
+
+    intensity = encoded.get('intensity')
+    if encoded['format'] == FORMAT_BINARY:
+        count = encoded['count']
+        values = struct.unpack(f'<{count}H{count}B', base64.b64decode(encoded['blob']))
+        deltas, ids = values[:count], values[count:]
+        if intensity is not None:
+            intensity = list(base64.b64decode(intensity))
+    else:
+        deltas, ids = encoded['dt'], encoded['ids']
+
+    visemes = []
+    time_ms = 0
+    for delta, viseme_id in zip(deltas, ids):
+        time_ms += delta
+        visemes.append({'time': time_ms / 1000, 'viseme': VISEME_NAMES[viseme_id]})
+
+    decoded = {'visemes': visemes, 'duration': encoded.get('duration', 0)}
+    if 'audio_duration' in encoded:
+        decoded['audio_duration'] = encoded['audio_duration']
+    if intensity is not None:
+        decoded['intensity'] = intensity
+        decoded['frame_rate'] = encoded.get('frame_rate')
+    if 'source' in encoded:
+        decoded['source'] = encoded['source']
+    return decoded
@@ -0,0 +1,382 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from config import VISEME_SPEAKING_RATE
+
+# Bump when the output changes so cached timelines from older engines are regenerated
+ENGINE_ID = 'g2p-2'
+
+# ARPAbet phoneme -> viseme understood by LipSyncManager.getVisemeIntensity.
+# None means the mouth takes the shape of the following sound (e.g. the h in "who").
+PHONEME_VISEMES = {
+    'AA': 'viseme_aa', 'AE': 'viseme_aa', 'AH': 'viseme_aa', 'AW': 'viseme_aa', 'AY': 'viseme_aa',
+    'AO': 'viseme_oo', 'OW': 'viseme_oo', 'OY': 'viseme_oo',
+    'EH': 'viseme_ee', 'EY': 'viseme_ee',
+    'IH': 'viseme_ii', 'IY': 'viseme_ii', 'Y': 'viseme_ii',
+    'UH': 'viseme_uu', 'UW': 'viseme_uu', 'W': 'viseme_uu',
+    'ER': 'viseme_rr', 'R': 'viseme_rr',
+    'P': 'viseme_PP', 'B': 'viseme_PP', 'M': 'viseme_PP',
+    'F': 'viseme_ff', 'V': 'viseme_ff',
+    'TH': 'viseme_th', 'DH': 'viseme_th',
+    'T': 'viseme_DD', 'D': 'viseme_DD',
+    'K': 'viseme_kk', 'G': 'viseme_kk', 'NG': 'viseme_kk',
+    'N': 'viseme_nn', 'L': 'viseme_nn',
+    'S': 'viseme_ss', 'Z': 'viseme_ss', 'SH': 'viseme_ss', 'ZH': 'viseme_ss', 'CH': 'viseme_ss', 'JH': 'viseme_ss',
+    'HH': None,
+}
+
+# Typical phoneme durations in seconds at speaking rate 1.0
+PHONEME_DURATIONS = {
+    'AA': 0.10, 'AE': 0.09, 'AH': 0.06, 'AO': 0.10, 'AW': 0.13, 'AY': 0.13, 'EH': 0.08, 'ER': 0.09,
+    'EY': 0.12, 'IH': 0.06, 'IY': 0.09, 'OW': 0.11, 'OY': 0.14, 'UH': 0.07, 'UW': 0.10,
+    'B': 0.06, 'D': 0.05, 'G': 0.06, 'K': 0.07, 'P': 0.07, 'T': 0.06,
+    'CH': 0.09, 'JH': 0.08,
+    'DH': 0.04, 'F': 0.08, 'HH': 0.05, 'S': 0.09, 'SH': 0.09, 'TH': 0.07, 'V': 0.05, 'Z': 0.07, 'ZH': 0.07,
+    'M': 0.07, 'N': 0.06, 'NG': 0.07,
+    'L': 0.06, 'R': 0.06, 'W': 0.05, 'Y': 0.05,
+}
+
+# Silence after punctuation, in seconds
+PAUSES = {',': 0.15, ';': 0.2, ':': 0.2, '-': 0.1, '.': 0.3, '!': 0.3, '?': 0.3}
+
+# Gaps between aligned words at least this long close the mouth
+MIN_ALIGNED_PAUSE = 0.08
+
+# Pronunciations the spelling rules get wrong: company, people and program
+# names, and the most common irregular English words
+LEXICON = {
+    # Company, team and programs
+    'kan': 'K AE N', 'guroo': 'G UH R UW', 'kanguroo': 'K AE N G UH R UW',
+    'otari': 'OW T AA R IY', 'melanashvili': 'M EH L AA N AA SH V IY L IY',
+    'saba': 'S AA B AA', 'gelashvili': 'G EH L AA SH V IY L IY',
+    'lasha': 'L AA SH AA', 'bevia': 'B EH V IY AH', 'dona': 'D OW N AH',
+    'usa': 'Y UW EH S EY', 'ceo': 'S IY IY OW', 'cto': 'S IY T IY OW',
+    'www': 'D AH B AH L Y UW D AH B AH L Y UW D AH B AH L Y UW', 'com': 'K AA M',
+    'europe': 'Y UH R AH P', 'european': 'Y UH R AH P IY AH N', 'america': 'AH M EH R IH K AH',
+    'english': 'IH NG G L IH SH', 'german': 'JH ER M AH N', 'georgia': 'JH AO R JH AH',
+    'program': 'P R OW G R AE M', 'programs': 'P R OW G R AE M Z',
+    'course': 'K AO R S', 'courses': 'K AO R S IH Z', 'school': 'S K UW L', 'schools': 'S K UW L Z',
+    'university': 'Y UW N IH V ER S IH T IY', 'language': 'L AE NG G W IH JH',
+    'abroad': 'AH B R AO D', 'study': 'S T AH D IY', 'student': 'S T UW D AH N T',
+    'students': 'S T UW D AH N T S', 'exchange': 'IH K S CH EY N JH', 'degree': 'D IH G R IY',
+    'bachelor': 'B AE CH AH L ER', 'master': 'M AE S T ER', 'founder': 'F AW N D ER',
+    'founders': 'F AW N D ER Z', 'company': 'K AH M P AH N IY', 'welcome': 'W EH L K AH M',
+    'education': 'EH JH AH K EY SH AH N', 'educational': 'EH JH AH K EY SH AH N AH L',
+    # Function words and common irregulars
+    'a': 'AH', 'an': 'AE N', 'and': 'AE N D', 'the': 'DH AH', 'to': 'T UW', 'of': 'AH V',
+    'i': 'AY', 'you': 'Y UW', 'your': 'Y AO R', 'our': 'AW ER', 'we': 'W IY', 'he': 'HH IY',
+    'she': 'SH IY', 'me': 'M IY', 'be': 'B IY', 'my': 'M AY', 'by': 'B AY', 'why': 'W AY',
+    'is': 'IH Z', 'are': 'AA R', 'was': 'W AA Z', 'were': 'W ER', 'what': 'W AH T', 'who': 'HH UW',
+    'how': 'HH AW', 'do': 'D UW', 'does': 'D AH Z', 'they': 'DH EY', 'this': 'DH IH S',
+    'that': 'DH AE T', 'these': 'DH IY Z', 'those': 'DH OW Z', 'there': 'DH EH R',
+    'their': 'DH EH R', 'then': 'DH EH N', 'than': 'DH AE N', 'them': 'DH EH M',
+    'with': 'W IH DH', 'have': 'HH AE V', 'has': 'HH AE Z', 'give': 'G IH V', 'get': 'G EH T',
+    'come': 'K AH M', 'some': 'S AH M', 'from': 'F R AH M', 'about': 'AH B AW T',
+    'also': 'AO L S OW', 'all': 'AO L', 'can': 'K AE N', 'will': 'W IH L', 'us': 'AH S',
+    'hello': 'HH AH L OW', 'hi': 'HH AY', 'yes': 'Y EH S', 'no': 'N OW', 'so': 'S OW', 'go': 'G OW',
+    'many': 'M EH N IY', 'any': 'EH N IY', 'people': 'P IY P AH L', 'help': 'HH EH L P',
+    'one': 'W AH N', 'two': 'T UW', 'three': 'TH R IY', 'four': 'F AO R', 'five': 'F AY V',
+    'six': 'S IH K S', 'seven': 'S EH V AH N', 'eight': 'EY T', 'nine': 'N AY N', 'zero': 'Z IH R OW',
+    'would': 'W UH D', 'could': 'K UH D', 'should': 'SH UH D', 'want': 'W AA N T',
+    'great': 'G R EY T', 'love': 'L AH V', 'live': 'L IH V', 'been': 'B IH N', 'done': 'D AH N',
+    'learn': 'L ER N', 'world': 'W ER L D', 'work': 'W ER K', 'call': 'K AO L', 'contact': 'K AA N T AE K T',
+}
+
+LETTER_NAMES = {
+    'a': 'EY', 'b': 'B IY', 'c': 'S IY', 'd': 'D IY', 'e': 'IY', 'f': 'EH F', 'g': 'JH IY',
+    'h': 'EY CH', 'i': 'AY', 'j': 'JH EY', 'k': 'K EY', 'l': 'EH L', 'm': 'EH M', 'n': 'EH N',
+    'o': 'OW', 'p': 'P IY', 'q': 'K Y UW', 'r': 'AA R', 's': 'EH S', 't': 'T IY', 'u': 'Y UW',
+    'v': 'V IY', 'w': 'D AH B AH L Y UW', 'x': 'EH K S', 'y': 'W AY', 'z': 'Z IY',
+}
+
+DIGIT_WORDS = ['zero', 'one', 'two', 'three', 'four', 'five', 'six', 'seven', 'eight', 'nine']
+
+VOWELS = set('aeiouy')
+
+# Spelling rules: (grapheme, phonemes, condition), tried longest first.
+# Conditions: 'start'/'end' of word, 'soft' (before e/i/y), 'long' (magic e,
+# as in "make"), 'silent' (final e after a consonant).
+GRAPHEME_RULES = [
+    ('augh', 'AO', None), ('ai', 'EY', None), ('ay', 'EY', None), ('au', 'AO', None),
+    ('aw', 'AO', None), ('ar', 'AA R', None), ('a', 'EY', 'long'), ('a', 'AE', None),
+    ('bb', 'B', None), ('b', 'B', None),
+    ('ch', 'CH', None), ('ck', 'K', None), ('cc', 'K', None), ('c', 'S', 'soft'), ('c', 'K', None),
+    ('dge', 'JH', None), ('dd', 'D', None), ('d', 'D', None),
+    ('eigh', 'EY', None), ('ee', 'IY', None), ('ea', 'IY', None), ('ei', 'EY', None),
+    ('ey', 'IY', 'end'), ('ey', 'EY', None), ('ew', 'UW', None), ('er', 'ER', None),
+    ('e', '', 'silent'), ('e', 'IY', 'long'), ('e', 'EH', None),
+    ('ff', 'F', None), ('f', 'F', None),
+    ('gh', 'G', 'start'), ('gh', '', None), ('gg', 'G', None), ('g', 'JH', 'soft'), ('g', 'G', None),
+    ('h', 'HH', None),
+    ('igh', 'AY', None), ('ing', 'IH NG', None), ('ie', 'IY', None), ('ir', 'ER', None),
+    ('i', 'AY', 'long'), ('i', 'IH', None),
+    ('j', 'JH', None),
+    ('kn', 'N', 'start'), ('k', 'K', None),
+    ('ll', 'L', None), ('l', 'L', None),
+    ('mm', 'M', None), ('m', 'M', None),
+    ('ng', 'NG', None), ('nn', 'N', None), ('n', 'N', None),
+    ('ough', 'AO', None), ('oo', 'UW', None), ('ou', 'AW', None), ('ow', 'OW', 'end'), ('ow', 'AW', None),
+    ('oi', 'OY', None), ('oy', 'OY', None), ('oa', 'OW', None), ('or', 'AO R', None),
+    ('o', 'OW', 'long'), ('o', 'OW', 'end'), ('o', 'AA', None),
+    ('ph', 'F', None), ('pp', 'P', None), ('p', 'P', None),
+    ('qu', 'K W', None), ('q', 'K', None),
+    ('rr', 'R', None), ('r', 'R', None),
+    ('sch', 'S K', None), ('sion', 'ZH AH N', None), ('sh', 'SH', None), ('ss', 'S', None), ('s', 'S', None),
+    ('tion', 'SH AH N', None), ('ture', 'CH ER', None), ('tch', 'CH', None), ('th', 'TH', None),
+    ('tt', 'T', None), ('t', 'T', None),
+    ('ue', 'UW', None), ('ur', 'ER', None), ('u', 'UW', 'long'), ('u', 'AH', None),
+    ('v', 'V', None),
+    ('wh', 'W', None), ('wr', 'R', 'start'), ('w', 'W', None),
+    ('x', 'K S', None),
+    ('y', 'Y', 'start'), ('y', 'IY', 'end'), ('y', 'IH', None),
+    ('zz', 'Z', None), ('z', 'Z', None),
+]
+
+RULES_BY_LETTER: Dict[str, List[Tuple[str, List[str], Optional[str]]]] = {}
+for _grapheme, _phonemes, _condition in GRAPHEME_RULES:
+    RULES_BY_LETTER.setdefault(_grapheme[0], []).append((_grapheme, _phonemes.split(), _condition))
+for _rules in RULES_BY_LETTER.values():
+    _rules.sort(key=lambda rule: len(rule[0]), reverse=True)
+
+TOKEN_PATTERN = re.compile(r"[A-Za-z]+(?:['-][A-Za-z]+)*|\d|[,;:.!?-]")
+
+def _rule_applies(word: str, start: int, end: int, condition: Optional[str]) -> bool:
+    if condition is None:
+        return True
+    n = len(word)
+    if condition == 'start':
+        return start == 0
+    if condition == 'end':
+        return end == n
+    if condition == 'soft':
+        return end < n and word[end] in 'eiy'
+    if condition == 'silent':
+        return end == n and n > 2 and word[start - 1] not in VOWELS
+    if condition == 'long':
+        # vowel + one consonant + final e (make, made, makes)
+        return (end + 1 < n and word[end] not in VOWELS and word[end + 1] == 'e'
+                and (end + 2 == n or (end + 3 == n and word[end + 2] in 'sd')))
+    return False
+
+def spell_phonemes(word: str) -> List[str]:
+    """Letter-to-sound rules for a lowercase word that isn't in the lexicon"""
+    phonemes = []
+    i = 0
+    n = len(word)
+    while i < n:
+        for grapheme, output, condition in RULES_BY_LETTER.get(word[i], ()):
+            end = i + len(grapheme)
+            if word.startswith(grapheme, i) and _rule_applies(word, i, end, condition):
+                phonemes.extend(output)
+                i = end
+                break
+        else:
+            i += 1  # no rule (e.g. accented letter), skip it
+    return phonemes
+
+@lru_cache(maxsize=8192)
+def word_to_phonemes(word: str) -> Tuple[str, ...]:
+    """Phonemes for one word token (case matters for acronyms like FAQ)"""
+    lower = word.lower().replace("'", "")
+    if '-' in lower:
+        if lower.replace('-', '') in LEXICON:
+            return tuple(LEXICON[lower.replace('-', '')].split())
+        return tuple(p for part in word.split('-') if part for p in word_to_phonemes(part))
+    if lower in LEXICON:
+        return tuple(LEXICON[lower].split())
+    if word.isupper() and 1 < len(word) <= 5:
+        # Letters without an English name (e.g. accented ones) are skipped
+        return tuple(p for letter in lower for p in LETTER_NAMES.get(letter, '').split())
+    if lower.endswith('s') and lower[:-1] in LEXICON:
+        return tuple(LEXICON[lower[:-1]].split()) + ('Z',)
+    return tuple(spell_phonemes(lower))
+
+@lru_cache(maxsize=8192)
+def word_to_segments(word: str, rate: float = 1.0) -> Tuple[Tuple[str, float], ...]:
+    """(viseme, duration) segments for one word at a speaking rate, already merged
+
+    Module-level so the cache doesn't hold on to engine instances.
+    """
+    segments = []
+    pending = 0.0
+    for phoneme in word_to_phonemes(word):
+        duration = PHONEME_DURATIONS[phoneme] / rate
+        viseme = PHONEME_VISEMES[phoneme]
+        if viseme is None:
+            pending += duration
+            continue
+        duration += pending
+        pending = 0.0
+        if segments and segments[-1][0] == viseme:
+            segments[-1][1] += duration
+        else:
+            segments.append([viseme, duration])
+    if pending and segments:
+        segments[-1][1] += pending
+    return tuple((viseme, duration) for viseme, duration in segments)
+
+class VisemeEngine:
+    """Text -> viseme timeline for LipSyncManager.
+
+    Words go through a lexicon or letter-to-sound rules to get phonemes, each
+    phoneme maps to one of the visemes the frontend knows and gets a typical
+    duration, punctuation adds pauses, and adjacent identical (or very short)
+    segments are merged so the client gets few keyframes. Per-word results
+    are memoized, so a reply is mostly dictionary lookups.
+    """
+
+    def __init__(self, rate: float = 1.0, min_segment: float = 0.07):
+        self.rate = rate
+        self.min_segment = min_segment
+
+    def text_to_phonemes(self, text: str) -> List[str]:
+        """Phoneme sequence for text, with 'sil' for pauses (handy for debugging)"""
+        phonemes = []
+        for token in TOKEN_PATTERN.findall(text):
+            if token in PAUSES:
+                phonemes.append('sil')
+            elif token.isdigit():
+                phonemes.extend(word_to_phonemes(DIGIT_WORDS[int(token)]))
+            else:
+                phonemes.extend(word_to_phonemes(token))
+        return phonemes
+
+    def segments(self, text: str) -> List[List[Any]]:
+        """Merged [viseme, duration] segments for text"""
+        segments: List[List[Any]] = []
+        for token in TOKEN_PATTERN.findall(text):
+            if token in PAUSES:
+                word_segments = (('viseme_sil', PAUSES[token] / self.rate),)
+            elif token.isdigit():
+                word_segments = word_to_segments(DIGIT_WORDS[int(token)], self.rate)
+            else:
+                word_segments = word_to_segments(token, self.rate)
+
+            for viseme, duration in word_segments:
+                if segments and self._absorbs(segments[-1][0], viseme, duration):
+                    segments[-1][1] += duration
+                else:
+                    segments.append([viseme, duration])
+        return segments
+
+    def generate(self, text: str, target_duration: Optional[float] = None) -> Dict[str, Any]:
+        """Viseme timeline in the {'visemes': [{'time', 'viseme'}], 'duration'} format.
+
+        If ``target_duration`` (the real audio length) is known, the timeline
+        is stretched or squeezed to match it.
+        """
+        segments = self.segments(text)
+        total = sum(duration for _, duration in segments)
+        scale = target_duration / total if target_duration and total else 1.0
+
+        visemes = []
+        current_time = 0.0
+        for viseme, duration in segments:
+            visemes.append({'time': round(current_time, 3), 'viseme': viseme})
+            current_time += duration * scale
+        if visemes and visemes[-1]['viseme'] != 'viseme_sil':
+            # Close the mouth when speech ends
+            visemes.append({'time': round(current_time, 3), 'viseme': 'viseme_sil'})
+
+        return {
+            'visemes': visemes,
+            'duration': round(current_time, 3),
+            'text': text,
+            'engine': ENGINE_ID,
+            'source': 'text'
+        }
+
+    def generate_aligned(self, text: str, alignment: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Viseme timeline anchored to character timestamps from the TTS provider.
+
+        ``alignment`` has ElevenLabs' shape: ``characters`` plus
+        ``character_start_times_seconds`` and ``character_end_times_seconds``.
+        Each word's phoneme segments are fitted between its first character's
+        start and its last character's end, and gaps between words become
+        silence, so the mouth can't drift from the audio on long answers.
+        Returns None if the alignment is missing or unusable.
+        """
+        words = alignment_words(alignment)
+        if not words:
+            return None
+
+        segments: List[List[Any]] = []  # [viseme, start, end]
+        last_end = 0.0
+        for word, start, end in words:
+            if start - last_end >= MIN_ALIGNED_PAUSE:
+                self._add_timed(segments, 'viseme_sil', last_end, start)
+            word_segments = word_to_segments(DIGIT_WORDS[int(word)] if word.isdecimal() else word, self.rate)
+            total = sum(duration for _, duration in word_segments)
+            if total > 0 and end > start:
+                scale = (end - start) / total
+                current_time = start
+                for viseme, duration in word_segments:
+                    self._add_timed(segments, viseme, current_time, current_time + duration * scale)
+                    current_time += duration * scale
+            last_end = max(last_end, end)
+
+        if not segments:
+            return None
+        visemes = [{'time': round(start, 3), 'viseme': viseme} for viseme, start, _ in segments]
+        if visemes[-1]['viseme'] != 'viseme_sil':
+            visemes.append({'time': round(last_end, 3), 'viseme': 'viseme_sil'})
+
+        return {
+            'visemes': visemes,
+            'duration': round(last_end, 3),
+            'text': text,
+            'engine': ENGINE_ID,
+            'source': 'alignment'
+        }
+
+    def _absorbs(self, previous: str, viseme: str, duration: float) -> bool:
+        """Whether a new segment merges into the previous one instead of getting a keyframe.
+
+        Speech never merges into a preceding silence, so the mouth opens on time.
+        """
+        if previous == viseme:
+            return True
+        return duration < self.min_segment and not (previous == 'viseme_sil' and viseme != 'viseme_sil')
+
+    def _add_timed(self, segments: List[List[Any]], viseme: str, start: float, end: float):
+        """Append a timed segment, merging it into the previous one if identical or very short"""
+        if segments and self._absorbs(segments[-1][0], viseme, end - start):
+            segments[-1][2] = end
+        else:
+            segments.append([viseme, start, end])
+
+def alignment_words(alignment: Optional[Dict[str, Any]]) -> List[Tuple[str, float, float]]:
+    """Group timed characters into (word, start, end); digits are words of their own
+
+    Only decimal digits count: superscripts like '²' pass ``isdigit()`` but
+    aren't valid for ``int()``, so they're dropped like other symbols.
+    """
+    if not alignment:
+        return []
+    characters = alignment.get('characters') or []
+    starts = alignment.get('character_start_times_seconds') or []
+    ends = alignment.get('character_end_times_seconds') or []
+    if not characters or len(characters) != len(starts) or len(characters) != len(ends):
+        return []
+
+    words = []
+    current, start, end = [], 0.0, 0.0
+    for i, char in enumerate(characters):
+        joins_word = current and char in "'-" and i + 1 < len(characters) and characters[i + 1].isalpha()
+        if char.isalpha() or joins_word:
+            if not current:
+                start = starts[i]
+            current.append(char)
+            end = ends[i]
+            continue
+        if current:
+            words.append((''.join(current), start, end))
+            current = []
+        if char.isdecimal():
+            words.append((char, starts[i], ends[i]))
+    if current:
+        words.append((''.join(current), start, end))
+    return words
+
+# Global viseme engine used by the TTS service
+viseme_engine = VisemeEngine(VISEME_SPEAKING_RATE)